@@ -1,2 +1,3 @@
 from .data_saver import DataSaver
+from .runner import DataSaverRunner
 from .saver import *
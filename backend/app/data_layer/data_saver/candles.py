@@ -0,0 +1,646 @@
+"""
+This module contains the streaming aggregation of the ticks into OHLCV candles. The
+candles of all the intervals of an instrument are updated in O(1) per tick from a flat
+array of floats, without any object per candle until the candle is closed. A candle is
+kept open for `grace_period_ms` milliseconds after its end, so the ticks arriving late
+are still counted, and the closed candles are handed to a candle sink.
+"""
+
+import csv
+import re
+from abc import ABC, abstractmethod
+from array import array
+from bisect import bisect_left, bisect_right
+from collections import deque
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Iterable, NamedTuple, Optional, TextIO
+
+from omegaconf import DictConfig
+from registrable import Registrable
+
+from app.utils.common.logger import get_logger
+
+logger = get_logger(Path(__file__).name)
+
+# Unit of the interval names -> milliseconds
+INTERVAL_UNITS = {"s": 1000, "m": 60 * 1000, "h": 60 * 60 * 1000}
+
+# Fields of a candle in the state array
+START, OPEN, HIGH, LOW, CLOSE, VOLUME, TICKS, FIRST_TS, LAST_TS = range(9)
+CANDLE_FIELDS = 9
+
+# Offsets of the open candle, of the candle waiting for the late ticks and of the
+# start of the last closed candle in the state of an instrument interval
+CURRENT = 0
+PENDING = CANDLE_FIELDS
+CLOSED_START = 2 * CANDLE_FIELDS
+STRIDE = 2 * CANDLE_FIELDS + 1
+
+EMPTY_STATE = array("d", [0.0] * STRIDE)
+EMPTY_STATE[CURRENT + START] = -1
+EMPTY_STATE[PENDING + START] = -1
+EMPTY_STATE[CLOSED_START] = -1
+
+# 09:15 IST, the market open of NSE and BSE, in minutes after 00:00 UTC
+DEFAULT_ORIGIN_MINUTES = 225
+
+DAY_MS = 24 * 60 * 60 * 1000
+
+
+class Candle(NamedTuple):
+    """
+    A closed OHLCV candle of an instrument.
+
+    Attributes
+    ----------
+    symbol: ``str``
+        The symbol of the instrument
+    exchange_id: ``int``
+        The id of the exchange of the instrument
+    interval: ``str``
+        The name of the interval. Eg: "5m"
+    start: ``int``
+        The start of the candle in milliseconds since the epoch
+    open: ``float``
+        The price of the first tick of the candle
+    high: ``float``
+        The highest price of the candle
+    low: ``float``
+        The lowest price of the candle
+    close: ``float``
+        The price of the last tick of the candle
+    volume: ``float``
+        The volume traded during the candle
+    ticks: ``int``
+        The number of ticks of the candle
+    """
+
+    symbol: str
+    exchange_id: int
+    interval: str
+    start: int
+    open: float
+    high: float
+    low: float
+    close: float
+    volume: float
+    ticks: int
+
+
+def parse_interval(interval: str) -> int:
+    """
+    Get the duration of the interval in milliseconds.
+
+    Parameters
+    ----------
+    interval: ``str``
+        The name of the interval, a number followed by `s`, `m` or `h`. Eg: "15m"
+
+    Returns
+    -------
+    ``int``
+        The duration of the interval in milliseconds
+
+    Raises
+    ------
+    ``ValueError``
+        If the interval is not valid
+    """
+    match = re.fullmatch(r"(\d+)([smh])", interval.strip().lower())
+
+    if match is None or int(match.group(1)) == 0:
+        raise ValueError(
+            f"Invalid interval `{interval}`, the interval should be a number "
+            "followed by s, m or h. Eg: 15m"
+        )
+
+    return int(match.group(1)) * INTERVAL_UNITS[match.group(2)]
+
+
+def to_number(value: Any) -> float | None:
+    """
+    Convert the value of the tick to a float, None if the value is missing or -1.
+    """
+    try:
+        number = float(value)
+    except (TypeError, ValueError):
+        return None
+
+    return None if number < 0 else number
+
+
+def get_tick_timestamp(tick: dict[str, Any]) -> int | None:
+    """
+    Get the time of the last trade of the tick in milliseconds since the epoch, or
+    the exchange timestamp if the last traded timestamp is missing. The timestamps
+    are sent in seconds or milliseconds by the data providers.
+    """
+    for field in ("last_traded_timestamp", "exchange_timestamp"):
+        timestamp = to_number(tick.get(field))
+
+        if timestamp:
+            # Timestamps after 1973 in milliseconds are larger than 1e11
+            return int(timestamp if timestamp > 1e11 else timestamp * 1000)
+
+    return None
+
+
+class CandleAggregator:
+    """
+    CandleAggregator builds the OHLCV candles of the instruments for several
+    intervals from the stream of ticks. The state of each instrument interval is a
+    fixed slice of a flat array with the open candle and the previous candle, which
+    stays open until `grace_period_ms` milliseconds after its end. The ticks older
+    than the previous candle are dropped and counted as late. The candles are aligned
+    on `origin_minutes` after 00:00 UTC, so the hourly candles start at the market
+    open.
+
+    The volume of a candle is the difference of the cumulative volume of the day
+    between the ticks, or the last traded quantity of the first tick of the
+    instrument. A cumulative volume lower than the last one is a late tick and adds
+    no volume, unless the tick is from a later trade date, when the volume restarts.
+
+    Attributes
+    ----------
+    intervals: ``Iterable[str]``, ( default = ("1m", "3m", "5m", "15m", "1h") )
+        The names of the intervals of the candles
+    grace_period_ms: ``int``, ( default = 2000 )
+        The time in milliseconds a candle waits for the late ticks after its end,
+        it must be shorter than the shortest interval
+    origin_minutes: ``int``, ( default = 225 )
+        The time of the day in minutes after 00:00 UTC the candles are aligned on,
+        09:15 IST by default
+    """
+
+    def __init__(
+        self,
+        intervals: Iterable[str] = ("1m", "3m", "5m", "15m", "1h"),
+        grace_period_ms: int = 2000,
+        origin_minutes: int = DEFAULT_ORIGIN_MINUTES,
+    ):
+        self.intervals = [(name, parse_interval(name)) for name in intervals]
+
+        if not self.intervals:
+            raise ValueError("At least one interval is required")
+
+        if grace_period_ms >= min(duration for _, duration in self.intervals):
+            raise ValueError(
+                f"The grace period of {grace_period_ms} ms must be shorter than the "
+                "shortest interval"
+            )
+
+        self.grace_period_ms = grace_period_ms
+        self.origin_ms = origin_minutes * 60 * 1000
+
+        self.instruments: dict[tuple[Any, Any], int] = {}
+        self._keys: list[tuple[Any, Any]] = []
+        self._state = array("d")
+        self._last_volume = array("d")
+        self._volume_day = array("d")
+        self._closed: list[Candle] = []
+
+        self.watermark = 0
+        self.ticks = 0
+        self.invalid_ticks = 0
+        self.late_ticks = 0
+
+    def _add_instrument(self, key: tuple[Any, Any]) -> int:
+        index = len(self._keys)
+        self.instruments[key] = index
+        self._keys.append(key)
+        self._state.extend(EMPTY_STATE * len(self.intervals))
+        self._last_volume.append(-1)
+        self._volume_day.append(-1)
+
+        return index
+
+    def _get_volume(self, index: int, tick: dict[str, Any], timestamp: int) -> float:
+        """
+        Get the volume traded since the last tick of the instrument. The late ticks,
+        with a lower cumulative volume or an earlier trade date, add no volume and
+        leave the last volume as is.
+        """
+        cumulative_volume = to_number(tick.get("volume_trade_for_the_day"))
+        last_volume = self._last_volume[index]
+        last_day = self._volume_day[index]
+        day = timestamp // DAY_MS
+
+        if cumulative_volume is None or day < last_day:
+            return 0.0
+
+        if last_volume < 0:
+            volume = to_number(tick.get("last_traded_quantity")) or 0.0
+        elif day > last_day:
+            # The cumulative volume is reset at the start of the day
+            volume = cumulative_volume
+        elif cumulative_volume < last_volume:
+            return 0.0
+        else:
+            volume = cumulative_volume - last_volume
+
+        self._last_volume[index] = cumulative_volume
+        self._volume_day[index] = day
+
+        return volume
+
+    def _start(self, offset: int, start: float, timestamp: int, price: float, volume):
+        state = self._state
+        state[offset + START] = start
+        state[offset + OPEN] = price
+        state[offset + HIGH] = price
+        state[offset + LOW] = price
+        state[offset + CLOSE] = price
+        state[offset + VOLUME] = volume
+        state[offset + TICKS] = 1
+        state[offset + FIRST_TS] = timestamp
+        state[offset + LAST_TS] = timestamp
+
+    def _add(self, offset: int, timestamp: int, price: float, volume: float):
+        state = self._state
+
+        if timestamp < state[offset + FIRST_TS]:
+            state[offset + OPEN] = price
+            state[offset + FIRST_TS] = timestamp
+        if timestamp >= state[offset + LAST_TS]:
+            state[offset + CLOSE] = price
+            state[offset + LAST_TS] = timestamp
+        if price > state[offset + HIGH]:
+            state[offset + HIGH] = price
+        if price < state[offset + LOW]:
+            state[offset + LOW] = price
+
+        state[offset + VOLUME] += volume
+        state[offset + TICKS] += 1
+
+    def _close(self, index: int, interval: int, offset: int):
+        """
+        Close the candle at the offset and add it to the closed candles.
+        """
+        state = self._state
+        base = offset - offset % STRIDE
+        exchange_id, symbol = self._keys[index]
+
+        self._closed.append(
+            Candle(
+                symbol,
+                exchange_id,
+                self.intervals[interval][0],
+                int(state[offset + START]),
+                state[offset + OPEN],
+                state[offset + HIGH],
+                state[offset + LOW],
+                state[offset + CLOSE],
+                state[offset + VOLUME],
+                int(state[offset + TICKS]),
+            )
+        )
+        state[base + CLOSED_START] = state[offset + START]
+        state[offset + START] = -1
+
+    def update(self, tick: dict[str, Any]):
+        """
+        Add the tick to the candles of its instrument. The candles closed by the
+        tick are kept until `drain` is called.
+
+        Parameters
+        ----------
+        tick: ``dict[str, Any]``
+            The decoded tick with its symbol, exchange id, last traded price and
+            timestamps
+        """
+        timestamp = get_tick_timestamp(tick)
+        price = to_number(tick.get("last_traded_price"))
+
+        if timestamp is None or price is None:
+            self.invalid_ticks += 1
+            return
+
+        key = (tick.get("exchange_id"), tick.get("symbol"))
+        index = self.instruments.get(key)
+        if index is None:
+            index = self._add_instrument(key)
+
+        volume = self._get_volume(index, tick, timestamp)
+        self.ticks += 1
+        if timestamp > self.watermark:
+            self.watermark = timestamp
+
+        state = self._state
+        grace_period = self.grace_period_ms
+        is_late = False
+
+        for interval, (_, duration) in enumerate(self.intervals):
+            base = (index * len(self.intervals) + interval) * STRIDE
+            start = timestamp - (timestamp - self.origin_ms) % duration
+            current_start = state[base + START]
+
+            if start == current_start:
+                self._add(base, timestamp, price, volume)
+            elif start > current_start and start > state[base + CLOSED_START]:
+                if current_start >= 0:
+                    if state[base + PENDING + START] >= 0:
+                        self._close(index, interval, base + PENDING)
+                    state[base + PENDING : base + 2 * PENDING] = state[
+                        base : base + PENDING
+                    ]
+                self._start(base, start, timestamp, price, volume)
+            elif start == state[base + PENDING + START]:
+                self._add(base + PENDING, timestamp, price, volume)
+            else:
+                is_late = True
+
+            # The previous candle is closed once the grace period is over
+            pending_start = state[base + PENDING + START]
+            if (
+                pending_start >= 0
+                and timestamp >= pending_start + duration + grace_period
+            ):
+                self._close(index, interval, base + PENDING)
+
+        if is_late:
+            self.late_ticks += 1
+
+    def advance(self, watermark: int | None = None):
+        """
+        Close the candles whose grace period is over at the watermark, so the candles
+        of the instruments without new ticks are closed as well.
+
+        Parameters
+        ----------
+        watermark: ``int | None``, ( default = None )
+            The current time in milliseconds since the epoch, defaults to the latest
+            tick timestamp
+        """
+        watermark = self.watermark if watermark is None else watermark
+        state = self._state
+
+        for index in range(len(self._keys)):
+            for interval, (_, duration) in enumerate(self.intervals):
+                base = (index * len(self.intervals) + interval) * STRIDE
+
+                for offset in (base + PENDING, base + CURRENT):
+                    start = state[offset + START]
+                    if (
+                        0 <= start
+                        and watermark >= start + duration + self.grace_period_ms
+                    ):
+                        self._close(index, interval, offset)
+
+    def close_all(self):
+        """
+        Close all the open candles, used when the aggregation stops.
+        """
+        state = self._state
+
+        for index in range(len(self._keys)):
+            for interval in range(len(self.intervals)):
+                base = (index * len(self.intervals) + interval) * STRIDE
+
+                for offset in (base + PENDING, base + CURRENT):
+                    if state[offset + START] >= 0:
+                        self._close(index, interval, offset)
+
+    def drain(self) -> list[Candle]:
+        """
+        Get the candles closed since the last call.
+        """
+        closed, self._closed = self._closed, []
+        return closed
+
+    def get_state(self) -> dict[str, Any]:
+        """
+        Get the open candles and the last volumes of the instruments, so the
+        aggregation is resumed with `set_state` after a restart. The closed candles
+        are not included, they must be drained before.
+        """
+        return {
+            "intervals": [name for name, _ in self.intervals],
+            "origin_ms": self.origin_ms,
+            "instruments": [list(key) for key in self._keys],
+            "state": self._state.tolist(),
+            "last_volume": self._last_volume.tolist(),
+            "volume_day": self._volume_day.tolist(),
+            "watermark": self.watermark,
+        }
+
+    def set_state(self, state: dict[str, Any]):
+        """
+        Restore the open candles and the last volumes saved by `get_state`.
+
+        Raises
+        ------
+        ``ValueError``
+            If the state was saved with other intervals or another origin, or if it
+            is incomplete
+        """
+        intervals = [name for name, _ in self.intervals]
+        if state.get("intervals") != intervals or state.get("origin_ms") != (
+            self.origin_ms
+        ):
+            raise ValueError(
+                f"The state of the intervals {state.get('intervals')} does not match "
+                f"the intervals {intervals}"
+            )
+
+        keys = [tuple(key) for key in state["instruments"]]
+        if len(state["state"]) != len(keys) * len(intervals) * STRIDE or not (
+            len(state["last_volume"]) == len(state["volume_day"]) == len(keys)
+        ):
+            raise ValueError("The state of the candles is incomplete")
+
+        self._keys = keys
+        self.instruments = {key: index for index, key in enumerate(keys)}
+        self._state = array("d", state["state"])
+        self._last_volume = array("d", state["last_volume"])
+        self._volume_day = array("d", state["volume_day"])
+        self.watermark = state["watermark"]
+
+    def stats(self) -> dict[str, float]:
+        """
+        Get the number of ticks aggregated, invalid and late, and the number of
+        instruments.
+        """
+        return {
+            "ticks": self.ticks,
+            "invalid_ticks": self.invalid_ticks,
+            "late_ticks": self.late_ticks,
+            "instruments": len(self._keys),
+        }
+
+    @classmethod
+    def from_cfg(cls, cfg: DictConfig) -> "CandleAggregator":
+        """
+        Create the aggregator from the configuration of the candle saver.
+        """
+        return cls(
+            intervals=cfg.get("intervals", ("1m", "3m", "5m", "15m", "1h")),
+            grace_period_ms=cfg.get("grace_period_ms", 2000),
+            origin_minutes=cfg.get("origin_minutes", DEFAULT_ORIGIN_MINUTES),
+        )
+
+
+class CandleSink(ABC, Registrable):
+    """
+    This is the base class of the sinks the closed candles are written to. The
+    subclasses should implement the `write` method, the candles are written durably
+    once `flush` returns.
+    """
+
+    @abstractmethod
+    def write(self, candles: list[Candle]):
+        """
+        Write the closed candles.
+
+        Parameters
+        ----------
+        candles: ``list[Candle]``
+            The closed candles, in the order they were closed
+        """
+        raise NotImplementedError
+
+    def flush(self):
+        """
+        Write the buffered candles durably.
+        """
+
+    def close(self):
+        """
+        Write the buffered candles and release the resources of the sink.
+        """
+        self.flush()
+
+    @classmethod
+    @abstractmethod
+    def from_cfg(cls, cfg: DictConfig) -> Optional["CandleSink"]:
+        """
+        Create the sink from the given configuration.
+        """
+        raise NotImplementedError
+
+
+@CandleSink.register("memory_candle_sink")
+class MemoryCandleSink(CandleSink):
+    """
+    MemoryCandleSink keeps the last `max_candles` candles of each instrument interval
+    in memory, to serve the intraday candles without querying a database.
+
+    Attributes
+    ----------
+    max_candles: ``int``, ( default = 1000 )
+        The number of candles kept per instrument and interval
+    """
+
+    def __init__(self, max_candles: int = 1000):
+        self.max_candles = max_candles
+        self.candles: dict[tuple[Any, str, str], deque[Candle]] = {}
+
+    def write(self, candles: list[Candle]):
+        for candle in candles:
+            key = (candle.exchange_id, candle.symbol, candle.interval)
+            history = self.candles.get(key)
+
+            if history is None:
+                history = self.candles[key] = deque(maxlen=self.max_candles)
+
+            # The candles of an instrument interval are closed in order
+            history.append(candle)
+
+    def get_candles(
+        self,
+        symbol: str,
+        exchange_id: int,
+        interval: str,
+        start: int | None = None,
+        end: int | None = None,
+    ) -> list[Candle]:
+        """
+        Get the candles of the instrument interval starting between `start` and
+        `end` inclusive, in milliseconds since the epoch.
+        """
+        history = self.candles.get((exchange_id, symbol, interval))
+        if not history:
+            return []
+
+        starts = [candle.start for candle in history]
+        low = 0 if start is None else bisect_left(starts, start)
+        high = len(starts) if end is None else bisect_right(starts, end)
+
+        return list(history)[low:high]
+
+    @classmethod
+    def from_cfg(cls, cfg: DictConfig) -> Optional["MemoryCandleSink"]:
+        return cls(max_candles=cfg.get("max_candles", 1000))
+
+
+@CandleSink.register("csv_candle_sink")
+class CSVCandleSink(CandleSink):
+    """
+    CSVCandleSink appends the candles of each interval to a csv file per trade date.
+    Eg: `candles_5m_2024_10_21.csv` for `csv_file_path` = "candles.csv". The files of
+    the previous trade dates of an interval are closed at each flush, a late candle
+    opens its file again.
+
+    Attributes
+    ----------
+    csv_file_path: ``str | Path``
+        The path of the csv files, appended with the interval and the UTC date of
+        the candles
+    """
+
+    def __init__(self, csv_file_path: str | Path):
+        csv_file_path = Path(csv_file_path)
+        csv_file_path.parent.mkdir(parents=True, exist_ok=True)
+
+        self._file_path = csv_file_path.with_suffix("")
+        self._files: dict[tuple[str, str], tuple[TextIO, Any]] = {}
+
+    def get_file_path(self, interval: str, date: str) -> Path:
+        """
+        Get the path of the csv file of the interval and the date.
+        """
+        return self._file_path.with_name(
+            f"{self._file_path.name}_{interval}_{date}.csv"
+        )
+
+    def write(self, candles: list[Candle]):
+        for candle in candles:
+            date = datetime.fromtimestamp(candle.start / 1000, tz=timezone.utc)
+            key = (candle.interval, date.strftime("%Y_%m_%d"))
+            entry = self._files.get(key)
+
+            if entry is None:
+                file_path = self.get_file_path(*key)
+                is_new = not file_path.exists() or file_path.stat().st_size == 0
+                file = open(  # pylint: disable=consider-using-with
+                    file_path, "a", encoding="utf-8", newline=""
+                )
+                writer = csv.writer(file)
+                if is_new:
+                    writer.writerow(Candle._fields)
+
+                entry = self._files[key] = (file, writer)
+
+            entry[1].writerow(candle)
+
+    def flush(self):
+        latest_dates: dict[str, str] = {}
+        for interval, date in self._files:
+            latest_dates[interval] = max(date, latest_dates.get(interval, date))
+
+        for key, (file, _) in list(self._files.items()):
+            if key[1] == latest_dates[key[0]]:
+                file.flush()
+            else:
+                file.close()
+                del self._files[key]
+
+    def close(self):
+        for file, _ in self._files.values():
+            file.close()
+
+        self._files = {}
+
+    @classmethod
+    def from_cfg(cls, cfg: DictConfig) -> Optional["CSVCandleSink"]:
+        return cls(cfg.get("csv_file_path"))
@@ -0,0 +1,247 @@
+"""
+This module contains the writer used by the data savers to write the ticks through a
+streaming compressor. The compressed data is split into independent frames, gzip members
+or zstd frames, every `frame_size` bytes of input. A file is a concatenation of frames,
+which the standard tools read as a single stream, and the complete frames of a file
+left partially written by a crash can still be read with `read_compressed_lines`.
+"""
+
+import zlib
+from pathlib import Path
+from typing import Any, BinaryIO, Iterator, cast
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = cast(Any, None)
+
+# Compression name -> file extension
+COMPRESSION_EXTENSIONS = {"gzip": ".gz", "zstd": ".zst"}
+
+# Window bits of zlib to write the gzip format
+GZIP_WBITS = 31
+
+
+def validate_compression(compression: str | None) -> str | None:
+    """
+    Validate the compression name and check that its library is installed.
+
+    Parameters
+    ----------
+    compression: ``str | None``
+        The compression name, one of `gzip` and `zstd`. None or "none" means no
+        compression
+
+    Returns
+    -------
+    ``str | None``
+        The lower case compression name or None for no compression
+
+    Raises
+    ------
+    ``ValueError``
+        If the compression is not supported or its library is not installed
+    """
+    if compression is None or compression.lower() == "none":
+        return None
+
+    compression = compression.lower()
+    if compression not in COMPRESSION_EXTENSIONS:
+        raise ValueError(
+            f"Unsupported compression `{compression}`, supported compressions are "
+            f"{list(COMPRESSION_EXTENSIONS)}"
+        )
+
+    if compression == "zstd" and zstandard is None:
+        raise ValueError("The `zstandard` library is required for the zstd compression")
+
+    return compression
+
+
+class FramedCompressedWriter:
+    """
+    FramedCompressedWriter writes the data to a file through a streaming compressor in
+    large blocks. The data is buffered until `block_size` bytes are collected, then the
+    block is compressed and written with a single write call. A new frame is started
+    every `frame_size` bytes of input.
+
+    Attributes
+    ----------
+    file_path: ``str | Path``
+        The path of the file, the data is appended to the existing file. A compressed
+        file whose last frame was not closed cannot be appended to, as the new frames
+        would be read as part of the incomplete frame
+    compression: ``str | None``, ( default = "zstd" )
+        The compression, `gzip`, `zstd` or None to write the data as it is
+    compression_level: ``int | None``, ( default = None )
+        The compression level, defaults to the default level of the compression
+    frame_size: ``int``, ( default = 16777216 )
+        The number of bytes of input after which the frame is closed
+    block_size: ``int``, ( default = 1048576 )
+        The number of bytes of input buffered before compressing them
+    """
+
+    def __init__(
+        self,
+        file_path: str | Path,
+        compression: str | None = "zstd",
+        compression_level: int | None = None,
+        frame_size: int = 16 * 1024 * 1024,
+        block_size: int = 1024 * 1024,
+    ):
+        self.file_path = Path(file_path)
+        self.compression = validate_compression(compression)
+        self.compression_level = compression_level
+        self.frame_size = frame_size
+        self.block_size = block_size
+
+        self.file: BinaryIO = open(  # pylint: disable=consider-using-with
+            self.file_path, "ab"
+        )
+        self._buffer: list[bytes] = []
+        self._buffer_size = 0
+        self._frame_input_size = 0
+        self._compressor = self._new_compressor()
+
+        self.bytes_in = 0
+        self.bytes_out = 0
+
+    def _new_compressor(self):
+        if self.compression == "gzip":
+            level = (
+                zlib.Z_DEFAULT_COMPRESSION
+                if self.compression_level is None
+                else self.compression_level
+            )
+            return zlib.compressobj(level, zlib.DEFLATED, GZIP_WBITS)
+
+        if self.compression == "zstd":
+            level = 3 if self.compression_level is None else self.compression_level
+            return zstandard.ZstdCompressor(level=level).compressobj()
+
+        return None
+
+    def _write(self, data: bytes):
+        if data:
+            self.file.write(data)
+            self.bytes_out += len(data)
+
+    def write(self, data: bytes):
+        """
+        Add the data to the buffer, the buffer is compressed and written to the file
+        once it has `block_size` bytes.
+
+        Parameters
+        ----------
+        data: ``bytes``
+            The data to be written
+        """
+        self._buffer.append(data)
+        self._buffer_size += len(data)
+
+        if self._buffer_size >= self.block_size:
+            self._write_block()
+
+    def _write_block(self):
+        """
+        Compress the buffered data and write it to the file. The frame is closed once
+        it has `frame_size` bytes of input.
+        """
+        if not self._buffer:
+            return
+
+        block = b"".join(self._buffer)
+        self._buffer = []
+        self._buffer_size = 0
+        self.bytes_in += len(block)
+
+        if self._compressor is None:
+            self._write(block)
+            return
+
+        self._write(self._compressor.compress(block))
+        self._frame_input_size += len(block)
+
+        if self._frame_input_size >= self.frame_size:
+            self._end_frame()
+
+    def _end_frame(self):
+        """
+        Close the current frame and start a new one.
+        """
+        self._write(self._compressor.flush())
+        self._compressor = self._new_compressor()
+        self._frame_input_size = 0
+
+    def flush(self):
+        """
+        Compress the buffered data and write it to the disk. The compressor is flushed
+        without closing the frame, so a streaming reader can decompress all the data
+        written so far while the frame is kept large.
+        """
+        self._write_block()
+
+        if self.compression == "gzip":
+            self._write(self._compressor.flush(zlib.Z_SYNC_FLUSH))
+        elif self.compression == "zstd":
+            self._write(self._compressor.flush(zstandard.COMPRESSOBJ_FLUSH_BLOCK))
+
+        self.file.flush()
+
+    def close(self):
+        """
+        Write the buffered data, close the frame and close the file.
+        """
+        if self.file.closed:
+            return
+
+        self._write_block()
+        if self._compressor is not None and self._frame_input_size:
+            self._end_frame()
+
+        self.file.close()
+
+
+def read_compressed_lines(
+    file_path: str | Path, compression: str | None
+) -> Iterator[bytes]:
+    """
+    Read the lines of a file written by the `FramedCompressedWriter`. The frames are
+    decompressed one after the other, and the data of an incomplete last frame is read
+    up to the last flush, so a file left partially written by a crash can be read.
+
+    Parameters
+    ----------
+    file_path: ``str | Path``
+        The path of the file
+    compression: ``str | None``
+        The compression of the file, `gzip`, `zstd` or None
+
+    Returns
+    -------
+    ``Iterator[bytes]``
+        The lines without the line break
+    """
+    compression = validate_compression(compression)
+    data = Path(file_path).read_bytes()
+    chunks: list[bytes] = []
+
+    while data:
+        if compression == "gzip":
+            decompressor = zlib.decompressobj(GZIP_WBITS)
+            chunks.append(decompressor.decompress(data))
+            data = decompressor.unused_data
+        elif compression == "zstd":
+            zstd_decompressor = zstandard.ZstdDecompressor().decompressobj()
+            try:
+                chunks.append(zstd_decompressor.decompress(data))
+            except zstandard.ZstdError:
+                break
+            data = zstd_decompressor.unused_data
+        else:
+            chunks.append(data)
+            break
+
+    content = b"".join(chunks)
+    # The last line is incomplete if the file was not flushed after it
+    yield from content.split(b"\n")[:-1]
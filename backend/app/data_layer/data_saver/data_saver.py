@@ -1,33 +1,415 @@
+import json
+import time
 from abc import ABC, abstractmethod
-from typing import Optional
+from datetime import datetime
+from pathlib import Path
+from threading import Event
+from typing import Any, Iterable, Optional
 
+from kafka import KafkaConsumer
 from omegaconf import DictConfig
 from registrable import Registrable
 
+from app.data_layer.data_saver.dedup import TickDeduplicator
+from app.data_layer.data_saver.rotation import RotationPolicy
+from app.data_layer.streaming.consumer import StreamConsumer
+from app.utils.common.logger import get_logger
+
+logger = get_logger(Path(__file__).name)
+
+
+def decode_messages(messages: Iterable[Any]) -> list[dict[str, Any]]:
+    """
+    Decode the json messages of the consumer, the invalid messages are skipped.
+
+    Parameters
+    ----------
+    messages: ``Iterable[Any]``
+        The messages with the utf-8 encoded json in their `value`
+
+    Returns
+    -------
+    ``list[dict[str, Any]]``
+        The decoded ticks
+    """
+    ticks = []
+    for message in messages:
+        try:
+            ticks.append(json.loads(message.value))
+        except (TypeError, ValueError) as e:
+            logger.warning("Skipping the invalid message %s: %s", message.value, e)
+
+    return ticks
+
 
 class DataSaver(ABC, Registrable):
     """
     This is the base class for all the data savers. The data savers are
     responsible for retrieving the data from the respective sources and
-    saving the data to the respective databases.The subclasses of this
-    class should implement the `retrieve_and_save` method to retrieve the
-    data from the respective sources and save the data to the respective
-    databases
+    saving the data to the respective databases. The subclasses of this
+    class should implement the `save_batch` method to save a batch of ticks
+    and the `flush` method to write them durably. The `retrieve_and_save`
+    method polls the messages of the consumer in batches and commits the
+    offsets only after the saved ticks are flushed, so a message is consumed
+    again after a restart unless it was saved.
+
+    The data savers writing to files start a new segment when the `rotation`
+    policy says so, which is checked after each flush. The subclasses name
+    their files with `get_segment_path` and implement `segment_size` and
+    `rotate_segment`. The closed segments are compressed and recorded in the
+    manifest in the background. The duplicated ticks are dropped before being
+    saved if a deduplicator is configured.
+
+    Attributes
+    ----------
+    rotation: ``RotationPolicy | None``, ( default = None )
+        The rotation policy of the files, defaults to a daily rotation
+    max_records: ``int``, ( default = 500 )
+        The maximum number of messages fetched by a poll
+    poll_timeout_ms: ``int``, ( default = 1000 )
+        The time in milliseconds to wait for the messages
+    commit_interval: ``float``, ( default = 1.0 )
+        The interval in seconds at which the data saver is flushed and the offsets
+        are committed
     """
 
+    consumer: KafkaConsumer | StreamConsumer
+
+    def __init__(self, rotation: RotationPolicy | None = None):
+        self.rotation = rotation or RotationPolicy()
+        self.segment_period = self.rotation.get_period(datetime.now())
+        self.segment_part = 0
+        self.segment_finalizer = self.rotation.create_finalizer()
+        self.deduplicator: TickDeduplicator | None = None
+
+        self.max_records = 500
+        self.poll_timeout_ms = 1000
+        self.commit_interval = 1.0
+
+        self.consumed_messages = 0
+        self.committed_messages = 0
+        self._stop_event = Event()
+
+    def configure_polling(self, cfg: DictConfig):
+        """
+        Set the polling options from the `poll` section of the configuration, the
+        options that are not given keep their value.
+        Eg: {"poll": {"max_records": 500, "timeout_ms": 1000, "commit_interval": 1.0}}
+        """
+        poll_cfg = cfg.get("poll") or {}
+
+        self.max_records = poll_cfg.get("max_records", self.max_records)
+        self.poll_timeout_ms = poll_cfg.get("timeout_ms", self.poll_timeout_ms)
+        self.commit_interval = poll_cfg.get("commit_interval", self.commit_interval)
+
+    def configure_dedup(self, cfg: DictConfig):
+        """
+        Create the deduplicator of the ticks from the `dedup` section of the
+        configuration, the ticks are not deduplicated if it is not given or invalid.
+        Only the data savers polling their own consumer are configured, the ticks of
+        a shared consumer are deduplicated once by the runner polling it.
+        Eg: {"dedup": {"capacity": 500000, "num_buckets": 4}}
+        """
+        try:
+            self.deduplicator = TickDeduplicator.from_cfg(cfg.get("dedup"))
+        except ValueError as e:
+            logger.error("Invalid dedup configuration: %s. No tick is deduplicated.", e)
+            self.deduplicator = None
+
+    def poll(self, max_records: int, timeout_ms: int) -> list[dict[str, Any]]:
+        """
+        Fetch the next batch of messages from the consumer, decode them and drop
+        the duplicated ticks.
+
+        Parameters
+        ----------
+        max_records: ``int``
+            The maximum number of messages to fetch
+        timeout_ms: ``int``
+            The time in milliseconds to wait for the messages if none are available
+
+        Returns
+        -------
+        ``list[dict[str, Any]]``
+            The decoded ticks, empty if no message arrived before the timeout
+        """
+        batch = self.consumer.poll(timeout_ms=timeout_ms, max_records=max_records)
+        messages = [message for records in batch.values() for message in records]
+        self.consumed_messages += len(messages)
+        ticks = decode_messages(messages)
+
+        if self.deduplicator is not None:
+            ticks = self.deduplicator.filter(ticks)
+
+        return ticks
+
+    def commit(self, flush: bool = True):
+        """
+        Commit the offsets of the consumed messages. The offsets are never committed
+        once a row failed to be saved, the ticks are consumed again from the last
+        committed offset when the data saver is restarted.
+
+        Parameters
+        ----------
+        flush: ``bool``, ( default = True )
+            If True, the saved ticks are flushed before committing the offsets
+
+        Raises
+        ------
+        ``RuntimeError``
+            If rows failed to be saved, the offsets are not committed
+        """
+        if flush:
+            self.flush()
+            self.rotate_if_needed()
+
+        self.check_failed_rows()
+
+        if self.committed_messages < self.consumed_messages:
+            self.consumer.commit()
+            self.committed_messages = self.consumed_messages
+
+    def check_failed_rows(self):
+        """
+        Check that no row failed to be saved, by the `failed_rows` of the stats of the
+        data saver. The failed rows are not retried by the data saver, so once a row
+        failed, the offsets must not be committed anymore and the data saver stops.
+        It is then created again by `save_data` or the supervisor, and the messages
+        not committed are consumed again, which retries the failed rows.
+
+        Raises
+        ------
+        ``RuntimeError``
+            If rows failed to be saved
+        """
+        failed_rows = self.stats().get("failed_rows", 0)
+        if failed_rows:
+            raise RuntimeError(
+                f"{failed_rows} rows failed to be saved by {type(self).__name__}, "
+                "the offsets are not committed"
+            )
+
+    def get_segment_path(
+        self, file_path: Path, suffix: str, append: bool = True
+    ) -> Path:
+        """
+        Get the path of the current segment of a file. The segments already finalized
+        are skipped, so a closed segment is never written again.
+
+        Parameters
+        ----------
+        file_path: ``Path``
+            The path of the file without the period and the suffix. Eg: `db/data`
+        suffix: ``str``
+            The suffix of the file. Eg: `.csv`
+        append: ``bool``, ( default = True )
+            If False, the existing segments are skipped as well
+
+        Returns
+        -------
+        ``Path``
+            The path of the segment. Eg: `db/data_2021_09_01.csv`, or
+            `db/data_2021_09_01_1.csv` for the second part of the period
+        """
+        part = self.segment_part
+
+        while True:
+            name = file_path.name
+            if self.segment_period:
+                name += f"_{self.segment_period}"
+            if part:
+                name += f"_{part}"
+
+            segment_path = file_path.with_name(name + suffix)
+            is_finalized = (
+                self.segment_finalizer is not None
+                and self.segment_finalizer.is_finalized(segment_path)
+            )
+
+            if not is_finalized and (append or not segment_path.exists()):
+                return segment_path
+
+            part += 1
+
+    def segment_size(self) -> int:
+        """
+        Get the size in bytes of the current segment, used for the size based
+        rotation.
+        """
+        return 0
+
+    def rotate_segment(self) -> list[Path]:
+        """
+        Close the files of the current segment, the next files are named after the
+        new `segment_period` and `segment_part`.
+
+        Returns
+        -------
+        ``list[Path]``
+            The paths of the closed files, to be finalized
+        """
+        return []
+
+    def rotate_if_needed(self) -> bool:
+        """
+        Start a new segment if the period of the current one is over or if it is
+        full, and finalize the closed files in the background.
+
+        Returns
+        -------
+        ``bool``
+            True if a new segment was started
+        """
+        period = self.rotation.get_period(datetime.now())
+
+        if period != self.segment_period:
+            self.segment_period = period
+            self.segment_part = 0
+        elif self.rotation.is_full(self.segment_size()):
+            self.segment_part += 1
+        else:
+            return False
+
+        self.finalize_segments(self.rotate_segment())
+        return True
+
+    def finalize_segments(self, file_paths: Iterable[Path], wait: bool = False):
+        """
+        Compress the closed files and record them in the manifest in the background.
+
+        Parameters
+        ----------
+        file_paths: ``Iterable[Path]``
+            The paths of the closed files
+        wait: ``bool``, ( default = False )
+            If True, wait until all the closed files are finalized and stop the
+            background thread, used when the data saver is closed
+        """
+        if self.segment_finalizer is None:
+            return
+
+        for file_path in file_paths:
+            self.segment_finalizer.submit(file_path)
+
+        if wait:
+            self.segment_finalizer.close()
+
+    def stop(self):
+        """
+        Stop `retrieve_and_save` after the current batch.
+        """
+        self._stop_event.set()
+
+    def retrieve_and_save(self) -> bool:
+        """
+        This method retrieves the data from the respective sources in batches
+        and saves the data to the respective databases, until `stop` is called
+        or an error occurs. The offsets are committed every `commit_interval`
+        seconds and when the data saver stops, but not after an error.
+
+        Returns
+        -------
+        ``bool``
+            True if the data saver stopped without an error
+        """
+        name = type(self).__name__
+        last_commit_time = time.monotonic()
+        failed = False
+
+        try:
+            while not self._stop_event.is_set():
+                data = self.poll(self.max_records, self.poll_timeout_ms)
+
+                if data:
+                    self.save_batch(data)
+
+                if time.monotonic() - last_commit_time >= self.commit_interval:
+                    self.commit()
+                    last_commit_time = time.monotonic()
+        except Exception as e:
+            failed = True
+            logger.error("Error while saving data with %s: %s", name, e)
+        finally:
+            try:
+                self.close()
+            except Exception as e:
+                failed = True
+                logger.error("Failed to close %s: %s", name, e)
+
+            if not failed:
+                try:
+                    self.commit(flush=False)
+                except Exception as e:
+                    failed = True
+                    logger.error("Failed to commit the offsets of %s: %s", name, e)
+
+            logger.info(
+                "%s: %s messages consumed, %s messages committed",
+                name,
+                self.consumed_messages,
+                self.committed_messages,
+            )
+            if self.deduplicator is not None:
+                logger.info("%s dedup stats: %s", name, self.deduplicator.stats())
+
+        return not failed
+
+    def stats(self) -> dict[str, float]:
+        """
+        Get the stats specific to the data saver, such as the insertion throughput.
+        """
+        return {}
+
+    def metrics(self) -> dict[str, float]:
+        """
+        Get the number of messages consumed and committed with the stats of the data
+        saver and of its deduplicator.
+        """
+        metrics = {
+            "consumed_messages": self.consumed_messages,
+            "committed_messages": self.committed_messages,
+            **self.stats(),
+        }
+
+        if self.deduplicator is not None:
+            dedup_stats = self.deduplicator.stats()
+            metrics["duplicate_ticks"] = dedup_stats["duplicate_ticks"]
+
+        return metrics
+
     @abstractmethod
-    def retrieve_and_save(self):
+    def save_batch(self, data: list[dict[str, Any]]):
         """
-        This method retrieves the data from the respective sources and
-        saves the data to the respective databases
+        Save a batch of decoded ticks. The ticks may be buffered by the data saver,
+        they are guaranteed to be written only after `flush` returns.
+
+        Parameters
+        ----------
+        data: ``list[dict[str, Any]]``
+            The ticks to be saved
         """
         raise NotImplementedError
 
+    def flush(self):
+        """
+        Write all the ticks saved so far durably, so the messages of the ticks can
+        be marked as consumed.
+        """
+
+    def close(self):
+        """
+        Write the remaining ticks and release the resources of the data saver.
+        """
+        self.flush()
+
     @classmethod
     @abstractmethod
-    def from_cfg(cls, cfg: DictConfig) -> Optional["DataSaver"]:
+    def from_cfg(
+        cls, cfg: DictConfig, consumer: KafkaConsumer | StreamConsumer | None = None
+    ) -> Optional["DataSaver"]:
         """
         This method creates an instance of the DataSaver class from the
-        given configuration
+        given configuration. The consumer is created from the streaming
+        configuration unless a shared `consumer` is given
         """
         raise NotImplementedError
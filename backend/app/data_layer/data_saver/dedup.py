@@ -0,0 +1,169 @@
+"""
+This module contains the deduplication stage applied to the ticks before they are
+saved. The ticks are replayed by the reconnections of the sockets and by the consumers
+reading uncommitted or earliest offsets again. A tick is identified by its data
+provider, its instrument and its sequence number, or its exchange timestamp with the
+traded price and volume when the data provider doesn't send a sequence number. The
+keys of the last ticks are kept in a fixed number of buckets, so the memory is bounded.
+"""
+
+from collections import deque
+from pathlib import Path
+from typing import Any, Hashable, Optional
+
+from omegaconf import DictConfig
+
+from app.utils.common.logger import get_logger
+
+logger = get_logger(Path(__file__).name)
+
+
+def is_missing(value: Any) -> bool:
+    """
+    Check if the field of the tick is missing, the data providers send -1 for the
+    missing values.
+    """
+    return value is None or value in (-1, "-1", "")
+
+
+def get_tick_key(tick: dict[str, Any]) -> Hashable | None:
+    """
+    Get the key identifying the tick.
+
+    Parameters
+    ----------
+    tick: ``dict[str, Any]``
+        The decoded tick
+
+    Returns
+    -------
+    ``Hashable | None``
+        The key of the tick, None if the tick has neither a sequence number nor a
+        timestamp set by the exchange, in which case it can't be deduplicated
+    """
+    instrument = tick.get("token")
+    if is_missing(instrument):
+        instrument = (tick.get("exchange_id"), tick.get("symbol"))
+
+    provider = tick.get("data_provider_id")
+    sequence_number = tick.get("sequence_number")
+
+    if not is_missing(sequence_number):
+        return (provider, instrument, tick.get("subscription_mode"), sequence_number)
+
+    timestamp = tick.get("exchange_timestamp")
+    if is_missing(timestamp):
+        timestamp = tick.get("last_traded_timestamp")
+
+    if is_missing(timestamp):
+        return None
+
+    return (
+        provider,
+        instrument,
+        timestamp,
+        tick.get("last_traded_price"),
+        tick.get("volume_trade_for_the_day"),
+    )
+
+
+class TickDeduplicator:
+    """
+    TickDeduplicator drops the ticks already seen among the last `capacity` ticks.
+    The keys are stored in `num_buckets` sets, the new keys are added to the newest
+    set and the oldest set is dropped once the newest one is full. The buckets are
+    rotated by the number of keys, not by time, so a tick replayed after more than
+    `capacity - capacity / num_buckets` newer ticks may be saved again. The keys
+    themselves are compared, so two different ticks are never dropped as duplicates.
+
+    Attributes
+    ----------
+    capacity: ``int``, ( default = 500000 )
+        The maximum number of keys kept
+    num_buckets: ``int``, ( default = 4 )
+        The number of sets the keys are split into, a larger number drops fewer keys
+        at once but makes each lookup slower
+    """
+
+    def __init__(self, capacity: int = 500_000, num_buckets: int = 4):
+        if capacity < num_buckets or num_buckets < 1:
+            raise ValueError(
+                f"The capacity {capacity} must be at least the number of buckets "
+                f"{num_buckets}, which must be positive"
+            )
+
+        self.capacity = capacity
+        self.num_buckets = num_buckets
+        self.bucket_size = capacity // num_buckets
+        self._buckets: deque[set[Hashable]] = deque([set()], maxlen=num_buckets)
+
+        self.seen_ticks = 0
+        self.duplicate_ticks = 0
+        self.unkeyed_ticks = 0
+
+    def is_duplicate(self, tick: dict[str, Any]) -> bool:
+        """
+        Check if the tick was already seen and remember it otherwise.
+        """
+        self.seen_ticks += 1
+        key = get_tick_key(tick)
+
+        if key is None:
+            self.unkeyed_ticks += 1
+            return False
+
+        if any(key in bucket for bucket in self._buckets):
+            self.duplicate_ticks += 1
+            return True
+
+        if len(self._buckets[-1]) >= self.bucket_size:
+            self._buckets.append(set())
+
+        self._buckets[-1].add(key)
+        return False
+
+    def filter(self, ticks: list[dict[str, Any]]) -> list[dict[str, Any]]:
+        """
+        Drop the duplicated ticks.
+
+        Parameters
+        ----------
+        ticks: ``list[dict[str, Any]]``
+            The decoded ticks
+
+        Returns
+        -------
+        ``list[dict[str, Any]]``
+            The ticks not seen before, in their order
+        """
+        return [tick for tick in ticks if not self.is_duplicate(tick)]
+
+    def stats(self) -> dict[str, float]:
+        """
+        Get the number of ticks seen, dropped as duplicates and without a key, and
+        the hit rate of the duplicates.
+        """
+        return {
+            "seen_ticks": self.seen_ticks,
+            "duplicate_ticks": self.duplicate_ticks,
+            "unkeyed_ticks": self.unkeyed_ticks,
+            "hit_rate": (
+                self.duplicate_ticks / self.seen_ticks if self.seen_ticks else 0
+            ),
+            "keys": sum(len(bucket) for bucket in self._buckets),
+        }
+
+    @classmethod
+    def from_cfg(cls, cfg: Optional[DictConfig]) -> Optional["TickDeduplicator"]:
+        """
+        Create the deduplicator from the `dedup` section of the configuration, None
+        if the section is not given or not enabled.
+        Eg: {"enabled": true, "capacity": 500000, "num_buckets": 4}
+        """
+        if not cfg or not cfg.get("enabled", True):
+            return None
+
+        return cls(
+            capacity=cfg.get("capacity", 500_000),
+            num_buckets=cfg.get("num_buckets", 4),
+        )
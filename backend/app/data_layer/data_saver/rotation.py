@@ -0,0 +1,338 @@
+"""
+This module contains the rotation policy of the files written by the data savers and
+the finalizer of the closed files. A data saver starts a new file, a segment, every day
+or every hour and once its file reaches `max_size_mb` MB. The closed segments are
+compressed in a background thread and recorded in a manifest, so the downstream jobs
+can pick up the finished segments from the manifest without scanning the directory
+or reading the files that are still written.
+"""
+
+import gzip
+import json
+import os
+import shutil
+from datetime import datetime, timezone
+from pathlib import Path
+from queue import Queue
+from threading import Lock, Thread
+from typing import Any, Optional, cast
+
+from omegaconf import DictConfig
+
+from app.data_layer.data_saver.compressed_file import (
+    COMPRESSION_EXTENSIONS,
+    validate_compression,
+)
+from app.utils.common.logger import get_logger
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = cast(Any, None)
+
+logger = get_logger(Path(__file__).name)
+
+# Rotation period -> date format of the segment names
+ROTATION_PERIODS = {"daily": "%Y_%m_%d", "hourly": "%Y_%m_%d_%H"}
+
+
+class SegmentManifest:
+    """
+    SegmentManifest records the finalized segments in a jsonl file, one entry per
+    segment with the path of the final file, the path of the file as it was written,
+    their sizes, the compression and the time it was closed. An entry is appended
+    only once the final file is complete.
+
+    Attributes
+    ----------
+    manifest_path: ``str | Path``
+        The path of the manifest file
+    """
+
+    def __init__(self, manifest_path: str | Path):
+        self.manifest_path = Path(manifest_path)
+        self.manifest_path.parent.mkdir(parents=True, exist_ok=True)
+
+        self._lock = Lock()
+        self._sources = {entry["source"] for entry in self.read()}
+
+    def read(self) -> list[dict[str, Any]]:
+        """
+        Read the entries of the manifest. A last line left incomplete by a crash
+        is skipped.
+
+        Returns
+        -------
+        ``list[dict[str, Any]]``
+            The entries in the order the segments were finalized
+        """
+        if not self.manifest_path.exists():
+            return []
+
+        entries = []
+        with open(self.manifest_path, encoding="utf-8") as file:
+            for line in file:
+                try:
+                    entries.append(json.loads(line))
+                except ValueError:
+                    logger.warning("Skipping the invalid manifest entry: %s", line)
+
+        return entries
+
+    def add(self, entry: dict[str, Any]):
+        """
+        Append the entry of a finalized segment and sync it to the disk.
+        """
+        with self._lock:
+            with open(self.manifest_path, "a", encoding="utf-8") as file:
+                file.write(json.dumps(entry) + "\n")
+                file.flush()
+                os.fsync(file.fileno())
+
+            self._sources.add(entry["source"])
+
+    def __contains__(self, file_path: str | Path) -> bool:
+        return str(file_path) in self._sources
+
+
+class SegmentFinalizer:
+    """
+    SegmentFinalizer compresses the closed segments and records them in the manifest
+    in a background thread, so the data saver doesn't wait for the compression. A
+    segment is compressed to a temporary file which is moved to its final name before
+    the segment is removed, then the entry is added to the manifest.
+
+    Attributes
+    ----------
+    compression: ``str | None``, ( default = None )
+        The compression of the closed segments, `gzip`, `zstd` or None to keep them
+        as they are. The segments that are already compressed are not compressed again
+    compression_level: ``int | None``, ( default = None )
+        The compression level, defaults to the default level of the compression
+    manifest_path: ``str | Path | None``, ( default = None )
+        The path of the manifest of the finalized segments, no manifest is written
+        if not given
+    """
+
+    def __init__(
+        self,
+        compression: str | None = None,
+        compression_level: int | None = None,
+        manifest_path: str | Path | None = None,
+    ):
+        self.compression = validate_compression(compression)
+        self.compression_level = compression_level
+        self.manifest = SegmentManifest(manifest_path) if manifest_path else None
+
+        self._queue: Queue[Path | None] = Queue()
+        self._thread: Thread | None = None
+        self._lock = Lock()
+
+        self.finalized_files = 0
+        self.failed_files = 0
+
+    def get_compressed_path(self, file_path: Path) -> Path:
+        """
+        Get the path of the compressed segment. Eg: `data_2021_09_01.csv.gz`.
+        """
+        extension = COMPRESSION_EXTENSIONS[self.compression]  # type: ignore
+        return file_path.with_name(file_path.name + extension)
+
+    def is_finalized(self, file_path: Path) -> bool:
+        """
+        Check if the segment was already finalized, in which case it must not be
+        written again.
+        """
+        if self.manifest is not None and file_path in self.manifest:
+            return True
+
+        return self.compression is not None and (
+            self.get_compressed_path(file_path).exists()
+        )
+
+    def _compress(self, file_path: Path) -> Path:
+        """
+        Compress the segment to its final path and remove the segment.
+        """
+        compressed_path = self.get_compressed_path(file_path)
+        temp_path = compressed_path.with_name(compressed_path.name + ".tmp")
+
+        with open(file_path, "rb") as source:
+            if self.compression == "gzip":
+                level = 6 if self.compression_level is None else self.compression_level
+                with gzip.open(temp_path, "wb", compresslevel=level) as target:
+                    shutil.copyfileobj(source, target, 1024 * 1024)
+            else:
+                level = 3 if self.compression_level is None else self.compression_level
+                with open(temp_path, "wb") as target:
+                    zstandard.ZstdCompressor(level=level).copy_stream(source, target)
+
+        os.replace(temp_path, compressed_path)
+        file_path.unlink()
+
+        return compressed_path
+
+    def finalize(self, file_path: str | Path) -> Path | None:
+        """
+        Compress the segment and add it to the manifest.
+
+        Parameters
+        ----------
+        file_path: ``str | Path``
+            The path of the closed segment
+
+        Returns
+        -------
+        ``Path | None``
+            The path of the finalized segment, None if the segment could not be
+            finalized
+        """
+        file_path = Path(file_path)
+
+        try:
+            source_size = file_path.stat().st_size
+            final_path = file_path
+
+            if self.compression is not None and not any(
+                file_path.name.endswith(extension)
+                for extension in COMPRESSION_EXTENSIONS.values()
+            ):
+                final_path = self._compress(file_path)
+
+            if self.manifest is not None:
+                self.manifest.add(
+                    {
+                        "path": str(final_path),
+                        "source": str(file_path),
+                        "size": final_path.stat().st_size,
+                        "source_size": source_size,
+                        "compression": (
+                            None if final_path == file_path else self.compression
+                        ),
+                        "closed_at": datetime.now(timezone.utc).isoformat(),
+                    }
+                )
+        except Exception as e:
+            self.failed_files += 1
+            logger.error("Failed to finalize the segment %s: %s", file_path, e)
+            return None
+
+        self.finalized_files += 1
+        return final_path
+
+    def _run(self):
+        while (file_path := self._queue.get()) is not None:
+            self.finalize(file_path)
+
+    def submit(self, file_path: str | Path):
+        """
+        Queue the closed segment to be finalized in the background thread.
+        """
+        with self._lock:
+            if self._thread is None:
+                self._thread = Thread(target=self._run, daemon=True)
+                self._thread.start()
+
+        self._queue.put(Path(file_path))
+
+    def close(self):
+        """
+        Wait for the queued segments to be finalized and stop the thread.
+        """
+        with self._lock:
+            if self._thread is None:
+                return
+
+            self._queue.put(None)
+            self._thread.join()
+            self._thread = None
+
+
+class RotationPolicy:
+    """
+    RotationPolicy decides when a data saver starts a new segment. The segments are
+    named after the period they were started in, with a part number once the size
+    limit is reached within the period.
+    Eg: `data_2021_09_01.csv`, then `data_2021_09_01_1.csv`.
+
+    Attributes
+    ----------
+    when: ``str | None``, ( default = "daily" )
+        The period of the segments, `daily`, `hourly` or None to rotate on the size
+        only
+    max_size_mb: ``float | None``, ( default = None )
+        The size in MB after which a new segment is started, no limit if None
+    compression: ``str | None``, ( default = None )
+        The compression of the closed segments, `gzip`, `zstd` or None
+    compression_level: ``int | None``, ( default = None )
+        The compression level of the closed segments
+    manifest_path: ``str | Path | None``, ( default = None )
+        The path of the manifest of the closed segments
+    """
+
+    def __init__(
+        self,
+        when: str | None = "daily",
+        max_size_mb: float | None = None,
+        compression: str | None = None,
+        compression_level: int | None = None,
+        manifest_path: str | Path | None = None,
+    ):
+        if when is not None and when not in ROTATION_PERIODS:
+            raise ValueError(
+                f"Unsupported rotation `{when}`, supported rotations are "
+                f"{list(ROTATION_PERIODS)}"
+            )
+
+        self.when = when
+        self.max_size = int(max_size_mb * 1024 * 1024) if max_size_mb else None
+        self.compression = validate_compression(compression)
+        self.compression_level = compression_level
+        self.manifest_path = manifest_path
+
+    def get_period(self, now: datetime) -> str:
+        """
+        Get the name of the period of the given time. Eg: `2021_09_01` for the daily
+        rotation, empty if the segments are rotated on the size only.
+        """
+        if self.when is None:
+            return ""
+
+        return now.strftime(ROTATION_PERIODS[self.when])
+
+    def is_full(self, size: int) -> bool:
+        """
+        Check if a segment of the given size in bytes must be rotated.
+        """
+        return self.max_size is not None and size >= self.max_size
+
+    def create_finalizer(self) -> SegmentFinalizer | None:
+        """
+        Create the finalizer of the closed segments, None if they are neither
+        compressed nor recorded in a manifest.
+        """
+        if self.compression is None and self.manifest_path is None:
+            return None
+
+        return SegmentFinalizer(
+            self.compression, self.compression_level, self.manifest_path
+        )
+
+    @classmethod
+    def from_cfg(cls, cfg: Optional[DictConfig]) -> "RotationPolicy":
+        """
+        Create the rotation policy from the `rotation` section of the data saver
+        configuration, the daily rotation is used if it is not given.
+        Eg: {"when": "hourly", "max_size_mb": 256, "compression": "zstd",
+        "manifest_path": "data/manifest.jsonl"}
+        """
+        if not cfg:
+            return cls()
+
+        return cls(
+            when=cfg.get("when", "daily"),
+            max_size_mb=cfg.get("max_size_mb"),
+            compression=cfg.get("compression"),
+            compression_level=cfg.get("compression_level"),
+            manifest_path=cfg.get("manifest_path"),
+        )
@@ -0,0 +1,274 @@
+"""
+This module contains the runner that feeds all the data savers from a single consumer.
+Each message is fetched and decoded once, and the batch of ticks is handed to every
+data saver. The offsets are committed only after all the data savers have flushed the
+ticks, so a message is marked as consumed once it is saved by all of them.
+"""
+
+import time
+from pathlib import Path
+from threading import Event
+from typing import Iterable, Optional, cast
+
+from kafka import KafkaConsumer
+from kafka.errors import NoBrokersAvailable
+from omegaconf import DictConfig
+
+from app.data_layer.data_saver.data_saver import DataSaver, decode_messages
+from app.data_layer.data_saver.dedup import TickDeduplicator
+from app.data_layer.streaming.consumer import StreamConsumer, init_consumer
+from app.utils.common import init_from_cfg
+from app.utils.common.logger import get_logger
+
+logger = get_logger(Path(__file__).name)
+
+
+class DataSaverRunner:
+    """
+    DataSaverRunner polls the messages of the topic in batches with a single consumer
+    and dispatches the decoded ticks to all the data savers. Every `commit_interval`
+    seconds, the data savers whose own `commit_interval` is over are flushed. The
+    offsets of the consumer are committed once all the data savers are flushed, at
+    the longest `commit_interval` of the data savers, so the data savers that finalize
+    their files on flush, like the parquet saver, keep their rotation interval. If a
+    data saver fails, the runner stops without committing, so the uncommitted messages
+    are consumed again on restart and the data savers may save some ticks twice.
+
+    Attributes
+    ----------
+    consumer: ``KafkaConsumer | StreamConsumer``
+        The consumer shared by the data savers
+    savers: ``dict[str, DataSaver]``
+        The data savers by name
+    max_records: ``int``, ( default = 1000 )
+        The maximum number of messages fetched by a poll
+    timeout_ms: ``int``, ( default = 1000 )
+        The time in milliseconds to wait for the messages
+    commit_interval: ``float``, ( default = 1.0 )
+        The interval in seconds at which the data savers are checked for a flush and
+        the offsets for a commit
+    deduplicator: ``TickDeduplicator | None``, ( default = None )
+        The deduplicator dropping the duplicated ticks once before they are handed
+        to the data savers
+    """
+
+    def __init__(
+        self,
+        consumer: KafkaConsumer | StreamConsumer,
+        savers: dict[str, DataSaver],
+        max_records: int = 1000,
+        timeout_ms: int = 1000,
+        commit_interval: float = 1.0,
+        deduplicator: TickDeduplicator | None = None,
+    ):
+        self.consumer = consumer
+        self.savers = savers
+        self.max_records = max_records
+        self.timeout_ms = timeout_ms
+        self.commit_interval = commit_interval
+        self.deduplicator = deduplicator
+
+        self.consumed_messages = 0
+        self.committed_messages = 0
+        self._stop_event = Event()
+
+        # The time of the last flush of each data saver and of the last commit
+        now = time.monotonic()
+        self._flush_times = {name: now for name in savers}
+        self._commit_time = now
+
+    def run_once(self) -> int:
+        """
+        Poll a batch of messages and hand the decoded ticks to all the data savers.
+
+        Returns
+        -------
+        ``int``
+            The number of messages consumed
+        """
+        batch = self.consumer.poll(
+            timeout_ms=self.timeout_ms, max_records=self.max_records
+        )
+        count = 0
+
+        for messages in batch.values():
+            ticks = decode_messages(messages)
+            count += len(messages)
+
+            if self.deduplicator is not None:
+                ticks = self.deduplicator.filter(ticks)
+
+            if not ticks:
+                continue
+
+            for saver in self.savers.values():
+                saver.save_batch(ticks)
+
+        self.consumed_messages += count
+        return count
+
+    def commit(self):
+        """
+        Flush the data savers whose `commit_interval` is over. Once the longest
+        `commit_interval` of the data savers is over, all the data savers are flushed
+        and the offsets of the consumed messages are committed. The files of the data
+        savers are rotated after the flush if needed.
+
+        Raises
+        ------
+        ``RuntimeError``
+            If a data saver failed to save rows, the offsets are not committed
+        """
+        now = time.monotonic()
+        commit_interval = max(
+            (saver.commit_interval for saver in self.savers.values()),
+            default=self.commit_interval,
+        )
+        commit_offsets = now - self._commit_time >= commit_interval
+
+        for name, saver in self.savers.items():
+            if commit_offsets or now - self._flush_times[name] >= saver.commit_interval:
+                saver.flush()
+                saver.rotate_if_needed()
+                self._flush_times[name] = now
+
+            saver.check_failed_rows()
+
+        if not commit_offsets:
+            return
+
+        self._commit_time = now
+        if self.committed_messages < self.consumed_messages:
+            self.consumer.commit()
+            self.committed_messages = self.consumed_messages
+
+    def run(self) -> bool:
+        """
+        Consume the messages until `stop` is called or an error occurs. The data
+        savers are closed and the consumed messages are committed when the runner
+        stops without an error.
+
+        Returns
+        -------
+        ``bool``
+            True if the runner stopped without an error
+        """
+        last_commit_time = time.monotonic()
+        failed = False
+
+        try:
+            while not self._stop_event.is_set():
+                self.run_once()
+
+                if time.monotonic() - last_commit_time >= self.commit_interval:
+                    self.commit()
+                    last_commit_time = time.monotonic()
+        except Exception as e:
+            failed = True
+            logger.error(
+                "Error while saving data, the uncommitted messages will be consumed "
+                "again: %s",
+                e,
+            )
+        finally:
+            self.close(commit=not failed)
+
+        return not failed
+
+    def stop(self):
+        """
+        Stop the runner after the current batch.
+        """
+        self._stop_event.set()
+
+    def close(self, commit: bool = True):
+        """
+        Close the data savers and the consumer.
+
+        Parameters
+        ----------
+        commit: ``bool``, ( default = True )
+            If True, the consumed messages are committed once all the data savers
+            are closed
+        """
+        for name, saver in self.savers.items():
+            try:
+                saver.close()
+                saver.check_failed_rows()
+            except Exception as e:
+                commit = False
+                logger.error("Failed to close the data saver %s: %s", name, e)
+
+        if commit and self.committed_messages < self.consumed_messages:
+            self.consumer.commit()
+            self.committed_messages = self.consumed_messages
+
+        self.consumer.close()
+        logger.info(
+            "%s messages consumed, %s messages committed",
+            self.consumed_messages,
+            self.committed_messages,
+        )
+        if self.deduplicator is not None:
+            logger.info("Dedup stats: %s", self.deduplicator.stats())
+
+    @classmethod
+    def from_cfg(
+        cls, cfg: DictConfig, savers_cfg: Iterable[DictConfig]
+    ) -> Optional["DataSaverRunner"]:
+        """
+        Create the shared consumer from the streaming configuration of the runner and
+        the data savers fed by it.
+
+        Parameters
+        ----------
+        cfg: ``DictConfig``
+            The configuration of the runner with its `streaming` configuration
+        savers_cfg: ``Iterable[DictConfig]``
+            The list of the data saver configurations by name.
+            Eg: [{"csv_saver": {...}}, {"jsonl_saver": {...}}]
+        """
+        try:
+            deduplicator = TickDeduplicator.from_cfg(cfg.get("dedup"))
+        except ValueError as e:
+            logger.error("Invalid dedup configuration: %s. No data will be saved.", e)
+            return None
+
+        try:
+            consumer = init_consumer(cfg.streaming, cfg.get("group_name", "data_saver"))
+        except NoBrokersAvailable:
+            logger.error(
+                "No Broker is available at the address: %s. No data will be saved.",
+                cfg.streaming.kafka_server,
+            )
+            return None
+        except ValueError as e:
+            logger.error("Failed to create the consumer: %s. No data will be saved.", e)
+            return None
+
+        savers: dict[str, DataSaver] = {}
+        for saver_cfg in savers_cfg:
+            saver_name, config = list(saver_cfg.items())[0]
+            saver = cast(
+                DataSaver | None, init_from_cfg(config, DataSaver, consumer=consumer)
+            )
+
+            if saver is None:
+                logger.error("Data saver %s is not registered", saver_name)
+                continue
+
+            savers[str(saver_name)] = saver
+
+        if not savers:
+            logger.error("No data saver could be created. No data will be saved.")
+            consumer.close()
+            return None
+
+        return cls(
+            consumer,
+            savers,
+            max_records=cfg.get("max_records", 1000),
+            timeout_ms=cfg.get("timeout_ms", 1000),
+            commit_interval=cfg.get("commit_interval", 1.0),
+            deduplicator=deduplicator,
+        )
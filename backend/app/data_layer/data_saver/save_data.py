@@ -1,23 +1,106 @@
+import time
+from operator import methodcaller
 from pathlib import Path
 from threading import Thread
+from typing import Any, Callable
 
 import hydra
-from omegaconf import DictConfig
+from omegaconf import DictConfig, OmegaConf
 
 from app.data_layer.data_saver.data_saver import DataSaver
+from app.data_layer.data_saver.runner import DataSaverRunner
+from app.data_layer.data_saver.supervisor import SaverSupervisor
 from app.utils.common import init_from_cfg
 from app.utils.common.logger import get_logger
 
 logger = get_logger(Path(__file__).name)
 
 
+def run_with_restarts(
+    name: str,
+    saver: Any,
+    create: Callable[[], Any],
+    run: Callable[[Any], bool],
+    restart_delay: float = 1.0,
+    max_restart_delay: float = 60,
+):
+    """
+    Run the data saver, or the runner of the data savers, and create it again when it
+    stops on an error. The new consumer starts from the committed offsets, so the
+    messages of the rows that failed to be saved are consumed again. The delay before
+    a restart is doubled at each restart up to `max_restart_delay` and reset once the
+    data saver runs for longer than `max_restart_delay`.
+
+    Parameters
+    ----------
+    name: ``str``
+        The name of the data saver
+    saver: ``Any``
+        The data saver or the runner to run first
+    create: ``Callable[[], Any]``
+        The function creating the data saver again, returns None on failure
+    run: ``Callable[[Any], bool]``
+        The function running the data saver, returns True if it stopped without an
+        error
+    restart_delay: ``float``, ( default = 1.0 )
+        The delay in seconds before the data saver is restarted
+    max_restart_delay: ``float``, ( default = 60 )
+        The maximum delay in seconds before the data saver is restarted
+    """
+    delay = 0.0
+
+    while True:
+        started_at = time.monotonic()
+        if saver is not None and run(saver):
+            return
+
+        if time.monotonic() - started_at > max_restart_delay:
+            delay = 0
+
+        delay = min(max(delay * 2, restart_delay), max_restart_delay)
+        logger.error("%s stopped on an error, restarting it in %s seconds", name, delay)
+        time.sleep(delay)
+        saver = create()
+
+
 @hydra.main(config_path="../../configs", config_name="data_saver", version_base=None)
 def main(cfg: DictConfig) -> None:
     """
     This is the main function that starts the data saver threads. The data saver
     threads are responsible for retrieving the data from the respective sources
-    and saving the data to the respective databases.
+    and saving the data to the respective databases. With `shared_consumer`, the
+    data savers are fed by a single consumer instead of one consumer per saver.
+    With the `process` execution mode, each data saver runs in its own processes
+    under a supervisor instead of a thread. The data savers, or the runner, stopping
+    on an error are restarted after the `restart_delay` of the execution.
     """
+    execution_cfg = cfg.get("execution") or OmegaConf.create()
+    restart_delay = execution_cfg.get("restart_delay", 1.0)
+    max_restart_delay = execution_cfg.get("max_restart_delay", 60)
+
+    if cfg.get("shared_consumer"):
+        runner = DataSaverRunner.from_cfg(cfg.runner, cfg.data_saver)
+
+        if runner is not None:
+            logger.info("Starting the savers %s", list(runner.savers))
+            run_with_restarts(
+                "DataSaverRunner",
+                runner,
+                lambda: DataSaverRunner.from_cfg(cfg.runner, cfg.data_saver),
+                methodcaller("run"),
+                restart_delay,
+                max_restart_delay,
+            )
+        return
+
+    if execution_cfg.get("mode", "thread") == "process":
+        supervisor = SaverSupervisor.from_cfg(execution_cfg, cfg.data_saver)
+
+        if supervisor is not None:
+            logger.info("Starting the saver processes %s", supervisor.processes)
+            supervisor.run()
+        return
+
     savers = []
     for data_saver_config in cfg.data_saver:
         data_saver_name, config = list(data_saver_config.items())[0]
@@ -27,8 +110,18 @@ def main(cfg: DictConfig) -> None:
             logger.error("Data saver %s is not registered", data_saver_name)
             continue
 
-        # Create a thread for each saver
-        saver_thread = Thread(target=data_saver.retrieve_and_save)
+        # Create a thread for each saver, restarting the saver on an error
+        saver_thread = Thread(
+            target=run_with_restarts,
+            args=(
+                data_saver_name,
+                data_saver,
+                lambda config=config: init_from_cfg(config, DataSaver),
+                methodcaller("retrieve_and_save"),
+                restart_delay,
+                max_restart_delay,
+            ),
+        )
         logger.info("Starting the saver %s", data_saver_name)
 
         # Start the saver thread to retrieve and save the data
@@ -1,3 +1,7 @@
+from .arrow_saver import ArrowDataSaver
+from .candle_saver import CandleDataSaver
 from .csv_saver import CSVDataSaver
 from .jsonl_saver import JSONLDataSaver
+from .parquet_saver import ParquetDataSaver
+from .postgres_saver import PostgresDataSaver
 from .sqlite_saver import SqliteDataSaver
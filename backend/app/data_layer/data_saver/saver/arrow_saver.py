@@ -0,0 +1,404 @@
+import uuid
+from datetime import date, datetime, timezone
+from pathlib import Path
+from typing import Any, Iterable, Iterator, Optional
+
+import numpy as np
+from kafka import KafkaConsumer
+from kafka.errors import NoBrokersAvailable
+from omegaconf import DictConfig
+
+from app.data_layer.data_saver.data_saver import DataSaver
+from app.data_layer.data_saver.saver.parquet_saver import (
+    COLUMN_TYPES,
+    CONVERTERS,
+    get_schema,
+    to_epoch_ms,
+)
+from app.data_layer.streaming.consumer import StreamConsumer, init_consumer
+from app.utils.common.logger import get_logger
+
+try:
+    import pyarrow as pa
+    import pyarrow.compute as pc
+    from pyarrow import ipc
+except ImportError:
+    pa = None
+    pc = None
+    ipc = None
+
+logger = get_logger(Path(__file__).name)
+
+# Extension of the Arrow IPC stream files
+ARROW_STREAM_EXTENSION = ".arrows"
+
+
+def get_trade_date(data: dict[str, Any]) -> str:
+    """
+    Get the trade date of the tick, the UTC date of the last traded timestamp, or of
+    the retrieval timestamp if the former is missing.
+    """
+    timestamp = to_epoch_ms(data.get("last_traded_timestamp")) or to_epoch_ms(
+        data.get("retrieval_timestamp")
+    )
+    if not timestamp:
+        return "unknown"
+
+    return datetime.fromtimestamp(timestamp / 1000, tz=timezone.utc).date().isoformat()
+
+
+def to_record_batch(
+    ticks: list[dict[str, Any]], schema: "pa.Schema"
+) -> "pa.RecordBatch":
+    """
+    Convert the ticks to a record batch sorted by the symbol and the last traded
+    timestamp. The dictionary of the symbols is sorted, so the rows of a symbol are
+    a contiguous run of the same dictionary index and can be sliced without copying
+    them when they are read.
+
+    Parameters
+    ----------
+    ticks: ``list[dict[str, Any]]``
+        The decoded ticks
+    schema: ``pa.Schema``
+        The schema of the tick columns
+
+    Returns
+    -------
+    ``pa.RecordBatch``
+        The record batch of the ticks
+    """
+    columns: dict[str, list] = {name: [] for name in COLUMN_TYPES}
+
+    for tick in ticks:
+        for name, column_type in COLUMN_TYPES.items():
+            value = tick.get(name)
+            columns[name].append(
+                None if value is None else CONVERTERS[column_type](value)
+            )
+
+    order = sorted(
+        range(len(ticks)),
+        key=lambda i: (
+            columns["symbol"][i] or "",
+            columns["last_traded_timestamp"][i] or -1,
+        ),
+    )
+
+    arrays = []
+    for name in COLUMN_TYPES:
+        values = [columns[name][i] for i in order]
+
+        if name == "symbol":
+            dictionary = sorted({symbol for symbol in values if symbol is not None})
+            codes = {symbol: code for code, symbol in enumerate(dictionary)}
+            arrays.append(
+                pa.DictionaryArray.from_arrays(
+                    pa.array([codes.get(symbol) for symbol in values], pa.int32()),
+                    pa.array(dictionary, pa.string()),
+                )
+            )
+        else:
+            arrays.append(pa.array(values, type=schema.field(name).type))
+
+    return pa.record_batch(arrays, schema=schema)
+
+
+@DataSaver.register("arrow_saver")
+class ArrowDataSaver(DataSaver):
+    """
+    ArrowDataSaver retrieve the data from kafka consumer and save it to Arrow IPC
+    stream files, one file per trade date and run of the saver.
+    Eg: `date=2024-10-21/ticks-20241021091500-1a2b3c4d.arrows`. The ticks are written
+    as record batches sorted by the symbol and the last traded timestamp, with the
+    schema of the parquet saver. The stream format has no footer, so the files are
+    readable while they are written and after a crash, up to their last complete
+    record batch. The files are read back with `read_arrow_ticks`.
+
+    Attributes
+    ----------
+    consumer: ``KafkaConsumer``
+        Kafka consumer object to consume the data from the specified topic
+    output_dir: ``str | Path``
+        The root directory of the files
+    batch_size: ``int``, ( default = 10000 )
+        The number of ticks buffered before writing a record batch
+    flush_interval: ``float``, ( default = 1.0 )
+        The maximum time in seconds the ticks wait in the buffer
+    """
+
+    def __init__(
+        self,
+        consumer: KafkaConsumer,
+        output_dir: str | Path,
+        batch_size: int = 10000,
+        flush_interval: float = 1.0,
+    ) -> None:
+        if pa is None:
+            raise ValueError("The `pyarrow` library is required for the arrow saver")
+
+        super().__init__()
+        self.consumer = consumer
+        self.output_dir = Path(output_dir)
+        self.batch_size = batch_size
+        self.commit_interval = flush_interval
+
+        self.schema = get_schema()
+        self.session = (
+            f"{datetime.now().strftime('%Y%m%d%H%M%S')}-{uuid.uuid4().hex[:8]}"
+        )
+        self.buffers: dict[str, list[dict[str, Any]]] = {}
+        self.writers: dict[str, tuple[Any, Any]] = {}
+        self.file_paths: dict[str, Path] = {}
+
+    def save_batch(self, data: list[dict[str, Any]]):
+        """
+        Add the ticks to the buffers of their trade date, writing a record batch once
+        a buffer has `batch_size` ticks.
+        """
+        for tick in data:
+            trade_date = get_trade_date(tick)
+            buffer = self.buffers.setdefault(trade_date, [])
+            buffer.append(tick)
+
+            if len(buffer) >= self.batch_size:
+                self._write(trade_date)
+
+    def _write(self, trade_date: str):
+        """
+        Write the buffered ticks of the trade date to its file as a record batch.
+        """
+        ticks = self.buffers.pop(trade_date, None)
+        if not ticks:
+            return
+
+        if trade_date not in self.writers:
+            directory = self.output_dir / f"date={trade_date}"
+            directory.mkdir(parents=True, exist_ok=True)
+            file_path = directory / f"ticks-{self.session}{ARROW_STREAM_EXTENSION}"
+
+            # A closed stream can't be appended to, the late ticks go to a new file
+            part = 0
+            while file_path.exists():
+                part += 1
+                file_path = file_path.with_name(
+                    f"ticks-{self.session}_{part}{ARROW_STREAM_EXTENSION}"
+                )
+
+            sink = pa.OSFile(str(file_path), "wb")
+            self.writers[trade_date] = (sink, ipc.new_stream(sink, self.schema))
+            self.file_paths[trade_date] = file_path
+
+        self.writers[trade_date][1].write_batch(to_record_batch(ticks, self.schema))
+
+    def _close_writer(self, trade_date: str):
+        sink, writer = self.writers.pop(trade_date)
+        writer.close()
+        sink.close()
+        logger.info("Arrow file %s closed", self.file_paths.pop(trade_date))
+
+    def flush(self):
+        """
+        Write the buffered ticks and close the files of the previous trade dates.
+        """
+        for trade_date in list(self.buffers):
+            self._write(trade_date)
+
+        trade_dates = [key for key in self.writers if key != "unknown"]
+        for trade_date in trade_dates:
+            if trade_date != max(trade_dates):
+                self._close_writer(trade_date)
+
+    def close(self):
+        """
+        Write the buffered ticks and close all the files.
+        """
+        for trade_date in list(self.buffers):
+            self._write(trade_date)
+
+        for trade_date in list(self.writers):
+            self._close_writer(trade_date)
+
+    @classmethod
+    def from_cfg(
+        cls, cfg: DictConfig, consumer: KafkaConsumer | StreamConsumer | None = None
+    ) -> Optional["ArrowDataSaver"]:
+        """
+        Create an instance of the ArrowDataSaver class from the given configuration.
+        A new consumer is created unless a shared `consumer` is given.
+        """
+        if pa is None:
+            logger.error(
+                "The `pyarrow` library is not installed. No data will be saved."
+            )
+            return None
+
+        try:
+            saver = cls(
+                (
+                    consumer
+                    if consumer is not None
+                    else init_consumer(cfg.streaming, cfg.get("name"))
+                ),
+                cfg.get("output_dir"),
+                batch_size=cfg.get("batch_size", 10000),
+                flush_interval=cfg.get("flush_interval", 1.0),
+            )
+            saver.configure_polling(cfg)
+            if consumer is None:
+                saver.configure_dedup(cfg)
+
+            return saver
+        except NoBrokersAvailable:
+            logger.error(
+                "No Broker is available at the address: %s. No data will be saved.",
+                cfg.streaming.kafka_server,
+            )
+            return None
+        except ValueError as e:
+            logger.error("Failed to create the consumer: %s. No data will be saved.", e)
+            return None
+
+
+def read_stream_batches(file_path: Path) -> list["pa.RecordBatch"]:
+    """
+    Memory map the Arrow IPC stream file and read its record batches without copying
+    them. The batches of a file being written or left truncated by a crash are read
+    up to the last complete batch.
+    """
+    source = pa.memory_map(str(file_path))
+
+    try:
+        reader = ipc.open_stream(source)
+    except pa.ArrowInvalid:
+        # The schema is not written yet
+        return []
+
+    batches = []
+    while True:
+        try:
+            batches.append(reader.read_next_batch())
+        except StopIteration:
+            break
+        except (pa.ArrowInvalid, OSError) as e:
+            logger.warning("Arrow file %s is truncated: %s", file_path, e)
+            break
+
+    return batches
+
+
+def get_symbol_runs(
+    batch: "pa.RecordBatch", symbols: Iterable[str] | None
+) -> Iterator[tuple[int, int]]:
+    """
+    Get the start and end rows of the runs of the symbols in the record batch, the
+    rows of a batch are sorted by the symbol.
+    """
+    symbol_column = batch.column("symbol")
+    codes = pc.fill_null(symbol_column.indices, -1).to_numpy()
+    dictionary = symbol_column.dictionary.to_pylist()
+
+    selected_codes: Iterable[int]
+    if symbols is None:
+        selected_codes = range(-1, len(dictionary))
+    else:
+        positions = {symbol: code for code, symbol in enumerate(dictionary)}
+        selected_codes = sorted(
+            positions[symbol] for symbol in set(symbols) if symbol in positions
+        )
+
+    for code in selected_codes:
+        start = int(np.searchsorted(codes, code, side="left"))
+        end = int(np.searchsorted(codes, code, side="right"))
+
+        if end > start:
+            yield start, end
+
+
+def to_epoch_ms_bound(value: datetime | int | None) -> int | None:
+    """
+    Convert the bound of the time range to milliseconds since the epoch.
+    """
+    if value is None or isinstance(value, int):
+        return value
+
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+
+    return int(value.timestamp() * 1000)
+
+
+def read_arrow_ticks(
+    output_dir: str | Path,
+    trade_date: str | date,
+    symbols: Iterable[str] | None = None,
+    start: datetime | int | None = None,
+    end: datetime | int | None = None,
+) -> "pa.Table":
+    """
+    Read the ticks of the trade date saved by the ArrowDataSaver. The files are memory
+    mapped and the returned table is made of slices of their record batches, so the
+    ticks are not copied in memory and only the pages read are loaded from the disk.
+
+    Parameters
+    ----------
+    output_dir: ``str | Path``
+        The root directory of the files
+    trade_date: ``str | date``
+        The UTC trade date of the ticks. Eg: "2024-10-21"
+    symbols: ``Iterable[str] | None``, ( default = None )
+        The symbols of the ticks, all the symbols if None
+    start: ``datetime | int | None``, ( default = None )
+        The first last traded timestamp included, a datetime or milliseconds since
+        the epoch. Naive datetimes are in UTC
+    end: ``datetime | int | None``, ( default = None )
+        The last last traded timestamp included
+
+    Returns
+    -------
+    ``pa.Table``
+        The ticks sorted by the symbol and the last traded timestamp within each
+        record batch
+    """
+    if pa is None:
+        raise ValueError("The `pyarrow` library is required to read the arrow files")
+
+    if isinstance(symbols, str):
+        symbols = [symbols]
+
+    start_ms = to_epoch_ms_bound(start)
+    end_ms = to_epoch_ms_bound(end)
+    is_time_range = start_ms is not None or end_ms is not None
+
+    directory = Path(output_dir) / f"date={trade_date}"
+    slices = []
+
+    for file_path in sorted(directory.glob(f"*{ARROW_STREAM_EXTENSION}")):
+        for batch in read_stream_batches(file_path):
+            if symbols is None and not is_time_range:
+                slices.append(batch)
+                continue
+
+            for run_start, run_end in get_symbol_runs(batch, symbols):
+                if is_time_range:
+                    # The timestamps of a symbol run are sorted, the missing ones first
+                    timestamps = pc.fill_null(
+                        batch.column("last_traded_timestamp")
+                        .slice(run_start, run_end - run_start)
+                        .cast(pa.int64()),
+                        -1,
+                    ).to_numpy()
+                    offset = run_start
+                    if start_ms is not None:
+                        run_start = offset + int(
+                            np.searchsorted(timestamps, start_ms, side="left")
+                        )
+                    if end_ms is not None:
+                        run_end = offset + int(
+                            np.searchsorted(timestamps, end_ms, side="right")
+                        )
+
+                if run_end > run_start:
+                    slices.append(batch.slice(run_start, run_end - run_start))
+
+    return pa.Table.from_batches(slices, schema=get_schema())
@@ -0,0 +1,194 @@
+import json
+import os
+from pathlib import Path
+from typing import Any, Optional, cast
+
+from kafka import KafkaConsumer
+from kafka.errors import NoBrokersAvailable
+from omegaconf import DictConfig
+
+from app.data_layer.data_saver.candles import CandleAggregator, CandleSink
+from app.data_layer.data_saver.data_saver import DataSaver
+from app.data_layer.streaming.consumer import StreamConsumer, init_consumer
+from app.utils.common import init_from_cfg
+from app.utils.common.logger import get_logger
+
+logger = get_logger(Path(__file__).name)
+
+
+@DataSaver.register("candle_saver")
+class CandleDataSaver(DataSaver):
+    """
+    CandleDataSaver retrieve the ticks from kafka consumer and aggregate them into
+    OHLCV candles of several intervals, which are written to the candle sink once
+    they are closed. The candles closed by the watermark of the ticks are written at
+    each flush.
+
+    The offsets of the ticks of the open candles are committed with the others, so
+    the open candles are saved to the `state_file_path` at each flush where they
+    changed, before the offsets are committed, and restored when the saver starts. The ticks consumed
+    again after a crash are then added to the candles they were missing from. When
+    the saver stops, the open candles are saved instead of being written, and they
+    are written once closed after the restart. Without a state file, the open
+    candles are only kept in memory: they are closed and written when the saver
+    stops, and lost if it crashes.
+
+    Attributes
+    ----------
+    consumer: ``KafkaConsumer``
+        Kafka consumer object to consume the data from the specified topic
+    aggregator: ``CandleAggregator``
+        The aggregator building the candles from the ticks
+    sink: ``CandleSink``
+        The sink the closed candles are written to
+    state_file_path: ``Path | None``, ( default = None )
+        The json file the open candles are saved to
+    """
+
+    def __init__(
+        self,
+        consumer: KafkaConsumer,
+        aggregator: CandleAggregator,
+        sink: CandleSink,
+        state_file_path: Path | None = None,
+    ) -> None:
+        super().__init__()
+        self.consumer = consumer
+        self.aggregator = aggregator
+        self.sink = sink
+        self.state_file_path = Path(state_file_path) if state_file_path else None
+        self.written_candles = 0
+        self._saved_state: str | None = None
+
+        self._load_state()
+
+    def _load_state(self):
+        """
+        Restore the open candles from the state file, the aggregation starts from
+        scratch if the state is invalid.
+        """
+        if self.state_file_path is None or not self.state_file_path.exists():
+            return
+
+        try:
+            self.aggregator.set_state(
+                json.loads(self.state_file_path.read_text(encoding="utf-8"))
+            )
+        except (KeyError, TypeError, ValueError) as e:
+            logger.error(
+                "Failed to restore the candles from %s: %s", self.state_file_path, e
+            )
+
+    def _save_state(self):
+        """
+        Replace the state file with the open candles, if they changed since the last
+        time they were saved.
+        """
+        if self.state_file_path is None:
+            return
+
+        state = json.dumps(self.aggregator.get_state())
+        if state == self._saved_state:
+            return
+
+        self.state_file_path.parent.mkdir(parents=True, exist_ok=True)
+        temp_path = self.state_file_path.with_suffix(".tmp")
+        temp_path.write_text(state, encoding="utf-8")
+        os.replace(temp_path, self.state_file_path)
+        self._saved_state = state
+
+    def _write_closed(self):
+        candles = self.aggregator.drain()
+
+        if candles:
+            self.sink.write(candles)
+            self.written_candles += len(candles)
+
+    def save_batch(self, data: list[dict[str, Any]]):
+        """
+        Add the ticks to the candles and write the candles they closed.
+        """
+        for tick in data:
+            self.aggregator.update(tick)
+
+        self._write_closed()
+
+    def flush(self):
+        """
+        Close the candles whose grace period is over, write them to the sink and
+        save the open candles.
+        """
+        self.aggregator.advance()
+        self._write_closed()
+        self.sink.flush()
+        self._save_state()
+
+    def close(self):
+        """
+        Write the closed candles, save the open ones and close the sink. The open
+        candles are closed and written if there is no state file.
+        """
+        if self.state_file_path is None:
+            self.aggregator.close_all()
+        else:
+            self.aggregator.advance()
+
+        self._write_closed()
+        self.sink.close()
+        self._save_state()
+
+    def stats(self) -> dict[str, float]:
+        """
+        Get the number of ticks aggregated, invalid and late, and the number of
+        candles written.
+        """
+        return {**self.aggregator.stats(), "written_candles": self.written_candles}
+
+    @classmethod
+    def from_cfg(
+        cls, cfg: DictConfig, consumer: KafkaConsumer | StreamConsumer | None = None
+    ) -> Optional["CandleDataSaver"]:
+        """
+        Create an instance of the CandleDataSaver class from the given configuration.
+        A new consumer is created unless a shared `consumer` is given.
+        """
+        try:
+            aggregator = CandleAggregator.from_cfg(cfg)
+        except ValueError as e:
+            logger.error("Invalid candle configuration: %s. No data will be saved.", e)
+            return None
+
+        sink = (
+            cast(CandleSink | None, init_from_cfg(cfg.sink, CandleSink))
+            if cfg.get("sink")
+            else None
+        )
+        if sink is None:
+            logger.error("No candle sink is configured. No data will be saved.")
+            return None
+
+        try:
+            saver = cls(
+                (
+                    consumer
+                    if consumer is not None
+                    else init_consumer(cfg.streaming, cfg.get("name"))
+                ),
+                aggregator,
+                sink,
+                cfg.get("state_file_path"),
+            )
+            saver.configure_polling(cfg)
+            if consumer is None:
+                saver.configure_dedup(cfg)
+
+            return saver
+        except NoBrokersAvailable:
+            logger.error(
+                "No Broker is available at the address: %s. No data will be saved.",
+                cfg.streaming.kafka_server,
+            )
+            return None
+        except ValueError as e:
+            logger.error("Failed to create the consumer: %s. No data will be saved.", e)
+            return None
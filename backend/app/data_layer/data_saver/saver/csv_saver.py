@@ -1,24 +1,36 @@
 import csv
-import json
-from datetime import datetime
+import os
+import re
 from pathlib import Path
-from typing import Optional
+from typing import Any, Optional, TextIO
 
 from kafka import KafkaConsumer
 from kafka.errors import NoBrokersAvailable
 from omegaconf import DictConfig
 
 from app.data_layer.data_saver.data_saver import DataSaver
+from app.data_layer.data_saver.rotation import RotationPolicy
+from app.data_layer.streaming.consumer import StreamConsumer, init_consumer
 from app.utils.common.logger import get_logger
 
 logger = get_logger(Path(__file__).name)
 
 
+# Size of the write buffer of each csv file in bytes
+DEFAULT_BUFFER_SIZE = 1024 * 1024
+
+
 @DataSaver.register("csv_saver")
 class CSVDataSaver(DataSaver):
     """
     This CSVDataSaver retrieve the data from kafka consumer and save it
-    to a csv file.
+    to a csv file. The ticks of each tick type are saved to their own file
+    with a fixed set of columns, taken from the header of the existing file
+    or from the first tick of the type. The fields of the ticks that are not
+    in the columns of their file are dropped, they are counted in the stats and
+    logged once per field. The rows are written through a large buffer, which
+    is flushed every `flush_interval` seconds. The files are rotated following
+    the `rotation` policy.
 
     Attributes
     ----------
@@ -26,13 +38,37 @@ class CSVDataSaver(DataSaver):
         Kafka consumer object to consume the data from the specified topic
     csv_file_path: ``str | Path``
         Path to save the csv file. The file name will be the given name
-        appended with the current date.
+        appended with the tick type and the current segment.
         For example: `csv_file_path` = "data.csv", then the file name will
-        be `data_2021_09_01.csv`
+        be `data_snap_quote_2021_09_01.csv`. The ticks without a tick type
+        are saved to `data_2021_09_01.csv`
+    flush_interval: ``float``, ( default = 1.0 )
+        The maximum time in seconds the rows wait in the buffer, the offsets
+        of the consumer are committed after each flush
+    buffer_size: ``int``, ( default = 1048576 )
+        The size of the write buffer of each file in bytes, the buffer is
+        written to the file once it is full
+    tick_type_field: ``str``, ( default = "subscription_mode_val" )
+        The field of the tick that gives the tick type
+    rotation: ``RotationPolicy | None``, ( default = None )
+        The rotation policy of the files, defaults to a daily rotation
     """
 
-    def __init__(self, consumer: KafkaConsumer, csv_file_path: str | Path) -> None:
+    def __init__(
+        self,
+        consumer: KafkaConsumer,
+        csv_file_path: str | Path,
+        flush_interval: float = 1.0,
+        buffer_size: int = DEFAULT_BUFFER_SIZE,
+        tick_type_field: str = "subscription_mode_val",
+        rotation: RotationPolicy | None = None,
+    ) -> None:
+        super().__init__(rotation)
         self.consumer = consumer
+        self.flush_interval = flush_interval
+        self.commit_interval = flush_interval
+        self.buffer_size = buffer_size
+        self.tick_type_field = tick_type_field
 
         if isinstance(csv_file_path, str):
             csv_file_path = Path(csv_file_path)
@@ -40,35 +76,158 @@ class CSVDataSaver(DataSaver):
         if not csv_file_path.parent.exists():
             csv_file_path.parent.mkdir(parents=True, exist_ok=True)
 
-        file_name = csv_file_path.stem + f"_{datetime.now().strftime('%Y_%m_%d')}.csv"
-        self.csv_file_path = csv_file_path.with_name(file_name)
+        self._file_path = csv_file_path.with_suffix("")
+        self._files: dict[str | None, tuple[TextIO, csv.DictWriter]] = {}
+        self._columns: dict[str | None, frozenset[str]] = {}
+        self._dropped_fields: set[tuple[str | None, str]] = set()
+        self.dropped_fields = 0
 
-    def retrieve_and_save(self):
+    @property
+    def csv_file_path(self) -> Path:
         """
-        Retrieve the data from the kafka consumer and save it to the csv file.
+        The path of the csv file of the ticks without a tick type.
         """
-        try:
-            idx = 0
-            with open(self.csv_file_path, "a", encoding="utf-8", newline="") as file:
-                writer = csv.writer(file)
+        return self.get_file_path(None)
+
+    def get_file_path(self, tick_type: str | None) -> Path:
+        """
+        Get the path of the csv file of the given tick type in the current segment.
+        """
+        if tick_type in self._files:
+            return Path(self._files[tick_type][0].name)
+
+        file_path = self._file_path
+        if tick_type is not None:
+            tick_type = re.sub(r"\W+", "_", tick_type).lower()
+            file_path = file_path.with_name(f"{file_path.name}_{tick_type}")
+
+        return self.get_segment_path(file_path, ".csv")
+
+    def _get_writer(
+        self, tick_type: str | None, data: dict[str, Any]
+    ) -> csv.DictWriter:
+        """
+        Get the writer of the tick type, opening its file if needed. The columns
+        are read from the header of the file if it already has data, otherwise
+        the keys of the given tick are used and the header is written.
+        """
+        if tick_type in self._files:
+            return self._files[tick_type][1]
+
+        file_path = self.get_file_path(tick_type)
+        fieldnames = None
+
+        if file_path.exists() and file_path.stat().st_size > 0:
+            with open(file_path, encoding="utf-8", newline="") as file:
+                fieldnames = next(csv.reader(file), None)
+
+        file = open(  # pylint: disable=consider-using-with
+            file_path, "a", encoding="utf-8", newline="", buffering=self.buffer_size
+        )
+        writer = csv.DictWriter(
+            file, fieldnames or list(data.keys()), restval="", extrasaction="ignore"
+        )
+        if not fieldnames:
+            writer.writeheader()
+
+        self._files[tick_type] = (file, writer)
+        self._columns[tick_type] = frozenset(writer.fieldnames)
+        return writer
+
+    def _drop_fields(self, tick_type: str | None, fields: set[str]):
+        """
+        Count the fields of the tick that are not in the columns of its file, and
+        log the fields that are dropped for the first time.
+        """
+        self.dropped_fields += len(fields)
+        new_fields = {(tick_type, field) for field in fields} - self._dropped_fields
+
+        if new_fields:
+            self._dropped_fields |= new_fields
+            logger.warning(
+                "Dropping the fields %s of the %s ticks, they are not in the columns "
+                "of %s",
+                sorted(field for _, field in new_fields),
+                tick_type,
+                self.get_file_path(tick_type),
+            )
+
+    def save(self, data: dict[str, Any]):
+        """
+        Add the tick to the buffer of the file of its tick type. The fields of the
+        tick that are not in the columns of the file are dropped and counted, the
+        missing ones are left empty.
+
+        Parameters
+        ----------
+        data: ``dict[str, Any]``
+            The tick to be saved
+        """
+        tick_type = data.get(self.tick_type_field)
+        if tick_type is not None:
+            tick_type = str(tick_type)
+
+        writer = self._get_writer(tick_type, data)
+        extra_fields = data.keys() - self._columns[tick_type]
+        if extra_fields:
+            self._drop_fields(tick_type, extra_fields)
 
-                for idx, message in enumerate(self.consumer):
-                    decoded_data = message.value.decode("utf-8")
-                    decoded_data = json.loads(decoded_data)
+        writer.writerow(data)
 
-                    if idx == 0:
-                        writer.writerow(list(decoded_data.keys()))
-                    writer.writerow(list(decoded_data.values()))
+    def save_batch(self, data: list[dict[str, Any]]):
+        """
+        Add the ticks to the buffers of their files.
+        """
+        for tick in data:
+            self.save(tick)
+
+    def flush(self):
+        """
+        Write the buffered rows of all the files.
+        """
+        for file, _ in self._files.values():
+            file.flush()
+
+    def segment_size(self) -> int:
+        """
+        Get the size of the largest file of the current segment.
+        """
+        return max(
+            (os.fstat(file.fileno()).st_size for file, _ in self._files.values()),
+            default=0,
+        )
+
+    def rotate_segment(self) -> list[Path]:
+        """
+        Close all the files, the files of the next segment are opened by the next
+        ticks.
+        """
+        file_paths = [Path(file.name) for file, _ in self._files.values()]
 
-                    # Save the data as soon as it is received
-                    file.flush()
-        except Exception as e:
-            logger.error("Error while saving data to csv: %s", e)
-        finally:
-            logger.info("%s messages saved to csv", idx)
+        for file, _ in self._files.values():
+            file.close()
+
+        self._files = {}
+        self._columns = {}
+        return file_paths
+
+    def stats(self) -> dict[str, float]:
+        """
+        Get the number of tick fields dropped because they are not in the columns of
+        their file.
+        """
+        return {"dropped_fields": self.dropped_fields}
+
+    def close(self):
+        """
+        Write the buffered rows, close all the files and finalize them.
+        """
+        self.finalize_segments(self.rotate_segment(), wait=True)
 
     @classmethod
-    def from_cfg(cls, cfg: DictConfig) -> Optional["CSVDataSaver"]:
+    def from_cfg(
+        cls, cfg: DictConfig, consumer: KafkaConsumer | StreamConsumer | None = None
+    ) -> Optional["CSVDataSaver"]:
         """
         Initialize the CSVDataSaver object from the given configuration.
 
@@ -77,19 +236,39 @@ class CSVDataSaver(DataSaver):
         cfg: ``DictConfig``
             Configuration object containing the necessary information to
             initialize the CSVDataSaver object
+        consumer: ``KafkaConsumer | StreamConsumer | None``, ( default = None )
+            The shared consumer, a new consumer is created if not given
         """
         try:
-            return cls(
-                KafkaConsumer(
-                    cfg.streaming.kafka_topic,
-                    bootstrap_servers=cfg.streaming.kafka_server,
-                    auto_offset_reset="earliest",
+            rotation = RotationPolicy.from_cfg(cfg.get("rotation"))
+        except ValueError as e:
+            logger.error("Invalid rotation: %s. No data will be saved.", e)
+            return None
+
+        try:
+            saver = cls(
+                (
+                    consumer
+                    if consumer is not None
+                    else init_consumer(cfg.streaming, cfg.get("name"))
                 ),
                 cfg.get("csv_file_path"),
+                flush_interval=cfg.get("flush_interval", 1.0),
+                buffer_size=cfg.get("buffer_size", DEFAULT_BUFFER_SIZE),
+                tick_type_field=cfg.get("tick_type_field", "subscription_mode_val"),
+                rotation=rotation,
             )
+            saver.configure_polling(cfg)
+            if consumer is None:
+                saver.configure_dedup(cfg)
+
+            return saver
         except NoBrokersAvailable:
             logger.error(
                 "No Broker is available at the address: %s. No data will be saved.",
                 cfg.streaming.kafka_server,
             )
             return None
+        except ValueError as e:
+            logger.error("Failed to create the consumer: %s. No data will be saved.", e)
+            return None
@@ -1,12 +1,20 @@
-from datetime import datetime
+import json
+import os
 from pathlib import Path
-from typing import Optional
+from typing import Any, Optional
 
 from kafka import KafkaConsumer
 from kafka.errors import NoBrokersAvailable
 from omegaconf import DictConfig
 
+from app.data_layer.data_saver.compressed_file import (
+    COMPRESSION_EXTENSIONS,
+    FramedCompressedWriter,
+    validate_compression,
+)
 from app.data_layer.data_saver.data_saver import DataSaver
+from app.data_layer.data_saver.rotation import RotationPolicy
+from app.data_layer.streaming.consumer import StreamConsumer, init_consumer
 from app.utils.common.logger import get_logger
 
 logger = get_logger(Path(__file__).name)
@@ -16,7 +24,11 @@ logger = get_logger(Path(__file__).name)
 class JSONLDataSaver(DataSaver):
     """
     JSONLDataSaver retrieve the data from kafka consumer and save it
-    to a jsonl file.
+    to a jsonl file. The file can be compressed with gzip or zstd, the
+    messages are then compressed in large blocks and a new compression frame
+    is started every `frame_size_mb` MB, so the complete frames of a file
+    left partially written by a crash can still be read. The files are rotated
+    following the `rotation` policy.
 
     Attributes
     ----------
@@ -24,13 +36,43 @@ class JSONLDataSaver(DataSaver):
         Kafka consumer object to consume the data from the specified topic
     jsonl_file_path: ``str | Path``
         Path to save the jsonl file. The file name will be the given name
-        appended with the current date.
+        appended with the current segment.
         For example: `jsonl_file_path` = "data.jsonl", then the file name will
-        be `data_2021_09_01.jsonl`
+        be `data_2021_09_01.jsonl`, or `data_2021_09_01.jsonl.zst` with the
+        zstd compression. Each run of a compressing saver writes a new file
+    compression: ``str | None``, ( default = None )
+        The compression of the file, `gzip`, `zstd` or None
+    compression_level: ``int | None``, ( default = None )
+        The compression level, defaults to the default level of the compression
+    frame_size_mb: ``float``, ( default = 16 )
+        The size of the uncompressed data in MB after which a new frame is started
+    block_size: ``int``, ( default = 1048576 )
+        The number of bytes buffered before being compressed and written
+    flush_interval: ``float``, ( default = 1.0 )
+        The maximum time in seconds the messages wait in the buffer
+    rotation: ``RotationPolicy | None``, ( default = None )
+        The rotation policy of the files, defaults to a daily rotation
     """
 
-    def __init__(self, consumer: KafkaConsumer, jsonl_file_path: str | Path) -> None:
+    def __init__(
+        self,
+        consumer: KafkaConsumer,
+        jsonl_file_path: str | Path,
+        compression: str | None = None,
+        compression_level: int | None = None,
+        frame_size_mb: float = 16,
+        block_size: int = 1024 * 1024,
+        flush_interval: float = 1.0,
+        rotation: RotationPolicy | None = None,
+    ) -> None:
+        super().__init__(rotation)
         self.consumer = consumer
+        self.compression = validate_compression(compression)
+        self.compression_level = compression_level
+        self.frame_size = int(frame_size_mb * 1024 * 1024)
+        self.block_size = block_size
+        self.flush_interval = flush_interval
+        self.commit_interval = flush_interval
 
         if isinstance(jsonl_file_path, str):
             jsonl_file_path = Path(jsonl_file_path)
@@ -38,44 +80,137 @@ class JSONLDataSaver(DataSaver):
         if not jsonl_file_path.parent.exists():
             jsonl_file_path.parent.mkdir(parents=True, exist_ok=True)
 
-        file_name = (
-            jsonl_file_path.stem + f"_{datetime.now().strftime('%Y_%m_%d')}.jsonl"
+        self._file_path = jsonl_file_path.with_suffix("")
+        self.jsonl_file_path = self.get_file_path()
+        self._writer: FramedCompressedWriter | None = None
+
+    def get_file_path(self) -> Path:
+        """
+        Get the path of the file of the current segment. The last frame of an
+        existing compressed file may not be closed if the saver crashed, so a new
+        file is started instead of appending to it.
+        Eg: `data_2021_09_01_1.jsonl.zst` if `data_2021_09_01.jsonl.zst` exists.
+        """
+        suffix = ".jsonl"
+        if self.compression:
+            suffix += COMPRESSION_EXTENSIONS[self.compression]
+
+        return self.get_segment_path(
+            self._file_path, suffix, append=self.compression is None
         )
-        self.jsonl_file_path = jsonl_file_path.with_name(file_name)
 
-    def retrieve_and_save(self):
+    def _get_writer(self) -> FramedCompressedWriter:
         """
-        Retrieve the data from the kafka consumer and save it to the jsonl file.
+        Get the writer of the file, opening the file on the first write.
         """
-        idx = 0
-        try:
-            with open(self.jsonl_file_path, "a", encoding="utf-8", newline="") as file:
-                for idx, message in enumerate(self.consumer):
-                    decoded_data = message.value.decode("utf-8")
-                    file.write(decoded_data + "\n")
-                    file.flush()
-        except Exception as e:
-            logger.error("Error while saving data to jsonl: %s", e)
-        finally:
-            logger.info("%s messages saved to jsonl", idx)
+        if self._writer is None:
+            self._writer = FramedCompressedWriter(
+                self.jsonl_file_path,
+                self.compression,
+                self.compression_level,
+                frame_size=self.frame_size,
+                block_size=self.block_size,
+            )
+
+        return self._writer
+
+    def save_batch(self, data: list[dict[str, Any]]):
+        """
+        Encode the ticks and write them to the file.
+        """
+        writer = self._get_writer()
+        writer.write(
+            b"".join(json.dumps(tick).encode("utf-8") + b"\n" for tick in data)
+        )
+
+    def flush(self):
+        """
+        Compress the buffered messages and write them to the file.
+        """
+        if self._writer is not None:
+            self._writer.flush()
+
+    def segment_size(self) -> int:
+        """
+        Get the size of the file of the current segment.
+        """
+        if self._writer is None:
+            return 0
+
+        return os.fstat(self._writer.file.fileno()).st_size
+
+    def _close_writer(self) -> list[Path]:
+        """
+        Close the file if it was opened and get its path.
+        """
+        if self._writer is None:
+            return []
+
+        self._writer.close()
+        self._writer = None
+        return [self.jsonl_file_path]
+
+    def rotate_segment(self) -> list[Path]:
+        """
+        Close the file and get the path of the file of the next segment.
+        """
+        file_paths = self._close_writer()
+        self.jsonl_file_path = self.get_file_path()
+
+        return file_paths
+
+    def close(self):
+        """
+        Write the buffered messages, close the file and finalize it.
+        """
+        self.finalize_segments(self._close_writer(), wait=True)
 
     @classmethod
-    def from_cfg(cls, cfg: DictConfig) -> Optional["JSONLDataSaver"]:
+    def from_cfg(
+        cls, cfg: DictConfig, consumer: KafkaConsumer | StreamConsumer | None = None
+    ) -> Optional["JSONLDataSaver"]:
         """
         Create an instance of the JSONLDataSaver class from the given configuration.
+        A new consumer is created unless a shared `consumer` is given.
         """
         try:
-            return cls(
-                KafkaConsumer(
-                    cfg.streaming.kafka_topic,
-                    bootstrap_servers=cfg.streaming.kafka_server,
-                    auto_offset_reset="earliest",
+            validate_compression(cfg.get("compression"))
+        except ValueError as e:
+            logger.error("Invalid compression: %s. No data will be saved.", e)
+            return None
+
+        try:
+            rotation = RotationPolicy.from_cfg(cfg.get("rotation"))
+        except ValueError as e:
+            logger.error("Invalid rotation: %s. No data will be saved.", e)
+            return None
+
+        try:
+            saver = cls(
+                (
+                    consumer
+                    if consumer is not None
+                    else init_consumer(cfg.streaming, cfg.get("name"))
                 ),
                 cfg.get("jsonl_file_path"),
+                compression=cfg.get("compression"),
+                compression_level=cfg.get("compression_level"),
+                frame_size_mb=cfg.get("frame_size_mb", 16),
+                block_size=cfg.get("block_size", 1024 * 1024),
+                flush_interval=cfg.get("flush_interval", 1.0),
+                rotation=rotation,
             )
+            saver.configure_polling(cfg)
+            if consumer is None:
+                saver.configure_dedup(cfg)
+
+            return saver
         except NoBrokersAvailable:
             logger.error(
                 "No Broker is available at the address: %s. No data will be saved.",
                 cfg.streaming.kafka_server,
             )
             return None
+        except ValueError as e:
+            logger.error("Failed to create the consumer: %s. No data will be saved.", e)
+            return None
@@ -0,0 +1,427 @@
+import os
+import time
+import uuid
+from collections import OrderedDict
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Callable, Optional, cast
+
+from kafka import KafkaConsumer
+from kafka.errors import NoBrokersAvailable
+from omegaconf import DictConfig
+
+from app.data_layer.data_saver.data_saver import DataSaver
+from app.data_layer.streaming.consumer import StreamConsumer, init_consumer
+from app.utils.common.logger import get_logger
+from app.utils.common.types.financial_types import ExchangeType
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = None
+    pq = None
+
+logger = get_logger(Path(__file__).name)
+
+
+def to_epoch_ms(value: Any) -> int | None:
+    """
+    Convert the epoch timestamp of the tick to milliseconds. The timestamps are sent
+    in seconds or milliseconds by the data providers, -1 means the value is missing.
+    """
+    try:
+        timestamp = float(value)
+    except (TypeError, ValueError):
+        return None
+
+    if timestamp < 0:
+        return None
+
+    # Timestamps after 1973 in milliseconds are larger than 1e11
+    return int(timestamp if timestamp > 1e11 else timestamp * 1000)
+
+
+def to_int(value: Any) -> int | None:
+    """
+    Convert the value to an integer, None if the value is not a number.
+    """
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def to_float(value: Any) -> float | None:
+    """
+    Convert the value to a float, None if the value is not a number.
+    """
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+# Column name -> type of the column
+COLUMN_TYPES = {
+    "retrieval_timestamp": "timestamp",
+    "last_traded_timestamp": "timestamp",
+    "symbol": "dictionary",
+    "exchange_id": "int16",
+    "data_provider_id": "int16",
+    "last_traded_price": "float64",
+    "last_traded_quantity": "int64",
+    "average_traded_price": "float64",
+    "volume_trade_for_the_day": "int64",
+    "total_buy_quantity": "float64",
+    "total_sell_quantity": "float64",
+    "open_price_of_the_day": "float64",
+    "high_price_of_the_day": "float64",
+    "low_price_of_the_day": "float64",
+    "closed_price": "float64",
+    "open_interest": "float64",
+}
+
+# Type of the column -> converter of the tick value
+CONVERTERS: dict[str, Callable[[Any], Any]] = {
+    "timestamp": to_epoch_ms,
+    "dictionary": str,
+    "int16": to_int,
+    "int64": to_int,
+    "float64": to_float,
+}
+
+
+def get_schema() -> "pa.Schema":
+    """
+    Get the arrow schema of the tick columns. The timestamps are stored in UTC with
+    millisecond precision and the symbols are dictionary encoded.
+    """
+    arrow_types = {
+        "timestamp": pa.timestamp("ms", tz="UTC"),
+        "dictionary": pa.dictionary(pa.int32(), pa.string()),
+        "int16": pa.int16(),
+        "int64": pa.int64(),
+        "float64": pa.float64(),
+    }
+    return pa.schema(
+        [(name, arrow_types[column_type]) for name, column_type in COLUMN_TYPES.items()]
+    )
+
+
+class ParquetPartition:
+    """
+    The buffered rows and the open file of a partition. The rows are written to a
+    temporary file as row groups, and the file is moved to its final name when it is
+    finalized, so the readers never see a partially written file.
+
+    Attributes
+    ----------
+    directory: ``Path``
+        The directory of the partition. Eg: `date=2024-10-21/exchange=NSE`
+    """
+
+    def __init__(self, directory: Path):
+        self.directory = directory
+        self.columns: dict[str, list] = {name: [] for name in COLUMN_TYPES}
+        self.num_buffered_rows = 0
+
+        self.writer: Optional["pq.ParquetWriter"] = None
+        self.file_path: Path | None = None
+        self.num_file_rows = 0
+        self.started_at = time.monotonic()
+
+    @property
+    def temp_file_path(self) -> Path:
+        """
+        The path the open file is written to, it is renamed to `file_path` once
+        closed.
+        """
+        file_path = cast(Path, self.file_path)
+        return file_path.with_name(file_path.name + ".tmp")
+
+    def append(self, data: dict[str, Any]):
+        """
+        Add the tick to the buffered columns.
+        """
+        for name, column_type in COLUMN_TYPES.items():
+            value = data.get(name)
+            self.columns[name].append(
+                None if value is None else CONVERTERS[column_type](value)
+            )
+
+        self.num_buffered_rows += 1
+
+    def write_row_group(self, schema: "pa.Schema", compression: str):
+        """
+        Write the buffered rows to the file of the partition as a row group.
+        """
+        if not self.num_buffered_rows:
+            return
+
+        if self.writer is None:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            timestamp = datetime.now().strftime("%Y%m%d%H%M%S")
+            self.file_path = (
+                self.directory / f"part-{timestamp}-{uuid.uuid4().hex[:8]}.parquet"
+            )
+            self.writer = pq.ParquetWriter(
+                self.temp_file_path, schema, compression=compression
+            )
+
+        table = pa.Table.from_pydict(self.columns, schema=schema)
+        self.writer.write_table(table, row_group_size=self.num_buffered_rows)
+
+        self.num_file_rows += self.num_buffered_rows
+        self.columns = {name: [] for name in COLUMN_TYPES}
+        self.num_buffered_rows = 0
+
+    def finalize(self) -> Path | None:
+        """
+        Close the file and move it to its final name.
+        """
+        if self.writer is None:
+            return None
+
+        self.writer.close()
+        os.replace(self.temp_file_path, self.file_path)  # type: ignore
+        file_path = self.file_path
+
+        self.writer = None
+        self.file_path = None
+        self.num_file_rows = 0
+        self.started_at = time.monotonic()
+
+        return file_path
+
+
+@DataSaver.register("parquet_saver")
+class ParquetDataSaver(DataSaver):
+    """
+    ParquetDataSaver retrieve the data from kafka consumer and save it to parquet
+    files partitioned by the trade date and the exchange, and optionally the symbol.
+    Eg: `date=2024-10-21/exchange=NSE/part-20241021091500-1a2b3c4d.parquet`. The ticks
+    are buffered in columns and written as row groups of `row_group_size` rows, with
+    the symbols dictionary encoded and the numeric fields typed. A file is finalized
+    once it has `max_file_rows` rows or `rotation_interval` seconds after its first
+    tick, and only the finalized files have the `.parquet` extension.
+
+    Attributes
+    ----------
+    consumer: ``KafkaConsumer``
+        Kafka consumer object to consume the data from the specified topic
+    output_dir: ``str | Path``
+        The root directory of the partitions
+    partition_by_symbol: ``bool``, ( default = False )
+        If True, the ticks of each symbol are saved in their own partition
+    row_group_size: ``int``, ( default = 100000 )
+        The number of rows buffered per partition before writing a row group
+    max_file_rows: ``int``, ( default = 1000000 )
+        The number of rows after which the file of a partition is finalized
+    rotation_interval: ``float``, ( default = 300 )
+        The maximum time in seconds the ticks of a partition wait before their file
+        is finalized
+    max_open_files: ``int``, ( default = 64 )
+        The maximum number of partitions buffered at once, the least recently used
+        partition is finalized when the limit is reached
+    compression: ``str``, ( default = "zstd" )
+        The compression codec of the parquet files
+    """
+
+    def __init__(
+        self,
+        consumer: KafkaConsumer,
+        output_dir: str | Path,
+        partition_by_symbol: bool = False,
+        row_group_size: int = 100000,
+        max_file_rows: int = 1000000,
+        rotation_interval: float = 300,
+        max_open_files: int = 64,
+        compression: str = "zstd",
+    ) -> None:
+        if pa is None:
+            raise ValueError("The `pyarrow` library is required for the parquet saver")
+
+        super().__init__()
+        self.consumer = consumer
+        self.output_dir = Path(output_dir)
+        self.partition_by_symbol = partition_by_symbol
+        self.row_group_size = row_group_size
+        self.max_file_rows = max_file_rows
+        self.rotation_interval = rotation_interval
+        self.commit_interval = rotation_interval
+        self.max_open_files = max_open_files
+        self.compression = compression
+
+        self.schema = get_schema()
+        self.partitions: OrderedDict[tuple, ParquetPartition] = OrderedDict()
+        self.remove_orphaned_files()
+
+    def remove_orphaned_files(self):
+        """
+        Remove the temporary files left by a data saver that stopped before
+        finalizing them. The replicas of the data saver share the output directory,
+        so only the temporary files not modified for twice `rotation_interval`
+        seconds are removed, the files being written are finalized before that.
+        """
+        if not self.output_dir.exists():
+            return
+
+        expiry_time = time.time() - 2 * self.rotation_interval
+
+        for file_path in self.output_dir.rglob("*.parquet.tmp"):
+            try:
+                if file_path.stat().st_mtime < expiry_time:
+                    file_path.unlink()
+                    logger.warning("Orphaned parquet file %s removed", file_path)
+            except FileNotFoundError:
+                continue
+
+    def get_partition(self, data: dict[str, Any]) -> ParquetPartition:
+        """
+        Get the partition of the tick. The trade date is the UTC date of the last
+        traded timestamp, or of the retrieval timestamp if the former is missing.
+        """
+        timestamp = to_epoch_ms(data.get("last_traded_timestamp")) or to_epoch_ms(
+            data.get("retrieval_timestamp")
+        )
+        trade_date = (
+            datetime.fromtimestamp(timestamp / 1000, tz=timezone.utc).date().isoformat()
+            if timestamp
+            else "unknown"
+        )
+        exchange = ExchangeType.get_exchange(to_int(data.get("exchange_id")) or 0)
+        exchange_name = exchange.name if exchange else "unknown"
+        symbol = data.get("symbol") if self.partition_by_symbol else None
+
+        key = (trade_date, exchange_name, symbol)
+        partition = self.partitions.get(key)
+
+        if partition is None:
+            directory = (
+                self.output_dir / f"date={trade_date}" / f"exchange={exchange_name}"
+            )
+            if self.partition_by_symbol:
+                directory = directory / f"symbol={symbol}"
+
+            # Finalize the least recently used partition above the limit
+            if len(self.partitions) >= self.max_open_files:
+                self._finalize(next(iter(self.partitions)))
+
+            partition = ParquetPartition(directory)
+            self.partitions[key] = partition
+
+        self.partitions.move_to_end(key)
+        return partition
+
+    def save(self, data: dict[str, Any]):
+        """
+        Add the tick to the buffer of its partition, writing a row group once the
+        buffer has `row_group_size` rows.
+
+        Parameters
+        ----------
+        data: ``dict[str, Any]``
+            The tick to be saved
+        """
+        partition = self.get_partition(data)
+        partition.append(data)
+
+        if partition.num_buffered_rows >= self.row_group_size:
+            self._write(partition)
+
+    def save_batch(self, data: list[dict[str, Any]]):
+        """
+        Add the ticks to the buffers of their partitions.
+        """
+        for tick in data:
+            self.save(tick)
+
+    def _write(self, partition: ParquetPartition):
+        """
+        Write the row group of the partition and finalize its file if it is full.
+        """
+        partition.write_row_group(self.schema, self.compression)
+
+        if partition.num_file_rows >= self.max_file_rows:
+            file_path = partition.finalize()
+            logger.info("Parquet file %s finalized", file_path)
+
+    def _finalize(self, key: tuple):
+        """
+        Write the buffered rows of the partition and finalize its file.
+        """
+        partition = self.partitions.pop(key)
+        partition.write_row_group(self.schema, self.compression)
+        file_path = partition.finalize()
+
+        if file_path:
+            logger.info("Parquet file %s finalized", file_path)
+
+    def rotate(self, force: bool = False):
+        """
+        Finalize the partitions whose first tick is older than `rotation_interval`
+        seconds, or all the partitions if `force` is True.
+        """
+        now = time.monotonic()
+
+        for key, partition in list(self.partitions.items()):
+            if force or now - partition.started_at >= self.rotation_interval:
+                self._finalize(key)
+
+    def flush(self):
+        """
+        Write the buffered rows and finalize all the files, a parquet file can only
+        be read once it is finalized.
+        """
+        self.rotate(force=True)
+
+    def close(self):
+        """
+        Write the buffered rows and finalize all the files.
+        """
+        self.flush()
+
+    @classmethod
+    def from_cfg(
+        cls, cfg: DictConfig, consumer: KafkaConsumer | StreamConsumer | None = None
+    ) -> Optional["ParquetDataSaver"]:
+        """
+        Create an instance of the ParquetDataSaver class from the given configuration.
+        A new consumer is created unless a shared `consumer` is given.
+        """
+        if pa is None:
+            logger.error(
+                "The `pyarrow` library is not installed. No data will be saved."
+            )
+            return None
+
+        try:
+            saver = cls(
+                (
+                    consumer
+                    if consumer is not None
+                    else init_consumer(cfg.streaming, cfg.get("name"))
+                ),
+                cfg.get("output_dir"),
+                partition_by_symbol=cfg.get("partition_by_symbol", False),
+                row_group_size=cfg.get("row_group_size", 100000),
+                max_file_rows=cfg.get("max_file_rows", 1000000),
+                rotation_interval=cfg.get("rotation_interval", 300),
+                max_open_files=cfg.get("max_open_files", 64),
+                compression=cfg.get("compression", "zstd"),
+            )
+            saver.configure_polling(cfg)
+            if consumer is None:
+                saver.configure_dedup(cfg)
+
+            return saver
+        except NoBrokersAvailable:
+            logger.error(
+                "No Broker is available at the address: %s. No data will be saved.",
+                cfg.streaming.kafka_server,
+            )
+            return None
+        except ValueError as e:
+            logger.error("Failed to create the consumer: %s. No data will be saved.", e)
+            return None
@@ -0,0 +1,530 @@
+import time
+import zlib
+from pathlib import Path
+from queue import Empty, Queue
+from threading import Event, Lock, Thread
+from typing import Any, Optional
+
+from kafka import KafkaConsumer
+from kafka.errors import NoBrokersAvailable
+from omegaconf import DictConfig
+from sqlalchemy.engine import Engine
+from sqlmodel import SQLModel
+
+from app.data_layer.data_saver.data_saver import DataSaver
+from app.data_layer.database.compact_prices import encode_tick_row
+from app.data_layer.database.crud.crud_utils import (
+    get_bulk_statements,
+    rows_to_copy_csv,
+)
+from app.data_layer.database.models import CompactInstrumentPrice, InstrumentPrice
+from app.data_layer.database.partitions import PartitionPolicy
+from app.data_layer.streaming.consumer import StreamConsumer, init_consumer
+from app.utils.common.logger import get_logger
+
+logger = get_logger(Path(__file__).name)
+
+INSTRUMENT_PRICE_COLUMNS = tuple(InstrumentPrice.__table__.columns.keys())  # type: ignore
+ON_CONFLICT_ACTIONS = ("ignore", "update")
+
+# Schema -> table the ticks are saved to
+SCHEMA_MODELS: dict[str, type[SQLModel]] = {
+    "default": InstrumentPrice,
+    "compact": CompactInstrumentPrice,
+}
+
+
+class CopyWriter:
+    """
+    CopyWriter inserts the batches of rows queued to it in a dedicated thread, with
+    its own database connection. The batches of a writer are inserted in the order
+    they are queued.
+
+    Attributes
+    ----------
+    name: ``str``
+        The name of the writer used in the logs. Eg: "writer_0"
+    engine: ``Engine``
+        The engine of the PostgreSQL database
+    on_conflict: ``str``, ( default = "ignore" )
+        `ignore` to keep the existing rows, `update` to overwrite them
+    queue_size: ``int``, ( default = 8 )
+        The maximum number of batches waiting to be inserted, the saver waits when
+        the queue is full
+    model: ``type[SQLModel]``, ( default = InstrumentPrice )
+        The table the rows are inserted in
+    """
+
+    def __init__(
+        self,
+        name: str,
+        engine: Engine,
+        on_conflict: str = "ignore",
+        queue_size: int = 8,
+        model: type[SQLModel] = InstrumentPrice,
+    ):
+        if on_conflict not in ON_CONFLICT_ACTIONS:
+            raise ValueError(
+                f"Invalid on_conflict action `{on_conflict}`, supported actions are "
+                f"{list(ON_CONFLICT_ACTIONS)}"
+            )
+
+        self.name = name
+        self.engine = engine
+        self.create_staging, self.copy, self.insert = get_bulk_statements(
+            model.__table__, update_existing=on_conflict == "update"  # type: ignore
+        )
+        self.queue: Queue[list[tuple]] = Queue(maxsize=queue_size)
+
+        self.inserted_rows = 0
+        self.failed_rows = 0
+        self.batches = 0
+        self.total_commit_time = 0.0
+        self.max_commit_time = 0.0
+
+        self._connection: Any = None
+        self._stop_event = Event()
+        self._thread = Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def _get_connection(self):
+        """
+        Get the DBAPI connection of the writer, the staging table lives as long as
+        the connection.
+        """
+        if self._connection is None:
+            self._connection = self.engine.raw_connection()
+            with self._connection.cursor() as cursor:
+                cursor.execute(self.create_staging)
+            self._connection.commit()
+
+        return self._connection
+
+    def insert_rows(self, rows: list[tuple]) -> int:
+        """
+        Copy the rows to the staging table and insert them in the InstrumentPrice
+        table in one transaction. If the insertion fails, the whole batch is rolled
+        back and counted as failed.
+
+        Parameters
+        ----------
+        rows: ``list[tuple]``
+            The rows with the values of the columns of the table
+
+        Returns
+        -------
+        ``int``
+            The number of rows copied
+        """
+        if not rows:
+            return 0
+
+        start_time = time.perf_counter()
+        try:
+            connection = self._get_connection()
+            with connection.cursor() as cursor:
+                cursor.copy_expert(self.copy, rows_to_copy_csv(rows))
+                cursor.execute(self.insert)
+            connection.commit()
+        except Exception as e:
+            self.failed_rows += len(rows)
+            logger.error(
+                "%s failed to insert a batch of %d rows: %s", self.name, len(rows), e
+            )
+            self._reset_connection()
+            return 0
+
+        commit_time = time.perf_counter() - start_time
+        self.inserted_rows += len(rows)
+        self.batches += 1
+        self.total_commit_time += commit_time
+        self.max_commit_time = max(self.max_commit_time, commit_time)
+
+        return len(rows)
+
+    def _reset_connection(self):
+        """
+        Discard the connection after a failure, a new one is opened for the next batch.
+        """
+        if self._connection is None:
+            return
+
+        try:
+            self._connection.rollback()
+            self._connection.close()
+        except Exception as e:
+            logger.error("%s failed to close the connection: %s", self.name, e)
+
+        self._connection = None
+
+    def _run(self):
+        while not (self._stop_event.is_set() and self.queue.empty()):
+            try:
+                rows = self.queue.get(timeout=0.1)
+            except Empty:
+                continue
+
+            self.insert_rows(rows)
+            self.queue.task_done()
+
+    def put(self, rows: list[tuple]):
+        """
+        Queue the batch of rows to be inserted.
+        """
+        self.queue.put(rows)
+
+    def join(self):
+        """
+        Wait until all the queued batches are inserted.
+        """
+        self.queue.join()
+
+    def close(self):
+        """
+        Insert the queued batches, stop the thread and close the connection.
+        """
+        self._stop_event.set()
+        self._thread.join()
+
+        if self._connection is not None:
+            self._connection.close()
+            self._connection = None
+
+
+@DataSaver.register("postgres_saver")
+class PostgresDataSaver(DataSaver):
+    """
+    PostgresDataSaver retrieve the data from kafka consumer and save it to the
+    InstrumentPrice table of the PostgreSQL database. The rows are buffered and
+    written in batches with `COPY FROM STDIN` to a temporary staging table, then
+    inserted in the table with `ON CONFLICT` on the primary key, which is much faster
+    than inserting the rows with VALUES. The batches are inserted by `num_writers`
+    writers, each with its own connection. The ticks of a symbol always go to the
+    same writer, so they are inserted in order while the symbols are inserted in
+    parallel. With the `compact` schema, the ticks are saved to the
+    CompactInstrumentPrice table, converted to integers without building the
+    InstrumentPrice objects.
+
+    Attributes
+    ----------
+    consumer: ``KafkaConsumer``
+        Kafka consumer object to consume the data from the specified topic
+    engine: ``Engine``
+        The engine of the PostgreSQL database
+    batch_size: ``int``, ( default = 5000 )
+        The number of rows copied in a single transaction
+    flush_interval_ms: ``int``, ( default = 500 )
+        The maximum time in milliseconds a tick waits before being inserted
+    num_writers: ``int``, ( default = 1 )
+        The number of writers inserting the batches in parallel
+    on_conflict: ``str``, ( default = "ignore" )
+        `ignore` to keep the rows already present in the table, `update` to
+        overwrite them with the new rows
+    queue_size: ``int``, ( default = 8 )
+        The maximum number of batches waiting per writer
+    stats_interval: ``float``, ( default = 60 )
+        The interval in seconds at which the insertion stats are logged
+    partition_policy: ``PartitionPolicy | None``, ( default = None )
+        The policy creating and dropping the partitions of the table, the partitions
+        are not managed if None
+    maintenance_interval: ``float``, ( default = 3600 )
+        The interval in seconds at which the partitions are maintained
+    schema: ``str``, ( default = "default" )
+        `default` to save the ticks to the InstrumentPrice table, `compact` to save
+        them to the CompactInstrumentPrice table
+    """
+
+    def __init__(
+        self,
+        consumer: KafkaConsumer,
+        engine: Engine,
+        batch_size: int = 5000,
+        flush_interval_ms: int = 500,
+        num_writers: int = 1,
+        on_conflict: str = "ignore",
+        queue_size: int = 8,
+        stats_interval: float = 60,
+        partition_policy: PartitionPolicy | None = None,
+        maintenance_interval: float = 3600,
+        schema: str = "default",
+    ) -> None:
+        if num_writers < 1:
+            raise ValueError(f"Invalid number of writers: {num_writers}")
+        if schema not in SCHEMA_MODELS:
+            raise ValueError(
+                f"Invalid schema `{schema}`, supported schemas are "
+                f"{list(SCHEMA_MODELS)}"
+            )
+
+        super().__init__()
+        self.consumer = consumer
+        self.engine = engine
+        self.batch_size = batch_size
+        self.flush_interval_ms = flush_interval_ms
+        self.stats_interval = stats_interval
+        self.schema = schema
+
+        self.writers = [
+            CopyWriter(
+                f"writer_{index}",
+                engine,
+                on_conflict,
+                queue_size,
+                SCHEMA_MODELS[schema],
+            )
+            for index in range(num_writers)
+        ]
+        self._buffers: list[list[tuple]] = [[] for _ in self.writers]
+        self._lock = Lock()
+
+        # The partitions of the coming days are created before the first insert
+        self.partition_policy = partition_policy
+        self.maintenance_interval = maintenance_interval
+        self.maintain_partitions()
+
+        self._start_time = time.monotonic()
+        self._last_stats_time = self._start_time
+        self._last_maintenance_time = self._start_time
+        self._stop_event = Event()
+        self._flush_thread = Thread(target=self._flush_periodically, daemon=True)
+        self._flush_thread.start()
+
+    def save_stock_data(self, data: dict[str, Any]):
+        """
+        Validate the tick with the InstrumentPrice model, or convert it to the values
+        of CompactInstrumentPrice with the `compact` schema, and add it to the batch of
+        the writer of its symbol. The batch is queued once it has `batch_size` rows.
+
+        Parameters
+        ----------
+        data: ``dict[str, Any]``
+            The tick to be saved, with all the required fields of InstrumentPrice
+        """
+        if self.schema == "compact":
+            row = encode_tick_row(data)
+        else:
+            row = self._to_instrument_price_row(data)
+
+        index = zlib.crc32(data["symbol"].encode("utf-8")) % len(self.writers)
+
+        with self._lock:
+            buffer = self._buffers[index]
+            buffer.append(row)
+
+            if len(buffer) < self.batch_size:
+                return
+
+            self._buffers[index] = []
+
+        self.writers[index].put(buffer)
+
+    @staticmethod
+    def _to_instrument_price_row(data: dict[str, Any]) -> tuple:
+        """
+        Validate the tick with the InstrumentPrice model and get its row.
+        """
+        instrument_price = InstrumentPrice(
+            retrieval_timestamp=data["retrieval_timestamp"],
+            last_traded_timestamp=data["last_traded_timestamp"],
+            symbol=data["symbol"],
+            exchange_id=data["exchange_id"],
+            data_provider_id=data["data_provider_id"],
+            last_traded_price=data["last_traded_price"],
+            last_traded_quantity=data.get("last_traded_quantity"),
+            average_traded_price=data.get("average_traded_price"),
+            volume_trade_for_the_day=data.get("volume_trade_for_the_day"),
+            total_buy_quantity=data.get("total_buy_quantity"),
+            total_sell_quantity=data.get("total_sell_quantity"),
+        )
+        return tuple(
+            getattr(instrument_price, column) for column in INSTRUMENT_PRICE_COLUMNS
+        )
+
+    def save_batch(self, data: list[dict[str, Any]]):
+        """
+        Add the ticks to the batches of the writers of their symbols.
+        """
+        for tick in data:
+            self.save_stock_data(tick)
+
+    def flush(self, wait: bool = True):
+        """
+        Queue the rows waiting in the batches.
+
+        Parameters
+        ----------
+        wait: ``bool``, ( default = True )
+            If True, wait until all the queued batches are inserted
+        """
+        with self._lock:
+            buffers, self._buffers = self._buffers, [[] for _ in self.writers]
+
+        for writer, rows in zip(self.writers, buffers):
+            if rows:
+                writer.put(rows)
+
+        if wait:
+            for writer in self.writers:
+                writer.join()
+
+    def _flush_periodically(self):
+        """
+        Queue the batches every `flush_interval_ms` milliseconds, so the rows don't
+        wait when the tick rate is low, log the stats every `stats_interval` seconds
+        and maintain the partitions every `maintenance_interval` seconds.
+        """
+        while not self._stop_event.wait(self.flush_interval_ms / 1000):
+            self.flush(wait=False)
+
+            if time.monotonic() - self._last_stats_time >= self.stats_interval:
+                self._last_stats_time = time.monotonic()
+                logger.info("PostgresDataSaver stats: %s", self.stats())
+
+            if time.monotonic() - self._last_maintenance_time >= (
+                self.maintenance_interval
+            ):
+                self._last_maintenance_time = time.monotonic()
+                self.maintain_partitions()
+
+    def maintain_partitions(self) -> dict[str, list[str]]:
+        """
+        Create the partitions of the table ahead and drop the expired ones with the
+        partition policy. The insertions continue if the maintenance fails.
+        """
+        if self.partition_policy is None:
+            return {}
+
+        try:
+            return self.partition_policy.maintain(self.engine)
+        except Exception as e:
+            logger.error("Failed to maintain the partitions: %s", e)
+            return {}
+
+    def stats(self) -> dict[str, float]:
+        """
+        Get the throughput and the commit latency of the insertions of all the writers.
+
+        Returns
+        -------
+        ``dict[str, float]``
+            The number of rows inserted and failed, the number of batches and the
+            batches waiting in the queues, the rows inserted per second since the
+            start and the average and maximum commit latency in milliseconds
+        """
+        elapsed_time = time.monotonic() - self._start_time
+        inserted_rows = sum(writer.inserted_rows for writer in self.writers)
+        batches = sum(writer.batches for writer in self.writers)
+        total_commit_time = sum(writer.total_commit_time for writer in self.writers)
+
+        return {
+            "inserted_rows": inserted_rows,
+            "failed_rows": sum(writer.failed_rows for writer in self.writers),
+            "batches": batches,
+            "queued_batches": sum(writer.queue.qsize() for writer in self.writers),
+            "rows_per_second": inserted_rows / elapsed_time if elapsed_time else 0,
+            "avg_commit_ms": total_commit_time / batches * 1000 if batches else 0,
+            "max_commit_ms": max(writer.max_commit_time for writer in self.writers)
+            * 1000,
+        }
+
+    def close(self):
+        """
+        Stop the periodic flush and insert the remaining rows.
+        """
+        self._stop_event.set()
+        self._flush_thread.join()
+        self.flush()
+
+        for writer in self.writers:
+            writer.close()
+
+        logger.info("PostgresDataSaver stats: %s", self.stats())
+
+    @classmethod
+    def from_cfg(
+        cls, cfg: DictConfig, consumer: KafkaConsumer | StreamConsumer | None = None
+    ) -> Optional["PostgresDataSaver"]:
+        # The connection module reads the database details from the environment, it
+        # is imported only when the postgres saver is used
+        # pylint: disable=import-outside-toplevel
+        from app.data_layer.database.db_connections.postgresql import (
+            create_db_and_tables,
+            get_engine,
+        )
+
+        on_conflict = cfg.get("on_conflict", "ignore")
+        if on_conflict not in ON_CONFLICT_ACTIONS:
+            logger.error(
+                "Invalid on_conflict action: %s. No data will be saved.", on_conflict
+            )
+            return None
+
+        schema = cfg.get("schema", "default")
+        if schema not in SCHEMA_MODELS:
+            logger.error("Invalid schema: %s. No data will be saved.", schema)
+            return None
+
+        try:
+            partition_policy = PartitionPolicy.from_cfg(cfg.get("partitions"))
+        except ValueError as e:
+            logger.error(
+                "Invalid partition configuration: %s. No data will be saved.", e
+            )
+            return None
+
+        # Only the InstrumentPrice table is partitioned
+        if schema == "compact" and partition_policy is not None:
+            logger.warning(
+                "The compact table is not partitioned, the partitions are not managed"
+            )
+            partition_policy = None
+
+        try:
+            engine = get_engine()
+        except ValueError as e:
+            logger.error(
+                "Invalid database configuration: %s. No data will be saved.", e
+            )
+            return None
+
+        try:
+            create_db_and_tables(engine)
+
+            saver = cls(
+                (
+                    consumer
+                    if consumer is not None
+                    else init_consumer(cfg.streaming, cfg.get("name"))
+                ),
+                engine,
+                batch_size=cfg.get("batch_size", 5000),
+                flush_interval_ms=cfg.get("flush_interval_ms", 500),
+                num_writers=cfg.get("num_writers", 1),
+                on_conflict=on_conflict,
+                queue_size=cfg.get("queue_size", 8),
+                stats_interval=cfg.get("stats_interval", 60),
+                partition_policy=partition_policy,
+                maintenance_interval=(cfg.get("partitions") or {}).get(
+                    "maintenance_interval", 3600
+                ),
+                schema=schema,
+            )
+            saver.configure_polling(cfg)
+            if consumer is None:
+                saver.configure_dedup(cfg)
+
+            return saver
+        except NoBrokersAvailable:
+            logger.error(
+                "No Broker is available at the address: %s. No data will be saved.",
+                cfg.streaming.kafka_server,
+            )
+            return None
+        except ValueError as e:
+            logger.error("Failed to create the consumer: %s. No data will be saved.", e)
+            return None
+        except Exception as e:
+            logger.error(
+                "Failed to connect to the database: %s. No data will be saved.", e
+            )
+            return None
@@ -1,30 +1,51 @@
 import json
-from datetime import datetime
+import time
 from pathlib import Path
-from typing import Optional
+from threading import Event, Lock, Thread
+from typing import Any, Mapping, Optional, cast
 
 from kafka import KafkaConsumer
 from kafka.errors import NoBrokersAvailable
-from omegaconf import DictConfig
-from sqlalchemy import create_engine
+from omegaconf import DictConfig, OmegaConf
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
 
 from app.data_layer.data_saver.data_saver import DataSaver
-from app.data_layer.database.crud.crud_utils import insert_data
+from app.data_layer.data_saver.rotation import RotationPolicy
+from app.data_layer.database.db_connections.engine_registry import (
+    dispose_engines,
+    get_engine,
+    register_engine,
+)
 from app.data_layer.database.db_connections.sqlite import (
     create_db_and_tables,
-    get_session,
+    set_sqlite_pragmas,
 )
 from app.data_layer.database.models import InstrumentPrice
+from app.data_layer.streaming.consumer import StreamConsumer, init_consumer
 from app.utils.common.logger import get_logger
 
 logger = get_logger(Path(__file__).name)
 
+# WAL lets the readers query the database while the ticks are written, and NORMAL
+# synchronous mode syncs the WAL only at checkpoints instead of at every commit
+DEFAULT_PRAGMAS = {
+    "journal_mode": "WAL",
+    "synchronous": "NORMAL",
+    "cache_size": -65536,
+    "temp_store": "MEMORY",
+    "busy_timeout": 5000,
+}
+INSTRUMENT_PRICE_COLUMNS = tuple(InstrumentPrice.__table__.columns.keys())  # type: ignore
+
 
 @DataSaver.register("sqlite_saver")
 class SqliteDataSaver(DataSaver):
     """
     This SqliteDataSaver retrieve the data from kafka consumer and save it
-    to sqilte database.
+    to sqilte database. The rows are inserted in batches of `batch_size` rows,
+    or every `flush_interval_ms` milliseconds, with one executemany in a
+    single transaction. The database uses WAL mode by default. A new database
+    is started following the `rotation` policy.
 
     Attributes
     ----------
@@ -33,13 +54,36 @@ class SqliteDataSaver(DataSaver):
     sqlite_db: ``str``
         Sqlite database path to save the data. The database will be created
         in the specified path. The name of the database will be the given name
-        appended with the current date.
+        appended with the current segment.
         For example: `sqlite_db` = "data.sqlite3", then the database name will
         be `data_2021_09_01.sqlite3`
+    batch_size: ``int``, ( default = 1000 )
+        The number of ticks inserted in a single transaction
+    flush_interval_ms: ``int``, ( default = 500 )
+        The maximum time in milliseconds a tick waits before being inserted
+    pragmas: ``Mapping[str, Any] | None``, ( default = None )
+        The SQLite pragmas set on each connection, defaults to `DEFAULT_PRAGMAS`
+    stats_interval: ``float``, ( default = 60 )
+        The interval in seconds at which the insertion stats are logged
+    rotation: ``RotationPolicy | None``, ( default = None )
+        The rotation policy of the database, defaults to a daily rotation
     """
 
-    def __init__(self, consumer: KafkaConsumer, sqlite_db: str | Path) -> None:
+    def __init__(
+        self,
+        consumer: KafkaConsumer,
+        sqlite_db: str | Path,
+        batch_size: int = 1000,
+        flush_interval_ms: int = 500,
+        pragmas: Mapping[str, Any] | None = None,
+        stats_interval: float = 60,
+        rotation: RotationPolicy | None = None,
+    ) -> None:
+        super().__init__(rotation)
         self.consumer = consumer
+        self.batch_size = batch_size
+        self.flush_interval_ms = flush_interval_ms
+        self.stats_interval = stats_interval
 
         if isinstance(sqlite_db, str):
             sqlite_db = Path(sqlite_db)
@@ -50,16 +94,50 @@ class SqliteDataSaver(DataSaver):
         if not sqlite_db.parent.exists():
             sqlite_db.parent.mkdir(parents=True, exist_ok=True)
 
-        current_date = datetime.now().strftime("%Y_%m_%d")
-        self.sqlite_db = f"sqlite:///{sqlite_db}_{current_date}.sqlite3"
+        self._db_path = sqlite_db
+        self.pragmas = DEFAULT_PRAGMAS if pragmas is None else pragmas
+        self._open_database()
+
+        self._insert_stmt = sqlite_insert(
+            InstrumentPrice.__table__  # type: ignore
+        ).on_conflict_do_nothing()
+        self._buffer: list[dict[str, Any]] = []
+        self._lock = Lock()
+
+        self.inserted_rows = 0
+        self.failed_rows = 0
+        self.batches = 0
+        self.total_commit_time = 0.0
+        self.max_commit_time = 0.0
+        self._start_time = time.monotonic()
+        self._last_stats_time = self._start_time
+
+        self._stop_event = Event()
+        self._flush_thread = Thread(target=self._flush_periodically, daemon=True)
+        self._flush_thread.start()
+
+    def _open_database(self):
+        """
+        Create the engine of the database of the current segment and its tables.
+        """
+        self.db_file_path = self.get_segment_path(self._db_path, ".sqlite3")
+        self.sqlite_db = f"sqlite:///{self.db_file_path}"
 
-        self.engine = create_engine(self.sqlite_db)
+        # The engine of each segment is registered with its url and removed from the
+        # registry once the segment is closed
+        register_engine(
+            self.sqlite_db,
+            self.sqlite_db,
+            on_create=lambda engine: set_sqlite_pragmas(engine, self.pragmas),
+        )
+        self.engine = get_engine(self.sqlite_db)
         create_db_and_tables(self.engine)
 
     def save_stock_data(self, data: dict[str, str | None]) -> None:
         """
-        Create a InstrumentPrice object from the given data and save it
-        to the sqlite database.
+        Create a InstrumentPrice object from the given data and add it to the
+        batch of rows to be inserted. The batch is inserted once it has
+        `batch_size` rows.
 
         Parameters
         ----------
@@ -84,8 +162,147 @@ class SqliteDataSaver(DataSaver):
             total_buy_quantity=data.get("total_buy_quantity"),
             total_sell_quantity=data.get("total_sell_quantity"),
         )
-        with get_session(self.engine) as session:
-            insert_data(InstrumentPrice, instrument_price, session=session)
+
+        with self._lock:
+            self._buffer.append(
+                {
+                    column: getattr(instrument_price, column)
+                    for column in INSTRUMENT_PRICE_COLUMNS
+                }
+            )
+            is_full = len(self._buffer) >= self.batch_size
+
+        if is_full:
+            self.flush()
+
+    def save_batch(self, data: list[dict[str, Any]]):
+        """
+        Add the ticks to the batch of rows to be inserted.
+        """
+        for tick in data:
+            self.save_stock_data(tick)
+
+    def insert_rows(self, rows: list[dict[str, Any]]) -> int:
+        """
+        Insert the rows with a single executemany in one transaction. The rows
+        already present in the database are ignored. If the insertion fails, the
+        whole batch is rolled back and counted as failed.
+
+        Parameters
+        ----------
+        rows: ``list[dict[str, Any]]``
+            The rows of the InstrumentPrice table
+
+        Returns
+        -------
+        ``int``
+            The number of rows inserted
+        """
+        if not rows:
+            return 0
+
+        start_time = time.perf_counter()
+        try:
+            with self.engine.begin() as connection:
+                connection.execute(self._insert_stmt, rows)
+        except Exception as e:
+            self.failed_rows += len(rows)
+            logger.error("Failed to insert a batch of %d rows: %s", len(rows), e)
+            return 0
+
+        commit_time = time.perf_counter() - start_time
+        self.inserted_rows += len(rows)
+        self.batches += 1
+        self.total_commit_time += commit_time
+        self.max_commit_time = max(self.max_commit_time, commit_time)
+
+        return len(rows)
+
+    def flush(self):
+        """
+        Insert the rows waiting in the batch.
+        """
+        with self._lock:
+            rows, self._buffer = self._buffer, []
+            self.insert_rows(rows)
+
+    def _flush_periodically(self):
+        """
+        Insert the batch every `flush_interval_ms` milliseconds, so the rows don't
+        wait when the tick rate is low, and log the stats every `stats_interval`
+        seconds.
+        """
+        while not self._stop_event.wait(self.flush_interval_ms / 1000):
+            self.flush()
+
+            if time.monotonic() - self._last_stats_time >= self.stats_interval:
+                self._last_stats_time = time.monotonic()
+                logger.info("SqliteDataSaver stats: %s", self.stats())
+
+    def stats(self) -> dict[str, float]:
+        """
+        Get the throughput and the commit latency of the insertions.
+
+        Returns
+        -------
+        ``dict[str, float]``
+            The number of rows inserted and failed, the number of batches, the rows
+            inserted per second since the start and the average and maximum commit
+            latency in milliseconds
+        """
+        elapsed_time = time.monotonic() - self._start_time
+
+        return {
+            "inserted_rows": self.inserted_rows,
+            "failed_rows": self.failed_rows,
+            "batches": self.batches,
+            "rows_per_second": self.inserted_rows / elapsed_time if elapsed_time else 0,
+            "avg_commit_ms": (
+                self.total_commit_time / self.batches * 1000 if self.batches else 0
+            ),
+            "max_commit_ms": self.max_commit_time * 1000,
+        }
+
+    def segment_size(self) -> int:
+        """
+        Get the size of the database of the current segment with its WAL file.
+        """
+        return sum(
+            file_path.stat().st_size
+            for file_path in (
+                self.db_file_path,
+                self.db_file_path.with_name(self.db_file_path.name + "-wal"),
+            )
+            if file_path.exists()
+        )
+
+    def rotate_segment(self) -> list[Path]:
+        """
+        Insert the remaining rows, close the database and open the database of the
+        next segment. The connections are closed before the database is finalized,
+        so its WAL file is checkpointed into the database.
+        """
+        with self._lock:
+            rows, self._buffer = self._buffer, []
+            self.insert_rows(rows)
+
+            dispose_engines(self.sqlite_db, remove=True)
+            file_path = self.db_file_path
+            self._open_database()
+
+        return [file_path]
+
+    def close(self):
+        """
+        Stop the periodic flush, insert the remaining rows and finalize the database.
+        """
+        self._stop_event.set()
+        self._flush_thread.join()
+        self.flush()
+        logger.info("SqliteDataSaver stats: %s", self.stats())
+
+        dispose_engines(self.sqlite_db, remove=True)
+        self.finalize_segments([self.db_file_path], wait=True)
 
     def save(self, data: bytes) -> None:
         """
@@ -102,28 +319,47 @@ class SqliteDataSaver(DataSaver):
         data_to_insert = json.loads(decoded_data)
         self.save_stock_data(data_to_insert)
 
-    def retrieve_and_save(self):
-        """
-        Retrieve the data from the kafka consumer and save it to the sqlite
-        database.
-        """
-        for message in self.consumer:
-            self.save(message.value)
-
     @classmethod
-    def from_cfg(cls, cfg: DictConfig) -> Optional["SqliteDataSaver"]:
+    def from_cfg(
+        cls, cfg: DictConfig, consumer: KafkaConsumer | StreamConsumer | None = None
+    ) -> Optional["SqliteDataSaver"]:
         try:
-            return cls(
-                KafkaConsumer(
-                    cfg.streaming.kafka_topic,
-                    bootstrap_servers=cfg.streaming.kafka_server,
-                    auto_offset_reset="earliest",
+            rotation = RotationPolicy.from_cfg(cfg.get("rotation"))
+        except ValueError as e:
+            logger.error("Invalid rotation: %s. No data will be saved.", e)
+            return None
+
+        try:
+            pragmas = (
+                cast(dict[str, Any], OmegaConf.to_container(cfg.pragmas))
+                if cfg.get("pragmas") is not None
+                else None
+            )
+
+            saver = cls(
+                (
+                    consumer
+                    if consumer is not None
+                    else init_consumer(cfg.streaming, cfg.get("name"))
                 ),
                 cfg.get("sqlite_db"),
+                batch_size=cfg.get("batch_size", 1000),
+                flush_interval_ms=cfg.get("flush_interval_ms", 500),
+                pragmas=pragmas,
+                stats_interval=cfg.get("stats_interval", 60),
+                rotation=rotation,
             )
+            saver.configure_polling(cfg)
+            if consumer is None:
+                saver.configure_dedup(cfg)
+
+            return saver
         except NoBrokersAvailable:
             logger.error(
                 "No Broker is availble at the address: %s. No data will be saved.",
                 cfg.streaming.kafka_server,
             )
             return None
+        except ValueError as e:
+            logger.error("Failed to create the consumer: %s. No data will be saved.", e)
+            return None
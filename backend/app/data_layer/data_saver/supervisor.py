@@ -0,0 +1,418 @@
+"""
+This module contains the supervisor that runs each data saver in its own processes, so
+the decoding, the validation and the writing of the ticks of the data savers don't
+contend for the GIL of a single process. A data saver consuming from Kafka can run
+in several processes of the same consumer group, the partitions of the topic are then
+split between them. The other streaming servers don't split the messages between the
+consumers, so their data savers run in a single process.
+The supervisor restarts the processes that exit and aggregates the metrics sent by
+the processes.
+"""
+
+import queue
+import signal
+import sys
+import time
+from multiprocessing import get_context
+from multiprocessing.context import DefaultContext
+from pathlib import Path
+from threading import Event, Thread
+from typing import Any, Callable, Iterable, Optional, cast
+
+from omegaconf import DictConfig, OmegaConf
+
+from app.data_layer.data_saver.data_saver import DataSaver
+from app.utils.common import init_from_cfg
+from app.utils.common.logger import get_logger
+
+logger = get_logger(Path(__file__).name)
+
+# The configuration keys of the files written by a single process, the keys of the
+# nested sections are joined with dots. The files of the other processes of the data
+# saver are suffixed with the index of the process
+REPLICA_PATH_KEYS = (
+    "csv_file_path",
+    "jsonl_file_path",
+    "sqlite_db",
+    "state_file_path",
+    "sink.csv_file_path",
+    "rotation.manifest_path",
+)
+
+
+def get_replica_config(config: dict[str, Any], replica: int) -> dict[str, Any]:
+    """
+    Get the configuration of a process of the data saver. The first process writes
+    to the configured files and the others to their own files.
+    Eg: `data.csv`, then `data_1.csv` for the second process.
+
+    Parameters
+    ----------
+    config: ``dict[str, Any]``
+        The resolved configuration of the data saver
+    replica: ``int``
+        The index of the process
+
+    Returns
+    -------
+    ``dict[str, Any]``
+        The configuration of the process
+    """
+    if replica == 0:
+        return config
+
+    config = dict(config)
+    for key in REPLICA_PATH_KEYS:
+        *sections, name = key.split(".")
+
+        # The sections are copied so the configuration of the first process is kept
+        section = config
+        for section_name in sections:
+            if not isinstance(section.get(section_name), dict):
+                break
+            section[section_name] = dict(section[section_name])
+            section = section[section_name]
+        else:
+            if section.get(name):
+                file_path = Path(section[name])
+                section[name] = str(
+                    file_path.with_name(f"{file_path.stem}_{replica}{file_path.suffix}")
+                )
+
+    return config
+
+
+def run_saver_process(
+    name: str,
+    config: dict[str, Any],
+    replica: int,
+    metrics_queue: Any,
+    metrics_interval: float,
+):
+    """
+    Create the data saver from its configuration and run it until the process is
+    terminated. The metrics of the data saver are sent to the supervisor every
+    `metrics_interval` seconds and when it stops. The process exits with 1 if the
+    data saver could not be created or stopped on an error.
+
+    Parameters
+    ----------
+    name: ``str``
+        The name of the data saver
+    config: ``dict[str, Any]``
+        The resolved configuration of the data saver
+    replica: ``int``
+        The index of the process
+    metrics_queue: ``multiprocessing.Queue``
+        The queue the metrics are sent to
+    metrics_interval: ``float``
+        The interval in seconds at which the metrics are sent
+    """
+    saver = init_from_cfg(OmegaConf.create(config), DataSaver)
+
+    if saver is None:
+        logger.error("Data saver %s could not be created", name)
+        sys.exit(1)
+
+    stop_event = Event()
+
+    def stop(*_):
+        stop_event.set()
+        saver.stop()
+
+    signal.signal(signal.SIGTERM, stop)
+    signal.signal(signal.SIGINT, stop)
+
+    def send_metrics():
+        metrics_queue.put((name, replica, saver.metrics()))
+
+    def report_metrics():
+        while not stop_event.wait(metrics_interval):
+            send_metrics()
+
+    Thread(target=report_metrics, daemon=True).start()
+    saver.retrieve_and_save()
+    send_metrics()
+
+    sys.exit(0 if stop_event.is_set() else 1)
+
+
+class SaverProcess:
+    """
+    A process of a data saver with its restart state.
+
+    Attributes
+    ----------
+    name: ``str``
+        The name of the data saver
+    replica: ``int``
+        The index of the process among the processes of the data saver
+    config: ``dict[str, Any]``
+        The resolved configuration of the process
+    """
+
+    def __init__(self, name: str, replica: int, config: dict[str, Any]):
+        self.name = name
+        self.replica = replica
+        self.config = config
+
+        self.process: Any = None
+        self.started_at = 0.0
+        self.restart_at = 0.0
+        self.restart_delay = 0.0
+        self.restarts = 0
+
+    def __repr__(self) -> str:
+        return f"{self.name}[{self.replica}]"
+
+
+class SaverSupervisor:
+    """
+    SaverSupervisor runs the data savers in their own processes. A process that exits
+    is restarted after `restart_delay` seconds, the delay is doubled at each restart
+    up to `max_restart_delay` and reset once the process runs for longer than
+    `max_restart_delay`. The last metrics of the processes are summed by data saver
+    and logged every `metrics_interval` seconds.
+
+    Attributes
+    ----------
+    savers: ``dict[str, tuple[dict[str, Any], int]]``
+        The resolved configuration and the number of processes of each data saver
+    start_method: ``str``, ( default = "spawn" )
+        The start method of the processes, `spawn` starts them without the state of
+        the supervisor
+    restart_delay: ``float``, ( default = 1.0 )
+        The delay in seconds before a process is restarted
+    max_restart_delay: ``float``, ( default = 60 )
+        The maximum delay in seconds before a process is restarted
+    metrics_interval: ``float``, ( default = 60 )
+        The interval in seconds at which the metrics are sent and logged
+    target: ``Callable``, ( default = run_saver_process )
+        The function run by the processes
+    """
+
+    def __init__(
+        self,
+        savers: dict[str, tuple[dict[str, Any], int]],
+        start_method: str = "spawn",
+        restart_delay: float = 1.0,
+        max_restart_delay: float = 60,
+        metrics_interval: float = 60,
+        target: Callable = run_saver_process,
+    ):
+        self.context = cast(DefaultContext, get_context(start_method))
+        self.restart_delay = restart_delay
+        self.max_restart_delay = max_restart_delay
+        self.metrics_interval = metrics_interval
+        self.target = target
+
+        self.processes = [
+            SaverProcess(name, replica, get_replica_config(config, replica))
+            for name, (config, num_processes) in savers.items()
+            for replica in range(num_processes)
+        ]
+        self.metrics_queue = self.context.Queue()
+        self.latest_metrics: dict[tuple[str, int], dict[str, float]] = {}
+        self._stop_event = Event()
+
+    def _start(self, saver_process: SaverProcess):
+        saver_process.process = self.context.Process(
+            target=self.target,
+            args=(
+                saver_process.name,
+                saver_process.config,
+                saver_process.replica,
+                self.metrics_queue,
+                self.metrics_interval,
+            ),
+            name=f"data_saver_{saver_process}",
+            daemon=False,
+        )
+        saver_process.process.start()
+        saver_process.started_at = time.monotonic()
+        logger.info("Started the saver process %s", saver_process)
+
+    def _check(self, saver_process: SaverProcess):
+        """
+        Schedule the restart of the process if it exited and restart it once its
+        delay is over.
+        """
+        process = saver_process.process
+        now = time.monotonic()
+
+        if process is not None and process.is_alive():
+            return
+
+        if process is not None:
+            if now - saver_process.started_at > self.max_restart_delay:
+                saver_process.restart_delay = 0
+
+            saver_process.restart_delay = min(
+                max(saver_process.restart_delay * 2, self.restart_delay),
+                self.max_restart_delay,
+            )
+            saver_process.restart_at = now + saver_process.restart_delay
+            saver_process.process = None
+            logger.error(
+                "The saver process %s exited with code %s, restarting it in %s seconds",
+                saver_process,
+                process.exitcode,
+                saver_process.restart_delay,
+            )
+            return
+
+        if now >= saver_process.restart_at:
+            saver_process.restarts += 1
+            self._start(saver_process)
+
+    def _drain_metrics(self, timeout: float):
+        try:
+            name, replica, metrics = self.metrics_queue.get(timeout=timeout)
+            self.latest_metrics[(name, replica)] = metrics
+
+            while True:
+                name, replica, metrics = self.metrics_queue.get_nowait()
+                self.latest_metrics[(name, replica)] = metrics
+        except queue.Empty:
+            pass
+
+    def metrics(self) -> dict[str, dict[str, float]]:
+        """
+        Get the last metrics of the processes summed by data saver, with the number
+        of running processes and of restarts.
+        """
+        metrics: dict[str, dict[str, float]] = {}
+
+        for saver_process in self.processes:
+            saver_metrics = metrics.setdefault(
+                saver_process.name, {"processes": 0, "restarts": 0}
+            )
+            saver_metrics["restarts"] += saver_process.restarts
+            if saver_process.process is not None and saver_process.process.is_alive():
+                saver_metrics["processes"] += 1
+
+            for key, value in self.latest_metrics.get(
+                (saver_process.name, saver_process.replica), {}
+            ).items():
+                if key.startswith(("avg_", "max_")):
+                    saver_metrics[key] = max(saver_metrics.get(key, 0), value)
+                else:
+                    saver_metrics[key] = saver_metrics.get(key, 0) + value
+
+        return metrics
+
+    def run(self):
+        """
+        Start the processes and supervise them until `stop` is called.
+        """
+        for saver_process in self.processes:
+            self._start(saver_process)
+
+        last_log_time = time.monotonic()
+
+        try:
+            while not self._stop_event.is_set():
+                self._drain_metrics(timeout=0.5)
+
+                for saver_process in self.processes:
+                    if not self._stop_event.is_set():
+                        self._check(saver_process)
+
+                if time.monotonic() - last_log_time >= self.metrics_interval:
+                    last_log_time = time.monotonic()
+                    logger.info("Saver metrics: %s", self.metrics())
+        except KeyboardInterrupt:
+            logger.info("Stopping the saver processes")
+        finally:
+            self.close()
+
+    def stop(self):
+        """
+        Stop supervising the processes, they are terminated by `run`.
+        """
+        self._stop_event.set()
+
+    def close(self, timeout: float = 30):
+        """
+        Ask the processes to stop, so the data savers flush and commit the consumed
+        messages, and kill the processes still running after `timeout` seconds.
+        """
+        self._stop_event.set()
+        running = [
+            saver_process.process
+            for saver_process in self.processes
+            if saver_process.process is not None and saver_process.process.is_alive()
+        ]
+
+        for process in running:
+            process.terminate()
+
+        deadline = time.monotonic() + timeout
+        for process in running:
+            process.join(max(deadline - time.monotonic(), 0))
+
+            if process.is_alive():
+                logger.error("Killing the saver process %s", process.name)
+                process.kill()
+                process.join()
+
+        self._drain_metrics(timeout=0)
+        logger.info("Saver metrics: %s", self.metrics())
+
+    @classmethod
+    def from_cfg(
+        cls, cfg: DictConfig, savers_cfg: Iterable[DictConfig]
+    ) -> Optional["SaverSupervisor"]:
+        """
+        Create the supervisor from the `execution` configuration and the list of the
+        data saver configurations by name.
+        Eg: [{"csv_saver": {...}}, {"sqlite_saver": {...}}]
+
+        Parameters
+        ----------
+        cfg: ``DictConfig``
+            The execution configuration, with the number of processes of the data
+            savers in `processes`. Eg: {"processes": {"sqlite_saver": 2}}. Only the
+            data savers consuming from Kafka can have more than one process
+        savers_cfg: ``Iterable[DictConfig]``
+            The configurations of the data savers
+        """
+        processes = cfg.get("processes") or {}
+        savers = {}
+
+        for saver_cfg in savers_cfg:
+            saver_name, config = list(saver_cfg.items())[0]
+            num_processes = processes.get(saver_name, 1)
+
+            if num_processes < 1:
+                logger.info("Data saver %s has no process, it is skipped", saver_name)
+                continue
+
+            streaming_name = (config.get("streaming") or {}).get("name", "kafka")
+            if num_processes > 1 and streaming_name != "kafka":
+                logger.error(
+                    "Data saver %s can't run in %s processes, only the Kafka consumer "
+                    "groups split the messages between the processes, the %s "
+                    "consumers would each save all the messages",
+                    saver_name,
+                    num_processes,
+                    streaming_name,
+                )
+                return None
+
+            savers[saver_name] = (
+                OmegaConf.to_container(config, resolve=True),
+                num_processes,
+            )
+
+        if not savers:
+            logger.error("No data saver to run. No data will be saved.")
+            return None
+
+        return cls(
+            savers,  # type: ignore
+            start_method=cfg.get("start_method", "spawn"),
+            restart_delay=cfg.get("restart_delay", 1.0),
+            max_restart_delay=cfg.get("max_restart_delay", 60),
+            metrics_interval=cfg.get("metrics_interval", 60),
+        )
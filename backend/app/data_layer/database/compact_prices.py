@@ -0,0 +1,280 @@
+"""
+This module converts the ticks to the rows of the CompactInstrumentPrice table and
+back, and migrates the rows of the InstrumentPrice table to it.
+
+The ticks carry the retrieval timestamp as `str(time.time())` and the last traded
+timestamp as epoch seconds or milliseconds. They are stored as epoch nanoseconds,
+parsed without building datetimes. The SmartAPI prices are integer paise and the
+Upstox prices are rupees, both are stored as integer paise. The rows are converted
+back to datetimes and to the prices of their data provider, as in the InstrumentPrice
+table, only when they are read.
+"""
+
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Any
+
+from sqlalchemy import tuple_
+from sqlalchemy.engine import Engine
+from sqlmodel import Session, select
+
+from app.data_layer.database.crud.crud_utils import insert_data
+from app.data_layer.database.models import CompactInstrumentPrice, InstrumentPrice
+from app.utils.common.logger import get_logger
+from app.utils.common.types.financial_types import DataProviderType
+
+logger = get_logger(Path(__file__).name)
+
+COMPACT_COLUMNS = tuple(CompactInstrumentPrice.__table__.columns.keys())  # type: ignore
+
+# The value of the missing timestamps and prices, like -1 in the ticks
+MISSING = -1
+
+NANOSECONDS_PER_SECOND = 1_000_000_000
+EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+
+# Data provider id -> number of paise in a price unit of the data provider
+PRICE_SCALES = {
+    DataProviderType.SMARTAPI.value: 1,
+    DataProviderType.UPLINK.value: 100,
+}
+
+
+def to_epoch_ns(value: Any) -> int:
+    """
+    Convert the timestamp of the tick to epoch nanoseconds. The epoch timestamps are
+    given in seconds, milliseconds, microseconds or nanoseconds, the decimal strings
+    of seconds are converted without rounding. The naive datetimes are UTC.
+    Eg: "1729532024.309936" -> 1729532024309936000
+
+    Raises
+    ------
+    ``ValueError``
+        If the value is not a timestamp
+    """
+    if value is None:
+        return MISSING
+
+    if isinstance(value, datetime):
+        if value.tzinfo is None:
+            value = value.replace(tzinfo=timezone.utc)
+        return (value - EPOCH) // timedelta(microseconds=1) * 1000
+
+    if isinstance(value, str):
+        seconds, _, fraction = value.partition(".")
+        if seconds.isdigit() and fraction.isdigit() and int(seconds) < 1e11:
+            return int(seconds) * NANOSECONDS_PER_SECOND + int(
+                fraction[:9].ljust(9, "0")
+            )
+        value = float(value)
+
+    if value < 0:
+        return MISSING
+
+    if value > 1e17:
+        return int(value)
+
+    # Timestamps after 1973 in milliseconds are larger than 1e11. The floats are
+    # rounded to microseconds, the precision of `time.time()`
+    if value > 1e14:
+        scale = 1
+    elif value > 1e11:
+        scale = 1_000
+    else:
+        scale = 1_000_000
+
+    if isinstance(value, int):
+        return value * scale * 1000
+
+    return round(value * scale) * 1000
+
+
+def from_epoch_ns(value: int | None) -> datetime | None:
+    """
+    Convert the epoch nanoseconds to a UTC datetime, None if the timestamp is missing.
+    The nanoseconds are truncated to microseconds.
+    """
+    if value is None or value < 0:
+        return None
+
+    return EPOCH + timedelta(microseconds=value // 1000)
+
+
+def to_paise(price: Any, data_provider_id: int) -> int | None:
+    """
+    Convert the price of the data provider to integer paise. Negative prices are
+    missing values.
+    Eg: 2000.5 -> 200050 for Upstox, 200050 -> 200050 for SmartAPI
+    """
+    if price is None:
+        return None
+
+    price = float(price)
+    if price < 0:
+        return MISSING
+
+    return round(price * PRICE_SCALES.get(data_provider_id, 100))
+
+
+def from_paise(price: int | None, data_provider_id: int) -> float | None:
+    """
+    Convert the price in paise back to the price of the data provider, -1 if the
+    price is missing.
+    Eg: 200050 -> 2000.5 for Upstox, 200050 -> 200050.0 for SmartAPI
+    """
+    if price is None:
+        return None
+
+    if price < 0:
+        return float(MISSING)
+
+    return price / PRICE_SCALES.get(data_provider_id, 100)
+
+
+def to_int(value: Any) -> int | None:
+    """
+    Convert the quantity of the tick to an integer, truncating the fractions.
+    """
+    if value is None:
+        return None
+
+    return int(value) if isinstance(value, int) else int(float(value))
+
+
+def encode_tick(data: dict[str, Any]) -> dict[str, Any]:
+    """
+    Convert the tick, or a row of the InstrumentPrice table, to the values of the
+    CompactInstrumentPrice table.
+
+    Parameters
+    ----------
+    data: ``dict[str, Any]``
+        The tick, with all the required fields of InstrumentPrice
+
+    Raises
+    ------
+    ``KeyError``
+        If a required field is missing
+    ``ValueError``
+        If a field is not a number
+
+    Returns
+    -------
+    ``dict[str, Any]``
+        The values of the columns of CompactInstrumentPrice
+    """
+    data_provider_id = int(data["data_provider_id"])
+
+    return {
+        "retrieval_timestamp": to_epoch_ns(data["retrieval_timestamp"]),
+        "last_traded_timestamp": to_epoch_ns(data["last_traded_timestamp"]),
+        "last_traded_price": to_paise(data["last_traded_price"], data_provider_id),
+        "last_traded_quantity": to_int(data.get("last_traded_quantity")),
+        "average_traded_price": to_paise(
+            data.get("average_traded_price"), data_provider_id
+        ),
+        "volume_trade_for_the_day": to_int(data.get("volume_trade_for_the_day")),
+        "total_buy_quantity": to_int(data.get("total_buy_quantity")),
+        "total_sell_quantity": to_int(data.get("total_sell_quantity")),
+        "exchange_id": int(data["exchange_id"]),
+        "data_provider_id": data_provider_id,
+        "symbol": data["symbol"],
+    }
+
+
+def encode_tick_row(data: dict[str, Any]) -> tuple:
+    """
+    Convert the tick to a row with the values of `COMPACT_COLUMNS`.
+    """
+    values = encode_tick(data)
+    return tuple(values[column] for column in COMPACT_COLUMNS)
+
+
+def decode_row(row: CompactInstrumentPrice | dict[str, Any]) -> dict[str, Any]:
+    """
+    Convert the row of the CompactInstrumentPrice table to the values of
+    InstrumentPrice, with UTC datetimes and the prices in the unit of the data
+    provider, so the rows decode to the prices of the migrated rows.
+    """
+    values = row.to_dict() if isinstance(row, CompactInstrumentPrice) else dict(row)
+    data_provider_id = int(values["data_provider_id"])
+
+    values["retrieval_timestamp"] = from_epoch_ns(values["retrieval_timestamp"])
+    values["last_traded_timestamp"] = from_epoch_ns(values["last_traded_timestamp"])
+    values["last_traded_price"] = from_paise(
+        values["last_traded_price"], data_provider_id
+    )
+    values["average_traded_price"] = from_paise(
+        values.get("average_traded_price"), data_provider_id
+    )
+
+    return values
+
+
+def migrate_instrument_prices(
+    db_engine: Engine,
+    batch_size: int = 50000,
+    start: datetime | None = None,
+    end: datetime | None = None,
+) -> int:
+    """
+    Copy the rows of the InstrumentPrice table to the CompactInstrumentPrice table,
+    creating it if it does not exist. The rows are read in batches in the order of
+    the primary key, and each batch is inserted in its own transaction, so the
+    migration can run while the savers write to the tables. The rows already copied
+    are ignored, so an interrupted migration is resumed by running it again. The
+    InstrumentPrice table is left as is, it can be dropped once the savers use the
+    compact schema.
+
+    Parameters
+    ----------
+    db_engine: ``Engine``
+        The engine of the database
+    batch_size: ``int``, ( default = 50000 )
+        The number of rows copied per transaction
+    start: ``datetime | None``, ( default = None )
+        Copy the rows retrieved from this time, all the rows if None
+    end: ``datetime | None``, ( default = None )
+        Copy the rows retrieved before this time, all the rows if None
+
+    Returns
+    -------
+    ``int``
+        The number of rows read from the InstrumentPrice table
+    """
+    if batch_size < 1:
+        raise ValueError(f"Invalid batch size: {batch_size}")
+
+    CompactInstrumentPrice.__table__.create(db_engine, checkfirst=True)  # type: ignore
+
+    key_columns = [
+        InstrumentPrice.__table__.columns[column.name]  # type: ignore
+        for column in InstrumentPrice.__table__.primary_key.columns  # type: ignore
+    ]
+    statement = select(InstrumentPrice).order_by(*key_columns).limit(batch_size)
+    if start is not None:
+        statement = statement.where(InstrumentPrice.retrieval_timestamp >= start)
+    if end is not None:
+        statement = statement.where(InstrumentPrice.retrieval_timestamp < end)
+
+    migrated = 0
+    last_key: tuple | None = None
+    while True:
+        batch_statement = statement
+        if last_key is not None:
+            batch_statement = statement.where(tuple_(*key_columns) > last_key)
+
+        with Session(db_engine) as session:
+            prices = session.exec(batch_statement).all()
+            if not prices:
+                break
+
+            # The rows are expired once the batch is committed
+            rows = [encode_tick(price.model_dump()) for price in prices]
+            last_key = tuple(getattr(prices[-1], column.name) for column in key_columns)
+            insert_data(CompactInstrumentPrice, rows, session=session)
+
+        migrated += len(rows)
+        logger.info("Migrated %d rows to the compact InstrumentPrice table", migrated)
+
+    return migrated
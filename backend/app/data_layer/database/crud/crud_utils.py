@@ -1,11 +1,14 @@
 """
 This script contains the CRUD operations for all the tables in the PostgreSQL database.
-Most of the functions are generic and can be used for any table in the database.The 
+Most of the functions are generic and can be used for any table in the database.The
 functions are used to perform Insert, Update, Delete and Select operations on the tables.
 """
 
+import csv
+import io
+import time
 from pathlib import Path
-from typing import Any, Sequence, cast
+from typing import Any, Iterable, Sequence, cast
 
 from fastapi import HTTPException, status
 from sqlalchemy import Table
@@ -15,13 +18,20 @@ from sqlalchemy.dialects.sqlite import insert as sqlite_insert
 from sqlalchemy.dialects.sqlite.dml import Insert as SQLiteInsert
 from sqlalchemy.sql.elements import BinaryExpression
 from sqlmodel import Session, SQLModel, or_, select
+from sqlmodel.ext.asyncio.session import AsyncSession
 
-from app.data_layer.database.db_connections.postgresql import with_session
+from app.data_layer.database.db_connections.postgresql import (
+    async_with_session,
+    with_session,
+)
 from app.utils.common.logger import get_logger
-from app.utils.constants import INSERTION_BATCH_SIZE
+from app.utils.constants import BULK_INSERTION_THRESHOLD, INSERTION_BATCH_SIZE
 
 logger = get_logger(Path(__file__).name)
 
+# The NULL marker of the bulk copy, so the empty strings are kept as empty strings
+COPY_NULL = "\\N"
+
 ################### CRUD Operations ###################
 
 
@@ -169,6 +179,35 @@ def get_data_by_all_conditions(
     return result
 
 
+@async_with_session(get_data_by_any_condition)
+async def get_data_by_any_condition_async(
+    model: type[SQLModel], session: AsyncSession, **kwargs
+) -> Sequence[SQLModel]:
+    """
+    Async variant of `get_data_by_any_condition`.
+    """
+    validate_model_attributes(model, kwargs)
+    conditions = get_conditions_list(model, kwargs)
+
+    statement = select(model).where(or_(*conditions))
+
+    return (await session.exec(statement)).all()
+
+
+@async_with_session(get_data_by_all_conditions)
+async def get_data_by_all_conditions_async(
+    model: type[SQLModel], session: AsyncSession, **kwargs
+) -> Sequence[SQLModel]:
+    """
+    Async variant of `get_data_by_all_conditions`.
+    """
+    validate_model_attributes(model, kwargs)
+    conditions = get_conditions_list(model, kwargs)
+    statement = select(model).where(*conditions)
+
+    return (await session.exec(statement)).all()
+
+
 @with_session
 def _upsert(
     model: type[SQLModel],
@@ -329,6 +368,171 @@ def _insert_or_ignore(
     session.commit()
 
 
+def get_bulk_statements(
+    table: Table, update_existing: bool = False
+) -> tuple[str, str, str]:
+    """
+    Get the statements used to bulk insert the rows of the table on PostgreSQL. The
+    rows are copied to a temporary staging table, created once per connection and
+    emptied at the end of each transaction, and moved to the table with a single
+    INSERT ... SELECT that resolves the conflicts on the primary key.
+
+    Parameters
+    ----------
+    table: ``Table``
+        The table to insert the rows into
+    update_existing: ``bool``, ( defaults = False )
+        If True, the existing rows are updated with the new rows, otherwise the new
+        rows are ignored
+
+    Returns
+    -------
+    ``tuple[str, str, str]``
+        The statements to create the staging table, to copy the rows to the staging
+        table and to insert the rows from the staging table
+    """
+    staging_table = f"{table.name}_staging"
+    columns = ", ".join(column.name for column in table.columns)
+    primary_key = ", ".join(column.name for column in table.primary_key)
+
+    create_staging = (
+        f"CREATE TEMP TABLE IF NOT EXISTS {staging_table} "
+        f"(LIKE {table.name} INCLUDING DEFAULTS) ON COMMIT DELETE ROWS"
+    )
+    copy = (
+        f"COPY {staging_table} ({columns}) FROM STDIN "
+        f"WITH (FORMAT csv, NULL '{COPY_NULL}')"
+    )
+
+    if not update_existing:
+        insert = (
+            f"INSERT INTO {table.name} ({columns}) "
+            f"SELECT {columns} FROM {staging_table} "
+            f"ON CONFLICT ({primary_key}) DO NOTHING"
+        )
+    else:
+        # A row can be updated only once per statement, keep one row per primary key
+        updates = ", ".join(
+            f"{column.name} = EXCLUDED.{column.name}"
+            for column in table.columns
+            if column.name not in table.primary_key
+        )
+        insert = (
+            f"INSERT INTO {table.name} ({columns}) "
+            f"SELECT DISTINCT ON ({primary_key}) {columns} FROM {staging_table} "
+            f"ON CONFLICT ({primary_key}) DO UPDATE SET {updates}"
+        )
+
+    return create_staging, copy, insert
+
+
+def rows_to_copy_csv(rows: Iterable[Iterable[Any]]) -> io.StringIO:
+    """
+    Write the rows in the CSV format read by the bulk copy, None is written as
+    `COPY_NULL`.
+    """
+    buffer = io.StringIO()
+    csv.writer(buffer).writerows(
+        [COPY_NULL if value is None else value for value in row] for row in rows
+    )
+    buffer.seek(0)
+
+    return buffer
+
+
+@with_session
+def _bulk_insert(
+    model: type[SQLModel],
+    data: list[SQLModel | dict[str, Any]],
+    session: Session,
+    update_existing: bool = False,
+) -> dict[str, float]:
+    """
+    Insert the data into the table of the PostgreSQL database with COPY through a
+    staging table, in a single transaction. The values are read from the objects
+    directly, without converting them to dictionaries. The columns missing from the
+    dictionaries take the default of the model, as with `model_dump`.
+
+    Note
+    ----
+    This function is a private function and should not be used directly.
+    Use the `insert_data` function to insert data into the table.
+
+    Parameters
+    ----------
+    model: ``SQLModel``
+        The SQLAlchemy model class to use for the insert operation
+    data: ``list[SQLModel | dict[str, Any]]``
+        The data to insert into the table
+    session: ``Session``
+        The SQLModel session object to use for the database operations
+    update_existing: ``bool``, ( defaults = False )
+        If True, the existing data in the table will be updated with the new data
+
+    Returns
+    -------
+    ``dict[str, float]``
+        The number of rows and the time in seconds taken to prepare, copy and insert
+        the rows
+    """
+    table: Table = model.__table__  # type: ignore
+    create_staging, copy, insert = get_bulk_statements(table, update_existing)
+    columns = [column.name for column in table.columns]
+    fields = model.__fields__
+
+    def get_value(item: dict[str, Any], column: str) -> Any:
+        if column in item:
+            return item[column]
+
+        return fields[column].get_default() if column in fields else None
+
+    start_time = time.perf_counter()
+    buffer = rows_to_copy_csv(
+        (
+            [get_value(item, column) for column in columns]
+            if isinstance(item, dict)
+            else [getattr(item, column) for column in columns]
+        )
+        for item in data
+    )
+    prepare_time = time.perf_counter()
+
+    try:
+        # The raw psycopg2 connection of the session, so the rows are copied in its
+        # transaction
+        connection: Any = session.connection().connection
+        with connection.cursor() as cursor:
+            cursor.execute(create_staging)
+            cursor.copy_expert(copy, buffer)
+            copy_time = time.perf_counter()
+            cursor.execute(insert)
+        session.commit()
+    except Exception:
+        session.rollback()
+        raise
+
+    end_time = time.perf_counter()
+    timings = {
+        "rows": len(data),
+        "prepare_seconds": prepare_time - start_time,
+        "copy_seconds": copy_time - prepare_time,
+        "insert_seconds": end_time - copy_time,
+        "total_seconds": end_time - start_time,
+    }
+    logger.info(
+        "Bulk inserted %d rows into %s in %.3f s "
+        "(prepare %.3f s, copy %.3f s, insert %.3f s)",
+        len(data),
+        table.name,
+        timings["total_seconds"],
+        timings["prepare_seconds"],
+        timings["copy_seconds"],
+        timings["insert_seconds"],
+    )
+
+    return timings
+
+
 @with_session
 def insert_data(
     model: type[SQLModel],
@@ -352,7 +556,9 @@ def insert_data(
         The SQLModel session object to use for the database operations. If not provided,
         a new session will be created from the database connection pool
     update_existing: ``bool``, ( defaults = False )
-        If True, the existing data in the table will be updated with the new data
+        If True, the existing data in the table will be updated with the new data.
+        On PostgreSQL, the batches of at least `BULK_INSERTION_THRESHOLD` rows are
+        copied through a staging table
     """
     if not data:
         logger.warning("Provided data is empty. Skipping insertion.")
@@ -361,6 +567,15 @@ def insert_data(
     if isinstance(data, (SQLModel, dict)):
         data = [data]
 
+    # Large batches are copied to PostgreSQL instead of being sent as one statement
+    if (
+        len(data) >= BULK_INSERTION_THRESHOLD
+        and session.bind is not None
+        and session.bind.dialect.name == "postgresql"
+    ):
+        _bulk_insert(model, data, session=session, update_existing=update_existing)
+        return True
+
     # Convert list of SQLModel to a list of dicts
     data_to_insert = cast(
         list[dict[str, Any]],
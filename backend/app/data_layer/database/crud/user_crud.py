@@ -5,8 +5,12 @@ from typing import Dict, Type
 
 from fastapi import HTTPException, status
 from sqlmodel import Session, SQLModel, select
+from sqlmodel.ext.asyncio.session import AsyncSession
 
-from app.data_layer.database.db_connections.postgresql import with_session
+from app.data_layer.database.db_connections.postgresql import (
+    async_with_session,
+    with_session,
+)
 from app.data_layer.database.models.user_model import User, UserVerification
 from app.utils.common.logger import get_logger
 
@@ -265,3 +269,146 @@ def create_or_update_user_verification(
     session.add(existing_user_verification)
     session.commit()
     session.refresh(existing_user_verification)
+
+
+#### Async User CRUD operations ####
+# The async variants of the operations, used by the routes so the database round trips
+# don't block the event loop. See `async_with_session` for the fallback without an
+# async driver.
+@async_with_session(is_attr_data_in_db)
+async def is_attr_data_in_db_async(
+    model: Type[SQLModel], att_values: Dict[str, str], session: AsyncSession
+) -> str | None:
+    """
+    Async variant of `is_attr_data_in_db`.
+    """
+    for attr_name, attr_value in att_values.items():
+
+        if not hasattr(model, attr_name):
+            raise HTTPException(
+                status.HTTP_400_BAD_REQUEST, f"Invalid field: {attr_name}"
+            )
+        statement = select(model).where(getattr(model, attr_name) == attr_value)
+
+        if (await session.exec(statement)).first():
+            return f"{attr_name} already exists"
+
+    return None
+
+
+@async_with_session(get_user_by_attr)
+async def get_user_by_attr_async(
+    attr_name: str, attr_value: str, session: AsyncSession
+) -> User:
+    """
+    Async variant of `get_user_by_attr`.
+    """
+    if not hasattr(User, attr_name):
+        raise HTTPException(status.HTTP_400_BAD_REQUEST, f"Invalid field: {attr_name}")
+
+    statement = select(User).where(getattr(User, attr_name) == attr_value)
+    result = (await session.exec(statement)).first()
+
+    if not result:
+        raise HTTPException(
+            status.HTTP_404_NOT_FOUND,
+            f"User does not exist with given {attr_name}: {attr_value}",
+        )
+
+    return result
+
+
+@async_with_session(create_user)
+async def create_user_async(user: User, session: AsyncSession):
+    """
+    Async variant of `create_user`.
+    """
+    try:
+        session.add(user)
+        await session.commit()
+        await session.refresh(user)
+    except Exception as e:
+        raise HTTPException(
+            status.HTTP_400_BAD_REQUEST, f"Error while creating user: {e}"
+        ) from e
+
+
+@async_with_session(get_user)
+async def get_user_async(user_id: int, session: AsyncSession) -> User:
+    """
+    Async variant of `get_user`.
+    """
+    statement = select(User).where(User.user_id == user_id)
+    user = (await session.exec(statement)).first()
+
+    if not user:
+        raise HTTPException(status.HTTP_404_NOT_FOUND, "User not found")
+
+    return user
+
+
+@async_with_session(update_user)
+async def update_user_async(user_id: int, user_data: dict, session: AsyncSession):
+    """
+    Async variant of `update_user`.
+    """
+    user = await get_user_async(user_id, session=session)
+
+    for key, value in user_data.items():
+        if not hasattr(user, key):
+            raise HTTPException(status.HTTP_400_BAD_REQUEST, f"Invalid field: {key}")
+
+        setattr(user, key, value)
+
+    session.add(user)
+    await session.commit()
+    await session.refresh(user)
+
+
+@async_with_session(delete_user)
+async def delete_user_async(user_id: int, session: AsyncSession):
+    """
+    Async variant of `delete_user`.
+    """
+    user = await get_user_async(user_id, session=session)
+    await session.delete(user)
+    await session.commit()
+
+
+@async_with_session(get_user_verification)
+async def get_user_verification_async(
+    email: str, session: AsyncSession
+) -> UserVerification | None:
+    """
+    Async variant of `get_user_verification`.
+    """
+    statement = select(UserVerification).where(UserVerification.email == email)
+
+    return (await session.exec(statement)).first()
+
+
+@async_with_session(create_or_update_user_verification)
+async def create_or_update_user_verification_async(
+    user_verification: UserVerification, session: AsyncSession
+):
+    """
+    Async variant of `create_or_update_user_verification`.
+    """
+    existing_user_verification = await get_user_verification_async(
+        user_verification.email, session=session
+    )
+
+    if not existing_user_verification:
+        existing_user_verification = user_verification
+    else:
+        existing_user_verification.verification_code = (
+            user_verification.verification_code
+        )
+        existing_user_verification.expiration_time = user_verification.expiration_time
+        existing_user_verification.reverified_datetime = (
+            user_verification.reverified_datetime or datetime.datetime.now()
+        )
+
+    session.add(existing_user_verification)
+    await session.commit()
+    await session.refresh(existing_user_verification)
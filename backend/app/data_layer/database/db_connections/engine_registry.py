@@ -0,0 +1,419 @@
+"""
+This module contains the registry of the database engines of the process. An engine
+is registered with its url and pool settings and is created on its first use, so
+importing the connection modules neither reads the connection details nor connects
+to the database. The registry also keeps the checkout and wait statistics of the
+connection pool of each engine. The async engines, used by the async sessions, are
+registered the same way with `is_async=True`.
+
+The pool settings of an engine can be overridden with the environment variables of
+its prefix. Eg: POSTGRES_POOL_SIZE, POSTGRES_MAX_OVERFLOW, POSTGRES_POOL_PRE_PING,
+POSTGRES_POOL_RECYCLE and POSTGRES_POOL_TIMEOUT for the prefix "POSTGRES".
+"""
+
+import os
+import time
+from pathlib import Path
+from threading import Lock
+from typing import Any, Callable
+
+from sqlalchemy import event, exc
+from sqlalchemy.engine import Engine, make_url
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
+from sqlalchemy.pool import AsyncAdaptedQueuePool, ConnectionPoolEntry, QueuePool
+from sqlmodel import create_engine
+
+from app.utils.common.logger import get_logger
+
+logger = get_logger(Path(__file__).name)
+
+# The default settings of the connection pools, by the argument of `create_engine`
+DEFAULT_POOL_SETTINGS: dict[str, Any] = {
+    "pool_size": 5,
+    "max_overflow": 10,
+    "pool_pre_ping": True,
+    "pool_recycle": 1800,
+    "pool_timeout": 30,
+}
+
+# The parsers of the pool settings read from the environment variables
+POOL_SETTING_PARSERS: dict[str, Callable[[str], Any]] = {
+    "pool_size": int,
+    "max_overflow": int,
+    "pool_pre_ping": lambda value: value.strip().lower() in ("1", "true", "yes"),
+    "pool_recycle": int,
+    "pool_timeout": float,
+}
+
+
+class PoolStats:
+    """
+    PoolStats counts the connections, the checkouts and the time spent waiting for a
+    connection of a pool. The counts are updated by the pool events and the
+    `TimedQueuePool` of the engine.
+    """
+
+    def __init__(self) -> None:
+        self._lock = Lock()
+        self.connections = 0
+        self.checkouts = 0
+        self.checked_out = 0
+        self.max_checked_out = 0
+        self.timeouts = 0
+        self.total_wait_time = 0.0
+        self.max_wait_time = 0.0
+
+    def on_connect(self, *_):
+        """
+        Count a new DBAPI connection of the pool.
+        """
+        with self._lock:
+            self.connections += 1
+
+    def on_checkout(self, *_):
+        """
+        Count a connection checked out of the pool.
+        """
+        with self._lock:
+            self.checkouts += 1
+            self.checked_out += 1
+            self.max_checked_out = max(self.max_checked_out, self.checked_out)
+
+    def on_checkin(self, *_):
+        """
+        Count a connection returned to the pool.
+        """
+        with self._lock:
+            self.checked_out = max(self.checked_out - 1, 0)
+
+    def add_wait(self, wait_time: float, timed_out: bool = False):
+        """
+        Add the time spent waiting for a connection of the pool.
+        """
+        with self._lock:
+            self.total_wait_time += wait_time
+            self.max_wait_time = max(self.max_wait_time, wait_time)
+            if timed_out:
+                self.timeouts += 1
+
+    def to_dict(self) -> dict[str, float]:
+        """
+        Get the statistics, the wait times are in milliseconds.
+        """
+        with self._lock:
+            return {
+                "connections": self.connections,
+                "checkouts": self.checkouts,
+                "checked_out": self.checked_out,
+                "max_checked_out": self.max_checked_out,
+                "timeouts": self.timeouts,
+                "total_wait_ms": self.total_wait_time * 1000,
+                "avg_wait_ms": (
+                    self.total_wait_time * 1000 / self.checkouts
+                    if self.checkouts
+                    else 0.0
+                ),
+                "max_wait_ms": self.max_wait_time * 1000,
+            }
+
+
+class TimedPoolMixin:
+    """
+    Mixin of the queue pools that adds the time spent getting each connection to the
+    statistics of the engine. The statistics are kept when the pool is recreated by
+    `dispose`.
+    """
+
+    stats: PoolStats | None = None
+
+    def _do_get(self) -> ConnectionPoolEntry:
+        start_time = time.perf_counter()
+        try:
+            connection = super()._do_get()  # type: ignore
+        except exc.TimeoutError:
+            if self.stats is not None:
+                self.stats.add_wait(time.perf_counter() - start_time, timed_out=True)
+            raise
+
+        if self.stats is not None:
+            self.stats.add_wait(time.perf_counter() - start_time)
+
+        return connection
+
+    def recreate(self) -> QueuePool:
+        """
+        Create a new pool with the same configuration and statistics.
+        """
+        pool = super().recreate()  # type: ignore
+        pool.stats = self.stats
+        return pool
+
+
+class TimedQueuePool(TimedPoolMixin, QueuePool):
+    """
+    QueuePool of the engines, with the wait statistics.
+    """
+
+
+class TimedAsyncQueuePool(TimedPoolMixin, AsyncAdaptedQueuePool):
+    """
+    AsyncAdaptedQueuePool of the async engines, with the wait statistics.
+    """
+
+
+def get_pool_settings(env_prefix: str | None = None) -> dict[str, Any]:
+    """
+    Get the default pool settings overridden by the environment variables of the
+    prefix. Eg: POSTGRES_POOL_SIZE=20 for the prefix "POSTGRES".
+
+    Parameters
+    ----------
+    env_prefix: ``str | None``, ( default = None )
+        The prefix of the environment variables, the default settings if None
+
+    Raises
+    ------
+    ``ValueError``
+        If the value of an environment variable is not valid
+
+    Returns
+    -------
+    ``dict[str, Any]``
+        The pool settings, by the argument of `create_engine`
+    """
+    settings = dict(DEFAULT_POOL_SETTINGS)
+    if env_prefix is None:
+        return settings
+
+    for setting, parse in POOL_SETTING_PARSERS.items():
+        name = f"{env_prefix}_{setting.upper()}"
+        value = os.environ.get(name)
+        if not value:
+            continue
+
+        try:
+            settings[setting] = parse(value)
+        except ValueError as e:
+            raise ValueError(f"Invalid value of {name}: {value}") from e
+
+    return settings
+
+
+def is_memory_database(url: str) -> bool:
+    """
+    Check if the url is an in-memory SQLite database, which can't use a queue pool.
+    """
+    db_url = make_url(url)
+    return db_url.get_backend_name() == "sqlite" and db_url.database in (
+        None,
+        "",
+        ":memory:",
+    )
+
+
+def get_sync_engine(engine: Engine | AsyncEngine) -> Engine:
+    """
+    Get the synchronous engine of the engine, the engine itself if it is not async.
+    """
+    return engine.sync_engine if isinstance(engine, AsyncEngine) else engine
+
+
+def dispose_engine(engine: Engine | AsyncEngine):
+    """
+    Dispose the engine. The connections of an async engine can only be closed by its
+    event loop, they are dropped from the pool and closed once garbage collected.
+    """
+    if isinstance(engine, AsyncEngine):
+        engine.sync_engine.dispose(close=False)
+    else:
+        engine.dispose()
+
+
+class EngineRegistry:
+    """
+    EngineRegistry creates the registered engines on their first use and shares them
+    across the process.
+    """
+
+    def __init__(self) -> None:
+        self._lock = Lock()
+        self._settings: dict[str, dict[str, Any]] = {}
+        self._engines: dict[str, Engine | AsyncEngine] = {}
+        self._stats: dict[str, PoolStats] = {}
+
+    def register(
+        self,
+        name: str,
+        url: str | Callable[[], str],
+        env_prefix: str | None = None,
+        on_create: Callable[[Engine], None] | None = None,
+        is_async: bool = False,
+        **engine_kwargs,
+    ):
+        """
+        Register the engine with the given name. The engine of the name is disposed
+        and created again on its next use if it was already created.
+
+        Parameters
+        ----------
+        name: ``str``
+            The name of the engine
+        url: ``str | Callable[[], str]``
+            The database url, or a function returning it when the engine is created
+        env_prefix: ``str | None``, ( default = None )
+            The prefix of the environment variables overriding the pool settings
+        on_create: ``Callable[[Engine], None] | None``, ( default = None )
+            Function called with the engine once it is created, before its first
+            connection. Eg: to add the connection event listeners. The synchronous
+            engine of an async engine is given
+        is_async: ``bool``, ( default = False )
+            Whether to create an async engine, the url should use an async driver.
+            Eg: "postgresql+asyncpg://..."
+        engine_kwargs: ``Any``
+            The arguments of `create_engine`, they override the pool settings
+        """
+        with self._lock:
+            self._settings[name] = {
+                "url": url,
+                "env_prefix": env_prefix,
+                "on_create": on_create,
+                "is_async": is_async,
+                "engine_kwargs": engine_kwargs,
+            }
+            engine = self._engines.pop(name, None)
+
+        if engine is not None:
+            dispose_engine(engine)
+
+    def is_registered(self, name: str) -> bool:
+        """
+        Check if an engine is registered with the given name.
+        """
+        return name in self._settings
+
+    def get_engine(self, name: str) -> Engine:
+        """
+        Get the engine of the given name, creating it on the first call.
+
+        Raises
+        ------
+        ``ValueError``
+            If no engine is registered with the name or it is an async engine
+        """
+        engine = self._get_or_create(name)
+        if not isinstance(engine, Engine):
+            raise ValueError(f"The engine {name} is an async engine")
+
+        return engine
+
+    def get_async_engine(self, name: str) -> AsyncEngine:
+        """
+        Get the async engine of the given name, creating it on the first call.
+
+        Raises
+        ------
+        ``ValueError``
+            If no engine is registered with the name or it is not an async engine
+        """
+        engine = self._get_or_create(name)
+        if not isinstance(engine, AsyncEngine):
+            raise ValueError(f"The engine {name} is not an async engine")
+
+        return engine
+
+    def _get_or_create(self, name: str) -> Engine | AsyncEngine:
+        engine = self._engines.get(name)
+        if engine is not None:
+            return engine
+
+        with self._lock:
+            engine = self._engines.get(name)
+            if engine is None:
+                engine = self._create_engine(name)
+                self._engines[name] = engine
+
+        return engine
+
+    def _create_engine(self, name: str) -> Engine | AsyncEngine:
+        settings = self._settings.get(name)
+        if settings is None:
+            raise ValueError(f"No engine is registered with the name: {name}")
+
+        url = settings["url"]() if callable(settings["url"]) else settings["url"]
+
+        engine_kwargs: dict[str, Any] = {}
+        if not is_memory_database(url):
+            engine_kwargs = get_pool_settings(settings["env_prefix"])
+            engine_kwargs["poolclass"] = (
+                TimedAsyncQueuePool if settings["is_async"] else TimedQueuePool
+            )
+        engine_kwargs.update(settings["engine_kwargs"])
+
+        engine: Engine | AsyncEngine
+        if settings["is_async"]:
+            engine = create_async_engine(url, **engine_kwargs)
+            sync_engine = engine.sync_engine
+        else:
+            engine = sync_engine = create_engine(url, **engine_kwargs)
+
+        stats = PoolStats()
+        if isinstance(sync_engine.pool, TimedPoolMixin):
+            sync_engine.pool.stats = stats
+        event.listen(sync_engine, "connect", stats.on_connect)
+        event.listen(sync_engine, "checkout", stats.on_checkout)
+        event.listen(sync_engine, "checkin", stats.on_checkin)
+        self._stats[name] = stats
+
+        if settings["on_create"] is not None:
+            settings["on_create"](sync_engine)
+
+        logger.info(
+            "Created the %s engine with the pool: %s", name, sync_engine.pool.status()
+        )
+
+        return engine
+
+    def get_pool_stats(self, name: str) -> dict[str, float]:
+        """
+        Get the checkout and wait statistics of the pool of the engine with the given
+        name, with the current size and overflow of the pool. The statistics are
+        empty if the engine was not created yet.
+        """
+        engine = self._engines.get(name)
+        stats = self._stats.get(name)
+        if engine is None or stats is None:
+            return {}
+
+        pool = get_sync_engine(engine).pool
+        pool_stats = stats.to_dict()
+        if isinstance(pool, QueuePool):
+            pool_stats["pool_size"] = pool.size()
+            pool_stats["overflow"] = pool.overflow()
+
+        return pool_stats
+
+    def dispose(self, name: str | None = None, remove: bool = False):
+        """
+        Dispose the engine with the given name, or all the engines if None. The
+        disposed engines are created again on their next use, unless they are also
+        removed from the registry.
+        """
+        with self._lock:
+            names = list(self._settings) if name is None else [name]
+            engines = [self._engines.pop(engine_name, None) for engine_name in names]
+            if remove:
+                for engine_name in names:
+                    self._settings.pop(engine_name, None)
+                    self._stats.pop(engine_name, None)
+
+        for engine in engines:
+            if engine is not None:
+                dispose_engine(engine)
+
+
+engine_registry = EngineRegistry()
+register_engine = engine_registry.register
+get_engine = engine_registry.get_engine
+get_async_engine = engine_registry.get_async_engine
+get_pool_stats = engine_registry.get_pool_stats
+dispose_engines = engine_registry.dispose
@@ -1,32 +1,88 @@
 """
 This module handles the PostgreSQL database connections and session management.
+The async sessions use the `asyncpg` driver when it is installed, without it the
+async database functions run their synchronous variant in a worker thread, so they
+never block the event loop.
 """
 
-from contextlib import contextmanager
+from contextlib import asynccontextmanager, contextmanager
 from functools import wraps
+from importlib.util import find_spec
 from pathlib import Path
-from typing import Any, Callable, Generator
+from typing import Any, AsyncGenerator, Callable, Generator
 from urllib.parse import quote_plus
 
+from fastapi.concurrency import run_in_threadpool
 from sqlalchemy.engine import Engine
-from sqlmodel import Session, SQLModel, create_engine
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlmodel import Session, SQLModel
+from sqlmodel.ext.asyncio.session import AsyncSession
 
+from app.data_layer.database.db_connections import engine_registry
 from app.utils.common.logger import get_logger
 from app.utils.fetch_data import get_required_env_var
 
 logger = get_logger(Path(__file__).name)
 
+ENGINE_NAME = "postgresql"
+ASYNC_ENGINE_NAME = "postgresql_async"
+ASYNC_DRIVER = "asyncpg"
 
-# Get the database connection details from the environment variables
-user_name: str = get_required_env_var("POSTGRES_USER")
-password: str = get_required_env_var("POSTGRES_PASSWORD")
-host: str = get_required_env_var("POSTGRES_HOST")
-port: str = get_required_env_var("POSTGRES_PORT")
-db_name: str = get_required_env_var("POSTGRES_DB")
 
-DATABASE_URL = f"postgresql://{quote_plus(user_name)}:{quote_plus(password)}@{host}:{port}/{db_name}"
+def get_database_url() -> str:
+    """
+    Get the url of the PostgreSQL database from the environment variables.
+
+    Raises
+    ------
+    ``ValueError``
+        If a required environment variable is not found
+    """
+    user_name = get_required_env_var("POSTGRES_USER")
+    password = get_required_env_var("POSTGRES_PASSWORD")
+    host = get_required_env_var("POSTGRES_HOST")
+    port = get_required_env_var("POSTGRES_PORT")
+    db_name = get_required_env_var("POSTGRES_DB")
+
+    return f"postgresql://{quote_plus(user_name)}:{quote_plus(password)}@{host}:{port}/{db_name}"
+
+
+def get_async_database_url() -> str:
+    """
+    Get the url of the PostgreSQL database using the async driver.
+    """
+    return get_database_url().replace(
+        "postgresql://", f"postgresql+{ASYNC_DRIVER}://", 1
+    )
+
+
+# The engines are created on their first use, with the pool settings overridden by
+# the POSTGRES_POOL_* environment variables
+engine_registry.register_engine(ENGINE_NAME, get_database_url, env_prefix="POSTGRES")
+engine_registry.register_engine(
+    ASYNC_ENGINE_NAME, get_async_database_url, env_prefix="POSTGRES", is_async=True
+)
+
 
-engine = create_engine(DATABASE_URL)
+def get_engine() -> Engine:
+    """
+    Get the engine of the PostgreSQL database, shared by the process.
+    """
+    return engine_registry.get_engine(ENGINE_NAME)
+
+
+def get_async_engine() -> AsyncEngine:
+    """
+    Get the async engine of the PostgreSQL database, shared by the process.
+    """
+    return engine_registry.get_async_engine(ASYNC_ENGINE_NAME)
+
+
+def is_async_driver_available() -> bool:
+    """
+    Check if the async driver of the PostgreSQL database is installed.
+    """
+    return find_spec(ASYNC_DRIVER) is not None
 
 
 def create_db_and_tables(db_engine: Engine | None = None):
@@ -36,7 +92,7 @@ def create_db_and_tables(db_engine: Engine | None = None):
     logger.info("Creating database and tables")
 
     # If the database engine is not provided, use the default engine
-    db_engine = db_engine or engine
+    db_engine = db_engine or get_engine()
 
     try:
         SQLModel.metadata.create_all(db_engine)
@@ -52,7 +108,7 @@ def get_session(db_engine: Engine | None = None) -> Generator[Session, None, Non
     Context manager for database sessions.
     Ensures proper handling of commits and rollbacks.
     """
-    db_engine = db_engine or engine
+    db_engine = db_engine or get_engine()
     session = Session(db_engine)
 
     try:
@@ -81,3 +137,57 @@ def with_session(func: Callable) -> Callable:
         return func(*args, session=session, **kwargs)
 
     return wrapper
+
+
+@asynccontextmanager
+async def get_async_session(
+    db_engine: AsyncEngine | None = None,
+) -> AsyncGenerator[AsyncSession, None]:
+    """
+    Async context manager for database sessions.
+    Ensures proper handling of commits and rollbacks. The objects are not expired on
+    commit, as loading the expired attributes would need to await the database.
+    """
+    db_engine = db_engine or get_async_engine()
+    session = AsyncSession(db_engine, expire_on_commit=False)
+
+    try:
+        yield session
+    except Exception as e:
+        await session.rollback()
+        logger.info("Session rollback due to error: %s", e)
+        raise
+    finally:
+        await session.close()
+
+
+def async_with_session(sync_func: Callable | None = None) -> Callable:
+    """
+    This decorator function is used to provide an async session object to the decorated
+    coroutine function. If the session object is not provided, a new async session is
+    created and used for the database operations.
+
+    If the async driver is not installed, the given synchronous variant of the function
+    is called with the same arguments in a worker thread instead.
+
+    Parameters
+    ----------
+    sync_func: ``Callable | None``, ( default = None )
+        The synchronous variant of the decorated function, decorated with `with_session`
+    """
+
+    def decorator(func: Callable) -> Callable:
+        @wraps(func)
+        async def wrapper(*args, session: AsyncSession | None = None, **kwargs) -> Any:
+            if session is not None:
+                return await func(*args, session=session, **kwargs)
+
+            if sync_func is not None and not is_async_driver_available():
+                return await run_in_threadpool(sync_func, *args, **kwargs)
+
+            async with get_async_session() as new_session:
+                return await func(*args, session=new_session, **kwargs)
+
+        return wrapper
+
+    return decorator
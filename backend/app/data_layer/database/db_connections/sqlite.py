@@ -1,5 +1,5 @@
-""" 
-This script is responsible for creating a connection to the SQLite database. 
+"""
+This script is responsible for creating a connection to the SQLite database.
 It also provides a function to create the database and tables and a function
 to get a session object to interact with the database.
 """
@@ -7,18 +7,29 @@ to get a session object to interact with the database.
 from contextlib import contextmanager
 from functools import wraps
 from pathlib import Path
-from typing import Any, Callable, Generator
+from typing import Any, Callable, Generator, Mapping
 
+from sqlalchemy import event
 from sqlalchemy.engine import Engine
-from sqlmodel import Session, SQLModel, create_engine
+from sqlmodel import Session, SQLModel
 
+from app.data_layer.database.db_connections import engine_registry
 from app.utils.common.logger import get_logger
 from app.utils.urls import SQLITE_DB_URL
 
 logger = get_logger(Path(__file__).name)
 
 
-sqlite_engine = create_engine(SQLITE_DB_URL)
+ENGINE_NAME = "sqlite"
+
+engine_registry.register_engine(ENGINE_NAME, SQLITE_DB_URL, env_prefix="SQLITE")
+
+
+def get_engine() -> Engine:
+    """
+    Get the engine of the SQLite database, shared by the process.
+    """
+    return engine_registry.get_engine(ENGINE_NAME)
 
 
 def create_db_and_tables(db_engine: Engine | None = None):
@@ -28,7 +39,7 @@ def create_db_and_tables(db_engine: Engine | None = None):
     logger.info("Creating database and tables")
 
     # If the database engine is not provided, use the default engine
-    db_engine = db_engine or sqlite_engine
+    db_engine = db_engine or get_engine()
 
     try:
         SQLModel.metadata.create_all(db_engine)
@@ -38,13 +49,42 @@ def create_db_and_tables(db_engine: Engine | None = None):
         raise
 
 
+def set_sqlite_pragmas(db_engine: Engine, pragmas: Mapping[str, Any]):
+    """
+    Set the given pragmas on every new connection of the engine. The pragmas should be
+    set before the first connection is made. Eg: {"journal_mode": "WAL"}
+
+    Parameters
+    ----------
+    db_engine: ``Engine``
+        The SQLite database engine
+    pragmas: ``Mapping[str, Any]``
+        The pragmas to set, by the name of the pragma
+
+    Raises
+    ------
+    ``ValueError``
+        If the name of a pragma is not valid
+    """
+    for name in pragmas:
+        if not name.isidentifier():
+            raise ValueError(f"Invalid pragma name: {name}")
+
+    @event.listens_for(db_engine, "connect")
+    def _set_pragmas(dbapi_connection, _):
+        cursor = dbapi_connection.cursor()
+        for name, value in pragmas.items():
+            cursor.execute(f"PRAGMA {name}={value}")
+        cursor.close()
+
+
 @contextmanager
 def get_session(db_engine: Engine | None = None) -> Generator[Session, None, None]:
     """
     Context manager for database sessions.
     Ensures proper handling of commits and rollbacks.
     """
-    db_engine = db_engine or sqlite_engine
+    db_engine = db_engine or get_engine()
     session = Session(db_engine)
 
     try:
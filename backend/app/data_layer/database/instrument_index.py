@@ -0,0 +1,306 @@
+"""
+This module contains the process-wide in-memory index of the Instrument table. The
+index is built from the table once the tokens are loaded by `create_tokens_db` and
+is used to look up the instruments by symbol, by token and by exchange without
+querying the database. The columns of the instruments are stored in lists of
+interned strings and typed arrays, and a refreshed index replaces the previous one
+at once, so the readers always see a complete index.
+"""
+
+import sys
+from array import array
+from pathlib import Path
+from threading import Lock
+from typing import Any, Iterable, NamedTuple, Optional
+
+from sqlalchemy import select
+from sqlmodel import Session
+
+from app.data_layer.database.db_connections.postgresql import with_session
+from app.data_layer.database.models import Instrument
+from app.utils.common.logger import get_logger
+
+logger = get_logger(Path(__file__).name)
+
+# The columns of the Instrument table stored in the index
+INDEX_COLUMNS = (
+    "symbol",
+    "exchange_id",
+    "data_provider_id",
+    "token",
+    "name",
+    "instrument_type",
+    "expiry_date",
+    "strike_price",
+    "lot_size",
+    "tick_size",
+)
+
+
+class InstrumentRecord(NamedTuple):
+    """
+    An instrument of the index, with the columns of the Instrument table.
+    """
+
+    symbol: str
+    exchange_id: int
+    data_provider_id: int
+    token: str
+    name: str
+    instrument_type: str
+    expiry_date: str | None
+    strike_price: float | None
+    lot_size: int | None
+    tick_size: float | None
+
+
+def intern(value: Any) -> str | None:
+    """
+    Intern the string, so the values repeated across the instruments are stored once.
+    """
+    return None if value is None else sys.intern(str(value))
+
+
+class InstrumentIndex:
+    """
+    InstrumentIndex holds the instruments in columns and indexes the positions of the
+    instruments by (symbol, exchange), by (token, data provider) and by (exchange,
+    data provider). The index is immutable once built.
+
+    Attributes
+    ----------
+    instruments: ``Iterable[Instrument | dict[str, Any] | tuple]``
+        The instruments, as Instrument objects, dictionaries or tuples of the values
+        of `INDEX_COLUMNS`
+    """
+
+    def __init__(self, instruments: Iterable[Instrument | dict[str, Any] | tuple]):
+        self.symbols: list[str] = []
+        self.tokens: list[str] = []
+        self.names: list[str] = []
+        self.instrument_types: list[str] = []
+        self.expiry_dates: list[str | None] = []
+        self.exchange_ids = array("h")
+        self.data_provider_ids = array("h")
+        self.lot_sizes = array("q")
+        self.strike_prices = array("d")
+        self.tick_sizes = array("d")
+
+        self.by_symbol: dict[tuple[str, int], list[int]] = {}
+        self.by_token: dict[tuple[str, int], int] = {}
+        self.by_exchange_provider: dict[tuple[int, int], array] = {}
+
+        for instrument in instruments:
+            self._add(instrument)
+
+    def _add(self, instrument: Instrument | dict[str, Any] | tuple):
+        record = (
+            instrument.to_dict() if isinstance(instrument, Instrument) else instrument
+        )
+        values: tuple[Any, ...] = (
+            tuple(record.get(column) for column in INDEX_COLUMNS)
+            if isinstance(record, dict)
+            else record
+        )
+
+        (
+            symbol,
+            exchange_id,
+            data_provider_id,
+            token,
+            name,
+            instrument_type,
+            expiry_date,
+            strike_price,
+            lot_size,
+            tick_size,
+        ) = values
+
+        position = len(self.symbols)
+        # The symbol, token, name and type are never null in the Instrument table
+        symbol = sys.intern(str(symbol))
+        token = sys.intern(str(token))
+
+        self.symbols.append(symbol)
+        self.tokens.append(token)
+        self.names.append(sys.intern(str(name)))
+        self.instrument_types.append(sys.intern(str(instrument_type)))
+        self.expiry_dates.append(intern(expiry_date) if expiry_date else None)
+        self.exchange_ids.append(exchange_id)
+        self.data_provider_ids.append(data_provider_id)
+        # The missing numeric values are stored as -1, like in the tick data
+        self.lot_sizes.append(-1 if lot_size is None else int(lot_size))
+        self.strike_prices.append(-1 if strike_price is None else float(strike_price))
+        self.tick_sizes.append(-1 if tick_size is None else float(tick_size))
+
+        self.by_symbol.setdefault((symbol, exchange_id), []).append(position)
+        self.by_token[(token, data_provider_id)] = position
+        self.by_exchange_provider.setdefault(
+            (exchange_id, data_provider_id), array("i")
+        ).append(position)
+
+    def __len__(self) -> int:
+        return len(self.symbols)
+
+    def get(self, position: int) -> InstrumentRecord:
+        """
+        Get the instrument at the position in the columns.
+        """
+        lot_size = self.lot_sizes[position]
+        strike_price = self.strike_prices[position]
+        tick_size = self.tick_sizes[position]
+
+        return InstrumentRecord(
+            self.symbols[position],
+            self.exchange_ids[position],
+            self.data_provider_ids[position],
+            self.tokens[position],
+            self.names[position],
+            self.instrument_types[position],
+            self.expiry_dates[position],
+            None if strike_price == -1 else strike_price,
+            None if lot_size == -1 else lot_size,
+            None if tick_size == -1 else tick_size,
+        )
+
+    def get_by_symbol(
+        self, symbol: str, exchange_id: int, data_provider_id: int | None = None
+    ) -> InstrumentRecord | None:
+        """
+        Get the instrument of the symbol on the exchange, from the given data provider
+        or from any data provider if None.
+
+        Parameters
+        ----------
+        symbol: ``str``
+            The symbol of the instrument, case insensitive. Eg: "INFY"
+        exchange_id: ``int``
+            The id of the exchange
+        data_provider_id: ``int | None``, ( default = None )
+            The id of the data provider
+
+        Returns
+        -------
+        ``InstrumentRecord | None``
+            The instrument, None if it is not in the index
+        """
+        for position in self.by_symbol.get((symbol.upper(), exchange_id), ()):
+            if (
+                data_provider_id is None
+                or self.data_provider_ids[position] == data_provider_id
+            ):
+                return self.get(position)
+
+        return None
+
+    def get_by_token(
+        self, token: str, data_provider_id: int
+    ) -> InstrumentRecord | None:
+        """
+        Get the instrument of the token of the data provider, None if it is not in
+        the index.
+        """
+        position = self.by_token.get((str(token), data_provider_id))
+        return None if position is None else self.get(position)
+
+    def has_symbol(self, symbol: str, exchange_id: int) -> bool:
+        """
+        Check if the symbol is an instrument of the exchange.
+        """
+        return (symbol.upper(), exchange_id) in self.by_symbol
+
+    def get_token_map(
+        self,
+        exchange_id: int | None = None,
+        data_provider_id: int | None = None,
+        symbols: Iterable[str] | None = None,
+    ) -> dict[str, str]:
+        """
+        Get the token-symbol mapping of the instruments of the exchange and the data
+        provider, restricted to the given symbols if any.
+        Eg: {"1594": "INFY"}
+
+        Parameters
+        ----------
+        exchange_id: ``int | None``, ( default = None )
+            The id of the exchange, all the exchanges if None
+        data_provider_id: ``int | None``, ( default = None )
+            The id of the data provider, all the data providers if None
+        symbols: ``Iterable[str] | None``, ( default = None )
+            The symbols of the instruments, case insensitive. All the instruments if
+            None, the symbols require the exchange
+
+        Returns
+        -------
+        ``dict[str, str]``
+            The symbols of the instruments by token
+        """
+        if symbols is not None:
+            if exchange_id is None:
+                raise ValueError("The exchange is required to look up the symbols")
+
+            positions: Iterable[int] = (
+                position
+                for symbol in symbols
+                for position in self.by_symbol.get((symbol.upper(), exchange_id), ())
+            )
+        else:
+            positions = (
+                position
+                for (exchange, _), exchange_positions in (
+                    self.by_exchange_provider.items()
+                )
+                if exchange_id in (None, exchange)
+                for position in exchange_positions
+            )
+
+        return {
+            self.tokens[position]: self.symbols[position]
+            for position in positions
+            if data_provider_id is None
+            or self.data_provider_ids[position] == data_provider_id
+        }
+
+
+_INSTRUMENT_INDEX: InstrumentIndex | None = None
+_refresh_lock = Lock()
+
+
+def get_instrument_index() -> InstrumentIndex | None:
+    """
+    Get the instrument index of the process, None if it was not loaded yet.
+    """
+    return _INSTRUMENT_INDEX
+
+
+@with_session
+def refresh_instrument_index(session: Session) -> Optional[InstrumentIndex]:
+    """
+    Build the instrument index from the Instrument table and replace the index of the
+    process with it. The previous index is kept if the table can't be read.
+
+    Parameters
+    ----------
+    session: ``Session``
+        The SQLModel session object to use for the database operations
+
+    Returns
+    -------
+    ``Optional[InstrumentIndex]``
+        The instrument index of the process
+    """
+    global _INSTRUMENT_INDEX  # pylint: disable=global-statement
+
+    columns = [getattr(Instrument, column) for column in INDEX_COLUMNS]
+
+    with _refresh_lock:
+        try:
+            index = InstrumentIndex(session.execute(select(*columns)).tuples())
+        except Exception as e:
+            logger.error("Failed to load the instrument index: %s", e)
+            return _INSTRUMENT_INDEX
+
+        _INSTRUMENT_INDEX = index
+        logger.info("Instrument index loaded with %d instruments", len(index))
+
+    return index
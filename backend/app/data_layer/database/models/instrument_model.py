@@ -1,11 +1,16 @@
 from datetime import datetime, timezone
 
 from sqlalchemy import (
+    DDL,
+    BigInteger,
     Column,
     ForeignKey,
     ForeignKeyConstraint,
+    Index,
     PrimaryKeyConstraint,
     SmallInteger,
+    event,
+    inspect,
 )
 from sqlmodel import TIMESTAMP, Field, SQLModel, text
 
@@ -217,6 +222,20 @@ class InstrumentPrice(SQLModel, table=True):  # type: ignore
                 "instrument.data_provider_id",
             ],
         ),
+        # On PostgreSQL, the table is partitioned by range of the retrieval time, see
+        # `app.data_layer.database.partitions`. The BRIN indexes of the timestamps are
+        # tiny as the ticks are inserted in time order
+        Index(
+            "ix_instrumentprice_retrieval_timestamp_brin",
+            "retrieval_timestamp",
+            postgresql_using="brin",
+        ).ddl_if(dialect="postgresql"),
+        Index(
+            "ix_instrumentprice_last_traded_timestamp_brin",
+            "last_traded_timestamp",
+            postgresql_using="brin",
+        ).ddl_if(dialect="postgresql"),
+        {"postgresql_partition_by": "RANGE (retrieval_timestamp)"},
     )
 
     def to_dict(self):
@@ -236,3 +255,112 @@ class InstrumentPrice(SQLModel, table=True):  # type: ignore
             "total_buy_quantity": self.total_buy_quantity,
             "total_sell_quantity": self.total_sell_quantity,
         }
+
+
+# The rows outside of the created partitions go to the default partition, so they are
+# not lost if the partitions were not created ahead
+event.listen(
+    inspect(InstrumentPrice, raiseerr=True).local_table,
+    "after_create",
+    DDL(
+        "CREATE TABLE IF NOT EXISTS %(table)s_default PARTITION OF %(table)s DEFAULT"
+    ).execute_if(dialect="postgresql"),
+)
+
+
+class CompactInstrumentPrice(SQLModel, table=True):  # type: ignore
+    """
+    This class holds the price information of the financial instrument in a compact
+    form. The timestamps are epoch nanoseconds, the prices are integer paise and the
+    ids are small integers, so the rows and the primary key index are narrower than
+    the ones of InstrumentPrice. The columns are ordered from the widest to the
+    narrowest, so PostgreSQL doesn't pad them. The ticks are converted at the edges by
+    `app.data_layer.database.compact_prices`.
+
+    Attributes
+    ----------
+    retrieval_timestamp: ``int``
+        The epoch nanoseconds at which the data was retrieved
+        Eg: 1729532024309936000
+    last_traded_timestamp: ``int``
+        The epoch nanoseconds at which the last trade was made, -1 if missing
+        Eg: 1729504796000000000
+    last_traded_price: ``int``
+        The price in paise at which the last trade was made, -1 if missing
+        Eg: 200000
+    last_traded_quantity: ``int | None``
+        The quantity of the last trade
+        Eg: 100
+    average_traded_price: ``int | None``
+        The average traded price in paise for the day
+        Eg: 200000
+    volume_trade_for_the_day: ``int | None``
+        The total volume traded for the day
+        Eg: 10000
+    total_buy_quantity: ``int | None``
+        The total buy quantity till the given timestamp
+        Eg: 5000
+    total_sell_quantity: ``int | None``
+        The total sell quantity till the given timestamp
+        Eg: 5000
+    exchange_id: ``int``
+        The unique identifier of the exchange
+        Eg: 1
+    data_provider_id: ``int``
+        The unique identifier of the data provider
+        Eg: 1
+    symbol: ``str``
+        The unique symbol of the financial instrument
+        Eg: "RELIANCE"
+    """
+
+    __tablename__ = "instrumentprice_compact"
+
+    retrieval_timestamp: int = Field(sa_column=Column(BigInteger(), nullable=False))
+    last_traded_timestamp: int = Field(sa_column=Column(BigInteger(), nullable=False))
+    last_traded_price: int
+    last_traded_quantity: int | None = None
+    average_traded_price: int | None = None
+    volume_trade_for_the_day: int | None = None
+    total_buy_quantity: int | None = None
+    total_sell_quantity: int | None = None
+    exchange_id: int = Field(sa_column=Column(SmallInteger(), nullable=False))
+    data_provider_id: int = Field(sa_column=Column(SmallInteger(), nullable=False))
+    symbol: str
+
+    __table_args__ = (
+        PrimaryKeyConstraint(
+            "symbol", "exchange_id", "data_provider_id", "retrieval_timestamp"
+        ),
+        ForeignKeyConstraint(
+            ["symbol", "exchange_id", "data_provider_id"],
+            [
+                "instrument.symbol",
+                "instrument.exchange_id",
+                "instrument.data_provider_id",
+            ],
+        ),
+        Index(
+            "ix_instrumentprice_compact_retrieval_timestamp_brin",
+            "retrieval_timestamp",
+            postgresql_using="brin",
+        ).ddl_if(dialect="postgresql"),
+    )
+
+    def to_dict(self):
+        """
+        Returns the object as a dictionary.
+        """
+        return {
+            "retrieval_timestamp": self.retrieval_timestamp,
+            "symbol": self.symbol,
+            "exchange_id": self.exchange_id,
+            "data_provider_id": self.data_provider_id,
+            "last_traded_timestamp": self.last_traded_timestamp,
+            "last_traded_price": self.last_traded_price,
+            "last_traded_quantity": self.last_traded_quantity,
+            "average_traded_price": self.average_traded_price,
+            "volume_trade_for_the_day": self.volume_trade_for_the_day,
+            "total_buy_quantity": self.total_buy_quantity,
+            "total_sell_quantity": self.total_sell_quantity,
+        }
@@ -0,0 +1,316 @@
+"""
+This module manages the range partitions of the InstrumentPrice table on PostgreSQL.
+The table is partitioned by the retrieval timestamp of the ticks, one partition per
+day or per month. The partitions are created ahead of time, so the inserts never wait
+for them, and the partitions older than the retention period are dropped at once
+instead of deleting their rows. The time range scans only read the partitions of the
+range, and the BRIN indexes of the timestamps, created on the parent table, skip the
+blocks outside of the range within a partition.
+
+The ticks outside of the created partitions go to the default partition of the table.
+A partition can't be created while the default partition holds rows of its range, so
+the partitions should be created well ahead with `premake`.
+"""
+
+import re
+from datetime import date, datetime, timedelta, timezone
+from pathlib import Path
+from typing import NamedTuple, Optional
+
+from omegaconf import DictConfig
+from sqlalchemy import text
+from sqlalchemy.engine import Connection, Engine
+
+from app.data_layer.database.models import InstrumentPrice
+from app.utils.common.logger import get_logger
+
+logger = get_logger(Path(__file__).name)
+
+INSTRUMENT_PRICE_TABLE = InstrumentPrice.__tablename__
+
+# Partition interval -> date format of the partition names
+PARTITION_INTERVALS = {"day": "%Y_%m_%d", "month": "%Y_%m"}
+
+# The partitions are created and dropped without waiting longer than this for the
+# lock of the table, the maintenance is retried on its next run
+LOCK_TIMEOUT = "5s"
+
+BOUND_PATTERN = re.compile(r"FROM \('([^']+)'\) TO \('([^']+)'\)")
+
+
+class Partition(NamedTuple):
+    """
+    A partition of the table, with the range [start, end) of its retrieval timestamps.
+    The range of the default partition is None.
+    """
+
+    name: str
+    start: datetime | None
+    end: datetime | None
+
+
+def validate_interval(interval: str) -> str:
+    """
+    Validate the partition interval.
+
+    Raises
+    ------
+    ``ValueError``
+        If the interval is not `day` or `month`
+    """
+    if interval not in PARTITION_INTERVALS:
+        raise ValueError(
+            f"Invalid partition interval `{interval}`, supported intervals are "
+            f"{list(PARTITION_INTERVALS)}"
+        )
+
+    return interval
+
+
+def get_partition_start(timestamp: date | datetime, interval: str) -> datetime:
+    """
+    Get the start of the partition of the timestamp. The timestamps are naive UTC
+    datetimes, like the retrieval timestamps of the table.
+    Eg: 2024-10-21 09:15:00 -> 2024-10-01 00:00:00 for the `month` interval
+    """
+    if isinstance(timestamp, datetime) and timestamp.tzinfo is not None:
+        timestamp = timestamp.astimezone(timezone.utc).replace(tzinfo=None)
+
+    start = datetime(timestamp.year, timestamp.month, timestamp.day)
+    if validate_interval(interval) == "month":
+        start = start.replace(day=1)
+
+    return start
+
+
+def get_next_partition_start(start: datetime, interval: str) -> datetime:
+    """
+    Get the start of the partition following the partition starting at `start`.
+    """
+    if validate_interval(interval) == "day":
+        return start + timedelta(days=1)
+
+    if start.month == 12:
+        return start.replace(year=start.year + 1, month=1)
+
+    return start.replace(month=start.month + 1)
+
+
+def get_partition_name(start: datetime, interval: str) -> str:
+    """
+    Get the name of the partition starting at `start`.
+    Eg: "instrumentprice_p2024_10_21" for the `day` interval
+    """
+    date_format = PARTITION_INTERVALS[validate_interval(interval)]
+    return f"{INSTRUMENT_PRICE_TABLE}_p{start.strftime(date_format)}"
+
+
+def is_partitioned(connection: Connection) -> bool:
+    """
+    Check if the InstrumentPrice table of the database is a partitioned table. The
+    tables created before the partitioning are regular tables.
+    """
+    return bool(
+        connection.execute(
+            text(
+                "SELECT 1 FROM pg_partitioned_table "
+                "WHERE partrelid = to_regclass(:table)"
+            ),
+            {"table": INSTRUMENT_PRICE_TABLE},
+        ).first()
+    )
+
+
+def get_partitions(connection: Connection) -> list[Partition]:
+    """
+    Get the partitions of the table with their ranges, sorted by start. The default
+    partition comes first.
+    """
+    rows = connection.execute(
+        text(
+            "SELECT child.relname, pg_get_expr(child.relpartbound, child.oid) "
+            "FROM pg_inherits "
+            "JOIN pg_class child ON child.oid = pg_inherits.inhrelid "
+            "WHERE pg_inherits.inhparent = to_regclass(:table)"
+        ),
+        {"table": INSTRUMENT_PRICE_TABLE},
+    ).all()
+
+    partitions = []
+    for name, bound in rows:
+        match = BOUND_PATTERN.search(bound or "")
+        if match is None:
+            partitions.append(Partition(name, None, None))
+        else:
+            partitions.append(
+                Partition(
+                    name,
+                    datetime.fromisoformat(match.group(1)),
+                    datetime.fromisoformat(match.group(2)),
+                )
+            )
+
+    return sorted(partitions, key=lambda partition: partition.start or datetime.min)
+
+
+def create_partition(connection: Connection, start: datetime, interval: str) -> str:
+    """
+    Create the partition of the table starting at `start`, if it does not exist.
+
+    Returns
+    -------
+    ``str``
+        The name of the partition
+    """
+    name = get_partition_name(start, interval)
+    end = get_next_partition_start(start, interval)
+
+    connection.execute(text(f"SET LOCAL lock_timeout = '{LOCK_TIMEOUT}'"))
+    connection.execute(
+        text(
+            f"CREATE TABLE IF NOT EXISTS {name} PARTITION OF {INSTRUMENT_PRICE_TABLE} "
+            f"FOR VALUES FROM ('{start.isoformat(sep=' ')}') "
+            f"TO ('{end.isoformat(sep=' ')}')"
+        )
+    )
+
+    return name
+
+
+def drop_partition(connection: Connection, name: str):
+    """
+    Drop the partition of the table with the given name.
+    """
+    connection.execute(text(f"SET LOCAL lock_timeout = '{LOCK_TIMEOUT}'"))
+    connection.execute(text(f"DROP TABLE IF EXISTS {name}"))
+
+
+class PartitionPolicy:
+    """
+    PartitionPolicy creates the partitions of the InstrumentPrice table ahead of time
+    and drops the partitions older than the retention period. Each partition is
+    created or dropped in its own transaction, so a partition that can't be created
+    doesn't prevent the others.
+
+    Attributes
+    ----------
+    interval: ``str``, ( default = "day" )
+        The range of each partition, `day` or `month`
+    premake: ``int``, ( default = 7 )
+        The number of partitions created after the current one
+    retention_days: ``int | None``, ( default = None )
+        The partitions whose range ended more than `retention_days` days ago are
+        dropped, all the partitions are kept if None
+    """
+
+    def __init__(
+        self,
+        interval: str = "day",
+        premake: int = 7,
+        retention_days: int | None = None,
+    ):
+        if premake < 0:
+            raise ValueError(f"Invalid number of partitions to premake: {premake}")
+        if retention_days is not None and retention_days < 1:
+            raise ValueError(f"Invalid retention period: {retention_days} days")
+
+        self.interval = validate_interval(interval)
+        self.premake = premake
+        self.retention_days = retention_days
+
+    def get_partition_starts(self, now: datetime) -> list[datetime]:
+        """
+        Get the starts of the current partition and of the `premake` next ones.
+        """
+        starts = [get_partition_start(now, self.interval)]
+        for _ in range(self.premake):
+            starts.append(get_next_partition_start(starts[-1], self.interval))
+
+        return starts
+
+    def maintain(
+        self, db_engine: Engine, now: datetime | None = None
+    ) -> dict[str, list[str]]:
+        """
+        Create the missing partitions and drop the expired ones. Nothing is done if
+        the database is not PostgreSQL or the table is not partitioned.
+
+        Parameters
+        ----------
+        db_engine: ``Engine``
+            The engine of the database
+        now: ``datetime | None``, ( default = None )
+            The current time, defaults to the current UTC time
+
+        Returns
+        -------
+        ``dict[str, list[str]]``
+            The names of the created and of the dropped partitions
+        """
+        result: dict[str, list[str]] = {"created": [], "dropped": []}
+        if db_engine.dialect.name != "postgresql":
+            return result
+
+        now = now or datetime.now(timezone.utc)
+
+        with db_engine.connect() as connection:
+            if not is_partitioned(connection):
+                logger.warning(
+                    "The %s table is not partitioned, its partitions are not managed",
+                    INSTRUMENT_PRICE_TABLE,
+                )
+                return result
+
+            partitions = get_partitions(connection)
+
+        existing = {partition.name for partition in partitions}
+        for start in self.get_partition_starts(now):
+            name = get_partition_name(start, self.interval)
+            if name in existing:
+                continue
+
+            try:
+                with db_engine.begin() as connection:
+                    create_partition(connection, start, self.interval)
+                result["created"].append(name)
+            except Exception as e:
+                logger.error("Failed to create the partition %s: %s", name, e)
+
+        if self.retention_days is not None:
+            expiry = get_partition_start(
+                now - timedelta(days=self.retention_days), "day"
+            )
+            for partition in partitions:
+                if partition.end is None or partition.end > expiry:
+                    continue
+
+                try:
+                    with db_engine.begin() as connection:
+                        drop_partition(connection, partition.name)
+                    result["dropped"].append(partition.name)
+                except Exception as e:
+                    logger.error(
+                        "Failed to drop the partition %s: %s", partition.name, e
+                    )
+
+        if result["created"] or result["dropped"]:
+            logger.info(
+                "Maintained the %s partitions: %s", INSTRUMENT_PRICE_TABLE, result
+            )
+
+        return result
+
+    @classmethod
+    def from_cfg(cls, cfg: DictConfig | None) -> Optional["PartitionPolicy"]:
+        """
+        Create the partition policy from the `partitions` configuration, None if it
+        is not given.
+        """
+        if cfg is None:
+            return None
+
+        return cls(
+            interval=cfg.get("interval", "day"),
+            premake=cfg.get("premake", 7),
+            retention_days=cfg.get("retention_days"),
+        )
@@ -1 +1,2 @@
+from .consumers import *
 from .streamers import *
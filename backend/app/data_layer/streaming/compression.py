@@ -0,0 +1,58 @@
+"""
+This module contains the helpers to validate the compression codec used by the
+Kafka producers and consumers. Kafka compresses the messages per batch on the
+producer side and the consumers decompress them transparently, but both sides
+need the library of the codec to be installed.
+"""
+
+from kafka.codec import has_gzip, has_lz4, has_snappy, has_zstd
+
+# Compression codec name -> (availability check, library to install)
+COMPRESSION_CODECS = {
+    "gzip": (has_gzip, "gzip"),
+    "snappy": (has_snappy, "python-snappy"),
+    "lz4": (has_lz4, "lz4"),
+    "zstd": (has_zstd, "zstandard"),
+}
+
+
+def validate_compression_type(compression_type: str | None) -> str | None:
+    """
+    Validate the compression codec and check that the library needed by the codec
+    is installed. `None` or "none" means the messages are not compressed.
+
+    Parameters
+    ----------
+    compression_type: ``str | None``
+        The name of the compression codec. Eg: "lz4", "zstd", "gzip", "snappy"
+
+    Returns
+    -------
+    ``str | None``
+        The normalized name of the compression codec or None if the messages
+        are not compressed
+
+    Raises
+    ------
+    ``ValueError``
+        If the codec is not supported or the library of the codec is not installed
+    """
+    if compression_type is None or compression_type.lower() == "none":
+        return None
+
+    compression_type = compression_type.lower()
+
+    if compression_type not in COMPRESSION_CODECS:
+        raise ValueError(
+            f"Unsupported compression type: {compression_type}. "
+            f"Supported compression types are: {list(COMPRESSION_CODECS)}"
+        )
+
+    is_available, library = COMPRESSION_CODECS[compression_type]
+    if not is_available():
+        raise ValueError(
+            f"Library for the {compression_type} compression codec is not found. "
+            f"Please install `{library}` to use it"
+        )
+
+    return compression_type
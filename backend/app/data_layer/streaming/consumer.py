@@ -0,0 +1,151 @@
+"""
+This module contains the base class for the consumers that read the data sent by the
+streamers, and the helper used by the data savers to create the consumer from the
+streaming configuration. Kafka is consumed with the `KafkaConsumer` itself, the other
+streaming servers have their own consumer class that provides the same interface.
+"""
+
+from abc import ABC, abstractmethod
+from typing import Any, Iterator, NamedTuple, Optional
+
+from kafka import KafkaConsumer
+from omegaconf import DictConfig
+from registrable import Registrable
+
+from app.data_layer.streaming.compression import validate_compression_type
+from app.data_layer.streaming.routing import TopicRouter
+from app.utils.common import init_from_cfg
+
+
+class StreamRecord(NamedTuple):
+    """
+    A single message read from the streaming server.
+
+    Attributes
+    ----------
+    topic: ``str``
+        The topic or stream from which the message was read
+    offset: ``Any``
+        The position of the message in the topic or stream. Eg: "1729532024309-0"
+    value: ``bytes``
+        The utf-8 encoded message
+    """
+
+    topic: str
+    offset: Any
+    value: bytes
+
+
+class StreamConsumer(ABC, Registrable):
+    """
+    This is the base class for all the consumers other than Kafka. The consumers follow
+    the interface of the `KafkaConsumer` used by the data savers, so the data savers can
+    read from any streaming server. Iterating over the consumer yields the messages one
+    by one and marks them as consumed, whereas `poll` returns a batch of messages that
+    are marked as consumed only when `commit` is called.
+    """
+
+    @abstractmethod
+    def poll(
+        self, timeout_ms: int = 0, max_records: int | None = None
+    ) -> dict[str, list[StreamRecord]]:
+        """
+        Fetch the next batch of messages from the streaming server.
+
+        Parameters
+        ----------
+        timeout_ms: ``int``, ( default = 0 )
+            The time in milliseconds to wait for the messages if none are available
+        max_records: ``int | None``, ( default = None )
+            The maximum number of messages to return
+
+        Returns
+        -------
+        ``dict[str, list[StreamRecord]]``
+            The messages grouped by the topic from which they were read
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    def commit(self):
+        """
+        Mark all the messages returned by `poll` as consumed.
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    def __iter__(self) -> Iterator[StreamRecord]:
+        """
+        Yield the messages one by one as they arrive.
+        """
+        raise NotImplementedError
+
+    def close(self):
+        """
+        Release the resources held by the consumer.
+        """
+
+    @classmethod
+    @abstractmethod
+    def from_cfg(
+        cls, cfg: DictConfig, group_name: str | None = None
+    ) -> Optional["StreamConsumer"]:
+        """
+        Create the consumer from the streaming configuration.
+        """
+        raise NotImplementedError
+
+
+def init_consumer(
+    cfg: DictConfig, group_name: str | None = None
+) -> KafkaConsumer | StreamConsumer:
+    """
+    Create the consumer from the streaming configuration. The `name` of the
+    configuration selects the streaming server, Kafka is used when no name is given.
+    If the Kafka producer compresses the messages, the library of the compression
+    codec is checked before creating the consumer, so the consumer doesn't fail on
+    the first compressed batch. The Kafka consumer is subscribed to all the topics the
+    `routes` of the streamer send the ticks to, along with `kafka_topic`. The Kafka
+    offsets are not committed automatically, they are committed with `commit` once
+    the messages are saved.
+
+    Parameters
+    ----------
+    cfg: ``DictConfig``
+        The streaming configuration. Eg: the `kafka_topic` and `kafka_server` for Kafka
+    group_name: ``str | None``, ( default = None )
+        The name of the consumer group, the consumers of the same group share the
+        messages among them. Usually the name of the data saver
+
+    Returns
+    -------
+    ``KafkaConsumer | StreamConsumer``
+        The consumer subscribed to the topics
+
+    Raises
+    ------
+    ``ValueError``
+        If the compression codec is not supported or its library is not installed,
+        if a route is invalid or if the consumer cannot be created
+    ``NoBrokersAvailable``
+        If the Kafka server is not available
+    """
+    name = cfg.get("name", "kafka")
+
+    if name == "kafka":
+        validate_compression_type(cfg.get("compression_type"))
+        router = TopicRouter(cfg.kafka_topic, cfg.get("routes"))
+
+        return KafkaConsumer(
+            *sorted(router.topics),
+            bootstrap_servers=cfg.kafka_server,
+            auto_offset_reset="earliest",
+            group_id=group_name,
+            enable_auto_commit=False,
+        )
+
+    consumer = init_from_cfg(cfg, StreamConsumer, group_name=group_name)
+    if consumer is None:
+        raise ValueError(f"Failed to create the consumer for `{name}`")
+
+    return consumer
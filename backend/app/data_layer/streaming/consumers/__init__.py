@@ -0,0 +1,3 @@
+from .redis_stream_consumer import RedisStreamConsumer
+from .segment_log_consumer import SegmentLogConsumer
+from .shared_memory_consumer import SharedMemoryConsumer
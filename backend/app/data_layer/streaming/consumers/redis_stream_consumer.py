@@ -0,0 +1,236 @@
+import socket
+from pathlib import Path
+from typing import Any, Iterator, Mapping, Optional, Sequence, cast
+
+import redis
+from omegaconf import DictConfig
+
+from app.data_layer.streaming.consumer import StreamConsumer, StreamRecord
+from app.data_layer.streaming.routing import TopicRouter
+from app.utils.common.logger import get_logger
+from app.utils.redis_utils import init_redis_client
+
+logger = get_logger(Path(__file__).name)
+
+# Maximum number of pending messages read again after a restart
+MAX_PENDING_MESSAGES = 100000
+
+
+@StreamConsumer.register("redis_stream")
+class RedisStreamConsumer(StreamConsumer):
+    """
+    RedisStreamConsumer reads the ticks sent by the `RedisStreamer` using a Redis
+    consumer group. The messages are read in batches with XREADGROUP and acknowledged
+    with XACK once they are consumed. On restart, the messages that were read but not
+    acknowledged by this consumer are claimed and read again before the new messages.
+    The group reads all the streams the `routes` of the streamer send the ticks to,
+    along with `stream_name`.
+
+    Attributes
+    ----------
+    redis_client: ``redis.Redis``
+        The synchronous Redis client
+    stream_name: ``str``
+        The stream from which the data should be read, the default stream of the routes
+    group_name: ``str``
+        The name of the consumer group. Each data saver should use its own group to
+        get all the messages of the stream
+    consumer_name: ``str | None``, ( default = None )
+        The name of the consumer in the group. Defaults to the group name and the
+        host name, so a restarted consumer can read its pending messages again
+    batch_size: ``int``, ( default = 500 )
+        The maximum number of messages read at once
+    block_ms: ``int``, ( default = 1000 )
+        The time in milliseconds to wait for the messages while iterating
+    routes: ``Sequence[Mapping[str, Any]] | None``, ( default = None )
+        The routes of the streamer, the streams of the routes are read as well
+    """
+
+    def __init__(
+        self,
+        redis_client: redis.Redis,
+        stream_name: str,
+        group_name: str,
+        consumer_name: str | None = None,
+        batch_size: int = 500,
+        block_ms: int = 1000,
+        routes: Sequence[Mapping[str, Any]] | None = None,
+    ):
+        self.redis_client = redis_client
+        self.stream_name = stream_name
+        self.stream_names = sorted(TopicRouter(stream_name, routes).topics)
+        self.group_name = group_name
+        self.consumer_name = consumer_name or f"{group_name}-{socket.gethostname()}"
+        self.batch_size = batch_size
+        self.block_ms = block_ms
+
+        # Messages read but not acknowledged by this consumer before a restart, by
+        # stream, they are read again before the new messages
+        self._pending_ids: dict[str, list[str]] | None = None
+        self._uncommitted: dict[str, list[str]] = {}
+
+        for name in self.stream_names:
+            self._create_group(name)
+
+    def _create_group(self, stream_name: str):
+        """
+        Create the consumer group and the stream if they don't exist. The new group
+        reads the stream from the beginning.
+        """
+        try:
+            self.redis_client.xgroup_create(
+                stream_name, self.group_name, id="0", mkstream=True
+            )
+        except redis.ResponseError as e:
+            if "BUSYGROUP" not in str(e):
+                raise
+
+    def poll(
+        self, timeout_ms: int = 0, max_records: int | None = None
+    ) -> dict[str, list[StreamRecord]]:
+        """
+        Read the next batch of messages of the consumer group. The messages are
+        acknowledged only when `commit` is called.
+
+        Parameters
+        ----------
+        timeout_ms: ``int``, ( default = 0 )
+            The time in milliseconds to wait for the new messages, 0 means no wait
+        max_records: ``int | None``, ( default = None )
+            The maximum number of messages to return, defaults to `batch_size`
+
+        Returns
+        -------
+        ``dict[str, list[StreamRecord]]``
+            The messages by stream or an empty dictionary if there are no messages
+        """
+        count = max_records or self.batch_size
+        entries_by_stream = self._read_pending(count)
+
+        if not entries_by_stream:
+            response = cast(
+                list,
+                self.redis_client.xreadgroup(
+                    self.group_name,
+                    self.consumer_name,
+                    {name: ">" for name in self.stream_names},
+                    count=count,
+                    block=timeout_ms or None,
+                ),
+            )
+            entries_by_stream = {
+                name.decode("utf-8") if isinstance(name, bytes) else name: entries
+                for name, entries in response or []
+            }
+
+        records: dict[str, list[StreamRecord]] = {}
+        for stream_name, entries in entries_by_stream.items():
+            for message_id, fields in entries:
+                self._uncommitted.setdefault(stream_name, []).append(message_id)
+                value = fields.get("data", "")
+
+                if isinstance(value, str):
+                    value = value.encode("utf-8")
+                records.setdefault(stream_name, []).append(
+                    StreamRecord(stream_name, message_id, value)
+                )
+
+        return records
+
+    def _read_pending(self, count: int) -> dict[str, list]:
+        """
+        Claim the next `count` pending messages of this consumer, from the first
+        stream that has some. The pending messages are fetched once, when the consumer
+        reads the streams for the first time.
+        """
+        if self._pending_ids is None:
+            self._pending_ids = {}
+            for name in self.stream_names:
+                pending = cast(
+                    list,
+                    self.redis_client.xpending_range(
+                        name,
+                        self.group_name,
+                        min="-",
+                        max="+",
+                        count=MAX_PENDING_MESSAGES,
+                        consumername=self.consumer_name,
+                    ),
+                )
+                self._pending_ids[name] = [entry["message_id"] for entry in pending]
+
+        for stream_name, pending_ids in self._pending_ids.items():
+            message_ids = pending_ids[:count]
+            self._pending_ids[stream_name] = pending_ids[count:]
+
+            if not message_ids:
+                continue
+
+            entries = cast(
+                list,
+                self.redis_client.xclaim(
+                    stream_name,
+                    self.group_name,
+                    self.consumer_name,
+                    min_idle_time=0,
+                    message_ids=list(message_ids),
+                ),
+            )
+
+            # The messages deleted by trimming are not returned, acknowledge them
+            claimed_ids = {entry[0] for entry in entries if entry}
+            self._uncommitted.setdefault(stream_name, []).extend(
+                set(message_ids) - claimed_ids
+            )
+
+            return {stream_name: [entry for entry in entries if entry]}
+
+        return {}
+
+    def commit(self):
+        """
+        Acknowledge all the messages returned by `poll`.
+        """
+        for stream_name, message_ids in self._uncommitted.items():
+            if message_ids:
+                self.redis_client.xack(stream_name, self.group_name, *message_ids)
+
+        self._uncommitted = {}
+
+    def __iter__(self) -> Iterator[StreamRecord]:
+        """
+        Yield the messages one by one as they arrive. Each batch is acknowledged once
+        all its messages are consumed.
+        """
+        while True:
+            for records in self.poll(self.block_ms).values():
+                yield from records
+
+            self.commit()
+
+    def close(self):
+        """
+        Close the Redis connection.
+        """
+        try:
+            self.redis_client.close()
+        except Exception as e:
+            logger.error("Error closing Redis connection: %s", e)
+
+    @classmethod
+    def from_cfg(
+        cls, cfg: DictConfig, group_name: str | None = None
+    ) -> Optional["RedisStreamConsumer"]:
+        try:
+            return cls(
+                init_redis_client(is_async=False),  # type: ignore
+                cfg["stream_name"],
+                cfg.get("group_name") or group_name or "data_saver",
+                consumer_name=cfg.get("consumer_name"),
+                batch_size=cfg.get("batch_size", 500),
+                block_ms=cfg.get("block_ms", 1000),
+                routes=cfg.get("routes"),
+            )
+        except Exception as e:
+            logger.error("Error creating RedisStreamConsumer object: %s", e)
+            return None
@@ -0,0 +1,169 @@
+import time
+from pathlib import Path
+from typing import Any, Iterator, Mapping, Optional, Sequence
+
+from omegaconf import DictConfig
+
+from app.data_layer.streaming.consumer import StreamConsumer, StreamRecord
+from app.data_layer.streaming.routing import TopicRouter
+from app.data_layer.streaming.segment_log import OffsetStore, SegmentLogReader
+from app.utils.common.logger import get_logger
+
+logger = get_logger(Path(__file__).name)
+
+# Time in seconds to wait before checking the log again when there are no new ticks
+POLL_INTERVAL = 0.01
+
+
+@StreamConsumer.register("segment_log")
+class SegmentLogConsumer(StreamConsumer):
+    """
+    SegmentLogConsumer tails the logs of the topics written by the `SegmentLogStreamer`,
+    the default `topic` and the topics of the `routes` of the streamer. The offset of
+    each consumer group is persisted per topic in the log directory on `commit`, so a
+    restarted consumer continues after the last committed tick.
+
+    Attributes
+    ----------
+    log_dir: ``str | Path``
+        The directory in which the logs of the topics are stored
+    topic: ``str``
+        The topic from which the ticks are read, the default topic of the routes
+    group_name: ``str``
+        The name of the consumer group. Each data saver should use its own group to
+        get all the ticks of the topic
+    batch_size: ``int``, ( default = 500 )
+        The maximum number of ticks read at once
+    block_ms: ``int``, ( default = 1000 )
+        The time in milliseconds to wait for the ticks while iterating
+    routes: ``Sequence[Mapping[str, Any]] | None``, ( default = None )
+        The routes of the streamer, the topics of the routes are read as well
+    """
+
+    def __init__(
+        self,
+        log_dir: str | Path,
+        topic: str,
+        group_name: str,
+        batch_size: int = 500,
+        block_ms: int = 1000,
+        routes: Sequence[Mapping[str, Any]] | None = None,
+    ):
+        self.topic = topic
+        self.topics = sorted(TopicRouter(topic, routes).topics)
+        self.group_name = group_name
+        self.batch_size = batch_size
+        self.block_ms = block_ms
+
+        self.offset_stores: dict[str, OffsetStore] = {}
+        self.readers: dict[str, SegmentLogReader] = {}
+        self._committed_offsets: dict[str, int] = {}
+
+        for topic_name in self.topics:
+            topic_dir = Path(log_dir) / topic_name
+            offset_store = OffsetStore(topic_dir)
+            reader = SegmentLogReader(topic_dir, offset_store.load(group_name))
+
+            self.offset_stores[topic_name] = offset_store
+            self.readers[topic_name] = reader
+            self._committed_offsets[topic_name] = reader.next_offset
+
+        # The topic read first, rotated on each poll so every topic gets its turn
+        self._next_topic = 0
+
+    def _read(self, count: int) -> dict[str, list[StreamRecord]]:
+        """
+        Read at most `count` ticks from the topics, starting from the next topic.
+        """
+        records: dict[str, list[StreamRecord]] = {}
+        num_records = 0
+
+        for i in range(len(self.topics)):
+            topic = self.topics[(self._next_topic + i) % len(self.topics)]
+            topic_records = self.readers[topic].read(count - num_records)
+
+            if topic_records:
+                records[topic] = [
+                    StreamRecord(topic, offset, value)
+                    for offset, value in topic_records
+                ]
+                num_records += len(topic_records)
+
+            if num_records >= count:
+                break
+
+        self._next_topic = (self._next_topic + 1) % len(self.topics)
+        return records
+
+    def poll(
+        self, timeout_ms: int = 0, max_records: int | None = None
+    ) -> dict[str, list[StreamRecord]]:
+        """
+        Read the next batch of ticks of the topics. The offsets are persisted only when
+        `commit` is called.
+
+        Parameters
+        ----------
+        timeout_ms: ``int``, ( default = 0 )
+            The time in milliseconds to wait for the new ticks, 0 means no wait
+        max_records: ``int | None``, ( default = None )
+            The maximum number of ticks to return, defaults to `batch_size`
+
+        Returns
+        -------
+        ``dict[str, list[StreamRecord]]``
+            The ticks by topic or an empty dictionary if there are no new ticks
+        """
+        count = max_records or self.batch_size
+        deadline = time.monotonic() + timeout_ms / 1000
+
+        records = self._read(count)
+        while not records and time.monotonic() < deadline:
+            time.sleep(POLL_INTERVAL)
+            records = self._read(count)
+
+        return records
+
+    def commit(self):
+        """
+        Persist the offsets of the ticks returned by `poll`.
+        """
+        for topic, reader in self.readers.items():
+            if reader.next_offset != self._committed_offsets[topic]:
+                self.offset_stores[topic].save(self.group_name, reader.next_offset)
+                self._committed_offsets[topic] = reader.next_offset
+
+    def __iter__(self) -> Iterator[StreamRecord]:
+        """
+        Yield the ticks one by one as they arrive. The offset is committed once all the
+        ticks of a batch are consumed.
+        """
+        while True:
+            for records in self.poll(self.block_ms).values():
+                yield from records
+
+            self.commit()
+
+    def close(self):
+        """
+        Unmap the segments being read.
+        """
+        for reader in self.readers.values():
+            reader.close()
+
+    @classmethod
+    def from_cfg(
+        cls, cfg: DictConfig, group_name: str | None = None
+    ) -> Optional["SegmentLogConsumer"]:
+        try:
+            return cls(
+                cfg["log_dir"],
+                cfg["topic"],
+                cfg.get("group_name") or group_name or "data_saver",
+                batch_size=cfg.get("batch_size", 500),
+                block_ms=cfg.get("block_ms", 1000),
+                routes=cfg.get("routes"),
+            )
+        except Exception as e:
+            logger.error("Error creating SegmentLogConsumer object: %s", e)
+            return None
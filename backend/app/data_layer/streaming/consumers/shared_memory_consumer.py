@@ -0,0 +1,186 @@
+import time
+from pathlib import Path
+from typing import Iterator, Optional
+
+from omegaconf import DictConfig
+
+from app.data_layer.streaming.consumer import StreamConsumer, StreamRecord
+from app.data_layer.streaming.ring_buffer import (
+    RingBufferReader,
+    SharedMemoryRingBuffer,
+)
+from app.utils.common.logger import get_logger
+
+logger = get_logger(Path(__file__).name)
+
+# Time in seconds to wait before checking the ring buffer again when it is empty
+POLL_INTERVAL = 0.0005
+
+
+@StreamConsumer.register("shared_memory")
+class SharedMemoryConsumer(StreamConsumer):
+    """
+    SharedMemoryConsumer reads the ticks written by the `SharedMemoryStreamer` to the
+    shared memory ring buffer. Each consumer keeps its own position in memory, so the
+    consumer starts from the next tick after a restart unless `from_beginning` is set.
+    The ticks overwritten before they are read are counted in `overruns`.
+
+    Attributes
+    ----------
+    buffer_name: ``str``
+        The name of the shared memory block. Eg: "smartsocket_ticks"
+    capacity: ``int``, ( default = 65536 )
+        The number of ticks held by the buffer, used if the buffer doesn't exist yet
+    slot_size: ``int``, ( default = 1024 )
+        The size of a slot in bytes, used if the buffer doesn't exist yet
+    batch_size: ``int``, ( default = 500 )
+        The maximum number of ticks read at once
+    block_ms: ``int``, ( default = 1000 )
+        The time in milliseconds to wait for the ticks while iterating
+    from_beginning: ``bool``, ( default = False )
+        If True, start from the oldest tick in the buffer
+    """
+
+    def __init__(
+        self,
+        buffer_name: str,
+        capacity: int = 65536,
+        slot_size: int = 1024,
+        batch_size: int = 500,
+        block_ms: int = 1000,
+        from_beginning: bool = False,
+    ):
+        self.ring_buffer = SharedMemoryRingBuffer(buffer_name, capacity, slot_size)
+        self.reader = RingBufferReader(self.ring_buffer, from_beginning)
+        self.batch_size = batch_size
+        self.block_ms = block_ms
+
+        # The views of the last `read_views`, released on the next read or on close
+        self._views: list[memoryview] = []
+
+    @property
+    def overruns(self) -> int:
+        """
+        The number of ticks overwritten by the producer before they were read.
+        """
+        return self.reader.overruns
+
+    def poll(
+        self, timeout_ms: int = 0, max_records: int | None = None
+    ) -> dict[str, list[StreamRecord]]:
+        """
+        Read the next batch of ticks from the ring buffer.
+
+        Parameters
+        ----------
+        timeout_ms: ``int``, ( default = 0 )
+            The time in milliseconds to wait for the new ticks, 0 means no wait
+        max_records: ``int | None``, ( default = None )
+            The maximum number of ticks to return, defaults to `batch_size`
+
+        Returns
+        -------
+        ``dict[str, list[StreamRecord]]``
+            The ticks of the buffer or an empty dictionary if there are no ticks
+        """
+        count = max_records or self.batch_size
+        deadline = time.monotonic() + timeout_ms / 1000
+        overruns = self.reader.overruns
+
+        records = self.reader.read(count)
+        while not records and time.monotonic() < deadline:
+            time.sleep(POLL_INTERVAL)
+            records = self.reader.read(count)
+
+        if self.reader.overruns > overruns:
+            logger.warning(
+                "%d ticks were overwritten before being read from %s",
+                self.reader.overruns - overruns,
+                self.ring_buffer.name,
+            )
+
+        name = self.ring_buffer.name
+        return (
+            {name: [StreamRecord(name, seq, value) for seq, value in records]}
+            if records
+            else {}
+        )
+
+    def read_views(
+        self, max_records: int | None = None
+    ) -> list[tuple[int, memoryview]]:
+        """
+        Get the next ticks as views into the shared memory without copying them. This
+        is meant for the analytics running in the consumer process. The producer may
+        overwrite a slot while its view is processed, so check `is_valid` with the
+        sequence of the tick once it is processed. The views are released on the next
+        call and on `close`.
+
+        Parameters
+        ----------
+        max_records: ``int | None``, ( default = None )
+            The maximum number of ticks to return, defaults to `batch_size`
+
+        Returns
+        -------
+        ``list[tuple[int, memoryview]]``
+            The (sequence, view) pairs of the utf-8 encoded ticks
+        """
+        self.release_views()
+        records = self.reader.read_views(max_records or self.batch_size)
+        self._views = [view for _, view in records]
+
+        return records
+
+    def is_valid(self, sequence: int) -> bool:
+        """
+        Check whether the tick of the sequence is still in the buffer, so the data
+        read from its view was not overwritten by the producer.
+        """
+        return self.ring_buffer.is_valid(sequence)
+
+    def release_views(self):
+        """
+        Release the views returned by the last `read_views`.
+        """
+        for view in self._views:
+            view.release()
+
+        self._views = []
+
+    def commit(self):
+        """
+        The position of the consumer is kept in memory, there is nothing to commit.
+        """
+
+    def __iter__(self) -> Iterator[StreamRecord]:
+        """
+        Yield the ticks one by one as they arrive.
+        """
+        while True:
+            for records in self.poll(self.block_ms).values():
+                yield from records
+
+    def close(self):
+        """
+        Release the views and detach from the ring buffer.
+        """
+        self.release_views()
+        self.ring_buffer.close()
+
+    @classmethod
+    def from_cfg(
+        cls, cfg: DictConfig, group_name: str | None = None
+    ) -> Optional["SharedMemoryConsumer"]:
+        try:
+            return cls(
+                cfg["buffer_name"],
+                capacity=cfg.get("capacity", 65536),
+                slot_size=cfg.get("slot_size", 1024),
+                batch_size=cfg.get("batch_size", 500),
+                block_ms=cfg.get("block_ms", 1000),
+                from_beginning=cfg.get("from_beginning", False),
+            )
+        except Exception as e:
+            logger.error("Error creating SharedMemoryConsumer object: %s", e)
+            return None
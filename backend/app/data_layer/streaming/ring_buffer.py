@@ -0,0 +1,353 @@
+"""
+This module contains the shared memory ring buffer used to hand off the ticks between
+the processes running on the same machine without going through a broker. The buffer
+has a single writer and any number of readers, each reader keeps its own position.
+
+Layout of the shared memory:
+    header: capacity (uint64) | slot_size (uint64) | write_sequence (uint64) |
+            ready (uint64) | padding
+    slots:  sequence (uint64) | length (uint32) | payload (slot_size - 12 bytes)
+
+The creator of the buffer sets the `ready` word once the rest of the header is written,
+the processes attaching to the buffer wait for it before reading the header.
+
+The writer stores the payload in the slot `sequence % capacity`, then the sequence of
+the slot and finally the write sequence of the header. The readers check the sequence of
+the slot before and after reading the payload, so a slot overwritten by the writer while
+it is read is detected as an overrun instead of returning a corrupted tick.
+"""
+
+import struct
+import time
+from multiprocessing import resource_tracker
+from multiprocessing.shared_memory import SharedMemory
+from pathlib import Path
+from threading import Lock
+from typing import cast
+
+from app.utils.common.logger import get_logger
+
+logger = get_logger(Path(__file__).name)
+
+HEADER = struct.Struct("<QQQ")
+HEADER_SIZE = 64
+SLOT_HEADER = struct.Struct("<QI")
+WRITE_SEQUENCE_OFFSET = 16
+READY_OFFSET = 24
+READY = 0x5245414459  # "READY"
+
+# The time in seconds to wait for the creator of the buffer to write the header
+READY_TIMEOUT = 5.0
+
+# The streamers of the same process share the writer lock of the buffer
+_write_locks: dict[str, Lock] = {}
+
+
+def get_tracked_name(shared_memory: SharedMemory) -> str:
+    """
+    Get the name the resource tracker knows the shared memory by, which has a leading
+    slash on POSIX systems.
+    """
+    return getattr(shared_memory, "_name", shared_memory.name)
+
+
+def wait_until_ready(buffer: memoryview, name: str):
+    """
+    Wait until the creator of the buffer has written its header.
+
+    Raises
+    ------
+    ``TimeoutError``
+        If the header is not written within `READY_TIMEOUT` seconds
+    """
+    deadline = time.monotonic() + READY_TIMEOUT
+
+    while struct.unpack_from("<Q", buffer, READY_OFFSET)[0] != READY:
+        if time.monotonic() > deadline:
+            raise TimeoutError(f"Ring buffer {name} was not initialized in time")
+        time.sleep(0.001)
+
+
+class SharedMemoryRingBuffer:
+    """
+    A fixed size ring buffer of fixed size slots in shared memory. The buffer is created
+    by the first process that opens it and attached by the others, so the producer and
+    the consumers can be started in any order. Only one process should write to the
+    buffer, the writers of that process are serialized with a lock.
+
+    Attributes
+    ----------
+    name: ``str``
+        The name of the shared memory block. Eg: "smartsocket_ticks"
+    capacity: ``int``, ( default = 65536 )
+        The number of slots in the buffer
+    slot_size: ``int``, ( default = 1024 )
+        The size of a slot in bytes, the payload can be at most `slot_size - 12` bytes
+    """
+
+    def __init__(self, name: str, capacity: int = 65536, slot_size: int = 1024):
+        if capacity <= 0 or slot_size <= SLOT_HEADER.size:
+            raise ValueError(
+                f"Invalid ring buffer size: capacity={capacity}, slot_size={slot_size}"
+            )
+
+        self.name = name
+        size = HEADER_SIZE + capacity * slot_size
+
+        try:
+            self.shared_memory = SharedMemory(name=name, create=True, size=size)
+            created = True
+        except FileExistsError:
+            self.shared_memory = SharedMemory(name=name)
+            created = False
+
+        # The buffer is shared by the independent processes, it should not be removed
+        # when one of them exits. Use `unlink` to remove it.
+        resource_tracker.unregister(
+            get_tracked_name(self.shared_memory), "shared_memory"
+        )
+
+        # The buffer of the shared memory is only None once it is closed
+        self.buffer = cast(memoryview, self.shared_memory.buf)
+        if created:
+            HEADER.pack_into(self.buffer, 0, capacity, slot_size, 0)
+            struct.pack_into("<Q", self.buffer, READY_OFFSET, READY)
+        else:
+            wait_until_ready(self.buffer, name)
+
+        self.capacity, self.slot_size, _ = HEADER.unpack_from(self.buffer, 0)
+
+        if (self.capacity, self.slot_size) != (capacity, slot_size):
+            logger.warning(
+                "Ring buffer %s already exists with capacity=%d and slot_size=%d",
+                name,
+                self.capacity,
+                self.slot_size,
+            )
+
+        self.max_payload_size = self.slot_size - SLOT_HEADER.size
+        self._write_lock = _write_locks.setdefault(name, Lock())
+
+    @property
+    def write_sequence(self) -> int:
+        """
+        The number of records written to the buffer so far.
+        """
+        return struct.unpack_from("<Q", self.buffer, WRITE_SEQUENCE_OFFSET)[0]
+
+    def _slot_offset(self, sequence: int) -> int:
+        return HEADER_SIZE + (sequence % self.capacity) * self.slot_size
+
+    def write(self, payload: bytes) -> bool:
+        """
+        Write the payload to the next slot of the buffer. The oldest record is
+        overwritten when the buffer is full.
+
+        Parameters
+        ----------
+        payload: ``bytes``
+            The record to be written
+
+        Returns
+        -------
+        ``bool``
+            True if the record was written, False if it is larger than the slot
+        """
+        if len(payload) > self.max_payload_size:
+            return False
+
+        with self._write_lock:
+            sequence = self.write_sequence
+            offset = self._slot_offset(sequence)
+
+            # Invalidate the slot while the payload is written
+            SLOT_HEADER.pack_into(self.buffer, offset, 0, 0)
+            payload_offset = offset + SLOT_HEADER.size
+            self.buffer[payload_offset : payload_offset + len(payload)] = payload
+            SLOT_HEADER.pack_into(self.buffer, offset, sequence + 1, len(payload))
+
+            struct.pack_into("<Q", self.buffer, WRITE_SEQUENCE_OFFSET, sequence + 1)
+
+        return True
+
+    def view(self, sequence: int) -> memoryview | None:
+        """
+        Get the record with the given sequence without copying it. The view is valid
+        until the writer wraps around the buffer, use `is_valid` after processing the
+        view to make sure it was not overwritten meanwhile.
+
+        Parameters
+        ----------
+        sequence: ``int``
+            The sequence of the record, starting from 0
+
+        Returns
+        -------
+        ``memoryview | None``
+            The view of the record or None if the slot no longer holds the record
+        """
+        offset = self._slot_offset(sequence)
+        slot_sequence, length = SLOT_HEADER.unpack_from(self.buffer, offset)
+
+        if slot_sequence != sequence + 1:
+            return None
+
+        payload_offset = offset + SLOT_HEADER.size
+        return self.buffer[payload_offset : payload_offset + length]
+
+    def is_valid(self, sequence: int) -> bool:
+        """
+        Check whether the slot of the record still holds the record with the given
+        sequence.
+        """
+        offset = self._slot_offset(sequence)
+        return SLOT_HEADER.unpack_from(self.buffer, offset)[0] == sequence + 1
+
+    def read(self, sequence: int) -> bytes | None:
+        """
+        Copy the record with the given sequence out of the buffer.
+
+        Parameters
+        ----------
+        sequence: ``int``
+            The sequence of the record, starting from 0
+
+        Returns
+        -------
+        ``bytes | None``
+            The record or None if it was overwritten by the writer
+        """
+        view = self.view(sequence)
+        if view is None:
+            return None
+
+        payload = bytes(view)
+        view.release()
+
+        return payload if self.is_valid(sequence) else None
+
+    def close(self, unlink: bool = False):
+        """
+        Detach from the shared memory and optionally remove it. The views returned by
+        `view` must be released before closing the buffer.
+
+        Parameters
+        ----------
+        unlink: ``bool``, ( default = False )
+            If True, the shared memory is removed once all the processes detach from it
+        """
+        del self.buffer
+        self.shared_memory.close()
+
+        if unlink:
+            # `unlink` removes the buffer from the resource tracker, which no longer
+            # tracks it
+            resource_tracker.register(
+                get_tracked_name(self.shared_memory), "shared_memory"
+            )
+            self.shared_memory.unlink()
+
+
+class RingBufferReader:
+    """
+    RingBufferReader reads the records of a `SharedMemoryRingBuffer` in order. A reader
+    that falls more than `capacity` records behind the writer loses the overwritten
+    records, it skips to the oldest available record and counts the lost records as
+    overruns.
+
+    Attributes
+    ----------
+    ring_buffer: ``SharedMemoryRingBuffer``
+        The ring buffer to read from
+    from_beginning: ``bool``, ( default = False )
+        If True, start from the oldest available record, otherwise from the next
+        record written
+    """
+
+    def __init__(self, ring_buffer: SharedMemoryRingBuffer, from_beginning=False):
+        self.ring_buffer = ring_buffer
+        write_sequence = ring_buffer.write_sequence
+
+        self.next_sequence = (
+            max(0, write_sequence - ring_buffer.capacity)
+            if from_beginning
+            else write_sequence
+        )
+        self.overruns = 0
+
+    @property
+    def lag(self) -> int:
+        """
+        The number of records written but not read yet.
+        """
+        return self.ring_buffer.write_sequence - self.next_sequence
+
+    def _skip_overrun(self, write_sequence: int):
+        """
+        Move the reader to the oldest record that is still in the buffer.
+        """
+        # Leave one slot as margin for the record being written
+        oldest_sequence = write_sequence - self.ring_buffer.capacity + 1
+        if oldest_sequence > self.next_sequence:
+            self.overruns += oldest_sequence - self.next_sequence
+            self.next_sequence = oldest_sequence
+
+    def read_views(self, max_records: int) -> list[tuple[int, memoryview]]:
+        """
+        Get the next records as views into the shared memory without copying them.
+        Process the views before the writer wraps around the buffer and check
+        `ring_buffer.is_valid(sequence)` afterwards if the reader may be slow.
+
+        Parameters
+        ----------
+        max_records: ``int``
+            The maximum number of records to return
+
+        Returns
+        -------
+        ``list[tuple[int, memoryview]]``
+            The (sequence, view) pairs of the records
+        """
+        views: list[tuple[int, memoryview]] = []
+        write_sequence = self.ring_buffer.write_sequence
+        self._skip_overrun(write_sequence)
+
+        while self.next_sequence < write_sequence and len(views) < max_records:
+            view = self.ring_buffer.view(self.next_sequence)
+
+            if view is None:
+                # Overwritten while reading, skip to the oldest record
+                write_sequence = self.ring_buffer.write_sequence
+                self._skip_overrun(write_sequence)
+                continue
+
+            views.append((self.next_sequence, view))
+            self.next_sequence += 1
+
+        return views
+
+    def read(self, max_records: int) -> list[tuple[int, bytes]]:
+        """
+        Copy the next records out of the buffer.
+
+        Parameters
+        ----------
+        max_records: ``int``
+            The maximum number of records to return
+
+        Returns
+        -------
+        ``list[tuple[int, bytes]]``
+            The (sequence, record) pairs of the records
+        """
+        records = []
+        for sequence, view in self.read_views(max_records):
+            payload = bytes(view)
+            view.release()
+
+            if self.ring_buffer.is_valid(sequence):
+                records.append((sequence, payload))
+            else:
+                self.overruns += 1
+
+        return records
@@ -0,0 +1,205 @@
+"""
+This module contains the helpers used by the streamers to decide where a tick
+should be sent to and with which key. The key is used by the streaming server to
+keep all the ticks of an instrument in the same partition, and the routes are used
+to send the ticks to different topics based on the data provider, exchange and
+the subscription mode of the tick.
+"""
+
+import json
+from typing import Any, Mapping, Sequence
+
+from app.utils.common.types.financial_types import DataProviderType, ExchangeType
+
+DEFAULT_KEY_FIELDS = ("symbol", "exchange_id")
+
+
+def parse_tick(data: str) -> dict[str, Any] | None:
+    """
+    Parse the tick data received from the socket. The sockets send the ticks as a
+    json string, if the data is not a json object then None is returned.
+
+    Parameters
+    ----------
+    data: ``str``
+        The tick data as a json string
+
+    Returns
+    -------
+    ``dict[str, Any] | None``
+        The parsed tick data or None if the data is not a json object
+    """
+    try:
+        tick = json.loads(data)
+    except (TypeError, ValueError):
+        return None
+
+    return tick if isinstance(tick, dict) else None
+
+
+def get_message_key(
+    tick: Mapping[str, Any] | None, key_fields: Sequence[str] = DEFAULT_KEY_FIELDS
+) -> bytes | None:
+    """
+    Build the message key of the tick from the given key fields. The values of the
+    key fields are joined with `|`. For example, if the key fields are `symbol` and
+    `exchange_id`, then the key of the tick will be `INFY|1`.
+
+    Parameters
+    ----------
+    tick: ``Mapping[str, Any] | None``
+        The parsed tick data
+    key_fields: ``Sequence[str]``, ( default = ("symbol", "exchange_id") )
+        The fields of the tick that uniquely identify the instrument
+
+    Returns
+    -------
+    ``bytes | None``
+        The utf-8 encoded key of the tick or None if any of the key fields is
+        missing in the tick
+    """
+    if not tick or not key_fields:
+        return None
+
+    try:
+        return "|".join(str(tick[field]) for field in key_fields).encode("utf-8")
+    except KeyError:
+        return None
+
+
+class TopicRoute:
+    """
+    A single routing rule that maps the data provider, exchange and subscription
+    mode of a tick to a topic. The conditions that are not given are treated as
+    wildcards, so a route without any condition matches all the ticks.
+
+    Attributes
+    ----------
+    topic: ``str``
+        The topic to which the matching ticks should be sent
+    data_provider: ``DataProviderType | None``
+        The data provider of the ticks that should be sent to the topic
+    exchange: ``ExchangeType | None``
+        The exchange of the ticks that should be sent to the topic
+    subscription_mode: ``str | None``
+        The subscription mode of the ticks that should be sent to the topic.
+        Eg: "LTP", "QUOTE", "SNAP_QUOTE"
+    """
+
+    def __init__(
+        self,
+        topic: str,
+        data_provider: str | int | None = None,
+        exchange: str | int | None = None,
+        subscription_mode: str | None = None,
+    ):
+        self.topic = topic
+        self.data_provider = self._resolve(
+            DataProviderType.get_data_provider, data_provider, "data provider"
+        )
+        self.exchange = self._resolve(ExchangeType.get_exchange, exchange, "exchange")
+        self.subscription_mode = (
+            subscription_mode.upper() if subscription_mode else None
+        )
+
+    @staticmethod
+    def _resolve(getter, value, value_type):
+        """
+        Resolve the route condition to the enum member using the given getter.
+        """
+        if value is None:
+            return None
+
+        resolved = getter(value)
+        if resolved is None:
+            raise ValueError(f"Invalid {value_type} in the route: {value}")
+
+        return resolved
+
+    def matches(self, tick: Mapping[str, Any]) -> bool:
+        """
+        Check whether the tick satisfies all the conditions of the route.
+
+        Parameters
+        ----------
+        tick: ``Mapping[str, Any]``
+            The parsed tick data
+
+        Returns
+        -------
+        ``bool``
+            True if the tick matches the route, otherwise False
+        """
+        if (
+            self.data_provider
+            and tick.get("data_provider_id") != self.data_provider.value
+        ):
+            return False
+
+        if self.exchange and tick.get("exchange_id") != self.exchange.value:
+            return False
+
+        if self.subscription_mode and (
+            str(tick.get("subscription_mode_val", "")).upper() != self.subscription_mode
+        ):
+            return False
+
+        return True
+
+
+class TopicRouter:
+    """
+    TopicRouter selects the topic of a tick using the first matching route. If
+    none of the routes match the tick, the tick is sent to the default topic.
+
+    Attributes
+    ----------
+    default_topic: ``str``
+        The topic used when none of the routes match the tick
+    routes: ``list[TopicRoute]``
+        The routing rules, evaluated in the given order
+    """
+
+    def __init__(
+        self,
+        default_topic: str,
+        routes: Sequence[Mapping[str, Any]] | None = None,
+    ):
+        self.default_topic = default_topic
+        self.routes = [
+            TopicRoute(
+                route["topic"],
+                data_provider=route.get("data_provider"),
+                exchange=route.get("exchange"),
+                subscription_mode=route.get("subscription_mode"),
+            )
+            for route in routes or []
+        ]
+
+    @property
+    def topics(self) -> set[str]:
+        """
+        All the topics to which the router can send the ticks.
+        """
+        return {self.default_topic, *(route.topic for route in self.routes)}
+
+    def get_topic(self, tick: Mapping[str, Any] | None) -> str:
+        """
+        Get the topic to which the tick should be sent.
+
+        Parameters
+        ----------
+        tick: ``Mapping[str, Any] | None``
+            The parsed tick data
+
+        Returns
+        -------
+        ``str``
+            The topic of the first matching route or the default topic
+        """
+        if tick:
+            for route in self.routes:
+                if route.matches(tick):
+                    return route.topic
+
+        return self.default_topic
@@ -0,0 +1,425 @@
+"""
+This module contains a minimal file backed log, used to buffer the ticks on the local
+disk without a streaming server. The log of a topic is a directory of segment files,
+a new segment is started once the active one reaches the segment size. The segment
+files are named after the offset of their first record.
+
+Layout of the files:
+    <base_offset>.log:   length (uint32) | offset (uint64) | payload, for each record
+    <base_offset>.index: offset (uint64) | position (uint64), every `index_interval_bytes`
+    consumers/<group_name>.offset: the next offset to be read by the consumer group
+
+The index is sparse, a record is found by looking up the closest indexed record before
+it and scanning the segment from there.
+"""
+
+import mmap
+import os
+import struct
+from bisect import bisect_right
+from pathlib import Path
+
+from app.utils.common.logger import get_logger
+
+logger = get_logger(Path(__file__).name)
+
+RECORD_HEADER = struct.Struct("<IQ")
+INDEX_ENTRY = struct.Struct("<QQ")
+SEGMENT_SUFFIX = ".log"
+INDEX_SUFFIX = ".index"
+
+
+def segment_name(base_offset: int) -> str:
+    """
+    Get the name of the segment starting at the given offset, without the suffix.
+    """
+    return f"{base_offset:020d}"
+
+
+def list_segments(topic_dir: Path) -> list[int]:
+    """
+    Get the base offsets of the segments of the topic in ascending order.
+    """
+    return sorted(int(path.stem) for path in topic_dir.glob(f"*{SEGMENT_SUFFIX}"))
+
+
+def read_index(index_path: Path) -> list[tuple[int, int]]:
+    """
+    Read the (offset, position) entries of the index file, ignoring a partially
+    written last entry.
+    """
+    if not index_path.exists():
+        return []
+
+    data = index_path.read_bytes()
+    size = len(data) - len(data) % INDEX_ENTRY.size
+
+    return list(INDEX_ENTRY.iter_unpack(data[:size]))
+
+
+class SegmentLogWriter:
+    """
+    SegmentLogWriter appends the records to the active segment of the topic and starts a
+    new segment once the active one is larger than `segment_bytes`. On start, the torn
+    record left at the end of the last segment by a crash is truncated and the writer
+    continues from the next offset. When a new segment is started, the oldest segments
+    are deleted while the segments of the topic are larger than `retention_bytes`, the
+    readers behind them continue from the first remaining record.
+
+    Attributes
+    ----------
+    topic_dir: ``Path``
+        The directory of the topic
+    segment_bytes: ``int``, ( default = 67108864 )
+        The size in bytes after which a new segment is started
+    index_interval_bytes: ``int``, ( default = 4096 )
+        The number of bytes written between two index entries
+    retention_bytes: ``int | None``, ( default = None )
+        The size in bytes of the segments kept for the topic, None keeps all of them
+    """
+
+    def __init__(
+        self,
+        topic_dir: Path,
+        segment_bytes: int = 64 * 1024 * 1024,
+        index_interval_bytes: int = 4096,
+        retention_bytes: int | None = None,
+    ):
+        self.topic_dir = Path(topic_dir)
+        self.topic_dir.mkdir(parents=True, exist_ok=True)
+        self.segment_bytes = segment_bytes
+        self.index_interval_bytes = index_interval_bytes
+        self.retention_bytes = retention_bytes
+
+        segments = list_segments(self.topic_dir)
+        base_offset = segments[-1] if segments else 0
+        self.next_offset, position = self._recover(base_offset)
+        self._open_segment(base_offset, position)
+
+    def _recover(self, base_offset: int) -> tuple[int, int]:
+        """
+        Find the next offset and the end position of the last complete record of the
+        segment, starting the scan from the last index entry.
+        """
+        segment_path = self.topic_dir / f"{segment_name(base_offset)}{SEGMENT_SUFFIX}"
+        if not segment_path.exists():
+            return base_offset, 0
+
+        index = read_index(
+            self.topic_dir / f"{segment_name(base_offset)}{INDEX_SUFFIX}"
+        )
+        next_offset, position = index[-1] if index else (base_offset, 0)
+
+        with open(segment_path, "r+b") as segment:
+            data = segment.read()
+            while position + RECORD_HEADER.size <= len(data):
+                length, offset = RECORD_HEADER.unpack_from(data, position)
+                end = position + RECORD_HEADER.size + length
+                if end > len(data):
+                    break
+                next_offset, position = offset + 1, end
+
+            if position < len(data):
+                logger.warning(
+                    "Truncating %d bytes of torn record from %s",
+                    len(data) - position,
+                    segment_path,
+                )
+                segment.truncate(position)
+
+        return next_offset, position
+
+    def _open_segment(self, base_offset: int, position: int = 0):
+        name = segment_name(base_offset)
+        self._segment = open(self.topic_dir / f"{name}{SEGMENT_SUFFIX}", "ab")
+        self._index = open(self.topic_dir / f"{name}{INDEX_SUFFIX}", "ab")
+        self._position = position
+        self._last_indexed_position = position
+
+    def append(self, payload: bytes) -> int:
+        """
+        Append the record to the active segment. The record is buffered until `flush`
+        is called.
+
+        Parameters
+        ----------
+        payload: ``bytes``
+            The record to be written
+
+        Returns
+        -------
+        ``int``
+            The offset of the record
+        """
+        if self._position >= self.segment_bytes:
+            self.roll()
+
+        offset = self.next_offset
+
+        if self._position - self._last_indexed_position >= self.index_interval_bytes:
+            self._index.write(INDEX_ENTRY.pack(offset, self._position))
+            self._last_indexed_position = self._position
+
+        self._segment.write(RECORD_HEADER.pack(len(payload), offset))
+        self._segment.write(payload)
+        self._position += RECORD_HEADER.size + len(payload)
+        self.next_offset += 1
+
+        return offset
+
+    def roll(self):
+        """
+        Close the active segment and start a new one at the next offset.
+        """
+        self.close()
+        self._open_segment(self.next_offset)
+        self.delete_old_segments()
+
+    def delete_old_segments(self) -> list[int]:
+        """
+        Delete the oldest segments while the segments of the topic are larger than
+        `retention_bytes`. The active segment is never deleted.
+
+        Returns
+        -------
+        ``list[int]``
+            The base offsets of the deleted segments
+        """
+        if self.retention_bytes is None:
+            return []
+
+        segments = list_segments(self.topic_dir)
+        sizes = [
+            (self.topic_dir / f"{segment_name(base)}{SEGMENT_SUFFIX}").stat().st_size
+            for base in segments
+        ]
+        total_size = sum(sizes)
+
+        deleted = []
+        for base_offset, size in zip(segments[:-1], sizes):
+            if total_size <= self.retention_bytes:
+                break
+
+            name = segment_name(base_offset)
+            (self.topic_dir / f"{name}{SEGMENT_SUFFIX}").unlink(missing_ok=True)
+            (self.topic_dir / f"{name}{INDEX_SUFFIX}").unlink(missing_ok=True)
+            total_size -= size
+            deleted.append(base_offset)
+
+        if deleted:
+            logger.info(
+                "Deleted %d segments of %s past the retention",
+                len(deleted),
+                self.topic_dir,
+            )
+
+        return deleted
+
+    def flush(self, fsync: bool = False):
+        """
+        Write the buffered records to the segment file, so the readers can see them.
+
+        Parameters
+        ----------
+        fsync: ``bool``, ( default = False )
+            If True, the records are also written to the disk
+        """
+        self._segment.flush()
+        self._index.flush()
+
+        if fsync:
+            os.fsync(self._segment.fileno())
+
+    def close(self):
+        """
+        Flush and close the active segment.
+        """
+        self.flush()
+        self._segment.close()
+        self._index.close()
+
+
+class SegmentLogReader:
+    """
+    SegmentLogReader reads the records of the topic in order, starting from the given
+    offset. The segments are memory mapped and mapped again as the writer appends to
+    them.
+
+    Attributes
+    ----------
+    topic_dir: ``Path``
+        The directory of the topic
+    offset: ``int``, ( default = 0 )
+        The offset of the first record to read. If the record was removed, the reader
+        starts from the first available record
+    """
+
+    def __init__(self, topic_dir: Path, offset: int = 0):
+        self.topic_dir = Path(topic_dir)
+        self.next_offset = offset
+
+        self._base_offset: int | None = None
+        self._map: mmap.mmap | None = None
+        self._position = 0
+
+    def _open_segment(self, base_offset: int, offset: int):
+        """
+        Open the segment and move to the record with the given offset using the index.
+        """
+        self._close_map()
+        self._base_offset = base_offset
+        self._position = 0
+
+        index = read_index(
+            self.topic_dir / f"{segment_name(base_offset)}{INDEX_SUFFIX}"
+        )
+        entry = bisect_right(index, (offset, float("inf"))) - 1
+        if entry >= 0:
+            self._position = index[entry][1]
+
+        self.next_offset = max(offset, base_offset)
+
+        # Skip the records between the indexed record and the offset
+        if self._remap():
+            position = self._position
+            while (record := self._read_record()) is not None and record[0] < offset:
+                position = self._position
+            self._position = position
+
+    def _segment_path(self) -> Path:
+        name = segment_name(self._base_offset)  # type: ignore
+        return self.topic_dir / f"{name}{SEGMENT_SUFFIX}"
+
+    def _remap(self) -> bool:
+        """
+        Map the segment again if the writer has appended to it.
+        """
+        try:
+            size = self._segment_path().stat().st_size
+        except FileNotFoundError:
+            return False
+
+        if self._map is not None and len(self._map) == size:
+            return True
+        if size == 0:
+            return False
+
+        self._close_map()
+        with open(self._segment_path(), "rb") as segment:
+            self._map = mmap.mmap(segment.fileno(), size, access=mmap.ACCESS_READ)
+
+        return True
+
+    def _read_record(self) -> tuple[int, bytes] | None:
+        """
+        Read the record at the current position of the mapped segment.
+        """
+        if self._map is None or self._position + RECORD_HEADER.size > len(self._map):
+            return None
+
+        length, offset = RECORD_HEADER.unpack_from(self._map, self._position)
+        start = self._position + RECORD_HEADER.size
+        if start + length > len(self._map):
+            return None
+
+        self._position = start + length
+        return offset, self._map[start : start + length]
+
+    def _find_next_segment(self) -> int | None:
+        """
+        Get the base offset of the segment after the current one, if the writer has
+        started it.
+        """
+        segments = list_segments(self.topic_dir)
+        index = bisect_right(segments, self._base_offset)  # type: ignore
+
+        return segments[index] if index < len(segments) else None
+
+    def read(self, max_records: int) -> list[tuple[int, bytes]]:
+        """
+        Read the next records of the topic.
+
+        Parameters
+        ----------
+        max_records: ``int``
+            The maximum number of records to return
+
+        Returns
+        -------
+        ``list[tuple[int, bytes]]``
+            The (offset, record) pairs of the records
+        """
+        if self._base_offset is None:
+            segments = list_segments(self.topic_dir)
+            if not segments:
+                return []
+
+            index = max(bisect_right(segments, self.next_offset) - 1, 0)
+            self._open_segment(segments[index], self.next_offset)
+
+        records: list[tuple[int, bytes]] = []
+        while len(records) < max_records:
+            record = self._read_record()
+
+            if record is None and self._remap():
+                record = self._read_record()
+
+            if record is None:
+                next_base_offset = self._find_next_segment()
+                if next_base_offset is None:
+                    break
+
+                # The segment is complete once the next one is started, read the
+                # records appended after it was mapped before moving on
+                if not self._remap() or (record := self._read_record()) is None:
+                    self._open_segment(next_base_offset, self.next_offset)
+                    continue
+
+            records.append(record)
+            self.next_offset = record[0] + 1
+
+        return records
+
+    def _close_map(self):
+        if self._map is not None:
+            self._map.close()
+            self._map = None
+
+    def close(self):
+        """
+        Unmap the current segment.
+        """
+        self._close_map()
+
+
+class OffsetStore:
+    """
+    OffsetStore persists the next offset to be read by each consumer group of a topic.
+    The offsets are written to a temporary file and moved in place, so a crash never
+    leaves a partially written offset.
+
+    Attributes
+    ----------
+    topic_dir: ``Path``
+        The directory of the topic
+    """
+
+    def __init__(self, topic_dir: Path):
+        self.offsets_dir = Path(topic_dir) / "consumers"
+        self.offsets_dir.mkdir(parents=True, exist_ok=True)
+
+    def load(self, group_name: str) -> int:
+        """
+        Get the next offset of the consumer group, 0 if it has not committed yet.
+        """
+        path = self.offsets_dir / f"{group_name}.offset"
+        return int(path.read_text(encoding="utf-8")) if path.exists() else 0
+
+    def save(self, group_name: str, offset: int):
+        """
+        Persist the next offset of the consumer group.
+        """
+        path = self.offsets_dir / f"{group_name}.offset"
+        temp_path = path.with_suffix(".tmp")
+        temp_path.write_text(str(offset), encoding="utf-8")
+        os.replace(temp_path, path)
@@ -1 +1,6 @@
+from .conflation_streamer import ConflationStreamer
+from .fan_out_streamer import FanOutStreamer
 from .kafka_streamer import KafkaStreamer
+from .redis_streamer import RedisStreamer
+from .segment_log_streamer import SegmentLogStreamer
+from .shared_memory_streamer import SharedMemoryStreamer
@@ -0,0 +1,260 @@
+import operator
+from pathlib import Path
+from threading import Event, Lock, Thread
+from typing import Any, Callable, Mapping, Optional, Sequence, cast
+
+from omegaconf import DictConfig, OmegaConf
+
+from app.data_layer.streaming.routing import (
+    DEFAULT_KEY_FIELDS,
+    get_message_key,
+    parse_tick,
+)
+from app.data_layer.streaming.streamer import Streamer
+from app.utils.common import init_from_cfg
+from app.utils.common.logger import get_logger
+
+logger = get_logger(Path(__file__).name)
+
+OPERATORS: dict[str, Callable[[Any, Any], bool]] = {
+    "eq": operator.eq,
+    "ne": operator.ne,
+    "gt": operator.gt,
+    "ge": operator.ge,
+    "lt": operator.lt,
+    "le": operator.le,
+    "in": lambda value, values: value in values,
+}
+
+
+class ExemptionRule:
+    """
+    A rule to send the matching ticks without conflation. The rule compares a field of
+    the tick with the given value, the ticks without the field don't match the rule.
+    For example, `ExemptionRule("last_traded_quantity", "gt", 0)` matches the trades.
+
+    Attributes
+    ----------
+    field: ``str``
+        The field of the tick to compare
+    op: ``str``
+        The comparison operator, one of `eq`, `ne`, `gt`, `ge`, `lt`, `le` and `in`
+    value: ``Any``
+        The value to compare the field with, a list of values for `in`
+    """
+
+    def __init__(self, field: str, op: str, value: Any):
+        if op not in OPERATORS:
+            raise ValueError(
+                f"Invalid operator `{op}`, supported operators are {list(OPERATORS)}"
+            )
+
+        self.field = field
+        self.op = op
+        self.value = value
+        self._compare = OPERATORS[op]
+
+    def matches(self, tick: Mapping[str, Any]) -> bool:
+        """
+        Check whether the tick matches the rule.
+        """
+        if self.field not in tick:
+            return False
+
+        try:
+            return bool(self._compare(tick[self.field], self.value))
+        except TypeError:
+            return False
+
+
+@Streamer.register("conflation")
+class ConflationStreamer(Streamer):
+    """
+    Conflation stage that keeps only the latest tick of each instrument and sends the
+    snapshot of the updated instruments to the downstream streamer every
+    `interval_ms` milliseconds, or as soon as `max_pending` instruments are updated.
+    This caps the tick rate of the downstream streamer to one tick per instrument per
+    interval for the consumers that only need the latest state of the instruments.
+
+    The latest ticks are kept in a slot array indexed by the instrument key, so the
+    memory is bounded by the number of instruments. The ticks matching any of the
+    exemption rules and the ticks without the key fields are sent immediately. The
+    snapshots and the exempted ticks are sent under the same lock, so an older tick
+    of an instrument is never sent after its exempted tick.
+
+    Attributes:
+    -----------
+    streamer: ``Streamer``
+        The downstream streamer to which the conflated ticks are sent
+    interval_ms: ``int``, ( default = 100 )
+        The interval in milliseconds at which the snapshot is sent
+    max_pending: ``int``, ( default = 5000 )
+        The number of updated instruments after which the snapshot is sent before
+        the interval has elapsed
+    key_fields: ``Sequence[str]``, ( default = ("symbol", "exchange_id") )
+        The fields of the tick that identify the instrument. Eg: [token]
+    exemptions: ``Sequence[Mapping[str, Any]] | None``, ( default = None )
+        The exemption rules as `field`, `op` and `value` mappings
+    """
+
+    def __init__(
+        self,
+        streamer: Streamer,
+        interval_ms: int = 100,
+        max_pending: int = 5000,
+        key_fields: Sequence[str] = DEFAULT_KEY_FIELDS,
+        exemptions: Sequence[Mapping[str, Any]] | None = None,
+    ):
+        self.streamer = streamer
+        self.interval_ms = interval_ms
+        self.max_pending = max_pending
+        self.key_fields = tuple(key_fields)
+        self.exemptions = [
+            ExemptionRule(rule["field"], rule["op"], rule["value"])
+            for rule in exemptions or []
+        ]
+
+        self._slot_index: dict[bytes, int] = {}
+        self._slots: list[str] = []
+        self._dirty = bytearray()
+        self._pending: list[int] = []
+
+        self.received = 0
+        self.sent = 0
+
+        self._lock = Lock()
+        self._send_lock = Lock()
+        self._stop_event = Event()
+        self._flush_thread = Thread(target=self._flush_periodically, daemon=True)
+        self._flush_thread.start()
+
+    def _send(self, data: str):
+        try:
+            self.streamer(data)
+            with self._lock:
+                self.sent += 1
+        except Exception as e:
+            logger.error("Error sending conflated tick: %s", e)
+
+    def __call__(self, data: str):
+        """
+        Store the received data as the latest tick of its instrument. The exempted
+        ticks are sent immediately.
+
+        Parameters:
+        -----------
+        data: ``str``
+            The tick data as a json string
+        """
+        tick = parse_tick(data)
+        key = get_message_key(tick, self.key_fields)
+
+        if key is None:
+            with self._lock:
+                self.received += 1
+            self._send(data)
+            return
+
+        is_exempted = any(rule.matches(tick) for rule in self.exemptions)  # type: ignore
+
+        if is_exempted:
+            # Wait for the snapshot being sent, it may hold an older tick of the slot
+            with self._send_lock:
+                self._store(key, data, is_exempted)
+                self._send(data)
+        elif self._store(key, data, is_exempted):
+            self.flush()
+
+    def _store(self, key: bytes, data: str, is_exempted: bool) -> bool:
+        """
+        Store the tick in the slot of its instrument and return whether the number
+        of updated instruments reached `max_pending`.
+        """
+        with self._lock:
+            self.received += 1
+            slot = self._slot_index.get(key)
+            if slot is None:
+                slot = len(self._slots)
+                self._slot_index[key] = slot
+                self._slots.append(data)
+                self._dirty.append(0)
+            else:
+                self._slots[slot] = data
+
+            if is_exempted:
+                # The exempted tick is the latest state, don't send the older one
+                self._dirty[slot] = 0
+            elif not self._dirty[slot]:
+                self._dirty[slot] = 1
+                self._pending.append(slot)
+
+            return len(self._pending) >= self.max_pending
+
+    def flush(self):
+        """
+        Send the latest tick of all the instruments updated since the last flush.
+        """
+        with self._send_lock:
+            with self._lock:
+                pending, self._pending = self._pending, []
+                ticks = []
+                for slot in pending:
+                    if self._dirty[slot]:
+                        self._dirty[slot] = 0
+                        ticks.append(self._slots[slot])
+
+            for data in ticks:
+                self._send(data)
+
+    def _flush_periodically(self):
+        """
+        Send the snapshot every `interval_ms` milliseconds.
+        """
+        while not self._stop_event.wait(self.interval_ms / 1000):
+            self.flush()
+
+    def stats(self) -> dict[str, int]:
+        """
+        The number of instruments, the ticks received and the ticks sent downstream.
+        """
+        with self._lock:
+            return {
+                "instruments": len(self._slots),
+                "received": self.received,
+                "sent": self.sent,
+            }
+
+    def close(self):
+        """
+        Send the pending ticks and close the downstream streamer.
+        """
+        self._stop_event.set()
+        self._flush_thread.join()
+        self.flush()
+
+        if hasattr(self.streamer, "close"):
+            self.streamer.close()
+
+    @classmethod
+    def from_cfg(cls, cfg: DictConfig) -> Optional["ConflationStreamer"]:
+        streamer = cast(Streamer | None, init_from_cfg(cfg.streamer, Streamer))
+        if streamer is None:
+            logger.error("Failed to create the downstream streamer of the conflation")
+            return None
+
+        exemptions = (
+            cast(list[dict[str, Any]], OmegaConf.to_container(cfg.exemptions))
+            if cfg.get("exemptions")
+            else None
+        )
+        try:
+            return cls(
+                streamer,
+                interval_ms=cfg.get("interval_ms", 100),
+                max_pending=cfg.get("max_pending", 5000),
+                key_fields=cfg.get("key_fields") or DEFAULT_KEY_FIELDS,
+                exemptions=exemptions,
+            )
+        except (KeyError, ValueError) as e:
+            logger.error("Error creating ConflationStreamer object: %s", e)
+            return None
@@ -0,0 +1,210 @@
+from pathlib import Path
+from queue import Empty, Full, Queue
+from threading import Lock, Thread
+from typing import Mapping, Optional, cast
+
+from omegaconf import DictConfig
+
+from app.data_layer.streaming.streamer import Streamer
+from app.utils.common import init_from_cfg
+from app.utils.common.logger import get_logger
+
+logger = get_logger(Path(__file__).name)
+
+# Log the dropped ticks of a sink once every `DROP_LOG_INTERVAL` drops
+DROP_LOG_INTERVAL = 10000
+
+
+class FanOutSink:
+    """
+    A streamer of the `FanOutStreamer` with its own queue and worker thread. The ticks
+    are dropped when the queue is full, so a slow streamer doesn't block the others.
+
+    Attributes
+    ----------
+    name: ``str``
+        The name of the sink used in the logs and the stats
+    streamer: ``Streamer``
+        The streamer to which the ticks are sent
+    queue_size: ``int``
+        The maximum number of ticks waiting to be sent
+    """
+
+    def __init__(self, name: str, streamer: Streamer, queue_size: int):
+        self.name = name
+        self.streamer = streamer
+        self.queue: Queue[str | None] = Queue(maxsize=queue_size)
+
+        self.sent = 0
+        self.dropped = 0
+        self.errors = 0
+        self._drop_lock = Lock()
+
+        self._worker = Thread(target=self._send, name=f"fan-out-{name}", daemon=True)
+        self._worker.start()
+
+    def put(self, data: str):
+        """
+        Add the tick to the queue of the sink without waiting.
+        """
+        try:
+            self.queue.put_nowait(data)
+        except Full:
+            with self._drop_lock:
+                self.dropped += 1
+                dropped = self.dropped
+
+            if dropped % DROP_LOG_INTERVAL == 1:
+                logger.warning(
+                    "Queue of sink %s is full, %d ticks dropped so far",
+                    self.name,
+                    dropped,
+                )
+
+    def _send(self):
+        """
+        Send the queued ticks to the streamer until the sink is closed.
+        """
+        while (data := self.queue.get()) is not None:
+            try:
+                self.streamer(data)
+                self.sent += 1
+            except Exception as e:
+                self.errors += 1
+                logger.error("Error sending tick to sink %s: %s", self.name, e)
+
+    def close(self, timeout: float | None = None):
+        """
+        Send the queued ticks, stop the worker and close the streamer.
+
+        Parameters
+        ----------
+        timeout: ``float | None``, ( default = None )
+            The maximum time in seconds to wait for the queued ticks to be sent
+        """
+        try:
+            self.queue.put(None, timeout=timeout)
+        except Full:
+            # Discard the ticks of a stuck sink to stop its worker
+            while True:
+                try:
+                    self.queue.get_nowait()
+                except Empty:
+                    break
+            self.queue.put_nowait(None)
+
+        self._worker.join(timeout)
+
+        if hasattr(self.streamer, "close"):
+            self.streamer.close()
+
+    def stats(self) -> dict[str, int]:
+        """
+        The number of ticks waiting in the queue, sent, dropped and failed.
+        """
+        return {
+            "lag": self.queue.qsize(),
+            "sent": self.sent,
+            "dropped": self.dropped,
+            "errors": self.errors,
+        }
+
+
+@Streamer.register("fan_out")
+class FanOutStreamer(Streamer):
+    """
+    Composite streaming class to send each tick to several streamers, eg: Kafka and
+    Redis. Each streamer is a sink with its own bounded queue and worker thread, so the
+    socket only adds the tick to the queues and a slow or failing sink never blocks the
+    socket or the other sinks. The ticks are dropped when the queue of a sink is full.
+
+    Attributes:
+    -----------
+    streamers: ``Mapping[str, Streamer]``
+        The streamers to which the ticks are sent, by the name of the sink
+    queue_size: ``int``, ( default = 100000 )
+        The maximum number of ticks waiting in the queue of each sink
+    queue_sizes: ``Mapping[str, int] | None``, ( default = None )
+        The queue size of the sinks that don't use `queue_size`
+    """
+
+    def __init__(
+        self,
+        streamers: Mapping[str, Streamer],
+        queue_size: int = 100000,
+        queue_sizes: Mapping[str, int] | None = None,
+    ):
+        queue_sizes = queue_sizes or {}
+        self.sinks = [
+            FanOutSink(name, streamer, queue_sizes.get(name, queue_size))
+            for name, streamer in streamers.items()
+        ]
+
+    def __call__(self, data: str):
+        """
+        Add the received data to the queue of each sink.
+
+        Parameters:
+        -----------
+        data: ``str``
+            The data to be sent to the sinks as a string
+        """
+        for sink in self.sinks:
+            sink.put(data)
+
+    def stats(self) -> dict[str, dict[str, int]]:
+        """
+        Get the counters of each sink. The `lag` is the number of ticks waiting in the
+        queue of the sink and `dropped` is the number of ticks dropped because the queue
+        was full.
+
+        Returns:
+        --------
+        ``dict[str, dict[str, int]]``
+            The counters by the name of the sink
+        """
+        return {sink.name: sink.stats() for sink in self.sinks}
+
+    def close(self, timeout: float | None = 10):
+        """
+        Send the queued ticks and close all the sinks.
+
+        Parameters:
+        -----------
+        timeout: ``float | None``, ( default = 10 )
+            The maximum time in seconds to wait for the queued ticks of each sink
+        """
+        for sink in self.sinks:
+            try:
+                sink.close(timeout)
+            except Exception as e:
+                logger.error("Error closing sink %s: %s", sink.name, e)
+
+    @classmethod
+    def from_cfg(cls, cfg: DictConfig) -> Optional["FanOutStreamer"]:
+        streamers: dict[str, Streamer] = {}
+        queue_sizes: dict[str, int] = {}
+
+        for index, sink_cfg in enumerate(cfg.get("sinks") or []):
+            name = sink_cfg.get("sink_name") or sink_cfg.get("name", str(index))
+            if name in streamers:
+                name = f"{name}_{index}"
+
+            streamer = cast(Streamer | None, init_from_cfg(sink_cfg, Streamer))
+            if streamer is None:
+                logger.error("Failed to create the streamer of sink %s", name)
+                continue
+
+            streamers[name] = streamer
+            if sink_cfg.get("queue_size"):
+                queue_sizes[name] = sink_cfg.queue_size
+
+        if not streamers:
+            logger.error("No sink of the FanOutStreamer could be created")
+            return None
+
+        return cls(
+            streamers,
+            queue_size=cfg.get("queue_size", 100000),
+            queue_sizes=queue_sizes,
+        )
@@ -1,9 +1,16 @@
 from pathlib import Path
-from typing import Optional
+from typing import Any, Mapping, Optional, Sequence
 
 from kafka import KafkaProducer
 from omegaconf import DictConfig
 
+from app.data_layer.streaming.compression import validate_compression_type
+from app.data_layer.streaming.routing import (
+    DEFAULT_KEY_FIELDS,
+    TopicRouter,
+    get_message_key,
+    parse_tick,
+)
 from app.data_layer.streaming.streamer import Streamer
 from app.utils.common.logger import get_logger
 
@@ -14,24 +21,62 @@ logger = get_logger(Path(__file__).name)
 class KafkaStreamer(Streamer):
     """
     Kafka streaming class to send data to Kafka server. This can be used as a callback
-    function to send data to Kafka.
+    function to send data to Kafka. The messages are keyed by the instrument, so all the
+    ticks of an instrument go to the same partition and their order is preserved. The
+    ticks can also be routed to different topics based on the data provider, exchange
+    and subscription mode of the tick.
 
     Attributes:
     -----------
     kafka_server: ``str``
         The ip address and port of the Kafka server in the format "ip_address:port"
     kafka_topic: ``str``
-        The topic to which the data should be sent to in Kafka
+        The default topic to which the data should be sent to in Kafka
+    key_fields: ``Sequence[str] | None``, ( default = ("symbol", "exchange_id") )
+        The fields of the tick used to build the message key. Eg: ["token"] or
+        ["symbol", "exchange_id"]. If empty, the messages are sent without a key
+    routes: ``Sequence[Mapping[str, Any]] | None``, ( default = None )
+        The routing rules to send the ticks to different topics. Each rule should
+        have a `topic` and optionally `data_provider`, `exchange` and `subscription_mode`.
+        Eg: [{"topic": "nse_ltp", "exchange": "NSE", "subscription_mode": "LTP"}]
+    compression_type: ``str | None``, ( default = None )
+        The codec used to compress the message batches. Eg: "lz4", "zstd", "gzip",
+        "snappy". If None, the messages are not compressed
+    linger_ms: ``int``, ( default = 5 )
+        The time in milliseconds the producer waits to fill a batch before sending it.
+        The messages are compressed per batch, so larger batches compress better
+    batch_size: ``int``, ( default = 65536 )
+        The maximum size of a batch in bytes per partition
     """
 
-    def __init__(self, kafka_server: str, kafka_topic: str):
+    def __init__(
+        self,
+        kafka_server: str,
+        kafka_topic: str,
+        key_fields: Sequence[str] | None = DEFAULT_KEY_FIELDS,
+        routes: Sequence[Mapping[str, Any]] | None = None,
+        compression_type: str | None = None,
+        linger_ms: int = 5,
+        batch_size: int = 65536,
+    ):
         self.kafka_topic = kafka_topic
-        self.kafka_producer = KafkaProducer(bootstrap_servers=kafka_server)
+        self.key_fields = list(key_fields or [])
+        self.router = TopicRouter(kafka_topic, routes)
+        self.kafka_producer = KafkaProducer(
+            bootstrap_servers=kafka_server,
+            compression_type=validate_compression_type(compression_type),
+            linger_ms=linger_ms,
+            batch_size=batch_size,
+        )
 
     def __call__(self, data: str):
         """
         This function sends the received data to the Kafka server. It receives the data
-        as a string and encodes it to utf-8 before sending it to the Kafka server.
+        as a string and encodes it to utf-8 before sending it to the Kafka server. The
+        topic and the key of the message are derived from the tick data. If the data is
+        not a json object, it is sent to the default topic without a key. The message
+        is only added to the batch of the producer, the batch is sent once it is full
+        or `linger_ms` has elapsed.
 
         Parameters:
         -----------
@@ -40,17 +85,23 @@ class KafkaStreamer(Streamer):
         """
         try:
             bytes_data = data.encode("utf-8")
-            self.kafka_producer.send(self.kafka_topic, bytes_data)
-            self.kafka_producer.flush()
+
+            tick = parse_tick(data) if self.key_fields or self.router.routes else None
+            self.kafka_producer.send(
+                self.router.get_topic(tick),
+                bytes_data,
+                key=get_message_key(tick, self.key_fields),
+            )
         except Exception as e:
             logger.error("Error sending data to Kafka: %s", e)
 
     def close(self):
         """
-        Close the Kafka producer connection.
+        Flush the pending batches and close the Kafka producer connection.
         """
         if self.kafka_producer:
             try:
+                self.kafka_producer.flush()
                 self.kafka_producer.close()
             except Exception as e:
                 logger.error("Error closing Kafka producer: %s", e)
@@ -58,7 +109,15 @@ class KafkaStreamer(Streamer):
     @classmethod
     def from_cfg(cls, cfg: DictConfig) -> Optional["KafkaStreamer"]:
         try:
-            return cls(cfg["kafka_server"], cfg["kafka_topic"])
+            return cls(
+                cfg["kafka_server"],
+                cfg["kafka_topic"],
+                key_fields=cfg.get("key_fields", DEFAULT_KEY_FIELDS),
+                routes=cfg.get("routes"),
+                compression_type=cfg.get("compression_type"),
+                linger_ms=cfg.get("linger_ms", 5),
+                batch_size=cfg.get("batch_size", 65536),
+            )
         except Exception as e:
             logger.error("Error creating KafkaStreaming object: %s", e)
             return None
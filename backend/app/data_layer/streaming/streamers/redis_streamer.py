@@ -0,0 +1,141 @@
+from pathlib import Path
+from threading import Event, Lock, Thread
+from typing import Any, Mapping, Optional, Sequence
+
+import redis
+from omegaconf import DictConfig
+
+from app.data_layer.streaming.routing import TopicRouter, parse_tick
+from app.data_layer.streaming.streamer import Streamer
+from app.utils.common.logger import get_logger
+from app.utils.redis_utils import init_redis_client
+
+logger = get_logger(Path(__file__).name)
+
+
+@Streamer.register("redis_stream")
+class RedisStreamer(Streamer):
+    """
+    Redis streaming class to send data to a Redis stream. This can be used as a callback
+    function to send data to Redis when running the whole pipeline on a single node
+    without a Kafka cluster. The ticks are buffered and sent with XADD in pipelined
+    batches, the batch is sent once it is full or `flush_interval` has elapsed. The
+    streams are trimmed to approximately `max_len` entries.
+
+    Attributes:
+    -----------
+    redis_client: ``redis.Redis``
+        The synchronous Redis client
+    stream_name: ``str``
+        The default stream to which the data should be sent to
+    max_len: ``int``, ( default = 1000000 )
+        The approximate maximum number of entries kept in the stream
+    batch_size: ``int``, ( default = 500 )
+        The maximum number of ticks sent in a single pipeline
+    flush_interval: ``float``, ( default = 0.01 )
+        The maximum time in seconds a tick waits in the buffer before it is sent
+    routes: ``Sequence[Mapping[str, Any]] | None``, ( default = None )
+        The routing rules to send the ticks to different streams. The `topic` of the
+        rule is the name of the stream. Refer `app.data_layer.streaming.routing`
+    """
+
+    def __init__(
+        self,
+        redis_client: redis.Redis,
+        stream_name: str,
+        max_len: int = 1000000,
+        batch_size: int = 500,
+        flush_interval: float = 0.01,
+        routes: Sequence[Mapping[str, Any]] | None = None,
+    ):
+        self.redis_client = redis_client
+        self.stream_name = stream_name
+        self.max_len = max_len
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.router = TopicRouter(stream_name, routes)
+
+        self._buffer: list[tuple[str, str]] = []
+        self._lock = Lock()
+        self._stop_event = Event()
+        self._flush_thread = Thread(target=self._flush_periodically, daemon=True)
+        self._flush_thread.start()
+
+    def __call__(self, data: str):
+        """
+        Add the received data to the buffer. The buffer is sent to the Redis server
+        once it has `batch_size` ticks.
+
+        Parameters:
+        -----------
+        data: ``str``
+            The data to be sent to the Redis stream as a string
+        """
+        stream_name = (
+            self.router.get_topic(parse_tick(data))
+            if self.router.routes
+            else self.stream_name
+        )
+
+        with self._lock:
+            self._buffer.append((stream_name, data))
+            is_full = len(self._buffer) >= self.batch_size
+
+        if is_full:
+            self.flush()
+
+    def flush(self):
+        """
+        Send all the buffered ticks to the Redis server in a single pipeline.
+        """
+        with self._lock:
+            buffer, self._buffer = self._buffer, []
+
+        if not buffer:
+            return
+
+        try:
+            pipeline = self.redis_client.pipeline(transaction=False)
+            for stream_name, data in buffer:
+                pipeline.xadd(
+                    stream_name, {"data": data}, maxlen=self.max_len, approximate=True
+                )
+            pipeline.execute()
+        except Exception as e:
+            logger.error("Error sending %d ticks to Redis: %s", len(buffer), e)
+
+    def _flush_periodically(self):
+        """
+        Send the buffered ticks every `flush_interval` seconds, so the ticks don't wait
+        in the buffer when the tick rate is low.
+        """
+        while not self._stop_event.wait(self.flush_interval):
+            self.flush()
+
+    def close(self):
+        """
+        Send the pending ticks and close the Redis connection.
+        """
+        self._stop_event.set()
+        self._flush_thread.join()
+        self.flush()
+
+        try:
+            self.redis_client.close()
+        except Exception as e:
+            logger.error("Error closing Redis connection: %s", e)
+
+    @classmethod
+    def from_cfg(cls, cfg: DictConfig) -> Optional["RedisStreamer"]:
+        try:
+            return cls(
+                init_redis_client(is_async=False),  # type: ignore
+                cfg["stream_name"],
+                max_len=cfg.get("max_len", 1000000),
+                batch_size=cfg.get("batch_size", 500),
+                flush_interval=cfg.get("flush_interval", 0.01),
+                routes=cfg.get("routes"),
+            )
+        except Exception as e:
+            logger.error("Error creating RedisStreamer object: %s", e)
+            return None
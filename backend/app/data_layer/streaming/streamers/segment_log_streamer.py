@@ -0,0 +1,149 @@
+from pathlib import Path
+from threading import Event, Lock, Thread
+from typing import Any, Mapping, Optional, Sequence
+
+from omegaconf import DictConfig
+
+from app.data_layer.streaming.routing import TopicRouter, parse_tick
+from app.data_layer.streaming.segment_log import SegmentLogWriter
+from app.data_layer.streaming.streamer import Streamer
+from app.utils.common.logger import get_logger
+
+logger = get_logger(Path(__file__).name)
+
+
+@Streamer.register("segment_log")
+class SegmentLogStreamer(Streamer):
+    """
+    File backed streaming class to append the ticks to a segmented log on the local
+    disk, like a minimal local Kafka. The log of each topic is a directory of size
+    rolled segment files under `log_dir`, read by the `SegmentLogConsumer`. This keeps
+    the ticks when there is no streaming server and gives a deterministic pipeline for
+    the tests and the benchmarks. The ticks are flushed to the files every
+    `flush_interval` seconds.
+
+    Attributes:
+    -----------
+    log_dir: ``str | Path``
+        The directory in which the logs of the topics are stored
+    topic: ``str``
+        The default topic to which the ticks are appended
+    segment_bytes: ``int``, ( default = 67108864 )
+        The size in bytes after which a new segment is started
+    index_interval_bytes: ``int``, ( default = 4096 )
+        The number of bytes written between two entries of the sparse index
+    retention_bytes: ``int | None``, ( default = None )
+        The size in bytes of the segments kept per topic, the oldest segments are
+        deleted when a new one is started. None keeps all the segments
+    flush_interval: ``float``, ( default = 0.1 )
+        The maximum time in seconds the ticks wait in the buffer before being written
+    fsync: ``bool``, ( default = False )
+        If True, the ticks are written to the disk on each flush, otherwise the
+        operating system decides when to write them
+    routes: ``Sequence[Mapping[str, Any]] | None``, ( default = None )
+        The routing rules to append the ticks to different topics.
+        Refer `app.data_layer.streaming.routing`
+    """
+
+    def __init__(
+        self,
+        log_dir: str | Path,
+        topic: str,
+        segment_bytes: int = 64 * 1024 * 1024,
+        index_interval_bytes: int = 4096,
+        retention_bytes: int | None = None,
+        flush_interval: float = 0.1,
+        fsync: bool = False,
+        routes: Sequence[Mapping[str, Any]] | None = None,
+    ):
+        self.log_dir = Path(log_dir)
+        self.segment_bytes = segment_bytes
+        self.index_interval_bytes = index_interval_bytes
+        self.retention_bytes = retention_bytes
+        self.flush_interval = flush_interval
+        self.fsync = fsync
+        self.router = TopicRouter(topic, routes)
+
+        self.writers: dict[str, SegmentLogWriter] = {}
+        for topic_name in self.router.topics:
+            self._get_writer(topic_name)
+
+        self._lock = Lock()
+        self._stop_event = Event()
+        self._flush_thread = Thread(target=self._flush_periodically, daemon=True)
+        self._flush_thread.start()
+
+    def _get_writer(self, topic: str) -> SegmentLogWriter:
+        if topic not in self.writers:
+            self.writers[topic] = SegmentLogWriter(
+                self.log_dir / topic,
+                self.segment_bytes,
+                self.index_interval_bytes,
+                self.retention_bytes,
+            )
+
+        return self.writers[topic]
+
+    def __call__(self, data: str):
+        """
+        Append the received data to the log of its topic.
+
+        Parameters:
+        -----------
+        data: ``str``
+            The data to be appended to the log as a string
+        """
+        topic = (
+            self.router.get_topic(parse_tick(data))
+            if self.router.routes
+            else self.router.default_topic
+        )
+
+        with self._lock:
+            self._get_writer(topic).append(data.encode("utf-8"))
+
+    def flush(self):
+        """
+        Write the buffered ticks of all the topics to the segment files.
+        """
+        with self._lock:
+            for topic, writer in self.writers.items():
+                try:
+                    writer.flush(self.fsync)
+                except OSError as e:
+                    logger.error("Error flushing the log of topic %s: %s", topic, e)
+
+    def _flush_periodically(self):
+        """
+        Flush the ticks every `flush_interval` seconds, so the consumers can read them.
+        """
+        while not self._stop_event.wait(self.flush_interval):
+            self.flush()
+
+    def close(self):
+        """
+        Flush the ticks and close the segment files.
+        """
+        self._stop_event.set()
+        self._flush_thread.join()
+
+        with self._lock:
+            for writer in self.writers.values():
+                writer.close()
+
+    @classmethod
+    def from_cfg(cls, cfg: DictConfig) -> Optional["SegmentLogStreamer"]:
+        try:
+            return cls(
+                cfg["log_dir"],
+                cfg["topic"],
+                segment_bytes=cfg.get("segment_bytes", 64 * 1024 * 1024),
+                index_interval_bytes=cfg.get("index_interval_bytes", 4096),
+                retention_bytes=cfg.get("retention_bytes"),
+                flush_interval=cfg.get("flush_interval", 0.1),
+                fsync=cfg.get("fsync", False),
+                routes=cfg.get("routes"),
+            )
+        except Exception as e:
+            logger.error("Error creating SegmentLogStreamer object: %s", e)
+            return None
@@ -0,0 +1,69 @@
+from pathlib import Path
+from typing import Optional
+
+from omegaconf import DictConfig
+
+from app.data_layer.streaming.ring_buffer import SharedMemoryRingBuffer
+from app.data_layer.streaming.streamer import Streamer
+from app.utils.common.logger import get_logger
+
+logger = get_logger(Path(__file__).name)
+
+
+@Streamer.register("shared_memory")
+class SharedMemoryStreamer(Streamer):
+    """
+    Shared memory streaming class to hand off the ticks to the consumers running on the
+    same machine. The ticks are written to a ring buffer in shared memory, so there is no
+    broker, socket or system call between the producer and the consumers. The buffer has
+    a fixed number of slots and the oldest ticks are overwritten when it is full, the
+    consumers that fall behind lose the overwritten ticks.
+
+    Attributes:
+    -----------
+    buffer_name: ``str``
+        The name of the shared memory block. Eg: "smartsocket_ticks"
+    capacity: ``int``, ( default = 65536 )
+        The number of ticks held by the buffer
+    slot_size: ``int``, ( default = 1024 )
+        The size of a slot in bytes, the ticks larger than the slot are dropped
+    """
+
+    def __init__(self, buffer_name: str, capacity: int = 65536, slot_size: int = 1024):
+        self.ring_buffer = SharedMemoryRingBuffer(buffer_name, capacity, slot_size)
+        self.dropped_ticks = 0
+
+    def __call__(self, data: str):
+        """
+        Write the received data to the next slot of the ring buffer.
+
+        Parameters:
+        -----------
+        data: ``str``
+            The data to be written to the ring buffer as a string
+        """
+        if not self.ring_buffer.write(data.encode("utf-8")):
+            self.dropped_ticks += 1
+            logger.error(
+                "Tick of %d bytes is larger than the slot of the ring buffer %s",
+                len(data),
+                self.ring_buffer.name,
+            )
+
+    def close(self):
+        """
+        Detach from the ring buffer. The buffer is kept for the consumers.
+        """
+        self.ring_buffer.close()
+
+    @classmethod
+    def from_cfg(cls, cfg: DictConfig) -> Optional["SharedMemoryStreamer"]:
+        try:
+            return cls(
+                cfg["buffer_name"],
+                capacity=cfg.get("capacity", 65536),
+                slot_size=cfg.get("slot_size", 1024),
+            )
+        except Exception as e:
+            logger.error("Error creating SharedMemoryStreamer object: %s", e)
+            return None
@@ -9,12 +9,12 @@ from fastapi.security import OAuth2PasswordBearer
 from snowflake import SnowflakeGenerator
 
 from app.data_layer.database.crud.user_crud import (
-    create_or_update_user_verification,
-    create_user,
-    get_user,
-    get_user_by_attr,
-    get_user_verification,
-    update_user,
+    create_or_update_user_verification_async,
+    create_user_async,
+    get_user_async,
+    get_user_by_attr_async,
+    get_user_verification_async,
+    update_user_async,
 )
 from app.data_layer.database.models.user_model import Gender, User, UserVerification
 from app.notification.email.email_provider import EmailProvider
@@ -89,7 +89,7 @@ def get_snowflake_id() -> int:
     return next(snowflake_generator)
 
 
-def signup_user(user: UserSignup) -> dict["str", "str"]:
+async def signup_user(user: UserSignup) -> dict["str", "str"]:
     """
     Validates the user data and creates a new user in the system if the user does not
     already exist. If the user already exists, it returns an error message.
@@ -105,7 +105,7 @@ def signup_user(user: UserSignup) -> dict["str", "str"]:
         A message indicating if the user was created successfully or an error message
     """
     # Check whether the user is already exists with the given details
-    if reason := validate_user_exists(user):
+    if reason := await validate_user_exists(user):
         raise UserSignupError(reason)
 
     validate_user_data(user)
@@ -120,9 +120,9 @@ def signup_user(user: UserSignup) -> dict["str", "str"]:
         ),
     )
 
-    create_user(user_model)
+    await create_user_async(user_model)
 
-    if not get_user_by_attr(EMAIL, user.email):
+    if not await get_user_by_attr_async(EMAIL, user.email):
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="User not created successfully. Please try again later",
@@ -133,7 +133,7 @@ def signup_user(user: UserSignup) -> dict["str", "str"]:
     }
 
 
-def authenticate_user(email: str, password: str) -> User:
+async def authenticate_user(email: str, password: str) -> User:
     """
     Authenticate the user with the given email and password. If the user does not exist,
     or the password is incorrect, it raises an error message. If the user is not verified,
@@ -151,13 +151,13 @@ def authenticate_user(email: str, password: str) -> User:
     ``User``
         The user details retrieved from the database
     """
-    user = get_user_by_attr(EMAIL, email)
+    user = await get_user_by_attr_async(EMAIL, email)
     verify_password(password, user.password)
 
     return user
 
 
-def signin_user(email: str, password: str) -> dict[str, str]:
+async def signin_user(email: str, password: str) -> dict[str, str]:
     """
     Sign in the user with the given email and password. If email or password is incorrect,
     or the user is not verified, it raises an error message. Otherwise, it generates an
@@ -175,7 +175,7 @@ def signin_user(email: str, password: str) -> dict[str, str]:
     ``dict[str, str]``
         Dictionary containing the message, access token, and refresh token
     """
-    user = authenticate_user(email, password)
+    user = await authenticate_user(email, password)
 
     if not user.is_verified:
         raise HTTPException(
@@ -202,7 +202,7 @@ def signin_user(email: str, password: str) -> dict[str, str]:
     }
 
 
-def update_user_verification_status(
+async def update_user_verification_status(
     user_email: str, is_verified: bool = True
 ) -> dict[str, str]:
     """
@@ -222,9 +222,9 @@ def update_user_verification_status(
     ``dict[str, str]``
         A message indicating if the user was verified successfully or an error message
     """
-    user = get_user_by_attr(EMAIL, user_email)
+    user = await get_user_by_attr_async(EMAIL, user_email)
     user.is_verified = is_verified
-    update_user(user.user_id, user.model_dump())
+    await update_user_async(user.user_id, user.model_dump())
 
     return {"message": "User verified successfully"}
 
@@ -246,7 +246,7 @@ def generate_verification_code(length: int = 6) -> str:
     return "".join([str(random.randint(0, 9)) for _ in range(length)])
 
 
-def send_and_save_code(email: str, user_name: str, provider: EmailProvider):
+async def send_and_save_code(email: str, user_name: str, provider: EmailProvider):
     """
     Send a verification code to the user's email and save the verification code in the
     database. If the user does not exist, it raises an error message.
@@ -266,7 +266,7 @@ def send_and_save_code(email: str, user_name: str, provider: EmailProvider):
         (datetime.now(timezone.utc) + timedelta(minutes=10)).timestamp()
     )
 
-    create_or_update_user_verification(
+    await create_or_update_user_verification_async(
         UserVerification(
             email=email,
             verification_code=verification_code,
@@ -282,7 +282,9 @@ def send_and_save_code(email: str, user_name: str, provider: EmailProvider):
     )
 
 
-def validate_verification_code(email: str, verification_code: str) -> UserVerification:
+async def validate_verification_code(
+    email: str, verification_code: str
+) -> UserVerification:
     """
     Validate the verification code sent by the user. If the verification code does not
     match the one stored in the database, or if the verification code has expired, it
@@ -306,7 +308,7 @@ def validate_verification_code(email: str, verification_code: str) -> UserVerifi
         The user verification object
     """
     # Fetch user verification details
-    user_verification = get_user_verification(email)
+    user_verification = await get_user_verification_async(email)
 
     if user_verification is None:
         raise HTTPException(
@@ -330,7 +332,7 @@ def validate_verification_code(email: str, verification_code: str) -> UserVerifi
     return user_verification
 
 
-def update_password(user_id: int, old_password: str, password: str):
+async def update_password(user_id: int, old_password: str, password: str):
     """
     Update the password of the user with the given user ID. If the old password does not
     match the password stored in the database or the new password is the same as the old
@@ -353,10 +355,10 @@ def update_password(user_id: int, old_password: str, password: str):
             detail="New password cannot be the same as the old password",
         )
 
-    update_user(user_id, {"password": get_hash_password(password)})
+    await update_user_async(user_id, {"password": get_hash_password(password)})
 
 
-def get_current_user(token: str = Depends(oauth2_scheme)) -> User:
+async def get_current_user(token: str = Depends(oauth2_scheme)) -> User:
     """
     Retrieve the current user from the database using the access token. If the token
     is invalid or expired, it returns an error message. If the token is valid, it
@@ -383,4 +385,4 @@ def get_current_user(token: str = Depends(oauth2_scheme)) -> User:
             status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid token"
         )
 
-    return get_user(decoded_data[USER_ID])
+    return await get_user_async(decoded_data[USER_ID])
@@ -8,8 +8,8 @@ from fastapi_limiter.depends import RateLimiter
 
 from app import ROOT_DIR
 from app.data_layer.database.crud.user_crud import (
-    create_or_update_user_verification,
-    get_user_by_attr,
+    create_or_update_user_verification_async,
+    get_user_by_attr_async,
 )
 from app.data_layer.database.models.user_model import User
 from app.notification.email.email_provider import EmailProvider
@@ -65,7 +65,7 @@ async def signup(user: UserSignup) -> dict:
         The user details to be registered in the system
     """
     logger.info("Signup attempt for user: %s", user.email)
-    return signup_user(user)
+    return await signup_user(user)
 
 
 @router.post("/signin", status_code=status.HTTP_200_OK)
@@ -79,7 +79,7 @@ async def signin(user: UserSignIn) -> dict:
         The user details to be authenticated in the system
     """
     logger.info("Signin attempt for user: %s", user.email)
-    return signin_user(user.email, user.password)
+    return await signin_user(user.email, user.password)
 
 
 @router.post(
@@ -114,7 +114,7 @@ async def send_verification_code(email: str, response: Response) -> dict:
     )
 
     # Fetch the user by email address
-    user = get_user_by_attr(EMAIL, email)
+    user = await get_user_by_attr_async(EMAIL, email)
 
     # Check if the user is already verified
     if user.is_verified:
@@ -122,7 +122,7 @@ async def send_verification_code(email: str, response: Response) -> dict:
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Email is already verified.",
         )
-    send_and_save_code(email, user.username, email_notification_provider)
+    await send_and_save_code(email, user.username, email_notification_provider)
     response.headers["retry-after"] = str(SECONDS)
 
     return {"message": f"Verification code sent to {email}. Valid for 10 minutes."}
@@ -143,16 +143,16 @@ async def verify_user(request: EmailVerificationRequest) -> dict:
     - JSON response indicating success or failure of the verification.
     """
     logger.info("Verification attempt for %s", request.email)
-    user_verification = validate_verification_code(
+    user_verification = await validate_verification_code(
         request.email, request.verification_code
     )
 
     # Update verification status
-    update_user_verification_status(request.email)
+    await update_user_verification_status(request.email)
 
     # Set the expiration time to 0 to indicate that the code has been used
     user_verification.expiration_time = 0
-    create_or_update_user_verification(user_verification)
+    await create_or_update_user_verification_async(user_verification)
 
     return {"message": "Email verified successfully"}
 
@@ -189,9 +189,9 @@ async def send_reset_password_code(email: str, response: Response) -> dict:
     )
 
     # Fetch the user by email address
-    user = get_user_by_attr(EMAIL, email)
+    user = await get_user_by_attr_async(EMAIL, email)
 
-    send_and_save_code(email, user.username, email_notification_provider)
+    await send_and_save_code(email, user.username, email_notification_provider)
     response.headers["retry-after"] = str(SECONDS)
 
     return {"message": f"Reset password code sent to {email}. Valid for 10 minutes."}
@@ -213,14 +213,14 @@ async def reset_password(request: UserResetPassword) -> dict:
     - JSON response indicating success or failure of the password reset.
     """
     logger.info("Password reset attempt for %s", request.email)
-    user_verification = validate_verification_code(
+    user_verification = await validate_verification_code(
         request.email, request.verification_code
     )
-    user = get_user_by_attr(EMAIL, request.email)
-    update_password(user.user_id, user.password, request.password)
+    user = await get_user_by_attr_async(EMAIL, request.email)
+    await update_password(user.user_id, user.password, request.password)
 
     user_verification.expiration_time = 0
-    create_or_update_user_verification(user_verification)
+    await create_or_update_user_verification_async(user_verification)
 
     return {"message": "Password reset successfully"}
 
@@ -241,13 +241,13 @@ async def change_password(request: UserChangePassword) -> dict:
     - JSON response indicating success or failure of the password change.
     """
     logger.info("Password change attempt for %s", request.email)
-    user = authenticate_user(request.email, request.old_password)
+    user = await authenticate_user(request.email, request.old_password)
     if not user.is_verified:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Email is not verified. Please verify the email first.",
         )
-    update_password(user.user_id, user.password, request.new_password)
+    await update_password(user.user_id, user.password, request.new_password)
     return {"message": "Password changed successfully"}
 
 
@@ -290,4 +290,4 @@ async def refresh_token(refresh_token: str) -> dict:
     - JSON response containing the new access and refresh tokens.
     """
     logger.info("Creating new access token using refresh token")
-    return access_token_from_refresh_token(refresh_token)
+    return await access_token_from_refresh_token(refresh_token)
@@ -4,7 +4,7 @@ from datetime import datetime, timedelta, timezone
 import jwt
 from fastapi import HTTPException, status
 
-from app.data_layer.database.crud.user_crud import get_user
+from app.data_layer.database.crud.user_crud import get_user_async
 from app.utils.constants import (
     ACCESS_TOKEN_EXPIRE_MINUTES,
     EMAIL,
@@ -69,7 +69,7 @@ def decode_token(token: str, secret: str) -> dict[str, str]:
         raise HTTPException(status.HTTP_401_UNAUTHORIZED, "Invalid token") from exc
 
 
-def access_token_from_refresh_token(refresh_token: str) -> dict[str, str]:
+async def access_token_from_refresh_token(refresh_token: str) -> dict[str, str]:
     """
     Create the access token using the refresh token. If the refresh token is invalid
     or expired, it returns an error message. Otherwise, it generates a new access token
@@ -87,7 +87,7 @@ def access_token_from_refresh_token(refresh_token: str) -> dict[str, str]:
     """
     decoded_data = decode_token(refresh_token, JWT_REFRESH_SECRET)
 
-    get_user(decoded_data[USER_ID])
+    await get_user_async(decoded_data[USER_ID])
 
     access_token = create_token(
         {USER_ID: decoded_data[USER_ID], EMAIL: decoded_data[EMAIL]},
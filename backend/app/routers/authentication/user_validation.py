@@ -7,7 +7,7 @@ from dateutil.parser import parse
 from dateutil.parser._parser import ParserError
 from fastapi import HTTPException, status
 
-from app.data_layer.database.crud.user_crud import is_attr_data_in_db
+from app.data_layer.database.crud.user_crud import is_attr_data_in_db_async
 from app.data_layer.database.models.user_model import User
 from app.schemas.user_model import UserSignup
 from app.utils.common.exceptions.authentication import UserSignupError
@@ -133,7 +133,7 @@ def validate_date_of_birth(date_of_birth: str) -> None:
         ) from exc
 
 
-def validate_user_exists(user: UserSignup) -> str | None:
+async def validate_user_exists(user: UserSignup) -> str | None:
     """
     Checks if the user already exists in the database. It checks the email
     and phone number fields to see if the user already exists.
@@ -152,7 +152,7 @@ def validate_user_exists(user: UserSignup) -> str | None:
         "email": user.email,
         "phone_number": user.phone_number,
     }
-    response = is_attr_data_in_db(User, fields_to_check)
+    response = await is_attr_data_in_db_async(User, fields_to_check)
 
     return response
 
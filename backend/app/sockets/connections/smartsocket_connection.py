@@ -6,6 +6,7 @@ from typing import Optional
 from omegaconf import DictConfig
 
 from app.data_layer.database.crud.crud_utils import get_data_by_all_conditions
+from app.data_layer.database.instrument_index import get_instrument_index
 from app.data_layer.database.models import Instrument
 from app.data_layer.streaming.streamer import Streamer
 from app.sockets.connections.websocket_connection import WebsocketConnection
@@ -33,7 +34,8 @@ class SmartSocketConnection(WebsocketConnection):
         exchange: ExchangeType = ExchangeType.NSE,
     ) -> dict[str, str]:
         """
-        Fetches the token-symbol mapping from the database based on the symbols provided.
+        Fetches the token-symbol mapping from the instrument index, or from the database
+        if the index is not loaded, based on the symbols provided.
         If no symbols are provided, it fetches all tokens from the SmartAPI data provider.
 
         Parameters
@@ -49,9 +51,17 @@ class SmartSocketConnection(WebsocketConnection):
             A dictionary containing token-symbol mappings. Eg: {"256265": "INFY"}
         """
         try:
-            if symbols:
-                if isinstance(symbols, str):
-                    symbols = [symbols]
+            if isinstance(symbols, str):
+                symbols = [symbols]
+
+            index = get_instrument_index()
+            if index is not None:
+                token_map = index.get_token_map(
+                    exchange.value if symbols else None,
+                    DataProviderType.SMARTAPI.value,
+                    symbols or None,
+                )
+            elif symbols:
                 instruments = [
                     get_data_by_all_conditions(
                         Instrument, symbol=symbol.upper(), exchange_id=exchange.value
@@ -59,12 +69,13 @@ class SmartSocketConnection(WebsocketConnection):
                     for symbol in symbols
                 ]
                 instruments = [inst[0] for inst in instruments if inst]
+                token_map = {inst.token: inst.symbol for inst in instruments}
             else:
                 instruments = get_data_by_all_conditions(
                     Instrument, data_provider_id=DataProviderType.SMARTAPI.value
                 )
+                token_map = {inst.token: inst.symbol for inst in instruments}
 
-            token_map = {inst.token: inst.symbol for inst in instruments}
             missing_symbols = set(symbols) - set(token_map.values()) if symbols else []
 
             if missing_symbols:
@@ -6,6 +6,7 @@ from typing import Optional
 from omegaconf import DictConfig
 
 from app.data_layer.database.crud.crud_utils import get_data_by_all_conditions
+from app.data_layer.database.instrument_index import get_instrument_index
 from app.data_layer.database.models import Instrument
 from app.data_layer.streaming.streamer import Streamer
 from app.sockets.connections.websocket_connection import WebsocketConnection
@@ -32,7 +33,8 @@ class UplinkSocketConnection(WebsocketConnection):
         exchange: ExchangeType = ExchangeType.BSE,
     ) -> dict[str, str]:
         """
-        Fetches the token-symbol mapping from the database based on the symbols provided.
+        Fetches the token-symbol mapping from the instrument index, or from the database
+        if the index is not loaded, based on the symbols provided.
         If no symbols are provided, it fetches all tokens from the SmartAPI data provider.
 
         Parameters
@@ -48,9 +50,17 @@ class UplinkSocketConnection(WebsocketConnection):
             A dictionary containing token-symbol mappings. Eg: {"256265": "INFY"}
         """
         try:
-            if symbols:
-                if isinstance(symbols, str):
-                    symbols = [symbols]
+            if isinstance(symbols, str):
+                symbols = [symbols]
+
+            index = get_instrument_index()
+            if index is not None:
+                token_map = index.get_token_map(
+                    exchange.value if symbols else None,
+                    DataProviderType.UPLINK.value,
+                    symbols or None,
+                )
+            elif symbols:
                 instruments = [
                     get_data_by_all_conditions(
                         Instrument, symbol=symbol.upper(), exchange_id=exchange.value
@@ -58,12 +68,13 @@ class UplinkSocketConnection(WebsocketConnection):
                     for symbol in symbols
                 ]
                 instruments = [inst[0] for inst in instruments if inst]
+                token_map = {inst.token: inst.symbol for inst in instruments}
             else:
                 instruments = get_data_by_all_conditions(
                     Instrument, data_provider_id=DataProviderType.UPLINK.value
                 )
+                token_map = {inst.token: inst.symbol for inst in instruments}
 
-            token_map = {inst.token: inst.symbol for inst in instruments}
             missing_symbols = set(symbols) - set(token_map.values()) if symbols else []
 
             if missing_symbols:
@@ -16,6 +16,8 @@ REFRESH_TOKEN_EXPIRE_MINUTES = 7 * 24 * 60
 
 # Database Constants
 INSERTION_BATCH_SIZE = 1000
+# Number of rows from which the data is copied to PostgreSQL through a staging table
+BULK_INSERTION_THRESHOLD = 5000
 
 try:
     MACHINE_ID = int(get_required_env_var("MACHINE_ID"))
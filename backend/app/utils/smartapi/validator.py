@@ -2,6 +2,7 @@
 from bisect import bisect_left
 from datetime import datetime, time, timedelta
 
+from app.data_layer.database.instrument_index import get_instrument_index
 from app.utils.common.exceptions.historical_data import (
     AllDaysHolidayException,
     DataUnavailableException,
@@ -9,7 +10,7 @@ from app.utils.common.exceptions.historical_data import (
     InvalidTradingHoursException,
     SymbolNotFoundException,
 )
-from app.utils.common.types.financial_types import ExchangeType
+from app.utils.common.types.financial_types import DataProviderType, ExchangeType
 from app.utils.common.types.reques_types import CandlestickInterval
 from app.utils.date_utils import validate_datetime_format
 from app.utils.file_utils import get_symbols, load_json_data, read_text_data
@@ -25,7 +26,8 @@ def validate_symbol_and_get_token(
     stock_exchange: ExchangeType, stock_symbol: str
 ) -> tuple[str, str]:
     """
-    Validate the stock symbol and get the stock token from the symbols data.
+    Validate the stock symbol and get the stock token of the SmartAPI instrument from
+    the instrument index, or from the symbols data if it is not in the index.
     Ref NSE website for information about stock symbols.
 
     Parameters:
@@ -47,6 +49,18 @@ def validate_symbol_and_get_token(
 
     """
     stock_symbol = stock_symbol.upper()
+
+    index = get_instrument_index()
+    instrument = (
+        index.get_by_symbol(
+            stock_symbol, stock_exchange.value, DataProviderType.SMARTAPI.value
+        )
+        if index is not None
+        else None
+    )
+    if instrument is not None:
+        return instrument.token, stock_symbol
+
     symbols_path = BSE_SYMBOLS_PATH
 
     if stock_exchange == ExchangeType.NSE:
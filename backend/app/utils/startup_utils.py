@@ -13,6 +13,7 @@ from app.data_layer.database.db_connections.postgresql import (
     create_db_and_tables,
     get_session,
 )
+from app.data_layer.database.instrument_index import refresh_instrument_index
 from app.data_layer.database.models import DataProvider, Exchange, Instrument
 from app.utils.common.logger import get_logger
 from app.utils.common.types.financial_types import DataProviderType, ExchangeType
@@ -86,7 +87,8 @@ def insert_data_provider_data():
 
 def create_tokens_db(remove_existing: bool = True):
     """
-    Creates and updates the tokens database and tables for all data providers.
+    Creates and updates the tokens database and tables for all data providers, then
+    loads the instrument index of the process from the updated tables.
     """
     create_db_and_tables()
     insert_exchange_data()
@@ -115,3 +117,5 @@ def create_tokens_db(remove_existing: bool = True):
                 "Skipping update for %s as it was updated today after 8:30 AM.",
                 provider.name,
             )
+
+    refresh_instrument_index()
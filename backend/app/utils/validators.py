@@ -4,14 +4,16 @@ from typing import Annotated
 
 from fastapi import HTTPException, Path
 
+from app.data_layer.database.instrument_index import get_instrument_index
+from app.utils.common.types.financial_types import ExchangeType
 from app.utils.file_utils import get_symbols
 from app.utils.urls import NSE_F_AND_O_SYMBOLS, NSE_INDEX_SYMBOLS, NSE_STOCK_SYMBOLS
 
 
 def validate_and_format_stock_symbol(stock_symbol: str) -> str:
     """
-    validate stock symbol with the available stock symbols in the Nse official website and change the symbol
-    case to upper.
+    validate stock symbol with the NSE instruments of the instrument index, or with the available stock
+    symbols in the Nse official website, and change the symbol case to upper.
 
     Parameters:
     -----------
@@ -29,6 +31,10 @@ def validate_and_format_stock_symbol(stock_symbol: str) -> str:
     ``str``
         Given stock symbol in upper case
     """
+    index = get_instrument_index()
+    if index is not None and index.has_symbol(stock_symbol, ExchangeType.NSE.value):
+        return stock_symbol.upper()
+
     symbols: set[str] = set(get_symbols(NSE_STOCK_SYMBOLS)["symbols"])
 
     if stock_symbol.upper() not in symbols:
@@ -0,0 +1,220 @@
+"""
+Benchmark the time range queries and the retention of the InstrumentPrice ticks on a
+regular table against a table partitioned by day with BRIN indexes on the timestamps.
+
+Both tables are created in the `benchmark` schema of the PostgreSQL database of the
+POSTGRES_* environment variables and are loaded with the same synthetic ticks, one tick
+per symbol every `--interval` seconds, generated on the server. The regular table has a
+B-tree index on the retrieval timestamp. Each query is run `--repeat` times after a
+warm up run and the median latency is reported. The retention deletes the ticks of the
+oldest day of the regular table and drops the oldest partition of the partitioned one.
+Loading 100M rows takes a while and about 25 GB of disk, use `--keep` to rerun the
+queries without loading the tables again, the retention is then skipped.
+
+Usage:
+    python scripts/benchmarks/instrument_price_partition_benchmark.py \
+        --rows 100000000 --symbols 2000 --repeat 5
+"""
+
+import argparse
+import statistics
+import sys
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+from sqlalchemy import text
+from sqlalchemy.engine import Connection
+
+sys.path.append(str(Path(__file__).parents[2]))
+
+# pylint: disable=wrong-import-position
+from app.data_layer.database.db_connections.postgresql import get_engine
+from app.data_layer.database.partitions import (
+    get_next_partition_start,
+    get_partition_start,
+)
+
+SCHEMA = "benchmark"
+COLUMNS = """
+    retrieval_timestamp TIMESTAMP NOT NULL,
+    symbol VARCHAR NOT NULL,
+    exchange_id INTEGER NOT NULL,
+    data_provider_id INTEGER NOT NULL,
+    last_traded_timestamp TIMESTAMP NOT NULL,
+    last_traded_price FLOAT NOT NULL,
+    last_traded_quantity INTEGER,
+    average_traded_price FLOAT,
+    volume_trade_for_the_day INTEGER,
+    total_buy_quantity INTEGER,
+    total_sell_quantity INTEGER,
+    PRIMARY KEY (symbol, exchange_id, data_provider_id, retrieval_timestamp)
+"""
+
+
+def create_tables(connection: Connection, start: datetime, end: datetime):
+    """
+    Create the regular and the partitioned tables, with a partition per day of the
+    range [start, end).
+    """
+    connection.execute(text(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE"))
+    connection.execute(text(f"CREATE SCHEMA {SCHEMA}"))
+
+    connection.execute(text(f"CREATE TABLE {SCHEMA}.flat ({COLUMNS})"))
+    connection.execute(text(f"CREATE INDEX ON {SCHEMA}.flat (retrieval_timestamp)"))
+
+    connection.execute(
+        text(
+            f"CREATE TABLE {SCHEMA}.partitioned ({COLUMNS}) "
+            "PARTITION BY RANGE (retrieval_timestamp)"
+        )
+    )
+    connection.execute(
+        text(f"CREATE INDEX ON {SCHEMA}.partitioned USING brin (retrieval_timestamp)")
+    )
+    connection.execute(
+        text(f"CREATE INDEX ON {SCHEMA}.partitioned USING brin (last_traded_timestamp)")
+    )
+
+    day = start
+    while day < end:
+        next_day = get_next_partition_start(day, "day")
+        connection.execute(
+            text(
+                f"CREATE TABLE {SCHEMA}.partitioned_p{day:%Y_%m_%d} PARTITION OF "
+                f"{SCHEMA}.partitioned FOR VALUES FROM ('{day}') TO ('{next_day}')"
+            )
+        )
+        day = next_day
+
+
+def load_tables(
+    connection: Connection,
+    start: datetime,
+    num_rows: int,
+    num_symbols: int,
+    interval: int,
+):
+    """
+    Insert the same synthetic ticks into both tables, in time order like the saver.
+    """
+    for table in ("flat", "partitioned"):
+        start_time = time.perf_counter()
+        connection.execute(
+            text(
+                f"INSERT INTO {SCHEMA}.{table} "
+                "SELECT ts, 'SYM' || s, 1, 1, ts, 100 + random() * 10, "
+                "(random() * 100)::int, 100, n::int, 1000, 1000 "
+                "FROM generate_series(0, :num_steps - 1) AS n, "
+                "generate_series(1, :num_symbols) AS s, "
+                "LATERAL (SELECT :start + n * make_interval(secs => :interval) AS ts) t"
+            ),
+            {
+                "num_steps": -(-num_rows // num_symbols),
+                "num_symbols": num_symbols,
+                "start": start,
+                "interval": interval,
+            },
+        )
+        connection.execute(text(f"ANALYZE {SCHEMA}.{table}"))
+        print(f"Loaded {table} in {time.perf_counter() - start_time:.1f}s")
+
+
+def time_query(connection: Connection, query: str, params: dict, repeat: int) -> float:
+    """
+    Get the median latency of the query in milliseconds, after a warm up run.
+    """
+    connection.execute(text(query), params).all()
+
+    latencies = []
+    for _ in range(repeat):
+        start_time = time.perf_counter()
+        connection.execute(text(query), params).all()
+        latencies.append((time.perf_counter() - start_time) * 1000)
+
+    return statistics.median(latencies)
+
+
+def main():
+    """
+    Load the tables, run the range queries and the retention on both of them and print
+    the results.
+    """
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[1])
+    parser.add_argument("--rows", type=int, default=100_000_000)
+    parser.add_argument("--symbols", type=int, default=2000)
+    parser.add_argument("--interval", type=int, default=1, help="Seconds between ticks")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--keep", action="store_true", help="Reuse the loaded tables")
+    args = parser.parse_args()
+
+    num_steps = -(-args.rows // args.symbols)
+    start = datetime(2024, 1, 1)
+    end = get_partition_start(
+        start + timedelta(seconds=num_steps * args.interval), "day"
+    ) + timedelta(days=1)
+    engine = get_engine()
+
+    if not args.keep:
+        with engine.begin() as connection:
+            create_tables(connection, start, end)
+            load_tables(connection, start, args.rows, args.symbols, args.interval)
+
+    middle = start + (end - start) / 2
+    queries = {
+        "1 hour": (
+            "SELECT count(*), avg(last_traded_price) FROM {table} "
+            "WHERE retrieval_timestamp >= :start AND retrieval_timestamp < :end",
+            {"start": middle, "end": middle + timedelta(hours=1)},
+        ),
+        "1 day": (
+            "SELECT count(*), avg(last_traded_price) FROM {table} "
+            "WHERE retrieval_timestamp >= :start AND retrieval_timestamp < :end",
+            {"start": middle, "end": middle + timedelta(days=1)},
+        ),
+        "symbol, 1 hour": (
+            "SELECT retrieval_timestamp, last_traded_price FROM {table} "
+            "WHERE symbol = 'SYM1' AND exchange_id = 1 AND data_provider_id = 1 "
+            "AND retrieval_timestamp >= :start AND retrieval_timestamp < :end",
+            {"start": middle, "end": middle + timedelta(hours=1)},
+        ),
+    }
+
+    print(f"{'query':<16}{'flat ms':>12}{'partitioned ms':>16}")
+    with engine.connect() as connection:
+        for name, (query, params) in queries.items():
+            latencies = [
+                time_query(
+                    connection,
+                    query.format(table=f"{SCHEMA}.{table}"),
+                    params,
+                    args.repeat,
+                )
+                for table in ("flat", "partitioned")
+            ]
+            print(f"{name:<16}{latencies[0]:>12.1f}{latencies[1]:>16.1f}")
+
+    if args.keep:
+        return
+
+    with engine.begin() as connection:
+        start_time = time.perf_counter()
+        connection.execute(
+            text(f"DELETE FROM {SCHEMA}.flat WHERE retrieval_timestamp < :end"),
+            {"end": start + timedelta(days=1)},
+        )
+        delete_time = time.perf_counter() - start_time
+
+        start_time = time.perf_counter()
+        connection.execute(
+            text(f"DROP TABLE IF EXISTS {SCHEMA}.partitioned_p{start:%Y_%m_%d}")
+        )
+        drop_time = time.perf_counter() - start_time
+
+    print(
+        f"{'retention 1 day':<16}{delete_time * 1000:>12.1f}{drop_time * 1000:>16.1f}"
+    )
+
+
+if __name__ == "__main__":
+    main()
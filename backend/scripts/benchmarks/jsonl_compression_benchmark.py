@@ -0,0 +1,106 @@
+"""
+Benchmark the compressions of the `JSONLDataSaver` on the tick data.
+
+The ticks are written with the `FramedCompressedWriter` used by the saver, so the
+reported sizes include the frame overhead. The throughput is the uncompressed MB written
+per second of CPU time, and the read throughput is measured by reading the file back.
+Use `--input` to benchmark a jsonl file captured by the saver, otherwise synthetic snap
+quote ticks are used.
+
+Usage:
+    python scripts/benchmarks/jsonl_compression_benchmark.py --input ticks.jsonl \
+        --levels 1 3 9 --frame-size-mb 16
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+from tempfile import TemporaryDirectory
+
+sys.path.append(str(Path(__file__).parents[2]))
+
+# pylint: disable=wrong-import-position
+from kafka_compression_benchmark import generate_ticks
+
+from app.data_layer.data_saver.compressed_file import (
+    FramedCompressedWriter,
+    read_compressed_lines,
+    zstandard,
+)
+
+
+def load_lines(input_path: str | None, num_ticks: int, num_symbols: int) -> list[bytes]:
+    """
+    Read the ticks of the captured jsonl file or generate the synthetic ticks.
+    """
+    if input_path:
+        return Path(input_path).read_bytes().splitlines()
+
+    return [value for _, value in generate_ticks(num_ticks, num_symbols)]
+
+
+def main():
+    """
+    Run the benchmark for the compressions and levels and print the results.
+    """
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[1])
+    parser.add_argument("--input", help="A jsonl file of ticks captured by the saver")
+    parser.add_argument("--num-ticks", type=int, default=200000)
+    parser.add_argument("--num-symbols", type=int, default=2000)
+    parser.add_argument("--levels", type=int, nargs="+", default=[1, 3, 6, 9])
+    parser.add_argument("--frame-size-mb", type=float, default=16)
+    parser.add_argument("--block-size", type=int, default=1024 * 1024)
+    args = parser.parse_args()
+
+    lines = load_lines(args.input, args.num_ticks, args.num_symbols)
+    raw_bytes = sum(len(line) + 1 for line in lines)
+
+    compressions = ["none", "gzip"] + (["zstd"] if zstandard else [])
+    print(f"{len(lines)} ticks, {raw_bytes / 1e6:.1f} MB uncompressed")
+    print(
+        f"{'compression':<12}{'level':>6}{'MB':>10}{'ratio':>8}"
+        f"{'write MB/s':>12}{'read MB/s':>12}"
+    )
+
+    with TemporaryDirectory() as temp_dir:
+        for compression in compressions:
+            levels = [0] if compression == "none" else args.levels
+
+            for level in levels:
+                file_path = Path(temp_dir) / f"ticks_{compression}_{level}.jsonl"
+                writer = FramedCompressedWriter(
+                    file_path,
+                    None if compression == "none" else compression,
+                    level,
+                    frame_size=int(args.frame_size_mb * 1024 * 1024),
+                    block_size=args.block_size,
+                )
+
+                start = time.process_time()
+                for line in lines:
+                    writer.write(line + b"\n")
+                writer.close()
+                write_time = time.process_time() - start
+
+                start = time.process_time()
+                num_read = sum(
+                    1
+                    for _ in read_compressed_lines(
+                        file_path, None if compression == "none" else compression
+                    )
+                )
+                read_time = time.process_time() - start
+                assert num_read == len(lines)
+
+                size = file_path.stat().st_size
+                print(
+                    f"{compression:<12}{level:>6}{size / 1e6:>10.2f}"
+                    f"{raw_bytes / size:>8.2f}"
+                    f"{raw_bytes / 1e6 / max(write_time, 1e-9):>12.1f}"
+                    f"{raw_bytes / 1e6 / max(read_time, 1e-9):>12.1f}"
+                )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,184 @@
+"""
+Benchmark the Kafka compression codecs on the tick data sent by the `KafkaStreamer`.
+
+The ticks are encoded into real Kafka record batches (the same format the producer
+sends to the broker), so the reported sizes are the bytes on the wire. The CPU cost
+is measured for both compressing the batches on the producer side and decompressing
+them on the consumer side.
+
+Usage:
+    python scripts/benchmarks/kafka_compression_benchmark.py --num-ticks 200000 \
+        --num-symbols 2000 --batch-size 65536 --tick-rate 50000
+"""
+
+import argparse
+import json
+import random
+import time
+
+from kafka.codec import (
+    gzip_decode,
+    gzip_encode,
+    has_lz4,
+    has_snappy,
+    has_zstd,
+    lz4_decode,
+    lz4_encode,
+    snappy_decode,
+    snappy_encode,
+    zstd_decode,
+    zstd_encode,
+)
+from kafka.record.default_records import DefaultRecordBatch, DefaultRecordBatchBuilder
+
+# Size of the record batch header, the records after the header are compressed
+HEADER_SIZE = DefaultRecordBatchBuilder.HEADER_STRUCT.size
+
+# codec name -> (availability check, encode, decode)
+CODECS = {
+    "gzip": (lambda: True, gzip_encode, gzip_decode),
+    "snappy": (has_snappy, snappy_encode, snappy_decode),
+    "lz4": (has_lz4, lz4_encode, lz4_decode),
+    "zstd": (has_zstd, zstd_encode, zstd_decode),
+}
+
+
+def generate_ticks(num_ticks: int, num_symbols: int) -> list[tuple[bytes, bytes]]:
+    """
+    Generate the snap quote ticks in the same format as the `SmartSocket` sends them
+    to the streamer. Returns the list of (key, value) pairs.
+    """
+    rng = random.Random(42)
+    symbols = [f"SYMBOL{i}" for i in range(num_symbols)]
+    prices = {symbol: rng.randint(1000, 500000) for symbol in symbols}
+    ticks = []
+
+    for sequence_number in range(num_ticks):
+        symbol_index = rng.randrange(num_symbols)
+        symbol = symbols[symbol_index]
+        prices[symbol] += rng.randint(-50, 50)
+        ltp = prices[symbol]
+        tick = {
+            "subscription_mode": 3,
+            "token": str(10000 + symbol_index),
+            "sequence_number": 18537152 + sequence_number,
+            "exchange_timestamp": 1729506514000 + sequence_number,
+            "last_traded_price": ltp,
+            "subscription_mode_val": "SNAP_QUOTE",
+            "last_traded_quantity": rng.randint(1, 1000),
+            "average_traded_price": ltp + rng.randint(-100, 100),
+            "volume_trade_for_the_day": rng.randint(1000, 10000000),
+            "total_buy_quantity": float(rng.randint(0, 100000)),
+            "total_sell_quantity": float(rng.randint(0, 100000)),
+            "open_price_of_the_day": ltp + 100,
+            "high_price_of_the_day": ltp + 200,
+            "low_price_of_the_day": ltp - 200,
+            "closed_price": ltp - 50,
+            "last_traded_timestamp": 1729504796 + sequence_number // 100,
+            "open_interest": 0,
+            "open_interest_change_percentage": 0,
+            "symbol": symbol,
+            "retrieval_timestamp": str(1729532024.309936 + sequence_number / 1000),
+            "data_provider_id": 1,
+            "exchange_id": 1,
+        }
+        ticks.append((f"{symbol}|1".encode(), json.dumps(tick).encode()))
+
+    return ticks
+
+
+def build_batches(ticks: list[tuple[bytes, bytes]], batch_size: int) -> list[bytes]:
+    """
+    Encode the ticks into uncompressed record batches of at most `batch_size` bytes,
+    the same way the producer accumulates the ticks before sending them to the broker.
+    """
+    batches = []
+    builder = None
+    offset = 0
+
+    for key, value in ticks:
+        if builder is not None and builder.append(offset, None, key, value, []):
+            offset += 1
+            continue
+
+        # The batch is full, start a new batch with the current tick
+        if builder is not None:
+            batches.append(bytes(builder.build()))
+
+        builder = DefaultRecordBatchBuilder(
+            2, DefaultRecordBatch.CODEC_NONE, 0, -1, -1, -1, batch_size
+        )
+        builder.append(0, None, key, value, [])
+        offset = 1
+
+    if builder is not None:
+        batches.append(bytes(builder.build()))
+
+    return batches
+
+
+def main():
+    """
+    Run the benchmark for all the available codecs and print the results.
+    """
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[1])
+    parser.add_argument("--num-ticks", type=int, default=200000)
+    parser.add_argument("--num-symbols", type=int, default=2000)
+    parser.add_argument("--batch-size", type=int, default=65536)
+    parser.add_argument(
+        "--tick-rate",
+        type=int,
+        default=50000,
+        help="Ticks per second used to estimate the CPU usage of a codec",
+    )
+    args = parser.parse_args()
+
+    ticks = generate_ticks(args.num_ticks, args.num_symbols)
+    batches = build_batches(ticks, args.batch_size)
+    num_ticks = sum(
+        DefaultRecordBatch(batch).last_offset_delta + 1 for batch in batches
+    )
+    records = [batch[HEADER_SIZE:] for batch in batches]
+    raw_bytes = sum(len(batch) for batch in batches)
+
+    print(
+        f"{num_ticks} ticks in {len(batches)} batches of {args.batch_size} bytes, "
+        f"{raw_bytes / 1e6:.1f} MB uncompressed, {args.tick_rate} ticks/sec"
+    )
+    print(
+        f"{'codec':<8}{'wire MB':>10}{'ratio':>8}{'bytes/tick':>12}"
+        f"{'compress us/tick':>18}{'decompress us/tick':>20}{'CPU % at rate':>15}"
+    )
+    print(
+        f"{'none':<8}{raw_bytes / 1e6:>10.2f}{1:>8.2f}"
+        f"{raw_bytes / num_ticks:>12.1f}{0:>18.2f}{0:>20.2f}{0:>15.1f}"
+    )
+
+    for name, (is_available, encode, decode) in CODECS.items():
+        if not is_available():
+            print(f"{name:<8} skipped, the library of the codec is not installed")
+            continue
+
+        start = time.process_time()
+        compressed = [encode(data) for data in records]
+        compress_time = time.process_time() - start
+
+        start = time.process_time()
+        for data, original in zip(compressed, records):
+            assert decode(data) == original
+        decompress_time = time.process_time() - start
+
+        wire_bytes = sum(HEADER_SIZE + len(data) for data in compressed)
+        compress_us = compress_time / num_ticks * 1e6
+        decompress_us = decompress_time / num_ticks * 1e6
+        cpu_percent = (compress_us + decompress_us) * args.tick_rate / 1e4
+
+        print(
+            f"{name:<8}{wire_bytes / 1e6:>10.2f}{raw_bytes / wire_bytes:>8.2f}"
+            f"{wire_bytes / num_ticks:>12.1f}{compress_us:>18.2f}"
+            f"{decompress_us:>20.2f}{cpu_percent:>15.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
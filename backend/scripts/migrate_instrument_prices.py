@@ -0,0 +1,46 @@
+"""
+Copy the rows of the InstrumentPrice table to the CompactInstrumentPrice table.
+
+The rows are copied in batches, in the order of the primary key, to the database of the
+POSTGRES_* environment variables, or to the SQLite database of `--sqlite`. The rows
+already copied are skipped, so an interrupted migration is resumed by running the
+script again. Once the rows are copied, set `schema: compact` in the configuration of
+the postgres saver; the InstrumentPrice table is not dropped by the script.
+
+Usage:
+    python scripts/migrate_instrument_prices.py --batch-size 50000 \
+        --start 2024-10-01 --end 2024-11-01
+"""
+
+import argparse
+import sys
+from datetime import datetime
+from pathlib import Path
+
+from sqlmodel import create_engine
+
+sys.path.append(str(Path(__file__).parents[1]))
+
+# pylint: disable=wrong-import-position
+from app.data_layer.database.compact_prices import migrate_instrument_prices
+from app.data_layer.database.db_connections.postgresql import get_engine
+
+
+def main():
+    """
+    Migrate the rows of the given time range and print the number of rows copied.
+    """
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[1])
+    parser.add_argument("--batch-size", type=int, default=50000)
+    parser.add_argument("--start", type=datetime.fromisoformat, help="UTC time")
+    parser.add_argument("--end", type=datetime.fromisoformat, help="UTC time")
+    parser.add_argument("--sqlite", help="Path of a SQLite database to migrate")
+    args = parser.parse_args()
+
+    engine = create_engine(f"sqlite:///{args.sqlite}") if args.sqlite else get_engine()
+    migrated = migrate_instrument_prices(engine, args.batch_size, args.start, args.end)
+    print(f"Copied {migrated} rows to the compact InstrumentPrice table")
+
+
+if __name__ == "__main__":
+    main()
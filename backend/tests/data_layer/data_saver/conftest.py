@@ -1,5 +1,9 @@
+from typing import Any, Callable
+
 import pytest
+from pytest_mock import MockerFixture, MockType
 
+from app.data_layer.data_saver import DataSaver
 from app.utils.common.types.financial_types import DataProviderType, ExchangeType
 
 
@@ -67,3 +71,34 @@ def kafka_data() -> list[dict]:
         #     "retrieval_timestamp": 1729532024.31136,
         # },
     ]
+
+
+@pytest.fixture
+def mock_base_logger(mocker: MockerFixture) -> MockType:
+    """
+    Mock the logger object of the DataSaver base class.
+    """
+    return mocker.patch("app.data_layer.data_saver.data_saver.logger")
+
+
+@pytest.fixture
+def set_messages() -> Callable[[DataSaver, list[Any]], None]:
+    """
+    This fixture returns a function that makes the mocked consumer of the data
+    saver return the given messages in a single batch. The data saver is stopped
+    on the next poll, so `retrieve_and_save` returns once the messages are saved.
+    """
+
+    def _set_messages(data_saver: DataSaver, messages: list[Any]):
+        batches = [{"test_topic": messages}]
+
+        def poll(**kwargs):
+            if batches:
+                return batches.pop(0)
+
+            data_saver.stop()
+            return {}
+
+        data_saver.consumer.poll.side_effect = poll  # type: ignore
+
+    return _set_messages
@@ -0,0 +1,178 @@
+import json
+import os
+from collections import namedtuple
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Callable, cast
+
+import pytest
+from kafka.errors import NoBrokersAvailable
+from omegaconf import DictConfig, OmegaConf
+from pytest_mock import MockerFixture, MockType
+
+from app.data_layer.data_saver import ArrowDataSaver, DataSaver
+from app.data_layer.data_saver.saver.arrow_saver import read_arrow_ticks
+from app.utils.common import init_from_cfg
+
+pa = pytest.importorskip("pyarrow")
+
+Message = namedtuple("Message", ["value"])
+
+
+####################################### FIXTURES #######################################
+@pytest.fixture
+def arrow_config(tmp_path: Path) -> DictConfig:
+    """
+    Configuration for the ArrowDataSaver.
+    """
+    return OmegaConf.create(
+        {
+            "name": "arrow_saver",
+            "output_dir": str(tmp_path / "arrow"),
+            "batch_size": 4,
+            "streaming": {
+                "kafka_topic": "test_topic",
+                "kafka_server": "localhost:9092",
+            },
+        }
+    )
+
+
+@pytest.fixture
+def mock_consumer(mocker: MockerFixture) -> MockType:
+    """
+    Mock the KafkaConsumer object.
+    """
+    return mocker.patch("app.data_layer.streaming.consumer.KafkaConsumer")
+
+
+@pytest.fixture
+def mock_logger(mocker: MockerFixture) -> MockType:
+    """
+    Mock the logger object in the ArrowDataSaver.
+    """
+    return mocker.patch("app.data_layer.data_saver.saver.arrow_saver.logger")
+
+
+@pytest.fixture
+def arrow_saver(mock_consumer: MockType, arrow_config: DictConfig) -> ArrowDataSaver:
+    """
+    Fixture to return the ArrowDataSaver object.
+    """
+    return cast(ArrowDataSaver, ArrowDataSaver.from_cfg(arrow_config))
+
+
+def make_ticks(kafka_data: list[dict]) -> list[dict]:
+    """
+    Create ticks of two symbols traded every 10 seconds, out of order.
+    """
+    return [
+        {
+            **kafka_data[0],
+            "symbol": symbol,
+            "last_traded_timestamp": 1729504800 + i * 10,
+        }
+        for i in (3, 0, 2, 1, 4)
+        for symbol in ("TCS", "DBOL")
+    ]
+
+
+####################################### TESTS #######################################
+
+
+# Test: 1
+def test_init(mock_consumer: MockType, arrow_config: DictConfig, mock_logger: MockType):
+    """
+    Test the initialization of the ArrowDataSaver object.
+    """
+    # Test: 1.1 ( valid initialization using init_from_cfg )
+    arrow_saver = cast(ArrowDataSaver, init_from_cfg(arrow_config, DataSaver))
+    assert isinstance(arrow_saver, ArrowDataSaver)
+    assert arrow_saver.output_dir == Path(arrow_config.output_dir)
+    assert arrow_saver.batch_size == 4
+
+    # Test: 1.2 ( Test NoBrokersAvailable exception )
+    mock_consumer.side_effect = NoBrokersAvailable()
+    assert ArrowDataSaver.from_cfg(arrow_config) is None
+    mock_logger.error.assert_called_once_with(
+        "No Broker is available at the address: %s. No data will be saved.",
+        "localhost:9092",
+    )
+
+
+# Test: 2
+def test_retrieve_and_save(
+    arrow_saver: ArrowDataSaver, kafka_data: list[dict], set_messages: Callable
+):
+    """
+    Test the ticks are saved as sorted record batches of the trade date file.
+    """
+    set_messages(
+        arrow_saver,
+        [
+            Message(value=json.dumps(tick).encode("utf-8"))
+            for tick in make_ticks(kafka_data)
+        ],
+    )
+    arrow_saver.retrieve_and_save()
+
+    files = list((arrow_saver.output_dir / "date=2024-10-21").glob("*.arrows"))
+    assert len(files) == 1
+
+    table = read_arrow_ticks(arrow_saver.output_dir, "2024-10-21")
+    assert table.num_rows == 10
+    assert table.schema == arrow_saver.schema
+
+    # Test: 2.1 ( Each record batch sorted by symbol and timestamp )
+    batches = table.to_batches()
+    assert [batch.num_rows for batch in batches] == [4, 4, 2]
+    assert batches[0].column("symbol").to_pylist() == ["DBOL", "DBOL", "TCS", "TCS"]
+    timestamps = batches[0].column("last_traded_timestamp").to_pylist()
+    assert timestamps[0] < timestamps[1]
+
+
+# Test: 3
+def test_read_arrow_ticks(
+    arrow_saver: ArrowDataSaver, kafka_data: list[dict], mock_logger: MockType
+):
+    """
+    Test the ticks are read back filtered by symbol and time range without copies.
+    """
+    arrow_saver.batch_size = 100
+    arrow_saver.save_batch(make_ticks(kafka_data))
+    arrow_saver.flush()
+
+    # Test: 3.1 ( Symbol and time range, the file still being written )
+    start = datetime(2024, 10, 21, 10, 0, 10, tzinfo=timezone.utc)
+    table = read_arrow_ticks(
+        arrow_saver.output_dir, "2024-10-21", symbols="TCS", start=start
+    )
+    assert table.column("symbol").to_pylist() == ["TCS"] * 4
+    assert table.column("last_traded_timestamp").to_pylist()[0] == start
+
+    table = read_arrow_ticks(
+        arrow_saver.output_dir,
+        "2024-10-21",
+        start=1729504810000,
+        end=1729504820000,
+    )
+    assert table.num_rows == 4
+
+    # Test: 3.2 ( Slices of the memory mapped file, no memory allocated )
+    allocated_bytes = pa.total_allocated_bytes()
+    table = read_arrow_ticks(arrow_saver.output_dir, "2024-10-21", symbols=["DBOL"])
+    assert table.num_rows == 5
+    assert pa.total_allocated_bytes() == allocated_bytes
+
+    # Test: 3.3 ( Truncated file read up to its last complete batch )
+    arrow_saver.save_batch(make_ticks(kafka_data)[:2])
+    arrow_saver.flush()
+    file_path = arrow_saver.file_paths["2024-10-21"]
+    os.truncate(file_path, os.path.getsize(file_path) - 16)
+
+    table = read_arrow_ticks(arrow_saver.output_dir, "2024-10-21")
+    assert table.num_rows == 10
+    mock_logger.warning.assert_called_once()
+
+    # Test: 3.4 ( No file for the trade date )
+    assert read_arrow_ticks(arrow_saver.output_dir, "2024-10-22").num_rows == 0
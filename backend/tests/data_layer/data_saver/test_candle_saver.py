@@ -0,0 +1,167 @@
+import json
+from collections import namedtuple
+from pathlib import Path
+from typing import Callable, cast
+
+import pytest
+from omegaconf import DictConfig, OmegaConf
+from pytest_mock import MockerFixture, MockType
+
+from app.data_layer.data_saver import CandleDataSaver, DataSaver
+from app.data_layer.data_saver.candles import MemoryCandleSink
+from app.utils.common import init_from_cfg
+
+Message = namedtuple("Message", ["value"])
+
+
+####################################### FIXTURES #######################################
+@pytest.fixture
+def candle_config() -> DictConfig:
+    """
+    Configuration for the CandleDataSaver.
+    """
+    return OmegaConf.create(
+        {
+            "name": "candle_saver",
+            "intervals": ["1m", "5m"],
+            "grace_period_ms": 1000,
+            "sink": {"name": "memory_candle_sink", "max_candles": 10},
+            "streaming": {
+                "kafka_topic": "test_topic",
+                "kafka_server": "localhost:9092",
+            },
+        }
+    )
+
+
+@pytest.fixture
+def mock_consumer(mocker: MockerFixture) -> MockType:
+    """
+    Mock the KafkaConsumer object.
+    """
+    return mocker.patch("app.data_layer.streaming.consumer.KafkaConsumer")
+
+
+@pytest.fixture
+def mock_logger(mocker: MockerFixture) -> MockType:
+    """
+    Mock the logger object in the CandleDataSaver.
+    """
+    return mocker.patch("app.data_layer.data_saver.saver.candle_saver.logger")
+
+
+####################################### TESTS #######################################
+
+
+# Test: 1
+def test_init(
+    mock_consumer: MockType, candle_config: DictConfig, mock_logger: MockType
+):
+    """
+    Test the initialization of the CandleDataSaver object from the configuration.
+    """
+    # Test: 1.1 ( valid initialization using init_from_cfg )
+    candle_saver = cast(CandleDataSaver, init_from_cfg(candle_config, DataSaver))
+    assert isinstance(candle_saver, CandleDataSaver)
+    assert isinstance(candle_saver.sink, MemoryCandleSink)
+    assert [name for name, _ in candle_saver.aggregator.intervals] == ["1m", "5m"]
+    mock_consumer.assert_called_once()
+
+    # Test: 1.2 ( Invalid intervals )
+    candle_config.intervals = ["1d"]
+    assert CandleDataSaver.from_cfg(candle_config) is None
+    mock_logger.error.assert_called_once()
+
+    # Test: 1.3 ( No sink )
+    candle_config.intervals = ["1m"]
+    del candle_config["sink"]
+    assert CandleDataSaver.from_cfg(candle_config) is None
+    mock_logger.error.assert_called_with(
+        "No candle sink is configured. No data will be saved."
+    )
+
+
+# Test: 2
+def test_retrieve_and_save(
+    mock_consumer: MockType,
+    candle_config: DictConfig,
+    kafka_data: list[dict],
+    set_messages: Callable,
+):
+    """
+    Test the ticks are aggregated and the candles written when the saver stops.
+    """
+    candle_saver = cast(CandleDataSaver, CandleDataSaver.from_cfg(candle_config))
+    ticks = [
+        {**kafka_data[0], "last_traded_timestamp": 1729504800 + i * 30}
+        for i in range(3)
+    ]
+    set_messages(
+        candle_saver,
+        [Message(value=json.dumps(tick).encode("utf-8")) for tick in ticks],
+    )
+    candle_saver.retrieve_and_save()
+
+    sink = cast(MemoryCandleSink, candle_saver.sink)
+    candles = sink.get_candles("DBOL", 1, "1m")
+    assert [candle.ticks for candle in candles] == [2, 1]
+    assert len(sink.get_candles("DBOL", 1, "5m")) == 1
+    assert candle_saver.stats()["written_candles"] == 3
+    cast(MockType, candle_saver.consumer).commit.assert_called_once()
+
+
+# Test: 3
+def test_restore_open_candles(
+    mock_consumer: MockType,
+    candle_config: DictConfig,
+    kafka_data: list[dict],
+    set_messages: Callable,
+    tmp_path: Path,
+):
+    """
+    Test the open candles are saved when the saver stops and completed after a restart.
+    """
+    candle_config.state_file_path = str(tmp_path / "candles_state.json")
+    ticks = [
+        {**kafka_data[0], "last_traded_timestamp": 1729504800 + seconds}
+        for seconds in (0, 30, 60, 90, 200)
+    ]
+
+    # Test: 3.1 ( Open candles saved instead of written )
+    candle_saver = cast(CandleDataSaver, CandleDataSaver.from_cfg(candle_config))
+    set_messages(
+        candle_saver,
+        [Message(value=json.dumps(tick).encode("utf-8")) for tick in ticks[:3]],
+    )
+    candle_saver.retrieve_and_save()
+
+    assert candle_saver.stats()["written_candles"] == 0
+    assert (tmp_path / "candles_state.json").exists()
+    cast(MockType, candle_saver.consumer).commit.assert_called_once()
+
+    # Test: 3.2 ( Candles completed by the ticks consumed after the restart )
+    candle_saver = cast(CandleDataSaver, CandleDataSaver.from_cfg(candle_config))
+    set_messages(
+        candle_saver,
+        [Message(value=json.dumps(tick).encode("utf-8")) for tick in ticks[3:]],
+    )
+    candle_saver.retrieve_and_save()
+
+    sink = cast(MemoryCandleSink, candle_saver.sink)
+    assert [candle.ticks for candle in sink.get_candles("DBOL", 1, "1m")] == [2, 2]
+    assert sink.get_candles("DBOL", 1, "5m") == []
+
+    # Test: 3.3 ( State written only when the open candles changed )
+    state_file_path = tmp_path / "candles_state.json"
+    state_file_path.unlink()
+    candle_saver.flush()
+    assert not state_file_path.exists()
+
+    candle_saver.save_batch([{**ticks[4], "last_traded_timestamp": 1729504830}])
+    candle_saver.flush()
+    assert state_file_path.exists()
+
+    # Test: 3.4 ( Invalid state ignored )
+    candle_config.intervals = ["1m"]
+    candle_saver = cast(CandleDataSaver, CandleDataSaver.from_cfg(candle_config))
+    assert candle_saver.aggregator.stats()["instruments"] == 0
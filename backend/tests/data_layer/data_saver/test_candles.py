@@ -0,0 +1,200 @@
+from pathlib import Path
+
+import pytest
+from omegaconf import OmegaConf
+
+from app.data_layer.data_saver.candles import (
+    Candle,
+    CandleAggregator,
+    CandleSink,
+    CSVCandleSink,
+    MemoryCandleSink,
+    get_tick_timestamp,
+    parse_interval,
+)
+from app.utils.common import init_from_cfg
+
+# 2024-10-21 09:15:00 IST in milliseconds
+MARKET_OPEN = 1729482300000
+MINUTE = 60 * 1000
+
+
+def make_tick(timestamp: int, price: float, volume: int, symbol: str = "TCS") -> dict:
+    """
+    Create a tick traded at `timestamp` milliseconds.
+    """
+    return {
+        "symbol": symbol,
+        "exchange_id": 1,
+        "last_traded_timestamp": timestamp,
+        "last_traded_price": price,
+        "last_traded_quantity": 10,
+        "volume_trade_for_the_day": volume,
+    }
+
+
+# Test: 1
+def test_parse_interval():
+    """
+    Test the intervals and the timestamps of the ticks are converted to milliseconds.
+    """
+    assert parse_interval("30s") == 30 * 1000
+    assert parse_interval("15m") == 15 * MINUTE
+    assert parse_interval("1H") == 60 * MINUTE
+
+    # Test: 1.1 ( Invalid intervals )
+    for interval in ("0m", "5d", "m"):
+        with pytest.raises(ValueError):
+            parse_interval(interval)
+
+    # Test: 1.2 ( Timestamps in seconds, milliseconds or missing )
+    assert get_tick_timestamp({"last_traded_timestamp": 1729504796}) == 1729504796000
+    assert (
+        get_tick_timestamp(
+            {"last_traded_timestamp": -1, "exchange_timestamp": 1729506514000}
+        )
+        == 1729506514000
+    )
+    assert get_tick_timestamp({"last_traded_timestamp": None}) is None
+
+
+# Test: 2
+def test_aggregate_candles():
+    """
+    Test the ticks are aggregated into the candles of each interval.
+    """
+    aggregator = CandleAggregator(intervals=["1m", "3m"], grace_period_ms=2000)
+
+    aggregator.update(make_tick(MARKET_OPEN + 1000, 100, 1000))
+    aggregator.update(make_tick(MARKET_OPEN + 20000, 105, 1050))
+    aggregator.update(make_tick(MARKET_OPEN + 40000, 98, 1100))
+    aggregator.update(make_tick(MARKET_OPEN + 30000, 101, 1120))
+
+    # Test: 2.1 ( Candle kept open during the grace period )
+    aggregator.update(make_tick(MARKET_OPEN + MINUTE + 1000, 102, 1150))
+    assert not aggregator.drain()
+
+    # Test: 2.2 ( Late tick added to the previous candle within the grace period )
+    aggregator.update(make_tick(MARKET_OPEN + 50000, 99, 1160))
+    aggregator.update(make_tick(MARKET_OPEN + MINUTE + 2000, 103, 1200))
+
+    assert aggregator.drain() == [
+        Candle("TCS", 1, "1m", MARKET_OPEN, 100, 105, 98, 99, 140, 5)
+    ]
+
+    # Test: 2.3 ( Tick older than the closed candle dropped from its interval )
+    aggregator.update(make_tick(MARKET_OPEN + 55000, 200, 1210))
+    assert aggregator.late_ticks == 1
+
+    # Test: 2.4 ( Candles closed by the watermark and on close )
+    aggregator.update(make_tick(MARKET_OPEN + 2 * MINUTE, 104, 1300, symbol="INFY"))
+    aggregator.advance(MARKET_OPEN + 3 * MINUTE)
+    assert aggregator.drain() == [
+        Candle("TCS", 1, "1m", MARKET_OPEN + MINUTE, 102, 103, 102, 103, 70, 2),
+    ]
+
+    aggregator.close_all()
+    assert aggregator.drain() == [
+        Candle("TCS", 1, "3m", MARKET_OPEN, 100, 200, 98, 103, 220, 8),
+        Candle("INFY", 1, "1m", MARKET_OPEN + 2 * MINUTE, 104, 104, 104, 104, 10, 1),
+        Candle("INFY", 1, "3m", MARKET_OPEN, 104, 104, 104, 104, 10, 1),
+    ]
+    assert aggregator.stats() == {
+        "ticks": 9,
+        "invalid_ticks": 0,
+        "late_ticks": 1,
+        "instruments": 2,
+    }
+
+
+# Test: 3
+def test_candle_volume():
+    """
+    Test the volume of the candles is the change of the cumulative volume of the day.
+    """
+    aggregator = CandleAggregator(intervals=["1m"], grace_period_ms=2000)
+
+    # Test: 3.1 ( Late tick with a lower cumulative volume adds no volume )
+    for i, volume in enumerate([1_000_000, 1_000_010, 1_000_005, 1_000_020]):
+        aggregator.update(make_tick(MARKET_OPEN + i * 1000, 100, volume))
+
+    # The last traded quantity of the first tick and the 20 traded after it
+    aggregator.close_all()
+    assert aggregator.drain()[0].volume == 10 + 20
+
+    # Test: 3.2 ( Cumulative volume reset on the next trade date )
+    aggregator.update(make_tick(MARKET_OPEN + 24 * 60 * MINUTE, 100, 500))
+    aggregator.update(make_tick(MARKET_OPEN + 10000, 100, 1_000_030))
+    aggregator.close_all()
+    assert aggregator.drain()[0].volume == 500
+    assert aggregator.late_ticks == 1
+
+
+# Test: 4
+def test_aggregator_from_cfg():
+    """
+    Test the aggregator is created from the configuration and rejects the invalid ones.
+    """
+    aggregator = CandleAggregator.from_cfg(
+        OmegaConf.create({"intervals": ["5m", "1h"], "grace_period_ms": 500})
+    )
+    assert aggregator.intervals == [("5m", 5 * MINUTE), ("1h", 60 * MINUTE)]
+
+    # Test: 4.1 ( Grace period longer than an interval )
+    with pytest.raises(ValueError):
+        CandleAggregator(intervals=["1s"], grace_period_ms=1000)
+
+    # Test: 4.2 ( Ticks without a price or a timestamp )
+    aggregator.update({"symbol": "TCS", "last_traded_price": 100})
+    assert aggregator.invalid_ticks == 1
+
+
+# Test: 5
+def test_candle_sinks(tmp_path: Path):
+    """
+    Test the memory and csv sinks write the candles.
+    """
+    candles = [
+        Candle("TCS", 1, "1m", MARKET_OPEN + i * MINUTE, 100, 101, 99, 100, 10, 2)
+        for i in range(5)
+    ]
+
+    # Test: 5.1 ( Last candles kept in memory )
+    memory_sink = init_from_cfg(
+        OmegaConf.create({"name": "memory_candle_sink", "max_candles": 3}), CandleSink
+    )
+    assert isinstance(memory_sink, MemoryCandleSink)
+    memory_sink.write(candles)
+    assert memory_sink.get_candles("TCS", 1, "1m") == candles[2:]
+    assert (
+        memory_sink.get_candles("TCS", 1, "1m", start=MARKET_OPEN + 3 * MINUTE)
+        == candles[3:]
+    )
+    assert memory_sink.get_candles("TCS", 1, "5m") == []
+
+    # Test: 5.2 ( Candles appended to a csv file per interval and date )
+    csv_sink = CSVCandleSink(tmp_path / "candles" / "candles.csv")
+    csv_sink.write(candles[:2])
+    csv_sink.close()
+    csv_sink.write(candles[2:])
+    csv_sink.close()
+
+    lines = (
+        (tmp_path / "candles" / "candles_1m_2024_10_21.csv").read_text().splitlines()
+    )
+    assert lines[0] == ",".join(Candle._fields)
+    assert len(lines) == 6
+
+    # Test: 5.3 ( Files of the previous trade dates closed on flush )
+    # pylint: disable=protected-access
+    next_day = candles[0]._replace(start=MARKET_OPEN + 24 * 60 * MINUTE)
+    csv_sink.write([candles[0], next_day, next_day._replace(interval="5m")])
+    csv_sink.flush()
+    assert sorted(csv_sink._files) == [("1m", "2024_10_22"), ("5m", "2024_10_22")]
+
+    csv_sink.write([candles[1]])
+    csv_sink.close()
+    lines = (
+        (tmp_path / "candles" / "candles_1m_2024_10_21.csv").read_text().splitlines()
+    )
+    assert len(lines) == 8
@@ -0,0 +1,85 @@
+import gzip
+
+import pytest
+import zstandard
+
+from app.data_layer.data_saver.compressed_file import (
+    FramedCompressedWriter,
+    read_compressed_lines,
+    validate_compression,
+)
+
+LINES = [
+    f'{{"symbol": "SYMBOL{i}", "last_traded_price": {i}}}'.encode() for i in range(2000)
+]
+
+
+# Test: 1
+def test_validate_compression(mocker):
+    """
+    Test the validation of the compression names.
+    """
+    assert validate_compression(None) is None
+    assert validate_compression("None") is None
+    assert validate_compression("ZSTD") == "zstd"
+
+    # Test: 1.1 ( Unsupported compression )
+    with pytest.raises(ValueError):
+        validate_compression("lz4")
+
+    # Test: 1.2 ( Missing library )
+    mocker.patch("app.data_layer.data_saver.compressed_file.zstandard", None)
+    with pytest.raises(ValueError):
+        validate_compression("zstd")
+
+
+# Test: 2
+@pytest.mark.parametrize("compression", ["gzip", "zstd", None])
+def test_framed_compressed_writer(tmp_path, compression):
+    """
+    Test the data is written in frames readable by the standard tools.
+    """
+    file_path = tmp_path / "ticks.jsonl"
+    writer = FramedCompressedWriter(
+        file_path, compression, frame_size=16 * 1024, block_size=4096
+    )
+    for line in LINES:
+        writer.write(line + b"\n")
+    writer.close()
+
+    content = file_path.read_bytes()
+    expected = b"".join(line + b"\n" for line in LINES)
+
+    # Test: 2.1 ( Concatenated frames are read as a single stream )
+    if compression == "gzip":
+        assert gzip.decompress(content) == expected
+    elif compression == "zstd":
+        reader = zstandard.ZstdDecompressor().stream_reader(
+            content, read_across_frames=True
+        )
+        assert reader.read() == expected
+    else:
+        assert content == expected
+
+    assert list(read_compressed_lines(file_path, compression)) == LINES
+    assert writer.bytes_in == len(expected)
+    if compression:
+        assert writer.bytes_out < writer.bytes_in / 2
+
+
+# Test: 3
+@pytest.mark.parametrize("compression", ["gzip", "zstd"])
+def test_framed_compressed_writer_crash(tmp_path, compression):
+    """
+    Test the data flushed to a file that is never closed can still be read.
+    """
+    file_path = tmp_path / "ticks.jsonl"
+    writer = FramedCompressedWriter(
+        file_path, compression, frame_size=16 * 1024, block_size=4096
+    )
+    for line in LINES:
+        writer.write(line + b"\n")
+    writer.flush()
+    writer.write(b"lost line\n")
+
+    assert list(read_compressed_lines(file_path, compression)) == LINES
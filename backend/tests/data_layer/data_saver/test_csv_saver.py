@@ -2,7 +2,7 @@ import json
 from collections import namedtuple
 from datetime import datetime
 from tempfile import TemporaryDirectory
-from typing import cast
+from typing import Callable, cast
 
 import pandas as pd
 import pytest
@@ -44,7 +44,7 @@ def mock_consumer(mocker: MockerFixture) -> MockType:
     """
     Mock the KafkaConsumer object.
     """
-    return mocker.patch("app.data_layer.data_saver.csv_saver.KafkaConsumer")
+    return mocker.patch("app.data_layer.streaming.consumer.KafkaConsumer")
 
 
 @pytest.fixture
@@ -89,6 +89,8 @@ def validate_init(
         csv_config.streaming.kafka_topic,
         bootstrap_servers=csv_config.streaming.kafka_server,
         auto_offset_reset="earliest",
+        group_id="csv_saver",
+        enable_auto_commit=False,
     )
 
 
@@ -117,6 +119,8 @@ def test_init(
         csv_config.streaming.kafka_topic,
         bootstrap_servers=csv_config.streaming.kafka_server,
         auto_offset_reset="earliest",
+        group_id="csv_saver",
+        enable_auto_commit=False,
     )
 
     # Test: 1.3 ( valid initialization from constructor )
@@ -136,11 +140,15 @@ def test_init(
         csv_config.streaming.kafka_topic,
         bootstrap_servers=csv_config.streaming.kafka_server,
         auto_offset_reset="earliest",
+        group_id="csv_saver",
+        enable_auto_commit=False,
     )
 
 
 # Test: 2
-def test_retrieve_and_save(csv_saver: CSVDataSaver, kafka_data: list[dict]):
+def test_retrieve_and_save(
+    csv_saver: CSVDataSaver, kafka_data: list[dict], set_messages: Callable
+):
     """
     Test the `retrieve_and_save` method of the CSVDataSaver object.
     """
@@ -148,13 +156,16 @@ def test_retrieve_and_save(csv_saver: CSVDataSaver, kafka_data: list[dict]):
         Message(value=json.dumps(data).encode("utf-8")) for data in kafka_data
     ]
 
-    # Setting the return value of the consumer to the encoded data
-    csv_saver.consumer.__iter__.return_value = encoded_data
+    # Setting the batch of the consumer to the encoded data
+    set_messages(csv_saver, encoded_data)
     csv_saver.retrieve_and_save()
 
-    assert csv_saver.consumer.__iter__.call_count == 1
+    consumer = cast(MockType, csv_saver.consumer)
+    consumer.poll.assert_called_with(timeout_ms=1000, max_records=500)
+    consumer.commit.assert_called_once()
+    assert csv_saver.committed_messages == len(kafka_data)
 
-    stored_data = pd.read_csv(csv_saver.csv_file_path)
+    stored_data = pd.read_csv(csv_saver.get_file_path("SNAP_QUOTE"))
     stored_data = stored_data.to_dict(orient="records")
 
     # Converting the data to string to compare
@@ -165,15 +176,73 @@ def test_retrieve_and_save(csv_saver: CSVDataSaver, kafka_data: list[dict]):
 
 
 # Test: 3
-def test_retrieve_and_save_error(csv_saver: CSVDataSaver, mock_logger: MockType):
+def test_retrieve_and_save_error(csv_saver: CSVDataSaver, mock_base_logger: MockType):
     """
     Test the `retrieve_and_save` method of the CSVDataSaver object when an error occurs.
     """
-    csv_saver.consumer.__iter__.side_effect = PermissionError("Permission denied")
+    consumer = cast(MockType, csv_saver.consumer)
+    consumer.poll.side_effect = PermissionError("Permission denied")
     csv_saver.retrieve_and_save()
 
-    mock_logger.error.assert_called_once_with(
-        "Error while saving data to csv: %s", csv_saver.consumer.__iter__.side_effect
+    mock_base_logger.error.assert_called_once_with(
+        "Error while saving data with %s: %s",
+        "CSVDataSaver",
+        consumer.poll.side_effect,
+    )
+    mock_base_logger.info.assert_called_once_with(
+        "%s: %s messages consumed, %s messages committed", "CSVDataSaver", 0, 0
+    )
+    consumer.commit.assert_not_called()
+
+
+# Test: 4
+def test_save_schema(
+    csv_saver: CSVDataSaver, kafka_data: list[dict], mock_logger: MockType
+):
+    """
+    Test the columns of the csv files are fixed per tick type.
+    """
+    ltp_tick = {"symbol": "INFY", "subscription_mode_val": "LTP", "ltp": 100}
+    csv_saver.save(kafka_data[0])
+    csv_saver.save(ltp_tick)
+
+    # Test: 4.1 ( Different key order, missing and extra fields )
+    csv_saver.save({"extra": 1, "ltp": 101, "subscription_mode_val": "LTP"})
+    csv_saver.save({"symbol": "TCS"})
+
+    # Test: 4.2 ( Rows are buffered until the flush )
+    ltp_file_path = csv_saver.get_file_path("LTP")
+    assert ltp_file_path.name == f"test_ltp_{csv_saver.segment_period}.csv"
+    assert ltp_file_path.read_text() == ""
+
+    csv_saver.close()
+
+    assert ltp_file_path.read_text().splitlines() == [
+        "symbol,subscription_mode_val,ltp",
+        "INFY,LTP,100",
+        ",LTP,101",
+    ]
+    assert csv_saver.csv_file_path.read_text().splitlines() == ["symbol", "TCS"]
+    assert len(pd.read_csv(csv_saver.get_file_path("SNAP_QUOTE"))) == 1
+
+    # Test: 4.3 ( Header is not written again when appending to the file )
+    csv_saver.save({"ltp": 102, "subscription_mode_val": "LTP", "symbol": "SBIN"})
+    csv_saver.close()
+
+    assert ltp_file_path.read_text().splitlines()[1:] == [
+        "INFY,LTP,100",
+        ",LTP,101",
+        "SBIN,LTP,102",
+    ]
+
+    # Test: 4.4 ( Dropped fields are counted and logged once per field )
+    csv_saver.save({"extra": 2, "ltp": 103, "subscription_mode_val": "LTP"})
+    csv_saver.close()
+
+    assert csv_saver.stats() == {"dropped_fields": 2}
+    mock_logger.warning.assert_called_once_with(
+        "Dropping the fields %s of the %s ticks, they are not in the columns of %s",
+        ["extra"],
+        "LTP",
+        ltp_file_path,
     )
-    mock_logger.info.assert_called_once_with("%s messages saved to csv", 0)
-    assert csv_saver.consumer.__iter__.call_count == 1
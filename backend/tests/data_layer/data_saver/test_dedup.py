@@ -0,0 +1,151 @@
+import json
+from collections import namedtuple
+from pathlib import Path
+from typing import Callable
+
+import pytest
+from omegaconf import OmegaConf
+from pytest_mock import MockerFixture
+
+from app.data_layer.data_saver import JSONLDataSaver
+from app.data_layer.data_saver.dedup import TickDeduplicator, get_tick_key
+
+Message = namedtuple("Message", ["value"])
+
+
+# Test: 1
+def test_get_tick_key(kafka_data: list[dict]):
+    """
+    Test the key of the ticks with and without a sequence number.
+    """
+    tick = kafka_data[0]
+
+    # Test: 1.1 ( Sequence number of the token )
+    assert get_tick_key(tick) == (1, "10893", 3, 18537152)
+    assert get_tick_key({**tick, "retrieval_timestamp": 0}) == get_tick_key(tick)
+    assert get_tick_key({**tick, "sequence_number": 1}) != get_tick_key(tick)
+
+    # Test: 1.2 ( Exchange timestamp with the price and the volume )
+    tick = {**tick, "sequence_number": None}
+    assert get_tick_key(tick) == (1, "10893", 1729506514000, 13468, 131137)
+
+    # Test: 1.3 ( Last traded timestamp of the symbol without a token )
+    tick = {
+        "symbol": "TCS",
+        "exchange_id": 1,
+        "data_provider_id": 2,
+        "last_traded_timestamp": 1729504796,
+        "last_traded_price": 4100,
+    }
+    assert get_tick_key(tick) == (2, (1, "TCS"), 1729504796, 4100, None)
+
+    # Test: 1.4 ( No timestamp set by the exchange )
+    assert get_tick_key({**tick, "last_traded_timestamp": -1}) is None
+
+
+# Test: 2
+def test_tick_deduplicator(kafka_data: list[dict]):
+    """
+    Test the duplicated ticks are dropped within the bounded window.
+    """
+    deduplicator = TickDeduplicator(capacity=4, num_buckets=2)
+    ticks = [{**kafka_data[0], "sequence_number": i} for i in range(6)]
+
+    # Test: 2.1 ( Duplicates in the same batch and in the next one )
+    assert deduplicator.filter(ticks[:2] + ticks[:2]) == ticks[:2]
+    assert deduplicator.filter(ticks[1:3]) == ticks[2:3]
+
+    # Test: 2.2 ( The oldest bucket is dropped once the newest is full )
+    assert deduplicator.filter(ticks[3:6]) == ticks[3:6]
+    assert deduplicator.stats()["keys"] <= 4
+    assert deduplicator.filter(ticks[:1]) == ticks[:1]
+    assert deduplicator.filter(ticks[5:6]) == []
+
+    # Test: 2.3 ( Ticks without a key are kept )
+    unkeyed_tick = {"symbol": "TCS", "last_traded_timestamp": -1}
+    assert deduplicator.filter([unkeyed_tick, unkeyed_tick]) == [unkeyed_tick] * 2
+
+    stats = deduplicator.stats()
+    assert stats["seen_ticks"] == 13
+    assert stats["duplicate_ticks"] == 4
+    assert stats["unkeyed_ticks"] == 2
+    assert stats["hit_rate"] == 4 / 13
+
+    # Test: 2.4 ( Different ticks with the same hash are kept )
+    tick = {**kafka_data[0], "sequence_number": None}
+    colliding_ticks = [
+        {**tick, "last_traded_price": -1},
+        {**tick, "last_traded_price": -2},
+    ]
+    assert hash(get_tick_key(colliding_ticks[0])) == hash(
+        get_tick_key(colliding_ticks[1])
+    )
+    assert deduplicator.filter(colliding_ticks) == colliding_ticks
+
+
+# Test: 3
+def test_from_cfg():
+    """
+    Test the deduplicator is created from the `dedup` configuration.
+    """
+    assert TickDeduplicator.from_cfg(None) is None
+    assert TickDeduplicator.from_cfg(OmegaConf.create({"enabled": False})) is None
+
+    deduplicator = TickDeduplicator.from_cfg(
+        OmegaConf.create({"capacity": 100, "num_buckets": 5})
+    )
+    assert deduplicator is not None
+    assert deduplicator.bucket_size == 20
+
+    # Test: 3.1 ( Invalid capacity )
+    with pytest.raises(ValueError):
+        TickDeduplicator(capacity=2, num_buckets=4)
+
+
+# Test: 4
+def test_saver_dedup(
+    mocker: MockerFixture,
+    tmp_path: Path,
+    kafka_data: list[dict],
+    set_messages: Callable,
+):
+    """
+    Test the data savers drop the duplicated ticks before saving them.
+    """
+    saver = JSONLDataSaver(mocker.MagicMock(), tmp_path / "data.jsonl")
+    saver.configure_dedup(OmegaConf.create({"dedup": {"capacity": 100}}))
+    message = Message(json.dumps(kafka_data[0]).encode("utf-8"))
+    set_messages(saver, [message, message, message])
+    saver.retrieve_and_save()
+
+    assert len(saver.jsonl_file_path.read_text().splitlines()) == 1
+    assert saver.consumed_messages == 3
+    assert saver.committed_messages == 3
+    assert saver.deduplicator.stats()["duplicate_ticks"] == 2  # type: ignore
+
+
+# Test: 5
+def test_saver_dedup_shared_consumer(mocker: MockerFixture, tmp_path: Path):
+    """
+    Test the data savers build their deduplicator only when they poll their own
+    consumer, the ticks of a shared consumer are deduplicated by the runner.
+    """
+    cfg = OmegaConf.create(
+        {
+            "name": "jsonl_saver",
+            "jsonl_file_path": str(tmp_path / "data.jsonl"),
+            "streaming": {"kafka_topic": "test_topic"},
+            "dedup": {"capacity": 100},
+        }
+    )
+    mocker.patch("app.data_layer.data_saver.saver.jsonl_saver.init_consumer")
+
+    # Test: 5.1 ( Own consumer )
+    saver = JSONLDataSaver.from_cfg(cfg)
+    assert saver is not None
+    assert saver.deduplicator is not None
+
+    # Test: 5.2 ( Shared consumer )
+    saver = JSONLDataSaver.from_cfg(cfg, consumer=mocker.MagicMock())
+    assert saver is not None
+    assert saver.deduplicator is None
@@ -2,7 +2,7 @@ import json
 from collections import namedtuple
 from datetime import datetime
 from tempfile import TemporaryDirectory
-from typing import cast
+from typing import Callable, cast
 
 import pandas as pd
 import pytest
@@ -11,6 +11,10 @@ from omegaconf import DictConfig, OmegaConf
 from pytest_mock import MockerFixture, MockType
 
 from app.data_layer.data_saver import DataSaver, JSONLDataSaver
+from app.data_layer.data_saver.compressed_file import (
+    COMPRESSION_EXTENSIONS,
+    read_compressed_lines,
+)
 from app.utils.common import init_from_cfg
 
 Message = namedtuple("Message", ["value"])
@@ -44,7 +48,7 @@ def mock_consumer(mocker: MockerFixture) -> MockType:
     """
     Mock the KafkaConsumer object.
     """
-    return mocker.patch("app.data_layer.data_saver.jsonl_saver.KafkaConsumer")
+    return mocker.patch("app.data_layer.streaming.consumer.KafkaConsumer")
 
 
 @pytest.fixture
@@ -91,6 +95,8 @@ def validate_init(
         jsonl_config.streaming.kafka_topic,
         bootstrap_servers=jsonl_config.streaming.kafka_server,
         auto_offset_reset="earliest",
+        group_id="jsonl_saver",
+        enable_auto_commit=False,
     )
 
 
@@ -119,6 +125,8 @@ def test_init(
         jsonl_config.streaming.kafka_topic,
         bootstrap_servers=jsonl_config.streaming.kafka_server,
         auto_offset_reset="earliest",
+        group_id="jsonl_saver",
+        enable_auto_commit=False,
     )
 
     # Test: 1.3 ( valid initialization from constructor )
@@ -138,11 +146,15 @@ def test_init(
         jsonl_config.streaming.kafka_topic,
         bootstrap_servers=jsonl_config.streaming.kafka_server,
         auto_offset_reset="earliest",
+        group_id="jsonl_saver",
+        enable_auto_commit=False,
     )
 
 
 # Test: 2
-def test_retrieve_and_save(jsonl_saver: JSONLDataSaver, kafka_data: list[dict]):
+def test_retrieve_and_save(
+    jsonl_saver: JSONLDataSaver, kafka_data: list[dict], set_messages: Callable
+):
     """
     Test the `retrieve_and_save` method of the JSONLDataSaver object.
     """
@@ -150,11 +162,11 @@ def test_retrieve_and_save(jsonl_saver: JSONLDataSaver, kafka_data: list[dict]):
         Message(value=json.dumps(data).encode("utf-8")) for data in kafka_data
     ]
 
-    # Setting the return value of the consumer to the encoded data
-    jsonl_saver.consumer.__iter__.return_value = encoded_data
+    # Setting the batch of the consumer to the encoded data
+    set_messages(jsonl_saver, encoded_data)
     jsonl_saver.retrieve_and_save()
 
-    assert jsonl_saver.consumer.__iter__.call_count == 1
+    cast(MockType, jsonl_saver.consumer).commit.assert_called_once()
 
     stored_data = pd.read_json(
         jsonl_saver.jsonl_file_path, lines=True, orient="records"
@@ -169,16 +181,63 @@ def test_retrieve_and_save(jsonl_saver: JSONLDataSaver, kafka_data: list[dict]):
 
 
 # Test: 3
-def test_retrieve_and_save_error(jsonl_saver: JSONLDataSaver, mock_logger: MockType):
+def test_retrieve_and_save_error(
+    mocker: MockerFixture,
+    jsonl_saver: JSONLDataSaver,
+    mock_base_logger: MockType,
+    kafka_data: list[dict],
+    set_messages: Callable,
+):
     """
     Test the `retrieve_and_save` method of the JSONLDataSaver object when an error occurs.
     """
-    jsonl_saver.consumer.__iter__.side_effect = PermissionError("Permission denied")
+    set_messages(jsonl_saver, [Message(value=json.dumps(kafka_data[0]).encode())])
+    error = PermissionError("Permission denied")
+    mocker.patch.object(jsonl_saver, "_get_writer", side_effect=error)
     jsonl_saver.retrieve_and_save()
 
-    mock_logger.error.assert_called_once_with(
-        "Error while saving data to jsonl: %s",
-        jsonl_saver.consumer.__iter__.side_effect,
+    mock_base_logger.error.assert_called_once_with(
+        "Error while saving data with %s: %s", "JSONLDataSaver", error
+    )
+    mock_base_logger.info.assert_called_once_with(
+        "%s: %s messages consumed, %s messages committed", "JSONLDataSaver", 1, 0
     )
-    mock_logger.info.assert_called_once_with("%s messages saved to jsonl", 0)
-    assert jsonl_saver.consumer.__iter__.call_count == 1
+    cast(MockType, jsonl_saver.consumer).commit.assert_not_called()
+
+
+# Test: 4
+@pytest.mark.parametrize("compression", ["gzip", "zstd"])
+def test_retrieve_and_save_compressed(
+    mock_consumer: MockType,
+    jsonl_config: DictConfig,
+    kafka_data: list[dict],
+    compression: str,
+    set_messages: Callable,
+):
+    """
+    Test the `retrieve_and_save` method of the JSONLDataSaver with compression.
+    """
+    jsonl_config.compression = compression
+    jsonl_saver = cast(JSONLDataSaver, JSONLDataSaver.from_cfg(jsonl_config))
+    encoded_data = [json.dumps(data).encode("utf-8") for data in kafka_data]
+
+    set_messages(jsonl_saver, [Message(value=value) for value in encoded_data])
+    jsonl_saver.retrieve_and_save()
+
+    extension = COMPRESSION_EXTENSIONS[compression]
+    assert jsonl_saver.jsonl_file_path.name.endswith(f".jsonl{extension}")
+    assert (
+        list(read_compressed_lines(jsonl_saver.jsonl_file_path, compression))
+        == encoded_data
+    )
+
+    # Test: 4.1 ( A new file is started instead of appending to the existing file )
+    new_jsonl_saver = cast(JSONLDataSaver, JSONLDataSaver.from_cfg(jsonl_config))
+    assert (
+        new_jsonl_saver.jsonl_file_path.name
+        == jsonl_saver.jsonl_file_path.name.replace(".jsonl", "_1.jsonl")
+    )
+
+    # Test: 4.2 ( Invalid compression )
+    jsonl_config.compression = "brotli"
+    assert JSONLDataSaver.from_cfg(jsonl_config) is None
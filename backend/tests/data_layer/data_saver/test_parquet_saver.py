@@ -0,0 +1,226 @@
+import json
+import os
+from collections import namedtuple
+from pathlib import Path
+from typing import Callable, cast
+
+import pytest
+from kafka.errors import NoBrokersAvailable
+from omegaconf import DictConfig, OmegaConf
+from pytest_mock import MockerFixture, MockType
+
+from app.data_layer.data_saver import DataSaver, ParquetDataSaver
+from app.utils.common import init_from_cfg
+
+pa = pytest.importorskip("pyarrow")
+pq = pytest.importorskip("pyarrow.parquet")
+
+Message = namedtuple("Message", ["value"])
+
+
+####################################### FIXTURES #######################################
+@pytest.fixture
+def parquet_config(tmp_path: Path) -> DictConfig:
+    """
+    Configuration for the ParquetDataSaver.
+    """
+    return OmegaConf.create(
+        {
+            "name": "parquet_saver",
+            "output_dir": str(tmp_path / "parquet"),
+            "row_group_size": 2,
+            "max_file_rows": 4,
+            "streaming": {
+                "kafka_topic": "test_topic",
+                "kafka_server": "localhost:9092",
+            },
+        }
+    )
+
+
+@pytest.fixture
+def mock_consumer(mocker: MockerFixture) -> MockType:
+    """
+    Mock the KafkaConsumer object.
+    """
+    return mocker.patch("app.data_layer.streaming.consumer.KafkaConsumer")
+
+
+@pytest.fixture
+def mock_logger(mocker: MockerFixture) -> MockType:
+    """
+    Mock the logger object in the ParquetDataSaver.
+    """
+    return mocker.patch("app.data_layer.data_saver.parquet_saver.logger")
+
+
+@pytest.fixture
+def parquet_saver(
+    mock_consumer: MockType, parquet_config: DictConfig, mocker: MockerFixture
+) -> ParquetDataSaver:
+    """
+    Fixture to return the ParquetDataSaver object.
+    """
+    mock_consumer.return_value = mocker.MagicMock()
+
+    return cast(ParquetDataSaver, ParquetDataSaver.from_cfg(parquet_config))
+
+
+def make_ticks(kafka_data: list[dict], count: int, **fields) -> list[dict]:
+    """
+    Create `count` ticks from the sample tick with the given fields.
+    """
+    return [
+        {**kafka_data[0], "retrieval_timestamp": 1729532024.309936 + i, **fields}
+        for i in range(count)
+    ]
+
+
+def read_partition(directory: Path):
+    """
+    Read all the finalized files of the partition as a single table.
+    """
+    files = sorted(directory.glob("*.parquet"))
+    return pa.concat_tables([pq.read_table(file) for file in files]), files
+
+
+####################################### TESTS #######################################
+
+
+# Test: 1
+def test_init(
+    mock_consumer: MockType,
+    mocker: MockerFixture,
+    parquet_config: DictConfig,
+    mock_logger: MockType,
+):
+    """
+    Test the initialization of the ParquetDataSaver object.
+    """
+    mock_consumer.return_value = mocker.MagicMock()
+
+    # Test: 1.1 ( valid initialization using init_from_cfg )
+    parquet_saver = cast(ParquetDataSaver, init_from_cfg(parquet_config, DataSaver))
+    assert isinstance(parquet_saver, ParquetDataSaver)
+    assert parquet_saver.output_dir == Path(parquet_config.output_dir)
+    assert parquet_saver.row_group_size == 2
+    assert parquet_saver.max_file_rows == 4
+    assert parquet_saver.compression == "zstd"
+
+    # Test: 1.2 ( Test NoBrokersAvailable exception )
+    mock_consumer.side_effect = NoBrokersAvailable()
+    assert ParquetDataSaver.from_cfg(parquet_config) is None
+    mock_logger.error.assert_called_once_with(
+        "No Broker is available at the address: %s. No data will be saved.",
+        "localhost:9092",
+    )
+
+
+# Test: 2
+def test_retrieve_and_save(
+    parquet_saver: ParquetDataSaver, kafka_data: list[dict], set_messages: Callable
+):
+    """
+    Test the ticks are saved to typed parquet files partitioned by date and exchange.
+    """
+    ticks = make_ticks(kafka_data, 5)
+    set_messages(
+        parquet_saver,
+        [Message(value=json.dumps(tick).encode("utf-8")) for tick in ticks],
+    )
+    parquet_saver.retrieve_and_save()
+
+    # Test: 2.1 ( Partition of the UTC trade date and the exchange name )
+    directory = parquet_saver.output_dir / "date=2024-10-21" / "exchange=NSE"
+    table, files = read_partition(directory)
+    assert table.num_rows == 5
+
+    # Test: 2.2 ( Files are rotated after `max_file_rows` rows, no temporary file )
+    metadata = sorted(
+        (pq.ParquetFile(file).metadata for file in files), key=lambda m: m.num_rows
+    )
+    assert [m.num_rows for m in metadata] == [1, 4]
+    assert [m.num_row_groups for m in metadata] == [1, 2]
+    assert not list(directory.glob("*.tmp"))
+
+    # Test: 2.3 ( Typed schema with dictionary encoded symbols )
+    assert table.schema == parquet_saver.schema
+    assert pa.types.is_dictionary(table.schema.field("symbol").type)
+    assert table.schema.field("exchange_id").type == pa.int16()
+    assert table.schema.field("last_traded_timestamp").type == pa.timestamp(
+        "ms", tz="UTC"
+    )
+
+    row = min(table.to_pylist(), key=lambda row: row["retrieval_timestamp"])
+    assert row["symbol"] == "DBOL"
+    assert row["last_traded_price"] == 13468.0
+    assert row["volume_trade_for_the_day"] == 131137
+    assert row["last_traded_timestamp"].timestamp() == 1729504796
+    assert row["retrieval_timestamp"].timestamp() == pytest.approx(1729532024.309)
+
+
+# Test: 3
+def test_partitions(parquet_saver: ParquetDataSaver, kafka_data: list[dict]):
+    """
+    Test the partitioning by symbol, the limit of open partitions and the rotation.
+    """
+    parquet_saver.partition_by_symbol = True
+    parquet_saver.max_open_files = 2
+    parquet_saver.row_group_size = 100
+
+    # Test: 3.1 ( Partition per symbol and exchange )
+    for tick in make_ticks(kafka_data, 1, symbol="INFY", exchange_id=2):
+        parquet_saver.save(tick)
+    for tick in make_ticks(kafka_data, 1, symbol="TCS"):
+        parquet_saver.save(tick)
+    assert len(parquet_saver.partitions) == 2
+
+    # Test: 3.2 ( Least recently used partition is finalized above the limit )
+    parquet_saver.save(make_ticks(kafka_data, 1)[0])
+    assert len(parquet_saver.partitions) == 2
+
+    date_dir = parquet_saver.output_dir / "date=2024-10-21"
+    table, _ = read_partition(date_dir / "exchange=BSE" / "symbol=INFY")
+    assert table.column("symbol").to_pylist() == ["INFY"]
+    assert not list((date_dir / "exchange=NSE").rglob("*.parquet"))
+
+    # Test: 3.3 ( Partitions are finalized after the rotation interval )
+    parquet_saver.rotate()
+    assert len(parquet_saver.partitions) == 2
+
+    parquet_saver.rotation_interval = 0
+    parquet_saver.rotate()
+    assert not parquet_saver.partitions
+    assert len(list((date_dir / "exchange=NSE").rglob("*.parquet"))) == 2
+    assert not list(date_dir.rglob("*.tmp"))
+
+
+# Test: 4
+def test_remove_orphaned_files(
+    mock_consumer: MockType,
+    mocker: MockerFixture,
+    parquet_config: DictConfig,
+    mock_logger: MockType,
+):
+    """
+    Test the temporary files left by a stopped data saver are removed on start.
+    """
+    mock_consumer.return_value = mocker.MagicMock()
+    directory = Path(parquet_config.output_dir) / "date=2024-10-21" / "exchange=NSE"
+    directory.mkdir(parents=True)
+    orphaned_file = directory / "part-20241021091500-1a2b3c4d.parquet.tmp"
+    recent_file = directory / "part-20241021092000-5e6f7a8b.parquet.tmp"
+    finalized_file = directory / "part-20241021091000-9c0d1e2f.parquet"
+    for file_path in [orphaned_file, recent_file, finalized_file]:
+        file_path.write_bytes(b"")
+    os.utime(orphaned_file, (0, 0))
+    os.utime(finalized_file, (0, 0))
+
+    # Test: 4.1 ( Only the temporary files older than twice the interval are removed )
+    ParquetDataSaver.from_cfg(parquet_config)
+    assert not orphaned_file.exists()
+    assert recent_file.exists()
+    assert finalized_file.exists()
+    mock_logger.warning.assert_called_once_with(
+        "Orphaned parquet file %s removed", orphaned_file
+    )
@@ -0,0 +1,374 @@
+import csv
+import json
+from collections import namedtuple
+from datetime import datetime, timezone
+from typing import Callable, cast
+
+import pytest
+from kafka.errors import NoBrokersAvailable
+from omegaconf import DictConfig, OmegaConf
+from pytest_mock import MockerFixture, MockType
+from sqlalchemy import text
+
+from app.data_layer.data_saver import DataSaver, PostgresDataSaver
+from app.data_layer.data_saver.saver.postgres_saver import (
+    INSTRUMENT_PRICE_COLUMNS,
+    CopyWriter,
+)
+from app.data_layer.database.compact_prices import COMPACT_COLUMNS
+from app.data_layer.database.crud.crud_utils import get_bulk_statements
+from app.data_layer.database.models import InstrumentPrice
+from app.utils.common import init_from_cfg
+
+Message = namedtuple("Message", ["value"])
+
+
+####################################### FIXTURES #######################################
+@pytest.fixture
+def postgres_config() -> DictConfig:
+    """
+    Configuration for the PostgresDataSaver.
+    """
+    return OmegaConf.create(
+        {
+            "name": "postgres_saver",
+            "batch_size": 2,
+            "flush_interval_ms": 60000,
+            "num_writers": 2,
+            "streaming": {
+                "kafka_topic": "test_topic",
+                "kafka_server": "localhost:9092",
+            },
+        }
+    )
+
+
+@pytest.fixture
+def mock_consumer(mocker: MockerFixture) -> MockType:
+    """
+    Mock the KafkaConsumer object.
+    """
+    return mocker.patch("app.data_layer.streaming.consumer.KafkaConsumer")
+
+
+@pytest.fixture
+def mock_logger(mocker: MockerFixture) -> MockType:
+    """
+    Mock the logger object in the PostgresDataSaver.
+    """
+    return mocker.patch("app.data_layer.data_saver.postgres_saver.logger")
+
+
+@pytest.fixture
+def mock_engine(mocker: MockerFixture) -> MockType:
+    """
+    Mock the engine of the PostgreSQL database and the creation of the tables. The
+    rows copied by each connection are recorded in `copied_rows`.
+    """
+    engine = mocker.MagicMock()
+    engine.copied_rows = []
+
+    def raw_connection():
+        connection = mocker.MagicMock()
+        cursor = connection.cursor.return_value.__enter__.return_value
+        cursor.copy_expert.side_effect = lambda sql, file: engine.copied_rows.append(
+            list(csv.reader(file))
+        )
+        return connection
+
+    engine.raw_connection.side_effect = raw_connection
+    mocker.patch(
+        "app.data_layer.database.db_connections.postgresql.get_engine",
+        return_value=engine,
+    )
+    mocker.patch(
+        "app.data_layer.database.db_connections.postgresql.create_db_and_tables"
+    )
+
+    return engine
+
+
+@pytest.fixture
+def postgres_saver(
+    mock_consumer: MockType,
+    mock_engine: MockType,
+    postgres_config: DictConfig,
+    mocker: MockerFixture,
+) -> PostgresDataSaver:
+    """
+    Initialize the PostgresDataSaver object.
+    """
+    mock_consumer.return_value = mocker.MagicMock()
+
+    return cast(PostgresDataSaver, PostgresDataSaver.from_cfg(postgres_config))
+
+
+def make_messages(kafka_data: list[dict], count: int) -> list:
+    """
+    Create `count` messages with different retrieval timestamps.
+    """
+    return [
+        Message(
+            json.dumps(
+                {**kafka_data[0], "retrieval_timestamp": 1729532024.309936 + i}
+            ).encode("utf-8")
+        )
+        for i in range(count)
+    ]
+
+
+####################################### TESTS #######################################
+
+
+# Test: 1
+def test_init(
+    mock_consumer: MockType,
+    mock_engine: MockType,
+    mocker: MockerFixture,
+    postgres_config: DictConfig,
+    mock_logger: MockType,
+):
+    """
+    Test the initialization of the PostgresDataSaver object.
+    """
+    mock_consumer.return_value = mocker.MagicMock()
+
+    # Test: 1.1 ( valid initialization using init_from_cfg )
+    postgres_saver = cast(PostgresDataSaver, init_from_cfg(postgres_config, DataSaver))
+    assert isinstance(postgres_saver, PostgresDataSaver)
+    assert postgres_saver.engine is mock_engine
+    assert postgres_saver.batch_size == 2
+    assert len(postgres_saver.writers) == 2
+    postgres_saver.close()
+
+    # Test: 1.2 ( Partitions section set to null )
+    postgres_config.partitions = None
+    postgres_saver = cast(
+        PostgresDataSaver, PostgresDataSaver.from_cfg(postgres_config)
+    )
+    assert postgres_saver.partition_policy is None
+    assert postgres_saver.maintenance_interval == 3600
+    postgres_saver.close()
+
+    # Test: 1.3 ( Invalid on_conflict action )
+    postgres_config.on_conflict = "replace"
+    assert PostgresDataSaver.from_cfg(postgres_config) is None
+    mock_logger.error.assert_called_once_with(
+        "Invalid on_conflict action: %s. No data will be saved.", "replace"
+    )
+    postgres_config.on_conflict = "ignore"
+
+    # Test: 1.4 ( Test NoBrokersAvailable exception )
+    mock_logger.reset_mock()
+    mock_consumer.side_effect = NoBrokersAvailable()
+    assert PostgresDataSaver.from_cfg(postgres_config) is None
+    mock_logger.error.assert_called_once_with(
+        "No Broker is available at the address: %s. No data will be saved.",
+        "localhost:9092",
+    )
+
+
+# Test: 2
+def test_copy_statements(mock_engine: MockType):
+    """
+    Test the writers copy the rows through the staging table of the bulk insert.
+    """
+    table = InstrumentPrice.__table__  # type: ignore
+
+    # Test: 2.1 ( Conflicts on the primary key are ignored )
+    writer = CopyWriter("writer_0", mock_engine)
+    assert (
+        writer.create_staging,
+        writer.copy,
+        writer.insert,
+    ) == get_bulk_statements(table)
+    assert writer.insert.endswith(
+        "ON CONFLICT (symbol, exchange_id, data_provider_id, retrieval_timestamp) "
+        "DO NOTHING"
+    )
+
+    # Test: 2.2 ( Conflicts on the primary key are updated )
+    writer.close()
+    writer = CopyWriter("writer_1", mock_engine, on_conflict="update")
+    assert writer.insert == get_bulk_statements(table, update_existing=True)[2]
+    writer.close()
+
+    # Test: 2.3 ( Invalid conflict action )
+    with pytest.raises(ValueError):
+        CopyWriter("writer_2", mock_engine, on_conflict="replace")
+
+
+# Test: 3
+def test_retrieve_and_save(
+    postgres_saver: PostgresDataSaver,
+    mock_engine: MockType,
+    kafka_data: list[dict],
+    set_messages: Callable,
+):
+    """
+    Test the ticks are copied in batches by the writer of their symbol.
+    """
+    messages = make_messages(kafka_data, 3) + make_messages(
+        [{**kafka_data[0], "symbol": "TCS"}], 2
+    )
+    set_messages(postgres_saver, messages)
+    postgres_saver.retrieve_and_save()
+
+    # Test: 3.1 ( Full batches and the remaining rows are copied )
+    stats = postgres_saver.stats()
+    assert stats["inserted_rows"] == 5
+    assert stats["batches"] == 3
+    assert stats["failed_rows"] == 0
+    assert sorted(len(rows) for rows in mock_engine.copied_rows) == [1, 2, 2]
+
+    # Test: 3.2 ( Symbols are split between the writers )
+    assert [writer.inserted_rows for writer in postgres_saver.writers] == [2, 3]
+
+    # Test: 3.3 ( Offsets are committed once the rows are inserted )
+    cast(MockType, postgres_saver.consumer).commit.assert_called_once()
+
+    # Test: 3.4 ( Rows are written in the column order with the NULL marker )
+    rows = [
+        dict(zip(INSTRUMENT_PRICE_COLUMNS, row))
+        for rows in mock_engine.copied_rows
+        for row in rows
+    ]
+    row = next(row for row in rows if row["symbol"] == "DBOL")
+    assert row["last_traded_price"] == "13468.0"
+    assert datetime.fromisoformat(
+        row["last_traded_timestamp"]
+    ) == datetime.fromtimestamp(1729504796, tz=timezone.utc)
+
+
+# Test: 4
+def test_save_batch_failure(
+    postgres_saver: PostgresDataSaver,
+    mock_engine: MockType,
+    mock_logger: MockType,
+    kafka_data: list[dict],
+):
+    """
+    Test a failed batch is counted as failed and the connection is replaced.
+    """
+    writer = postgres_saver.writers[0]
+    connection = mock_engine.raw_connection()
+    cursor = connection.cursor.return_value.__enter__.return_value
+    cursor.execute.side_effect = [None, Exception("foreign key violation")]
+    mock_engine.raw_connection.side_effect = None
+    mock_engine.raw_connection.return_value = connection
+
+    row = tuple(range(len(INSTRUMENT_PRICE_COLUMNS)))
+    assert writer.insert_rows([row, row]) == 0
+    assert writer.failed_rows == 2
+    connection.rollback.assert_called_once()
+    connection.close.assert_called_once()
+    mock_logger.error.assert_called_once()
+
+    postgres_saver.close()
+
+
+# Test: 5
+def test_copy_to_postgres(kafka_data: list[dict]):
+    """
+    Test the ticks are copied to a PostgreSQL database, if one is available.
+    """
+    # pylint: disable=import-outside-toplevel
+    from sqlmodel import Session
+
+    from app.data_layer.database.db_connections.postgresql import (
+        create_db_and_tables,
+        get_engine,
+    )
+    from app.data_layer.database.models import DataProvider, Exchange, Instrument
+
+    try:
+        engine = get_engine()
+        create_db_and_tables(engine)
+    except Exception:
+        pytest.skip("PostgreSQL database is not available")
+
+    tick = kafka_data[0]
+    with Session(engine) as session:
+        session.merge(Exchange(id=tick["exchange_id"], symbol="NSE"))
+        session.merge(DataProvider(id=tick["data_provider_id"], name="SMARTAPI"))
+        session.merge(
+            Instrument(
+                symbol=tick["symbol"],
+                exchange_id=tick["exchange_id"],
+                data_provider_id=tick["data_provider_id"],
+                token=tick["token"],
+                name=tick["symbol"],
+                instrument_type="EQ",
+            )
+        )
+        session.commit()
+
+    start = datetime(2024, 10, 21, 17, 33, 44)
+    query = (
+        "FROM instrumentprice WHERE symbol = :symbol AND retrieval_timestamp >= :start"
+    )
+    parameters = {"symbol": tick["symbol"], "start": start}
+    with engine.begin() as connection:
+        connection.execute(text(f"DELETE {query}"), parameters)
+
+    saver = PostgresDataSaver(None, engine, batch_size=2)  # type: ignore
+    ticks = [json.loads(message.value) for message in make_messages(kafka_data, 3)]
+    saver.save_batch(ticks * 2)
+    saver.close()
+
+    with engine.connect() as connection:
+        count = connection.execute(
+            text(f"SELECT count(*) {query}"), parameters
+        ).scalar()
+
+    # The duplicated ticks are ignored
+    assert count == 3
+    assert saver.stats()["failed_rows"] == 0
+
+
+# Test: 6
+def test_compact_schema(
+    mock_consumer: MockType,
+    mock_engine: MockType,
+    postgres_config: DictConfig,
+    mock_logger: MockType,
+    kafka_data: list[dict],
+    set_messages: Callable,
+    mocker: MockerFixture,
+):
+    """
+    Test the ticks are copied to the compact table as integers.
+    """
+    mock_consumer.return_value = mocker.MagicMock()
+
+    # Test: 6.1 ( Invalid schema )
+    postgres_config.schema = "narrow"
+    assert PostgresDataSaver.from_cfg(postgres_config) is None
+    mock_logger.error.assert_called_once_with(
+        "Invalid schema: %s. No data will be saved.", "narrow"
+    )
+
+    # Test: 6.2 ( Partitions not managed on the compact table )
+    postgres_config.schema = "compact"
+    postgres_config.partitions = {"interval": "day"}
+    postgres_saver = cast(
+        PostgresDataSaver, PostgresDataSaver.from_cfg(postgres_config)
+    )
+    assert postgres_saver.partition_policy is None
+    mock_logger.warning.assert_called_once()
+    assert "instrumentprice_compact" in postgres_saver.writers[0].insert
+
+    # Test: 6.3 ( Timestamps in epoch nanoseconds and prices in paise )
+    set_messages(postgres_saver, make_messages(kafka_data, 2))
+    postgres_saver.retrieve_and_save()
+
+    rows = [
+        dict(zip(COMPACT_COLUMNS, row))
+        for rows in mock_engine.copied_rows
+        for row in rows
+    ]
+    assert len(rows) == 2
+    assert rows[0]["retrieval_timestamp"] == "1729532024309936000"
+    assert rows[0]["last_traded_timestamp"] == "1729504796000000000"
+    assert rows[0]["last_traded_price"] == "13468"
+    assert rows[0]["total_buy_quantity"] == "0"
@@ -0,0 +1,188 @@
+import gzip
+import json
+from collections import namedtuple
+from datetime import datetime
+from pathlib import Path
+from typing import Callable
+
+import pytest
+from pytest_mock import MockerFixture
+
+from app.data_layer.data_saver import CSVDataSaver, JSONLDataSaver, SqliteDataSaver
+from app.data_layer.data_saver.rotation import (
+    RotationPolicy,
+    SegmentFinalizer,
+    SegmentManifest,
+)
+
+Message = namedtuple("Message", ["value"])
+
+
+# Test: 1
+def test_rotation_policy():
+    """
+    Test the periods and the size limit of the rotation policy.
+    """
+    now = datetime(2024, 10, 21, 9, 15)
+
+    assert RotationPolicy().get_period(now) == "2024_10_21"
+    assert RotationPolicy("hourly").get_period(now) == "2024_10_21_09"
+    assert RotationPolicy(None).get_period(now) == ""
+
+    # Test: 1.1 ( Size limit )
+    assert not RotationPolicy().is_full(10**9)
+    assert RotationPolicy(max_size_mb=1).is_full(1024 * 1024)
+    assert not RotationPolicy(max_size_mb=1).is_full(1024 * 1024 - 1)
+
+    # Test: 1.2 ( Finalizer only when compressing or writing a manifest )
+    assert RotationPolicy().create_finalizer() is None
+    assert isinstance(
+        RotationPolicy(compression="gzip").create_finalizer(), SegmentFinalizer
+    )
+
+    # Test: 1.3 ( Invalid period and compression )
+    with pytest.raises(ValueError):
+        RotationPolicy("weekly")
+
+    with pytest.raises(ValueError):
+        RotationPolicy(compression="lz4")
+
+
+# Test: 2
+def test_segment_finalizer(tmp_path: Path):
+    """
+    Test the closed segments are compressed and recorded in the manifest.
+    """
+    manifest_path = tmp_path / "manifest.jsonl"
+    finalizer = SegmentFinalizer("gzip", manifest_path=manifest_path)
+    file_path = tmp_path / "data_2024_10_21.csv"
+    file_path.write_text("symbol\nTCS\n")
+
+    finalizer.submit(file_path)
+    finalizer.close()
+
+    # Test: 2.1 ( Segment replaced by its compressed file )
+    compressed_path = tmp_path / "data_2024_10_21.csv.gz"
+    assert not file_path.exists()
+    assert gzip.decompress(compressed_path.read_bytes()) == b"symbol\nTCS\n"
+    assert finalizer.is_finalized(file_path)
+
+    # Test: 2.2 ( Manifest entry of the final file )
+    entries = SegmentManifest(manifest_path).read()
+    assert len(entries) == 1
+    assert entries[0]["path"] == str(compressed_path)
+    assert entries[0]["source"] == str(file_path)
+    assert entries[0]["source_size"] == 11
+    assert entries[0]["compression"] == "gzip"
+    assert file_path in SegmentManifest(manifest_path)
+
+    # Test: 2.3 ( Missing segment )
+    assert finalizer.finalize(tmp_path / "missing.csv") is None
+    assert finalizer.failed_files == 1
+
+
+# Test: 3
+def test_csv_rotation(
+    mocker: MockerFixture,
+    tmp_path: Path,
+    kafka_data: list[dict],
+):
+    """
+    Test the csv files are rotated when the period is over and finalized on close.
+    """
+    manifest_path = tmp_path / "manifest.jsonl"
+    saver = CSVDataSaver(
+        mocker.MagicMock(),
+        tmp_path / "data.csv",
+        rotation=RotationPolicy(compression="gzip", manifest_path=manifest_path),
+    )
+    saver.save(kafka_data[0])
+    first_path = saver.get_file_path("SNAP_QUOTE")
+
+    # Test: 3.1 ( No rotation within the period )
+    assert not saver.rotate_if_needed()
+
+    # Test: 3.2 ( New file once the period is over )
+    mocker.patch.object(saver.rotation, "get_period", return_value="2099_01_01")
+    assert saver.rotate_if_needed()
+
+    saver.save(kafka_data[0])
+    second_path = saver.get_file_path("SNAP_QUOTE")
+    assert second_path.name == "data_snap_quote_2099_01_01.csv"
+
+    # Test: 3.3 ( Closed files compressed and recorded in the manifest )
+    saver.close()
+    assert not first_path.exists()
+    assert not second_path.exists()
+    compressed_path = first_path.with_name(first_path.name + ".gz")
+    assert len(gzip.decompress(compressed_path.read_bytes()).splitlines()) == 2
+    assert [entry["source"] for entry in SegmentManifest(manifest_path).read()] == [
+        str(first_path),
+        str(second_path),
+    ]
+
+    # Test: 3.4 ( A finalized file is not written again )
+    assert saver.get_file_path("SNAP_QUOTE").name == "data_snap_quote_2099_01_01_1.csv"
+
+
+# Test: 4
+def test_size_rotation(
+    mocker: MockerFixture,
+    tmp_path: Path,
+    kafka_data: list[dict],
+    set_messages: Callable,
+):
+    """
+    Test a new jsonl file is started once the file reaches the size limit.
+    """
+    saver = JSONLDataSaver(
+        mocker.MagicMock(),
+        tmp_path / "data.jsonl",
+        rotation=RotationPolicy(max_size_mb=1e-4),
+    )
+    saver.commit_interval = 0
+    set_messages(
+        saver,
+        [Message(json.dumps(kafka_data[0]).encode("utf-8")) for _ in range(3)],
+    )
+    saver.retrieve_and_save()
+
+    # The file of the next part is created by the next write
+    period = saver.segment_period
+    assert saver.segment_part == 1
+    assert saver.jsonl_file_path.name == f"data_{period}_1.jsonl"
+    assert len((tmp_path / f"data_{period}.jsonl").read_text().splitlines()) == 3
+
+
+# Test: 5
+def test_sqlite_rotation(
+    mocker: MockerFixture,
+    tmp_path: Path,
+    kafka_data: list[dict],
+):
+    """
+    Test a new sqlite database is opened on rotation and the closed one is recorded.
+    """
+    manifest_path = tmp_path / "manifest.jsonl"
+    saver = SqliteDataSaver(
+        mocker.MagicMock(),
+        tmp_path / "data.sqlite3",
+        rotation=RotationPolicy(manifest_path=manifest_path),
+    )
+    first_path = saver.db_file_path
+    saver.save_stock_data(kafka_data[0])  # type: ignore
+
+    mocker.patch.object(saver.rotation, "get_period", return_value="2099_01_01")
+    assert saver.rotate_if_needed()
+    saver.close()
+
+    # Test: 5.1 ( Rows of the closed database inserted before the rotation )
+    assert saver.db_file_path.name == "data_2099_01_01.sqlite3"
+    assert saver.stats()["inserted_rows"] == 1
+    assert not first_path.with_name(first_path.name + "-wal").exists()
+
+    # Test: 5.2 ( Both databases recorded in the manifest )
+    assert [entry["source"] for entry in SegmentManifest(manifest_path).read()] == [
+        str(first_path),
+        str(saver.db_file_path),
+    ]
@@ -0,0 +1,268 @@
+import json
+from collections import namedtuple
+from pathlib import Path
+from typing import cast
+
+import pytest
+from kafka.errors import NoBrokersAvailable
+from omegaconf import DictConfig, OmegaConf
+from pytest_mock import MockerFixture, MockType
+
+from app.data_layer.data_saver import (
+    CSVDataSaver,
+    DataSaverRunner,
+    JSONLDataSaver,
+    SqliteDataSaver,
+)
+from app.data_layer.data_saver.data_saver import decode_messages
+
+Message = namedtuple("Message", ["value"])
+
+
+####################################### FIXTURES #######################################
+@pytest.fixture
+def mock_consumer(mocker: MockerFixture) -> MockType:
+    """
+    Mock the KafkaConsumer object.
+    """
+    return mocker.patch("app.data_layer.streaming.consumer.KafkaConsumer")
+
+
+@pytest.fixture
+def mock_logger(mocker: MockerFixture) -> MockType:
+    """
+    Mock the logger object of the runner.
+    """
+    return mocker.patch("app.data_layer.data_saver.runner.logger")
+
+
+@pytest.fixture
+def runner_config(tmp_path: Path) -> DictConfig:
+    """
+    Configuration of the runner and of the data savers.
+    """
+    return OmegaConf.create(
+        {
+            "runner": {
+                "group_name": "data_saver",
+                "max_records": 10,
+                "commit_interval": 0,
+                "streaming": {
+                    "kafka_topic": "test_topic",
+                    "kafka_server": "localhost:9092",
+                },
+            },
+            "data_saver": [
+                {
+                    "csv_saver": {
+                        "name": "csv_saver",
+                        "csv_file_path": str(tmp_path / "test.csv"),
+                        "poll": {"commit_interval": 0},
+                    }
+                },
+                {
+                    "jsonl_saver": {
+                        "name": "jsonl_saver",
+                        "jsonl_file_path": str(tmp_path / "test.jsonl"),
+                        "poll": {"commit_interval": 0},
+                    }
+                },
+                {
+                    "sqlite_saver": {
+                        "name": "sqlite_saver",
+                        "sqlite_db": str(tmp_path / "test.sqlite3"),
+                        "poll": {"commit_interval": 0},
+                    }
+                },
+            ],
+        }
+    )
+
+
+def make_batches(kafka_data: list[dict], count: int) -> list[dict]:
+    """
+    Create the poll results with one message each.
+    """
+    return [
+        {
+            "partition_0": [
+                Message(
+                    json.dumps(
+                        {**kafka_data[0], "retrieval_timestamp": 1729532024 + i}
+                    ).encode("utf-8")
+                )
+            ]
+        }
+        for i in range(count)
+    ]
+
+
+####################################### TESTS #######################################
+
+
+# Test: 1
+def test_from_cfg(
+    mocker: MockerFixture,
+    mock_consumer: MockType,
+    runner_config: DictConfig,
+    mock_logger: MockType,
+):
+    """
+    Test the runner creates a single consumer shared by the data savers.
+    """
+    mock_consumer.return_value = mocker.MagicMock()
+    runner = DataSaverRunner.from_cfg(runner_config.runner, runner_config.data_saver)
+
+    # Test: 1.1 ( Single consumer of the runner group )
+    assert runner is not None
+    mock_consumer.assert_called_once_with(
+        "test_topic",
+        bootstrap_servers="localhost:9092",
+        auto_offset_reset="earliest",
+        group_id="data_saver",
+        enable_auto_commit=False,
+    )
+
+    # Test: 1.2 ( All the data savers use the shared consumer )
+    assert list(runner.savers) == ["csv_saver", "jsonl_saver", "sqlite_saver"]
+    assert all(
+        saver.consumer is mock_consumer.return_value  # type: ignore
+        for saver in runner.savers.values()
+    )
+    runner.close()
+
+    # Test: 1.3 ( Test NoBrokersAvailable exception )
+    mock_consumer.side_effect = NoBrokersAvailable()
+    assert (
+        DataSaverRunner.from_cfg(runner_config.runner, runner_config.data_saver) is None
+    )
+    mock_logger.error.assert_called_once_with(
+        "No Broker is available at the address: %s. No data will be saved.",
+        "localhost:9092",
+    )
+
+
+# Test: 2
+def test_run(
+    mocker: MockerFixture,
+    mock_consumer: MockType,
+    runner_config: DictConfig,
+    kafka_data: list[dict],
+):
+    """
+    Test the messages are consumed once and saved by all the data savers.
+    """
+    consumer = mocker.MagicMock()
+    mock_consumer.return_value = consumer
+    runner = cast(
+        DataSaverRunner,
+        DataSaverRunner.from_cfg(runner_config.runner, runner_config.data_saver),
+    )
+    batches = make_batches(kafka_data, 3)
+
+    def poll(**kwargs):
+        if not batches:
+            runner.stop()
+            return {}
+        return batches.pop(0)
+
+    consumer.poll.side_effect = poll
+    csv_saver = cast(CSVDataSaver, runner.savers["csv_saver"])
+    jsonl_saver = cast(JSONLDataSaver, runner.savers["jsonl_saver"])
+    sqlite_saver = cast(SqliteDataSaver, runner.savers["sqlite_saver"])
+    runner.run()
+
+    # Test: 2.1 ( Each message is fetched once and saved by every data saver )
+    consumer.poll.assert_called_with(timeout_ms=1000, max_records=10)
+    assert runner.consumed_messages == 3
+    assert len(csv_saver.get_file_path("SNAP_QUOTE").read_text().splitlines()) == 4
+    assert len(jsonl_saver.jsonl_file_path.read_text().splitlines()) == 3
+    assert sqlite_saver.stats()["inserted_rows"] == 3
+
+    # Test: 2.2 ( Offsets are committed after the flushes and on close )
+    assert runner.committed_messages == 3
+    assert consumer.commit.call_count == 3
+    consumer.close.assert_called_once()
+
+
+# Test: 3
+def test_run_error(
+    mocker: MockerFixture,
+    mock_consumer: MockType,
+    mock_logger: MockType,
+    kafka_data: list[dict],
+):
+    """
+    Test the offsets are not committed when a data saver fails.
+    """
+    consumer = mocker.MagicMock()
+    consumer.poll.side_effect = make_batches(kafka_data, 2)
+    saver = mocker.MagicMock(commit_interval=0)
+    saver.save_batch.side_effect = [None, OSError("No space left on device")]
+
+    runner = DataSaverRunner(consumer, {"saver": saver}, commit_interval=60)
+    runner.run()
+
+    # Test: 3.1 ( Data saver failing )
+    assert runner.consumed_messages == 1
+    consumer.commit.assert_not_called()
+    saver.close.assert_called_once()
+    consumer.close.assert_called_once()
+    mock_logger.error.assert_called_once()
+
+    # Test: 3.2 ( Rows failed to be inserted by a data saver )
+    consumer.reset_mock()
+    consumer.poll.side_effect = make_batches(kafka_data, 1) + [OSError("stop")]
+    saver = mocker.MagicMock(commit_interval=0)
+    saver.check_failed_rows.side_effect = RuntimeError("1 rows failed to be saved")
+
+    runner = DataSaverRunner(consumer, {"saver": saver}, commit_interval=0)
+    runner.run()
+
+    assert runner.consumed_messages == 1
+    consumer.commit.assert_not_called()
+
+
+# Test: 4
+def test_commit_intervals(mocker: MockerFixture):
+    """
+    Test the data savers are flushed at their own interval and the offsets are
+    committed at the longest one.
+    """
+    mock_time = mocker.patch("app.data_layer.data_saver.runner.time")
+    mock_time.monotonic.return_value = 0.0
+    consumer = mocker.MagicMock()
+    fast_saver = mocker.MagicMock(commit_interval=1.0)
+    slow_saver = mocker.MagicMock(commit_interval=60.0)
+    runner = DataSaverRunner(
+        consumer, {"fast": fast_saver, "slow": slow_saver}, commit_interval=1.0
+    )
+    runner.consumed_messages = 5
+
+    # Test: 4.1 ( Only the data saver with a short interval is flushed )
+    mock_time.monotonic.return_value = 1.0
+    runner.commit()
+    fast_saver.flush.assert_called_once()
+    slow_saver.flush.assert_not_called()
+    slow_saver.check_failed_rows.assert_called_once()
+    consumer.commit.assert_not_called()
+
+    # Test: 4.2 ( All the data savers are flushed before the offsets are committed )
+    mock_time.monotonic.return_value = 60.0
+    runner.commit()
+    assert fast_saver.flush.call_count == 2
+    slow_saver.flush.assert_called_once()
+    slow_saver.rotate_if_needed.assert_called_once()
+    consumer.commit.assert_called_once()
+    assert runner.committed_messages == 5
+
+
+# Test: 5
+def test_decode_messages(mock_base_logger: MockType):
+    """
+    Test the invalid messages are skipped.
+    """
+    messages = [Message(b'{"symbol": "TCS"}'), Message(b"{invalid"), Message(None)]
+
+    assert decode_messages(messages) == [{"symbol": "TCS"}]
+    assert mock_base_logger.warning.call_count == 2
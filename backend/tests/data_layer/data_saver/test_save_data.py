@@ -6,7 +6,7 @@ from omegaconf import DictConfig, OmegaConf
 from pytest_mock import MockerFixture, MockType
 
 from app.data_layer.data_saver import CSVDataSaver, DataSaver
-from app.data_layer.data_saver.save_data import main
+from app.data_layer.data_saver.save_data import main, run_with_restarts
 
 #################### Fixtures ####################
 
@@ -38,7 +38,7 @@ def mock_csv_consumer(mocker: MockerFixture) -> MockType:
     """
     Mock the KafkaConsumer object.
     """
-    return mocker.patch("app.data_layer.data_saver.csv_saver.KafkaConsumer")
+    return mocker.patch("app.data_layer.streaming.consumer.KafkaConsumer")
 
 
 @pytest.fixture
@@ -103,6 +103,77 @@ def test_main_data_saver(
 
     main(data_saver_config)
 
-    mock_thread.assert_called_once_with(target=csv_saver.retrieve_and_save)
+    mock_thread.assert_called_once()
+    assert mock_thread.call_args.kwargs["target"] is run_with_restarts
+    assert mock_thread.call_args.kwargs["args"][:2] == ("csv_saver", csv_saver)
     mock_thread().start.assert_called_once()
     mock_thread().join.assert_called_once()
+
+
+# Test: 2
+def test_main_shared_consumer(mocker: MockerFixture, data_saver_config: DictConfig):
+    """
+    Test the main function runs the data savers with a shared consumer.
+    """
+    data_saver_config.shared_consumer = True
+    data_saver_config.runner = {"group_name": "data_saver"}
+    mock_runner = mocker.patch("app.data_layer.data_saver.save_data.DataSaverRunner")
+    mock_thread = mocker.patch("app.data_layer.data_saver.save_data.Thread")
+
+    main(data_saver_config)
+
+    mock_runner.from_cfg.assert_called_once_with(
+        data_saver_config.runner, data_saver_config.data_saver
+    )
+    mock_runner.from_cfg.return_value.run.assert_called_once()
+    mock_thread.assert_not_called()
+
+
+# Test: 3
+def test_main_process_mode(mocker: MockerFixture, data_saver_config: DictConfig):
+    """
+    Test the main function runs the data savers in processes under the supervisor.
+    """
+    data_saver_config.execution = {"mode": "process", "processes": {"csv_saver": 2}}
+    mock_supervisor = mocker.patch(
+        "app.data_layer.data_saver.save_data.SaverSupervisor"
+    )
+    mock_thread = mocker.patch("app.data_layer.data_saver.save_data.Thread")
+
+    main(data_saver_config)
+
+    mock_supervisor.from_cfg.assert_called_once_with(
+        data_saver_config.execution, data_saver_config.data_saver
+    )
+    mock_supervisor.from_cfg.return_value.run.assert_called_once()
+    mock_thread.assert_not_called()
+
+
+# Test: 4
+def test_run_with_restarts(mocker: MockerFixture):
+    """
+    Test the data saver is created again when it stops on an error.
+    """
+    mock_sleep = mocker.patch("app.data_layer.data_saver.save_data.time.sleep")
+    mock_logger = mocker.patch("app.data_layer.data_saver.save_data.logger")
+    savers = [mocker.MagicMock(), None, mocker.MagicMock()]
+    savers[0].retrieve_and_save.return_value = False
+    savers[2].retrieve_and_save.return_value = True
+    create = mocker.MagicMock(side_effect=savers[1:])
+
+    run_with_restarts(
+        "csv_saver",
+        savers[0],
+        create,
+        lambda saver: saver.retrieve_and_save(),
+        restart_delay=1.0,
+        max_restart_delay=3.0,
+    )
+
+    # Test: 4.1 ( Restarted until the data saver stops without an error )
+    assert create.call_count == 2
+    savers[2].retrieve_and_save.assert_called_once()
+
+    # Test: 4.2 ( The delay is doubled at each restart up to the maximum )
+    assert [call.args[0] for call in mock_sleep.call_args_list] == [1.0, 2.0]
+    assert mock_logger.error.call_count == 2
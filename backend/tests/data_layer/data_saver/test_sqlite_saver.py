@@ -2,7 +2,7 @@ import json
 from collections import namedtuple
 from datetime import datetime
 from tempfile import TemporaryDirectory
-from typing import cast
+from typing import Callable, cast
 
 import pytest
 from kafka.errors import NoBrokersAvailable
@@ -24,7 +24,7 @@ def mock_consumer(mocker: MockerFixture) -> MockType:
     """
     Mock the KafkaConsumer object.
     """
-    return mocker.patch("app.data_layer.data_saver.sqlite_saver.KafkaConsumer")
+    return mocker.patch("app.data_layer.streaming.consumer.KafkaConsumer")
 
 
 @pytest.fixture
@@ -89,6 +89,8 @@ def validate_init(
         sqlite_config.streaming.kafka_topic,
         bootstrap_servers=sqlite_config.streaming.kafka_server,
         auto_offset_reset="earliest",
+        group_id="sqlite_saver",
+        enable_auto_commit=False,
     )
 
 
@@ -119,6 +121,8 @@ def test_init(
         sqlite_config.streaming.kafka_topic,
         bootstrap_servers=sqlite_config.streaming.kafka_server,
         auto_offset_reset="earliest",
+        group_id="sqlite_saver",
+        enable_auto_commit=False,
     )
     sqlite_saver = SqliteDataSaver(consumer, sqlite_config.sqlite_db)
     validate_init(sqlite_saver, mock_consumer, sqlite_config)
@@ -136,11 +140,15 @@ def test_init(
         sqlite_config.streaming.kafka_topic,
         bootstrap_servers=sqlite_config.streaming.kafka_server,
         auto_offset_reset="earliest",
+        group_id="sqlite_saver",
+        enable_auto_commit=False,
     )
 
 
 # Test: 2
-def test_retrieve_and_save(sqlite_saver: SqliteDataSaver, kafka_data: list[dict]):
+def test_retrieve_and_save(
+    sqlite_saver: SqliteDataSaver, kafka_data: list[dict], set_messages: Callable
+):
     """
     Test the `retrieve_and_save` method of the SqliteDataSaver.
     """
@@ -149,10 +157,10 @@ def test_retrieve_and_save(sqlite_saver: SqliteDataSaver, kafka_data: list[dict]
     ]
 
     # Test: 2.1 ( Test saving data to the sqlite database )
-    sqlite_saver.consumer.__iter__.return_value = encoded_data
+    set_messages(sqlite_saver, encoded_data)
     sqlite_saver.retrieve_and_save()
 
-    assert sqlite_saver.consumer.__iter__.call_count == 1
+    cast(MockType, sqlite_saver.consumer).commit.assert_called_once()
 
     with get_session(sqlite_saver.engine) as session:
         stock_price_info = get_all_stock_price_info(session=session)
@@ -178,3 +186,102 @@ def test_save_stock_data_validation(sqlite_saver):
     for _, data in invalid_data.items():
         with pytest.raises(KeyError):
             sqlite_saver.save_stock_data(data)
+
+
+# Test: 3
+def test_save_batch(
+    mock_consumer: MockType, sqlite_config: DictConfig, kafka_data: list[dict]
+):
+    """
+    Test the batched insertion of the SqliteDataSaver.
+    """
+    sqlite_config.batch_size = 2
+    sqlite_config.flush_interval_ms = 60000
+    sqlite_saver = cast(SqliteDataSaver, SqliteDataSaver.from_cfg(sqlite_config))
+    ticks = [
+        json.dumps({**kafka_data[0], "retrieval_timestamp": str(1729506514 + i)})
+        for i in range(2)
+    ]
+
+    def count_rows() -> int:
+        with get_session(sqlite_saver.engine) as session:
+            return len(get_all_stock_price_info(session=session))
+
+    # Test: 3.1 ( Rows wait in the batch until it is full )
+    sqlite_saver.save(ticks[0].encode("utf-8"))
+    assert count_rows() == 0
+
+    sqlite_saver.save(ticks[1].encode("utf-8"))
+    assert count_rows() == 2
+
+    # Test: 3.2 ( Duplicate rows are ignored and the remaining rows are flushed )
+    sqlite_saver.save(ticks[0].encode("utf-8"))
+    sqlite_saver.close()
+    assert count_rows() == 2
+
+    # Test: 3.3 ( Stats )
+    stats = sqlite_saver.stats()
+    assert stats["batches"] == 2
+    assert stats["inserted_rows"] == 3
+    assert stats["failed_rows"] == 0
+    assert stats["max_commit_ms"] >= stats["avg_commit_ms"] > 0
+
+    # Test: 3.4 ( Failed batch )
+    row = {
+        "symbol": "INFY",
+        "exchange_id": 1,
+        "data_provider_id": 1,
+        "retrieval_timestamp": datetime.now(),
+    }
+    assert sqlite_saver.insert_rows([row]) == 0
+    assert sqlite_saver.stats()["failed_rows"] == 1
+
+
+# Test: 4
+def test_sqlite_pragmas(mock_consumer: MockType, sqlite_config: DictConfig):
+    """
+    Test the pragmas set on the database connections.
+    """
+    sqlite_saver = cast(SqliteDataSaver, SqliteDataSaver.from_cfg(sqlite_config))
+
+    # Test: 4.1 ( Default pragmas )
+    with sqlite_saver.engine.connect() as connection:
+        assert connection.exec_driver_sql("PRAGMA journal_mode").scalar() == "wal"
+        assert connection.exec_driver_sql("PRAGMA synchronous").scalar() == 1
+    sqlite_saver.close()
+
+    # Test: 4.2 ( Pragmas from the configuration )
+    sqlite_config.pragmas = {"synchronous": "FULL"}
+    sqlite_saver = cast(SqliteDataSaver, SqliteDataSaver.from_cfg(sqlite_config))
+    with sqlite_saver.engine.connect() as connection:
+        assert connection.exec_driver_sql("PRAGMA synchronous").scalar() == 2
+    sqlite_saver.close()
+
+    # Test: 4.3 ( Invalid pragma name )
+    with pytest.raises(ValueError):
+        SqliteDataSaver(mock_consumer(), sqlite_config.sqlite_db, pragmas={"a b": 1})
+
+
+# Test: 5
+def test_failed_insert_not_committed(
+    sqlite_saver: SqliteDataSaver,
+    kafka_data: list[dict],
+    set_messages: Callable,
+    mock_base_logger: MockType,
+    mocker: MockerFixture,
+):
+    """
+    Test the offsets are not committed when the ticks failed to be inserted.
+    """
+    mock_engine = mocker.patch.object(sqlite_saver, "engine")
+    mock_engine.begin.side_effect = Exception("disk I/O error")
+    set_messages(
+        sqlite_saver,
+        [Message(value=json.dumps(data).encode("utf-8")) for data in kafka_data],
+    )
+    sqlite_saver.retrieve_and_save()
+
+    assert sqlite_saver.stats()["failed_rows"] == 1
+    cast(MockType, sqlite_saver.consumer).commit.assert_not_called()
+    assert sqlite_saver.committed_messages == 0
+    mock_base_logger.error.assert_called()
@@ -0,0 +1,189 @@
+import sys
+import time
+from pathlib import Path
+from threading import Thread
+
+import pytest
+from omegaconf import OmegaConf
+from pytest_mock import MockerFixture, MockType
+
+from app.data_layer.data_saver.supervisor import (
+    SaverSupervisor,
+    get_replica_config,
+    run_saver_process,
+)
+
+
+####################################### FIXTURES #######################################
+@pytest.fixture
+def mock_logger(mocker: MockerFixture) -> MockType:
+    """
+    Mock the logger object of the supervisor.
+    """
+    return mocker.patch("app.data_layer.data_saver.supervisor.logger")
+
+
+def crash_once(name, config, replica, metrics_queue, metrics_interval):
+    """
+    Process target crashing at its first start, then sending its metrics and
+    waiting to be terminated.
+    """
+    marker = Path(f"{config['marker']}_{replica}")
+
+    if not marker.exists():
+        marker.write_text("started", encoding="utf-8")
+        sys.exit(1)
+
+    metrics_queue.put((name, replica, {"consumed_messages": 5, "max_commit_ms": 2}))
+    time.sleep(60)
+
+
+####################################### TESTS #######################################
+
+
+# Test: 1
+def test_get_replica_config():
+    """
+    Test the extra processes of a data saver write to their own files.
+    """
+    config = {
+        "name": "csv_saver",
+        "csv_file_path": "/data/csv_saver.csv",
+        "sqlite_db": "/data/sqlite_db",
+    }
+
+    assert get_replica_config(config, 0) == config
+    assert get_replica_config(config, 2) == {
+        "name": "csv_saver",
+        "csv_file_path": "/data/csv_saver_2.csv",
+        "sqlite_db": "/data/sqlite_db_2",
+    }
+
+    # Test: 1.1 ( Paths of the nested sections )
+    config = {
+        "name": "candle_saver",
+        "state_file_path": "/data/candles_state.json",
+        "sink": {"name": "csv_candle_sink", "csv_file_path": "/data/candles.csv"},
+        "rotation": None,
+    }
+
+    assert get_replica_config(config, 1) == {
+        "name": "candle_saver",
+        "state_file_path": "/data/candles_state_1.json",
+        "sink": {"name": "csv_candle_sink", "csv_file_path": "/data/candles_1.csv"},
+        "rotation": None,
+    }
+    assert config["sink"]["csv_file_path"] == "/data/candles.csv"
+
+
+# Test: 2
+def test_from_cfg(mock_logger: MockType):
+    """
+    Test the supervisor creates the processes of each data saver.
+    """
+    savers_cfg = OmegaConf.create(
+        [
+            {"csv_saver": {"name": "csv_saver", "csv_file_path": "/data/test.csv"}},
+            {"jsonl_saver": {"name": "jsonl_saver"}},
+            {"sqlite_saver": {"name": "sqlite_saver"}},
+        ]
+    )
+    execution_cfg = OmegaConf.create(
+        {"mode": "process", "processes": {"csv_saver": 2, "sqlite_saver": 0}}
+    )
+
+    supervisor = SaverSupervisor.from_cfg(execution_cfg, savers_cfg)
+
+    # Test: 2.1 ( Processes by data saver, none for the disabled ones )
+    assert supervisor is not None
+    assert [str(process) for process in supervisor.processes] == [
+        "csv_saver[0]",
+        "csv_saver[1]",
+        "jsonl_saver[0]",
+    ]
+    assert supervisor.processes[1].config["csv_file_path"] == "/data/test_1.csv"
+
+    # Test: 2.2 ( No data saver to run )
+    execution_cfg.processes = {"csv_saver": 0, "jsonl_saver": 0, "sqlite_saver": 0}
+    assert SaverSupervisor.from_cfg(execution_cfg, savers_cfg) is None
+    mock_logger.error.assert_called_once_with(
+        "No data saver to run. No data will be saved."
+    )
+
+    # Test: 2.3 ( Several processes of a data saver not consuming from Kafka )
+    mock_logger.reset_mock()
+    savers_cfg[0].csv_saver.streaming = {"name": "segment_log"}
+    execution_cfg.processes = {"csv_saver": 2}
+    assert SaverSupervisor.from_cfg(execution_cfg, savers_cfg) is None
+    mock_logger.error.assert_called_once()
+
+    execution_cfg.processes = {"csv_saver": 1}
+    assert SaverSupervisor.from_cfg(execution_cfg, savers_cfg) is not None
+
+
+# Test: 3
+def test_restart_on_crash(tmp_path: Path, mock_logger: MockType):
+    """
+    Test the processes are restarted after a crash and their metrics aggregated.
+    """
+    supervisor = SaverSupervisor(
+        {"csv_saver": ({"marker": str(tmp_path / "marker")}, 2)},
+        start_method="fork",
+        restart_delay=0.1,
+        target=crash_once,
+    )
+    thread = Thread(target=supervisor.run)
+    thread.start()
+
+    deadline = time.monotonic() + 20
+    while len(supervisor.latest_metrics) < 2 and time.monotonic() < deadline:
+        time.sleep(0.1)
+
+    supervisor.stop()
+    thread.join()
+
+    # Test: 3.1 ( Each process restarted once )
+    metrics = supervisor.metrics()["csv_saver"]
+    assert metrics["restarts"] == 2
+    assert mock_logger.error.call_count == 2
+
+    # Test: 3.2 ( Metrics summed, maximum latencies kept )
+    assert metrics["consumed_messages"] == 10
+    assert metrics["max_commit_ms"] == 2
+
+    # Test: 3.3 ( Processes terminated on stop )
+    assert metrics["processes"] == 0
+    assert all(
+        saver_process.process.exitcode != 0 for saver_process in supervisor.processes
+    )
+
+
+# Test: 4
+def test_run_saver_process(mocker: MockerFixture):
+    """
+    Test the process exits with an error when the data saver can't run.
+    """
+    mocker.patch("app.data_layer.data_saver.supervisor.signal.signal")
+    mock_init_from_cfg = mocker.patch(
+        "app.data_layer.data_saver.supervisor.init_from_cfg"
+    )
+    metrics_queue = mocker.MagicMock()
+
+    # Test: 4.1 ( Data saver stopped on an error )
+    saver = mock_init_from_cfg.return_value
+    saver.metrics.return_value = {"consumed_messages": 1}
+    with pytest.raises(SystemExit) as exc_info:
+        run_saver_process("csv_saver", {}, 0, metrics_queue, 60)
+
+    assert exc_info.value.code == 1
+    saver.retrieve_and_save.assert_called_once()
+    metrics_queue.put.assert_called_once_with(
+        ("csv_saver", 0, {"consumed_messages": 1})
+    )
+
+    # Test: 4.2 ( Data saver not created )
+    mock_init_from_cfg.return_value = None
+    with pytest.raises(SystemExit) as exc_info:
+        run_saver_process("csv_saver", {}, 0, metrics_queue, 60)
+
+    assert exc_info.value.code == 1
@@ -1,28 +1,40 @@
 # pylint: disable=missing-function-docstring line-too-long unused-argument
-"""" 
+""" "
 This module contains tests for the smartapi_crud.py module in the sqlite/crud directory.
 """
 
+import csv
+from contextlib import nullcontext
 from copy import deepcopy
+from datetime import datetime
+from typing import Sequence, cast
 from unittest.mock import MagicMock
 
 import pytest
 from fastapi import HTTPException
 from sqlalchemy.exc import OperationalError
-from sqlmodel import select
+from sqlalchemy.pool import StaticPool
+from sqlmodel import SQLModel, select
 
 from app.data_layer.database.crud.crud_utils import (
+    COPY_NULL,
+    _bulk_insert,
     _insert_or_ignore,
     _upsert,
+    get_bulk_statements,
     get_conditions_list,
     get_data_by_all_conditions,
+    get_data_by_all_conditions_async,
     get_data_by_any_condition,
+    get_data_by_any_condition_async,
     insert_data,
+    rows_to_copy_csv,
     validate_model_attributes,
 )
-from app.data_layer.database.models import Instrument, InstrumentPrice
+from app.data_layer.database.db_connections import postgresql
+from app.data_layer.database.models import DataProvider, Instrument, InstrumentPrice
 from app.utils.common.types.financial_types import DataProviderType, ExchangeType
-from app.utils.constants import INSERTION_BATCH_SIZE
+from app.utils.constants import BULK_INSERTION_THRESHOLD, INSERTION_BATCH_SIZE
 
 #################### TESTS ####################
 
@@ -427,3 +439,138 @@ def test_insert_data_with_dummy_session():
     mock_session.bind.dialect.name = "mysql"
     with pytest.raises(ValueError):
         insert_data(Instrument, {"token": "123"}, session=mock_session)
+
+
+def test_bulk_statements():
+    """
+    Test the statements and the CSV rows of the bulk copy through a staging table.
+    """
+    create_staging, copy, insert = get_bulk_statements(Instrument.__table__)
+
+    assert "TEMP TABLE IF NOT EXISTS instrument_staging" in create_staging
+    assert "ON COMMIT DELETE ROWS" in create_staging
+    assert copy.endswith("FROM STDIN WITH (FORMAT csv, NULL '\\N')")
+    assert insert.endswith(
+        "ON CONFLICT (symbol, exchange_id, data_provider_id) DO NOTHING"
+    )
+
+    _, _, insert = get_bulk_statements(Instrument.__table__, update_existing=True)
+    assert "SELECT DISTINCT ON (symbol, exchange_id, data_provider_id)" in insert
+    assert "token = EXCLUDED.token" in insert
+    assert "symbol = EXCLUDED.symbol" not in insert
+
+    # Empty strings are kept, None is written as the NULL marker
+    buffer = rows_to_copy_csv([["INFY", "", None, 5.0]])
+    assert buffer.read() == "INFY,,\\N,5.0\r\n"
+
+
+def test_bulk_insert_with_dummy_session(sample_instrument):
+    """
+    Test the large batches are copied to PostgreSQL in a single transaction.
+    """
+    mock_session = MagicMock()
+    mock_session.bind.dialect.name = "postgresql"
+    cursor = (
+        mock_session.connection().connection.cursor.return_value.__enter__.return_value
+    )
+    data = [sample_instrument] * BULK_INSERTION_THRESHOLD
+
+    assert insert_data(Instrument, data, session=mock_session, update_existing=True)
+
+    create_staging, copy, insert = get_bulk_statements(Instrument.__table__, True)
+    assert [call.args[0] for call in cursor.execute.call_args_list] == [
+        create_staging,
+        insert,
+    ]
+    copy_statement, buffer = cursor.copy_expert.call_args.args
+    assert copy_statement == copy
+    assert len(buffer.getvalue().splitlines()) == BULK_INSERTION_THRESHOLD
+    mock_session.commit.assert_called_once()
+
+    # The failed copy is rolled back
+    cursor.copy_expert.side_effect = OperationalError("COPY", {}, Exception())
+    with pytest.raises(OperationalError):
+        _bulk_insert(Instrument, data, session=mock_session)
+    mock_session.rollback.assert_called_once()
+
+
+def test_bulk_insert_with_model_defaults():
+    """
+    Test the columns missing from the dictionaries are copied with the defaults of
+    the model instead of NULL.
+    """
+    mock_session = MagicMock()
+    mock_session.bind.dialect.name = "postgresql"
+    cursor = (
+        mock_session.connection().connection.cursor.return_value.__enter__.return_value
+    )
+
+    _bulk_insert(DataProvider, [{"id": 1, "name": "SMARTAPI"}], session=mock_session)
+
+    _, buffer = cursor.copy_expert.call_args.args
+    provider_id, name, last_updated = next(csv.reader(buffer))
+    assert (provider_id, name) == ("1", "SMARTAPI")
+    assert last_updated != COPY_NULL
+    assert datetime.fromisoformat(last_updated).tzinfo is not None
+
+
+@pytest.mark.asyncio
+async def test_get_data_async(sample_instrument):
+    """
+    Test the async variants of the query functions with an async session, if the
+    async sqlite driver is installed.
+    """
+    pytest.importorskip("aiosqlite")
+    # pylint: disable=import-outside-toplevel
+    from sqlalchemy.ext.asyncio import create_async_engine
+
+    engine = create_async_engine("sqlite+aiosqlite:///:memory:", poolclass=StaticPool)
+    async with engine.begin() as connection:
+        await connection.run_sync(SQLModel.metadata.create_all)
+
+    async with postgresql.get_async_session(engine) as session:
+        session.add(sample_instrument)
+        await session.commit()
+
+        results = cast(
+            Sequence[Instrument],
+            await get_data_by_any_condition_async(
+                Instrument, session=session, token="1594", symbol="TCS"
+            ),
+        )
+        assert [result.token for result in results] == ["1594"]
+
+        results = await get_data_by_all_conditions_async(
+            Instrument, session=session, token="1594", symbol="TCS"
+        )
+        assert not results
+
+        with pytest.raises(HTTPException):
+            await get_data_by_all_conditions_async(Instrument, session=session)
+
+    await engine.dispose()
+
+
+@pytest.mark.asyncio
+async def test_get_data_async_without_async_driver(
+    session, monkeypatch, create_insert_sample_data
+):
+    """
+    Test the async variants of the query functions run the synchronous variants
+    when the async driver is not installed.
+    """
+    # The session is created by the decorator
+    # pylint: disable=no-value-for-parameter
+    monkeypatch.setattr(postgresql, "is_async_driver_available", lambda: False)
+    monkeypatch.setattr(postgresql, "get_session", lambda: nullcontext(session))
+
+    results = cast(
+        Sequence[Instrument],
+        await get_data_by_all_conditions_async(
+            Instrument, symbol="INFY", exchange_id=ExchangeType.BSE.value
+        ),
+    )
+    assert [result.token for result in results] == ["1020"]
+
+    results = await get_data_by_any_condition_async(InstrumentPrice, symbol="INFY")
+    assert len(results) == 1
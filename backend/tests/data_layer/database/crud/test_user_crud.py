@@ -1,23 +1,35 @@
-""" 
+"""
 This script tests the CRUD operations for the User model in the PostgreSQL database.
 """
 
+import threading
 from datetime import date, datetime, timezone
 
 import pytest
 from fastapi import HTTPException
+from pytest import MonkeyPatch
+from pytest_mock import MockerFixture
+from sqlalchemy.pool import StaticPool
 from sqlmodel import SQLModel, create_engine
 
 from app.data_layer.database.crud.user_crud import (
     create_or_update_user_verification,
+    create_or_update_user_verification_async,
     create_user,
+    create_user_async,
     delete_user,
     get_user,
+    get_user_async,
     get_user_by_attr,
+    get_user_by_attr_async,
     get_user_verification,
+    get_user_verification_async,
     is_attr_data_in_db,
+    is_attr_data_in_db_async,
     update_user,
+    update_user_async,
 )
+from app.data_layer.database.db_connections import postgresql
 from app.data_layer.database.db_connections.postgresql import get_session
 from app.data_layer.database.models.user_model import Gender, User, UserVerification
 
@@ -242,3 +254,81 @@ def test_get_user_verification(session):
 
     # Test: 8.2 ( Check if the user verification does not exist )
     assert get_user_verification("sampleuser@gmail.com", session=session) is None
+
+
+# Test: 9
+@pytest.mark.asyncio
+async def test_async_crud_without_async_driver(
+    test_user, monkeypatch: MonkeyPatch, mocker: MockerFixture
+):
+    """
+    Test the async variants run the synchronous operations in a worker thread when
+    the async driver is not installed.
+    """
+    # The session is created by the decorator
+    # pylint: disable=no-value-for-parameter
+    engine = create_engine(
+        "sqlite:///:memory:",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+    SQLModel.metadata.create_all(engine)
+
+    threads = []
+
+    def get_test_session():
+        threads.append(threading.get_ident())
+        return get_session(engine)
+
+    monkeypatch.setattr(postgresql, "is_async_driver_available", lambda: False)
+    monkeypatch.setattr(postgresql, "get_session", get_test_session)
+    mock_async_session = mocker.patch.object(postgresql, "get_async_session")
+
+    await create_user_async(test_user)
+    user = await get_user_by_attr_async("email", TEST_EMAIL)
+    assert user.user_id == test_user.user_id
+
+    await update_user_async(test_user.user_id, {"username": "asyncuser"})
+    assert (await get_user_async(test_user.user_id)).username == "asyncuser"
+    assert await is_attr_data_in_db_async(User, {"email": TEST_EMAIL})
+
+    assert threading.get_ident() not in threads
+    mock_async_session.assert_not_called()
+
+
+# Test: 10
+@pytest.mark.asyncio
+async def test_async_crud_with_async_session(test_user):
+    """
+    Test the async variants with an async session, if the async sqlite driver is
+    installed.
+    """
+    pytest.importorskip("aiosqlite")
+    # pylint: disable=import-outside-toplevel
+    from sqlalchemy.ext.asyncio import create_async_engine
+
+    engine = create_async_engine("sqlite+aiosqlite:///:memory:", poolclass=StaticPool)
+    async with engine.begin() as connection:
+        await connection.run_sync(SQLModel.metadata.create_all)
+
+    async with postgresql.get_async_session(engine) as session:
+        # Test: 10.1 ( Users )
+        await create_user_async(test_user, session=session)
+        user = await get_user_by_attr_async("email", TEST_EMAIL, session=session)
+        assert user.user_id == test_user.user_id
+
+        with pytest.raises(HTTPException) as http_exe:
+            await get_user_async(1, session=session)
+        assert http_exe.value.status_code == 404
+
+        # Test: 10.2 ( User verifications )
+        await create_or_update_user_verification_async(
+            UserVerification(
+                email=TEST_EMAIL, verification_code="123456", expiration_time=1
+            ),
+            session=session,
+        )
+        result = await get_user_verification_async(TEST_EMAIL, session=session)
+        assert result.verification_code == "123456"  # type: ignore
+
+    await engine.dispose()
@@ -13,6 +13,7 @@ from app.data_layer.database.db_connections.postgresql import (
     get_session,
 )
 from app.data_layer.database.models import (
+    CompactInstrumentPrice,
     DataProvider,
     Exchange,
     Instrument,
@@ -34,6 +35,7 @@ POSTGRES_DB = "POSTGRES_DB"
 model_classes = {
     "instrument": Instrument,
     "instrumentprice": InstrumentPrice,
+    "instrumentprice_compact": CompactInstrumentPrice,
     "user": User,
     "userverification": UserVerification,
     "dataprovider": DataProvider,
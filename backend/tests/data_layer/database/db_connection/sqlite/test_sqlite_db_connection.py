@@ -9,6 +9,7 @@ from app.data_layer.database.db_connections.sqlite import (
     get_session,
 )
 from app.data_layer.database.models import (
+    CompactInstrumentPrice,
     DataProvider,
     Exchange,
     Instrument,
@@ -20,6 +21,7 @@ from app.data_layer.database.models import (
 model_classes = {
     "instrument": Instrument,
     "instrumentprice": InstrumentPrice,
+    "instrumentprice_compact": CompactInstrumentPrice,
     "user": User,
     "userverification": UserVerification,
     "dataprovider": DataProvider,
@@ -0,0 +1,194 @@
+from datetime import datetime, timezone
+
+import pytest
+from sqlalchemy.engine import Engine
+from sqlmodel import Session, col, select
+
+from app.data_layer.database.compact_prices import (
+    COMPACT_COLUMNS,
+    decode_row,
+    encode_tick,
+    encode_tick_row,
+    from_epoch_ns,
+    migrate_instrument_prices,
+    to_epoch_ns,
+    to_paise,
+)
+from app.data_layer.database.crud.crud_utils import insert_data
+from app.data_layer.database.models import (
+    CompactInstrumentPrice,
+    Instrument,
+    InstrumentPrice,
+)
+from app.utils.common.types.financial_types import DataProviderType, ExchangeType
+
+NSE = ExchangeType.NSE.value
+SMARTAPI = DataProviderType.SMARTAPI.value
+UPLINK = DataProviderType.UPLINK.value
+
+
+####################################### FIXTURES #######################################
+@pytest.fixture
+def tick() -> dict:
+    """
+    Tick of the SmartAPI socket, with the price in paise.
+    """
+    return {
+        "retrieval_timestamp": "1729532024.309936",
+        "last_traded_timestamp": 1729504796,
+        "symbol": "DBOL",
+        "exchange_id": NSE,
+        "data_provider_id": SMARTAPI,
+        "last_traded_price": 13468,
+        "last_traded_quantity": 414,
+        "average_traded_price": 13529,
+        "volume_trade_for_the_day": 131137,
+        "total_buy_quantity": 0.2,
+        "total_sell_quantity": 0.1,
+    }
+
+
+####################################### TESTS #######################################
+
+
+# Test: 1
+def test_timestamps():
+    """
+    Test the timestamps of the ticks are converted to epoch nanoseconds and back.
+    """
+    # Test: 1.1 ( Epoch seconds, milliseconds and nanoseconds )
+    assert to_epoch_ns("1729532024.309936") == 1729532024309936000
+    assert to_epoch_ns("1729532024") == 1729532024000000000
+    assert to_epoch_ns(1729532024.309936) == 1729532024309936000
+    assert to_epoch_ns(1729504796) == 1729504796000000000
+    assert to_epoch_ns("1729506514000") == 1729506514000000000
+    assert to_epoch_ns(1729506514000000000) == 1729506514000000000
+
+    # Test: 1.2 ( Datetimes, the naive ones are UTC )
+    timestamp = datetime(2024, 10, 21, 17, 33, 44, 309936, tzinfo=timezone.utc)
+    assert to_epoch_ns(timestamp) == 1729532024309936000
+    assert to_epoch_ns(timestamp.replace(tzinfo=None)) == 1729532024309936000
+    assert from_epoch_ns(1729532024309936999) == timestamp
+
+    # Test: 1.3 ( Missing and invalid timestamps )
+    assert to_epoch_ns(-1) == -1
+    assert to_epoch_ns(None) == -1
+    assert from_epoch_ns(-1) is None
+    with pytest.raises(ValueError):
+        to_epoch_ns("yesterday")
+
+
+# Test: 2
+def test_encode_tick(tick: dict):
+    """
+    Test the ticks are converted to the values of the compact table and back.
+    """
+    # Test: 2.1 ( SmartAPI prices are in paise )
+    values = encode_tick(tick)
+    assert values == {
+        "retrieval_timestamp": 1729532024309936000,
+        "last_traded_timestamp": 1729504796000000000,
+        "last_traded_price": 13468,
+        "last_traded_quantity": 414,
+        "average_traded_price": 13529,
+        "volume_trade_for_the_day": 131137,
+        "total_buy_quantity": 0,
+        "total_sell_quantity": 0,
+        "exchange_id": NSE,
+        "data_provider_id": SMARTAPI,
+        "symbol": "DBOL",
+    }
+    assert encode_tick_row(tick) == tuple(values[column] for column in COMPACT_COLUMNS)
+
+    # Test: 2.2 ( Upstox prices are in rupees )
+    assert to_paise(2000.55, UPLINK) == 200055
+    assert to_paise(-1, UPLINK) == -1
+
+    # Test: 2.3 ( Decoded to datetimes and the SmartAPI prices in paise )
+    decoded = decode_row(CompactInstrumentPrice(**values))
+    assert decoded["retrieval_timestamp"] == datetime(
+        2024, 10, 21, 17, 33, 44, 309936, tzinfo=timezone.utc
+    )
+    assert decoded["last_traded_price"] == 13468
+    assert decoded["average_traded_price"] == 13529
+
+    # Test: 2.4 ( Upstox prices round trip in rupees )
+    upstox_tick = {
+        **tick,
+        "data_provider_id": UPLINK,
+        "last_traded_price": 134.68,
+        "average_traded_price": 135.29,
+    }
+    values = encode_tick(upstox_tick)
+    assert values["last_traded_price"] == 13468
+    decoded = decode_row(values)
+    assert decoded["last_traded_price"] == 134.68
+    assert decoded["average_traded_price"] == 135.29
+
+    # Test: 2.5 ( Missing prices )
+    decoded = decode_row({**values, "average_traded_price": None})
+    assert decoded["average_traded_price"] is None
+    decoded = decode_row({**values, "last_traded_price": -1})
+    assert decoded["last_traded_price"] == -1
+
+    # Test: 2.6 ( Missing field )
+    del tick["last_traded_price"]
+    with pytest.raises(KeyError):
+        encode_tick(tick)
+
+
+# Test: 3
+def test_migrate_instrument_prices(test_engine: Engine, tick: dict):
+    """
+    Test the rows of InstrumentPrice are copied to the compact table in batches.
+    """
+    with Session(test_engine) as session:
+        session.add(
+            Instrument(
+                symbol="DBOL",
+                exchange_id=NSE,
+                data_provider_id=SMARTAPI,
+                token="10893",
+                name="DBOL",
+                instrument_type="EQ",
+            )
+        )
+        session.commit()
+
+        insert_data(
+            InstrumentPrice,
+            [
+                InstrumentPrice(
+                    **{**tick, "retrieval_timestamp": 1729532024.309936 + i}
+                ).model_dump()
+                for i in range(5)
+            ],
+            session=session,
+        )
+
+    # Test: 3.1 ( All the rows copied )
+    assert migrate_instrument_prices(test_engine, batch_size=2) == 5
+    with Session(test_engine) as session:
+        rows = session.exec(
+            select(CompactInstrumentPrice).order_by(
+                col(CompactInstrumentPrice.retrieval_timestamp)
+            )
+        ).all()
+
+    assert len(rows) == 5
+    assert rows[0].retrieval_timestamp == 1729532024309936000
+    assert rows[4].retrieval_timestamp == 1729532028309936000
+    assert rows[0].last_traded_price == 13468
+    assert decode_row(rows[0])["last_traded_price"] == tick["last_traded_price"]
+
+    # Test: 3.2 ( Rerun ignores the copied rows, time range )
+    assert (
+        migrate_instrument_prices(
+            test_engine,
+            start=datetime(2024, 10, 21, 17, 33, 46),
+            end=datetime(2024, 10, 21, 17, 33, 48),
+        )
+        == 2
+    )
+    with Session(test_engine) as session:
+        assert len(session.exec(select(CompactInstrumentPrice)).all()) == 5
@@ -0,0 +1,190 @@
+from typing import Any
+
+import pytest
+from omegaconf import OmegaConf
+from pytest import MonkeyPatch
+from pytest_mock import MockerFixture
+from sqlmodel import Session
+
+from app.data_layer.database import instrument_index
+from app.data_layer.database.crud.crud_utils import insert_data
+from app.data_layer.database.instrument_index import (
+    InstrumentIndex,
+    InstrumentRecord,
+    get_instrument_index,
+    refresh_instrument_index,
+)
+from app.data_layer.database.models import Instrument
+from app.sockets.connections import SmartSocketConnection
+from app.utils.common.types.financial_types import DataProviderType, ExchangeType
+from app.utils.smartapi.validator import validate_symbol_and_get_token
+from app.utils.validators import validate_and_format_stock_symbol
+
+NSE = ExchangeType.NSE.value
+BSE = ExchangeType.BSE.value
+SMARTAPI = DataProviderType.SMARTAPI.value
+UPLINK = DataProviderType.UPLINK.value
+
+
+####################################### FIXTURES #######################################
+@pytest.fixture
+def instrument_data() -> list[dict[str, Any]]:
+    """
+    Sample data for the instruments table.
+    """
+    return [
+        {
+            "symbol": "INFY",
+            "exchange_id": NSE,
+            "data_provider_id": SMARTAPI,
+            "token": "1594",
+            "name": "INFY",
+            "instrument_type": "EQ",
+            "expiry_date": None,
+            "strike_price": -1.0,
+            "lot_size": 1,
+            "tick_size": 5.0,
+        },
+        {
+            "symbol": "TCS",
+            "exchange_id": NSE,
+            "data_provider_id": SMARTAPI,
+            "token": "11536",
+            "name": "TCS",
+            "instrument_type": "EQ",
+            "expiry_date": None,
+            "strike_price": -1.0,
+            "lot_size": 1,
+            "tick_size": 5.0,
+        },
+        {
+            "symbol": "TCS",
+            "exchange_id": BSE,
+            "data_provider_id": UPLINK,
+            "token": "BSE_EQ|INE467B01029",
+            "name": "TATA CONSULTANCY SERVICES LTD.",
+            "instrument_type": "EQ",
+            "expiry_date": None,
+            "strike_price": None,
+            "lot_size": 1,
+            "tick_size": 5.0,
+        },
+    ]
+
+
+@pytest.fixture
+def index(instrument_data: list[dict[str, Any]]) -> InstrumentIndex:
+    """
+    Instrument index of the sample instruments.
+    """
+    return InstrumentIndex(instrument_data)
+
+
+@pytest.fixture
+def loaded_index(
+    session: Session, instrument_data, monkeypatch: MonkeyPatch
+) -> InstrumentIndex | None:
+    """
+    Load the instrument index of the process from the sample instruments table.
+    """
+    monkeypatch.setattr(instrument_index, "_INSTRUMENT_INDEX", None)
+    insert_data(Instrument, instrument_data, session=session)
+
+    return refresh_instrument_index(session=session)
+
+
+####################################### TESTS #######################################
+
+
+# Test: 1
+def test_lookups(index: InstrumentIndex):
+    """
+    Test the instruments are looked up by symbol, token and exchange.
+    """
+    # Test: 1.1 ( Symbol and exchange, case insensitive )
+    assert index.get_by_symbol("infy", NSE) == InstrumentRecord(
+        "INFY", NSE, SMARTAPI, "1594", "INFY", "EQ", None, None, 1, 5.0
+    )
+    assert index.get_by_symbol("TCS", BSE).token == "BSE_EQ|INE467B01029"  # type: ignore
+    assert index.get_by_symbol("TCS", BSE, SMARTAPI) is None
+    assert index.has_symbol("tcs", NSE)
+    assert not index.has_symbol("INFY", BSE)
+
+    # Test: 1.2 ( Token and data provider )
+    assert index.get_by_token("11536", SMARTAPI).symbol == "TCS"  # type: ignore
+    assert index.get_by_token("11536", UPLINK) is None
+
+    # Test: 1.3 ( Token maps by exchange, data provider and symbols )
+    assert index.get_token_map(NSE, SMARTAPI) == {"1594": "INFY", "11536": "TCS"}
+    assert index.get_token_map(data_provider_id=UPLINK) == {
+        "BSE_EQ|INE467B01029": "TCS"
+    }
+    assert index.get_token_map(NSE, symbols=["tcs", "FAKE"]) == {"11536": "TCS"}
+    with pytest.raises(ValueError):
+        index.get_token_map(symbols=["TCS"])
+
+    # Test: 1.4 ( Strings shared between the instruments )
+    assert index.symbols[1] is index.symbols[2]
+    assert len(index) == 3
+
+
+# Test: 2
+def test_refresh_instrument_index(
+    loaded_index: InstrumentIndex | None, session: Session, mocker: MockerFixture
+):
+    """
+    Test the index of the process is built from the Instrument table and replaced on
+    refresh.
+    """
+    # Test: 2.1 ( Index loaded from the table )
+    assert loaded_index is not None
+    assert get_instrument_index() is loaded_index
+    assert loaded_index.get_token_map(BSE, UPLINK) == {"BSE_EQ|INE467B01029": "TCS"}
+
+    # Test: 2.2 ( Previous index kept when the table can't be read )
+    mocker.patch.object(instrument_index, "InstrumentIndex", side_effect=OSError())
+    assert refresh_instrument_index(session=session) is loaded_index
+    assert get_instrument_index() is loaded_index
+
+
+# Test: 3
+def test_index_consumers(loaded_index: InstrumentIndex | None, mocker: MockerFixture):
+    """
+    Test the socket connections and the validators use the loaded index.
+    """
+    assert loaded_index is not None
+    mock_get_data = mocker.patch(
+        "app.sockets.connections.smartsocket_connection.get_data_by_all_conditions"
+    )
+    mock_smart_socket = mocker.patch(
+        "app.sockets.connections.smartsocket_connection.SmartSocket"
+    )
+    mocker.patch("app.sockets.connections.smartsocket_connection.init_from_cfg")
+    connection_cfg = OmegaConf.create(
+        {
+            "provider": {"correlation_id": "smart00001"},
+            "streaming": {"name": "kafka"},
+            "symbols": ["infy"],
+            "exchange_type": "nse",
+        }
+    )
+
+    # Test: 3.1 ( Socket tokens without querying the database )
+    assert SmartSocketConnection.from_cfg(connection_cfg) is not None
+    mock_smart_socket.initialize_socket().set_tokens.assert_called_once_with(
+        [{"exchangeType": 1, "tokens": {"1594": "INFY"}}]
+    )
+
+    connection_cfg.symbols = None
+    assert SmartSocketConnection.from_cfg(connection_cfg) is not None
+    mock_smart_socket.initialize_socket().set_tokens.assert_called_with(
+        [{"exchangeType": 1, "tokens": {"1594": "INFY", "11536": "TCS"}}]
+    )
+    mock_get_data.assert_not_called()
+
+    # Test: 3.2 ( Validators )
+    mock_get_symbols = mocker.patch("app.utils.validators.get_symbols")
+    assert validate_and_format_stock_symbol("tcs") == "TCS"
+    mock_get_symbols.assert_not_called()
+
+    assert validate_symbol_and_get_token(ExchangeType.NSE, "infy") == ("1594", "INFY")
@@ -0,0 +1,142 @@
+from datetime import datetime
+
+import pytest
+from pytest_mock import MockerFixture, MockType
+from sqlmodel import create_engine
+
+from app.data_layer.database.partitions import (
+    Partition,
+    PartitionPolicy,
+    get_next_partition_start,
+    get_partition_name,
+    get_partition_start,
+    get_partitions,
+)
+
+NOW = datetime(2024, 10, 21, 9, 15)
+
+
+####################################### FIXTURES #######################################
+@pytest.fixture
+def mock_engine(mocker: MockerFixture) -> MockType:
+    """
+    Mock the engine of a PostgreSQL database with a partitioned InstrumentPrice table
+    holding the default partition and the partitions of 2024-10-01 and 2024-10-21.
+    The statements creating and dropping the partitions are recorded in `statements`
+    and the table is a regular table when `partitioned` is set to False.
+    """
+    engine = mocker.MagicMock()
+    engine.dialect.name = "postgresql"
+    engine.statements = []
+    engine.partitioned = True
+    engine.partition_bounds = [
+        ("instrumentprice_default", "DEFAULT"),
+        (
+            "instrumentprice_p2024_10_01",
+            "FOR VALUES FROM ('2024-10-01 00:00:00') TO ('2024-10-02 00:00:00')",
+        ),
+        (
+            "instrumentprice_p2024_10_21",
+            "FOR VALUES FROM ('2024-10-21 00:00:00') TO ('2024-10-22 00:00:00')",
+        ),
+    ]
+
+    def execute(statement, *_):
+        result = mocker.MagicMock()
+        sql = str(statement)
+        if "pg_partitioned_table" in sql:
+            result.first.return_value = (1,) if engine.partitioned else None
+        elif "pg_inherits" in sql:
+            result.all.return_value = engine.partition_bounds
+        elif "lock_timeout" not in sql:
+            engine.statements.append(sql)
+
+        return result
+
+    connection = mocker.MagicMock()
+    connection.execute.side_effect = execute
+    engine.connect.return_value.__enter__.return_value = connection
+    engine.begin.return_value.__enter__.return_value = connection
+
+    return engine
+
+
+####################################### TESTS #######################################
+
+
+# Test: 1
+def test_partition_ranges():
+    """
+    Test the ranges and the names of the daily and monthly partitions.
+    """
+    # Test: 1.1 ( Daily partitions )
+    start = get_partition_start(NOW, "day")
+    assert start == datetime(2024, 10, 21)
+    assert get_next_partition_start(start, "day") == datetime(2024, 10, 22)
+    assert get_partition_name(start, "day") == "instrumentprice_p2024_10_21"
+
+    # Test: 1.2 ( Monthly partitions, across the years )
+    start = get_partition_start(datetime(2024, 12, 31, 23, 59), "month")
+    assert start == datetime(2024, 12, 1)
+    assert get_next_partition_start(start, "month") == datetime(2025, 1, 1)
+    assert get_partition_name(start, "month") == "instrumentprice_p2024_12"
+
+    # Test: 1.3 ( Invalid interval )
+    with pytest.raises(ValueError):
+        get_partition_start(NOW, "week")
+    with pytest.raises(ValueError):
+        PartitionPolicy(retention_days=0)
+
+
+# Test: 2
+def test_get_partitions(mock_engine: MockType):
+    """
+    Test the ranges of the partitions are read from their bounds.
+    """
+    with mock_engine.connect() as connection:
+        partitions = get_partitions(connection)
+
+    assert partitions == [
+        Partition("instrumentprice_default", None, None),
+        Partition(
+            "instrumentprice_p2024_10_01", datetime(2024, 10, 1), datetime(2024, 10, 2)
+        ),
+        Partition(
+            "instrumentprice_p2024_10_21",
+            datetime(2024, 10, 21),
+            datetime(2024, 10, 22),
+        ),
+    ]
+
+
+# Test: 3
+def test_maintain(mock_engine: MockType):
+    """
+    Test the missing partitions are created ahead and the expired ones are dropped.
+    """
+    # Test: 3.1 ( Partitions created ahead, the existing one skipped )
+    policy = PartitionPolicy("day", premake=2, retention_days=7)
+    result = policy.maintain(mock_engine, NOW)
+
+    assert result == {
+        "created": ["instrumentprice_p2024_10_22", "instrumentprice_p2024_10_23"],
+        "dropped": ["instrumentprice_p2024_10_01"],
+    }
+    assert mock_engine.statements[0] == (
+        "CREATE TABLE IF NOT EXISTS instrumentprice_p2024_10_22 PARTITION OF "
+        "instrumentprice FOR VALUES FROM ('2024-10-22 00:00:00') "
+        "TO ('2024-10-23 00:00:00')"
+    )
+    assert mock_engine.statements[-1] == (
+        "DROP TABLE IF EXISTS instrumentprice_p2024_10_01"
+    )
+
+    # Test: 3.2 ( Table not partitioned )
+    mock_engine.partitioned = False
+    assert policy.maintain(mock_engine, NOW) == {"created": [], "dropped": []}
+
+    # Test: 3.3 ( Not a PostgreSQL database )
+    assert policy.maintain(create_engine("sqlite://"), NOW) == {
+        "created": [],
+        "dropped": [],
+    }
@@ -0,0 +1,60 @@
+# pylint: disable=missing-function-docstring
+import pytest
+from omegaconf import OmegaConf
+
+from app.data_layer.streaming.compression import validate_compression_type
+from app.data_layer.streaming.consumer import init_consumer
+
+
+# Test: 1 (Test the validation of the compression codecs)
+def test_validate_compression_type(mocker):
+    mocker.patch.dict(
+        "app.data_layer.streaming.compression.COMPRESSION_CODECS",
+        {
+            "zstd": (lambda: True, "zstandard"),
+            "snappy": (lambda: False, "python-snappy"),
+        },
+    )
+
+    # Test: 1.1 ( No compression )
+    assert validate_compression_type(None) is None
+    assert validate_compression_type("none") is None
+
+    # Test: 1.2 ( Valid codecs are normalized )
+    assert validate_compression_type("gzip") == "gzip"
+    assert validate_compression_type("ZSTD") == "zstd"
+
+    # Test: 1.3 ( Codec library is not installed )
+    with pytest.raises(ValueError, match="python-snappy"):
+        validate_compression_type("snappy")
+
+    # Test: 1.4 ( Unsupported codec )
+    with pytest.raises(ValueError, match="Unsupported compression type"):
+        validate_compression_type("brotli")
+
+
+# Test: 2 (Test the consumer checks the codec before connecting to the server)
+def test_init_consumer_compression(mocker):
+    mock_consumer = mocker.patch("app.data_layer.streaming.consumer.KafkaConsumer")
+    cfg = OmegaConf.create(
+        {
+            "kafka_topic": "test_topic",
+            "kafka_server": "localhost:9092",
+            "compression_type": "gzip",
+        }
+    )
+
+    init_consumer(cfg)
+    mock_consumer.assert_called_once_with(
+        "test_topic",
+        bootstrap_servers="localhost:9092",
+        auto_offset_reset="earliest",
+        group_id=None,
+        enable_auto_commit=False,
+    )
+
+    mock_consumer.reset_mock()
+    cfg.compression_type = "brotli"
+    with pytest.raises(ValueError):
+        init_consumer(cfg)
+    mock_consumer.assert_not_called()
@@ -0,0 +1,179 @@
+# pylint: disable=missing-function-docstring
+import json
+from threading import Thread
+
+import pytest
+from omegaconf import OmegaConf
+
+from app.data_layer.streaming import ConflationStreamer
+from app.data_layer.streaming.streamer import Streamer
+from app.data_layer.streaming.streamers.conflation_streamer import ExemptionRule
+from app.utils.common import init_from_cfg
+
+
+@Streamer.register("test_list")
+class ListStreamer(Streamer):
+    """
+    Streamer that keeps the received ticks in a list.
+    """
+
+    def __init__(self):
+        self.ticks: list[str] = []
+
+    def __call__(self, data: str):
+        self.ticks.append(data)
+
+    @classmethod
+    def from_cfg(cls, cfg):
+        return cls()
+
+
+def make_tick(symbol: str, price: int, ltq: int = 0) -> str:
+    return json.dumps(
+        {
+            "symbol": symbol,
+            "exchange_id": 1,
+            "last_traded_price": price,
+            "last_traded_quantity": ltq,
+        }
+    )
+
+
+####################### FIXTURES #######################
+@pytest.fixture
+def downstream():
+    return ListStreamer()
+
+
+@pytest.fixture
+def conflation_streamer(downstream):
+    streamer = ConflationStreamer(
+        downstream,
+        interval_ms=60000,
+        max_pending=3,
+        exemptions=[{"field": "last_traded_quantity", "op": "gt", "value": 0}],
+    )
+    yield streamer
+    streamer.close()
+
+
+####################### TESTS #######################
+
+
+# Test: 1 (Test only the latest tick of each instrument is sent)
+def test_conflation_streamer(conflation_streamer, downstream):
+    for price in range(10):
+        conflation_streamer(make_tick("INFY", price))
+        conflation_streamer(make_tick("TCS", price))
+
+    # Test: 1.1 ( Ticks wait until the flush )
+    assert not downstream.ticks
+
+    conflation_streamer.flush()
+    assert downstream.ticks == [make_tick("INFY", 9), make_tick("TCS", 9)]
+
+    # Test: 1.2 ( Nothing is sent when no instrument is updated )
+    conflation_streamer.flush()
+    assert len(downstream.ticks) == 2
+
+    assert conflation_streamer.stats() == {
+        "instruments": 2,
+        "received": 20,
+        "sent": 2,
+    }
+
+
+# Test: 2 (Test the snapshot is sent once `max_pending` instruments are updated)
+def test_conflation_streamer_max_pending(conflation_streamer, downstream):
+    for symbol in ["INFY", "TCS", "INFY", "SBIN"]:
+        conflation_streamer(make_tick(symbol, 1))
+
+    assert downstream.ticks == [
+        make_tick("INFY", 1),
+        make_tick("TCS", 1),
+        make_tick("SBIN", 1),
+    ]
+
+
+# Test: 3 (Test the exempted ticks and the ticks without key are sent immediately)
+def test_conflation_streamer_exemptions(conflation_streamer, downstream):
+    conflation_streamer(make_tick("INFY", 1))
+    conflation_streamer(make_tick("INFY", 2, ltq=10))
+    assert downstream.ticks == [make_tick("INFY", 2, ltq=10)]
+
+    # Test: 3.1 ( The older tick is not sent after the exempted tick )
+    conflation_streamer.flush()
+    assert len(downstream.ticks) == 1
+
+    # Test: 3.2 ( Ticks without the key fields )
+    conflation_streamer("invalid")
+    assert downstream.ticks[-1] == "invalid"
+
+
+# Test: 4 (Test an older tick is not sent after the exempted tick during a flush)
+def test_conflation_streamer_exemption_during_flush(conflation_streamer):
+    class ExemptingStreamer(ListStreamer):
+        """
+        Streamer receiving an exempted tick from another thread during the flush.
+        """
+
+        def __init__(self):
+            super().__init__()
+            self.thread = Thread(
+                target=conflation_streamer, args=(make_tick("INFY", 2, ltq=10),)
+            )
+
+        def __call__(self, data: str):
+            if not self.ticks:
+                self.thread.start()
+                self.thread.join(timeout=0.1)
+            super().__call__(data)
+
+    downstream = ExemptingStreamer()
+    conflation_streamer.streamer = downstream
+    conflation_streamer(make_tick("INFY", 1))
+    conflation_streamer.flush()
+    downstream.thread.join()
+    conflation_streamer.flush()
+
+    assert downstream.ticks == [make_tick("INFY", 1), make_tick("INFY", 2, ltq=10)]
+    assert conflation_streamer.stats()["sent"] == 2
+
+
+# Test: 5 (Test the exemption rules)
+def test_exemption_rule():
+    assert ExemptionRule("subscription_mode", "in", [1, 2]).matches(
+        {"subscription_mode": 2}
+    )
+    assert not ExemptionRule("last_traded_quantity", "gt", 0).matches({})
+    assert not ExemptionRule("last_traded_quantity", "gt", 0).matches(
+        {"last_traded_quantity": "NA"}
+    )
+
+    # Test: 5.1 ( Invalid operator )
+    with pytest.raises(ValueError):
+        ExemptionRule("last_traded_quantity", "between", 0)
+
+
+# Test: 6 (Test the streamer is created from the configuration)
+def test_conflation_streamer_from_cfg():
+    cfg = OmegaConf.create(
+        {
+            "name": "conflation",
+            "interval_ms": 50,
+            "key_fields": ["token"],
+            "exemptions": [{"field": "last_traded_quantity", "op": "gt", "value": 0}],
+            "streamer": {"name": "test_list"},
+        }
+    )
+
+    streamer = init_from_cfg(cfg, Streamer)
+    assert isinstance(streamer, ConflationStreamer)
+    assert isinstance(streamer.streamer, ListStreamer)
+    assert streamer.key_fields == ("token",)
+    assert streamer.exemptions[0].value == 0
+    streamer.close()
+
+    # Test: 6.1 ( Invalid exemption rule )
+    cfg.exemptions = [{"field": "last_traded_quantity", "op": "gt"}]
+    assert init_from_cfg(cfg, Streamer) is None
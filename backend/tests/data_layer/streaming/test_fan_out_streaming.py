@@ -0,0 +1,121 @@
+# pylint: disable=missing-function-docstring
+import time
+from threading import Event
+
+import fakeredis
+import pytest
+from omegaconf import OmegaConf
+from registrable.exceptions import RegistrationError
+
+from app.data_layer.streaming import FanOutStreamer, RedisStreamer
+from app.data_layer.streaming.streamer import Streamer
+from app.utils.common import init_from_cfg
+
+
+class ListStreamer(Streamer):
+    """
+    Streamer that keeps the received ticks in a list, optionally waiting for an event
+    before each tick to simulate a slow sink.
+    """
+
+    def __init__(self, release: Event | None = None):
+        self.ticks: list[str] = []
+        self.release = release
+        self.closed = False
+
+    def __call__(self, data: str):
+        if self.release:
+            self.release.wait()
+        if data == "bad":
+            raise ValueError("Invalid tick")
+        self.ticks.append(data)
+
+    def close(self):
+        self.closed = True
+
+    @classmethod
+    def from_cfg(cls, cfg):
+        return cls()
+
+
+####################### TESTS #######################
+
+
+# Test: 1 (Test the ticks are sent to all the sinks)
+def test_fan_out_streamer():
+    first, second = ListStreamer(), ListStreamer()
+    streamer = FanOutStreamer({"first": first, "second": second})
+
+    ticks = [f"tick{i}" for i in range(100)]
+    for tick in ticks:
+        streamer(tick)
+    streamer("bad")
+    streamer.close()
+
+    assert first.ticks == ticks and second.ticks == ticks
+    assert first.closed and second.closed
+
+    # Test: 1.1 ( Stats )
+    assert streamer.stats()["first"] == {
+        "lag": 0,
+        "sent": 100,
+        "dropped": 0,
+        "errors": 1,
+    }
+
+
+# Test: 2 (Test a slow sink doesn't block the other sinks)
+def test_fan_out_streamer_slow_sink():
+    release = Event()
+    slow, fast = ListStreamer(release), ListStreamer()
+    streamer = FanOutStreamer({"slow": slow, "fast": fast}, queue_sizes={"slow": 2})
+
+    start = time.perf_counter()
+    for i in range(10):
+        streamer(f"tick{i}")
+    assert time.perf_counter() - start < 1
+
+    # Test: 2.1 ( Ticks of the slow sink are dropped when its queue is full )
+    stats = streamer.stats()
+    assert stats["slow"]["dropped"] >= 7
+    assert stats["slow"]["lag"] == 2
+    assert stats["fast"]["dropped"] == 0
+
+    release.set()
+    streamer.close()
+    assert fast.ticks == [f"tick{i}" for i in range(10)]
+    assert len(slow.ticks) == 10 - stats["slow"]["dropped"]
+
+
+# Test: 3 (Test the streamer is created from the configuration)
+def test_fan_out_streamer_from_cfg(mocker):
+    mocker.patch(
+        "app.data_layer.streaming.streamers.redis_streamer.init_redis_client",
+        return_value=fakeredis.FakeRedis(decode_responses=True),
+    )
+    cfg = OmegaConf.create(
+        {
+            "name": "fan_out",
+            "queue_size": 50,
+            "sinks": [
+                {"name": "redis_stream", "stream_name": "ticks"},
+                {"name": "redis_stream", "stream_name": "copy", "queue_size": 5},
+            ],
+        }
+    )
+
+    streamer = init_from_cfg(cfg, Streamer)
+    assert isinstance(streamer, FanOutStreamer)
+    assert [sink.name for sink in streamer.sinks] == ["redis_stream", "redis_stream_1"]
+    assert isinstance(streamer.sinks[0].streamer, RedisStreamer)
+    assert [sink.queue.maxsize for sink in streamer.sinks] == [50, 5]
+    streamer.close()
+
+    # Test: 3.1 ( No sink could be created )
+    cfg.sinks = [{"name": "redis_stream"}]
+    assert init_from_cfg(cfg, Streamer) is None
+
+    # Test: 3.2 ( Unknown sink )
+    cfg.sinks = [{"name": "unknown"}]
+    with pytest.raises(RegistrationError):
+        init_from_cfg(cfg, Streamer)
@@ -1,9 +1,16 @@
 # pylint: disable=missing-function-docstring
+import json
+from collections import namedtuple
+
 import pytest
 from kafka.errors import KafkaError, NoBrokersAvailable
+from omegaconf import OmegaConf
 
+from app.data_layer.data_saver import CandleDataSaver
 from app.data_layer.streaming import KafkaStreamer
 
+Message = namedtuple("Message", ["value"])
+
 
 ####################### FIXTURES #######################
 @pytest.fixture
@@ -68,9 +75,10 @@ def test_kafka_streamer_call_success(kafka_streamer):
 
     # Verify the Kafka producer's send method was called correctly
     kafka_streamer.kafka_producer.send.assert_called_once_with(
-        kafka_streamer.kafka_topic, data.encode("utf-8")
+        kafka_streamer.kafka_topic, data.encode("utf-8"), key=None
     )
-    kafka_streamer.kafka_producer.flush.assert_called_once()
+    # The messages are batched by the producer, so no flush per message
+    kafka_streamer.kafka_producer.flush.assert_not_called()
 
 
 # Test: 4 (Test the __call__ method of the KafkaStreaming class with data sending failure)
@@ -98,7 +106,8 @@ def test_kafka_streamer_close_success(kafka_streamer):
     # Close the Kafka producer
     kafka_streamer.close()
 
-    # Verify close was called
+    # Verify the pending batches were flushed and close was called
+    kafka_streamer.kafka_producer.flush.assert_called_once()
     kafka_streamer.kafka_producer.close.assert_called_once()
 
 
@@ -165,3 +174,181 @@ def test_kafka_streamer_from_cfg_failure(mocker):
     mock_logger.error.assert_called_once_with(
         "Error creating KafkaStreaming object: %s", mocker.ANY
     )
+
+
+# Test: 9 (Test the messages are keyed by the instrument)
+def test_kafka_streamer_call_keyed(kafka_streamer):
+    data = json.dumps({"symbol": "INFY", "exchange_id": 1, "token": "1594"})
+    kafka_streamer(data)
+
+    kafka_streamer.kafka_producer.send.assert_called_once_with(
+        kafka_streamer.kafka_topic, data.encode("utf-8"), key=b"INFY|1"
+    )
+
+    # Test: 9.1 ( Custom key fields )
+    kafka_streamer.kafka_producer.send.reset_mock()
+    kafka_streamer.key_fields = ["token"]
+    kafka_streamer(data)
+
+    kafka_streamer.kafka_producer.send.assert_called_once_with(
+        kafka_streamer.kafka_topic, data.encode("utf-8"), key=b"1594"
+    )
+
+    # Test: 9.2 ( Missing key field sends the message without key )
+    kafka_streamer.kafka_producer.send.reset_mock()
+    data = json.dumps({"symbol": "INFY", "exchange_id": 1})
+    kafka_streamer(data)
+
+    kafka_streamer.kafka_producer.send.assert_called_once_with(
+        kafka_streamer.kafka_topic, data.encode("utf-8"), key=None
+    )
+
+
+# Test: 10 (Test the routing of the messages to the topics)
+def test_kafka_streamer_routes(mocker, kafka_server, kafka_topic):
+    mocker.patch(
+        "app.data_layer.streaming.streamers.kafka_streamer.KafkaProducer",
+        return_value=mocker.MagicMock(),
+    )
+    routes = [
+        {"topic": "nse_ltp", "exchange": "NSE", "subscription_mode": "ltp"},
+        {"topic": "uplink", "data_provider": "uplink"},
+    ]
+    kafka_streamer = KafkaStreamer(kafka_server, kafka_topic, routes=routes)
+
+    assert kafka_streamer.router.topics == {kafka_topic, "nse_ltp", "uplink"}
+
+    ticks = [
+        (
+            {
+                "symbol": "INFY",
+                "exchange_id": 1,
+                "data_provider_id": 1,
+                "subscription_mode_val": "LTP",
+            },
+            "nse_ltp",
+        ),
+        (
+            {
+                "symbol": "INFY",
+                "exchange_id": 1,
+                "data_provider_id": 1,
+                "subscription_mode_val": "SNAP_QUOTE",
+            },
+            kafka_topic,
+        ),
+        ({"symbol": "TCS", "exchange_id": 2, "data_provider_id": 2}, "uplink"),
+    ]
+
+    for tick, topic in ticks:
+        kafka_streamer.kafka_producer.send.reset_mock()
+        data = json.dumps(tick)
+        kafka_streamer(data)
+
+        kafka_streamer.kafka_producer.send.assert_called_once_with(
+            topic,
+            data.encode("utf-8"),
+            key=f"{tick['symbol']}|{tick['exchange_id']}".encode("utf-8"),
+        )
+
+    # Test: 10.1 ( Invalid route condition )
+    with pytest.raises(ValueError):
+        KafkaStreamer(
+            kafka_server, kafka_topic, routes=[{"topic": "t", "exchange": "X"}]
+        )
+
+
+# Test: 11 (Test the compression and batching configuration of the producer)
+def test_kafka_streamer_compression(mocker, kafka_server, kafka_topic):
+    mock_producer = mocker.patch(
+        "app.data_layer.streaming.streamers.kafka_streamer.KafkaProducer"
+    )
+
+    # Test: 11.1 ( Default configuration sends uncompressed batches )
+    KafkaStreamer(kafka_server, kafka_topic)
+    mock_producer.assert_called_once_with(
+        bootstrap_servers=kafka_server,
+        compression_type=None,
+        linger_ms=5,
+        batch_size=65536,
+    )
+
+    # Test: 11.2 ( Compression codec from the configuration )
+    mock_producer.reset_mock()
+    mocker.patch.dict(
+        "app.data_layer.streaming.compression.COMPRESSION_CODECS",
+        {"lz4": (lambda: True, "lz4")},
+    )
+    cfg = {
+        "kafka_server": kafka_server,
+        "kafka_topic": kafka_topic,
+        "compression_type": "LZ4",
+        "linger_ms": 20,
+        "batch_size": 131072,
+    }
+    assert KafkaStreamer.from_cfg(cfg) is not None
+    mock_producer.assert_called_once_with(
+        bootstrap_servers=kafka_server,
+        compression_type="lz4",
+        linger_ms=20,
+        batch_size=131072,
+    )
+
+    # Test: 11.3 ( Unsupported compression codec )
+    mock_producer.reset_mock()
+    with pytest.raises(ValueError, match="Unsupported compression type"):
+        KafkaStreamer(kafka_server, kafka_topic, compression_type="brotli")
+    mock_producer.assert_not_called()
+
+
+# Test: 12 (Test the ticks routed to another topic are consumed by the data savers)
+def test_routed_tick_saved(mocker, kafka_server, kafka_topic):
+    mocker.patch(
+        "app.data_layer.streaming.streamers.kafka_streamer.KafkaProducer",
+        return_value=mocker.MagicMock(),
+    )
+    mock_consumer = mocker.patch("app.data_layer.streaming.consumer.KafkaConsumer")
+    streaming_cfg = {
+        "kafka_server": kafka_server,
+        "kafka_topic": kafka_topic,
+        "routes": [{"topic": "nse_ltp", "exchange": "NSE"}],
+    }
+    kafka_streamer = KafkaStreamer.from_cfg(streaming_cfg)
+    candle_saver = CandleDataSaver.from_cfg(
+        OmegaConf.create(
+            {
+                "name": "candle_saver",
+                "intervals": ["1m"],
+                "sink": {"name": "memory_candle_sink"},
+                "streaming": streaming_cfg,
+            }
+        )
+    )
+
+    # The consumer of the data saver is subscribed to the topics of the routes
+    assert mock_consumer.call_args.args == ("nse_ltp", kafka_topic)
+
+    tick = {
+        "symbol": "INFY",
+        "exchange_id": 1,
+        "data_provider_id": 1,
+        "last_traded_price": 1900.5,
+        "last_traded_timestamp": 1729504800,
+    }
+    kafka_streamer(json.dumps(tick))
+    topic, value = kafka_streamer.kafka_producer.send.call_args.args
+    assert topic == "nse_ltp"
+
+    batches = [{topic: [Message(value=value)]}]
+
+    def poll(**kwargs):
+        if batches:
+            return batches.pop(0)
+
+        candle_saver.stop()
+        return {}
+
+    candle_saver.consumer.poll.side_effect = poll
+    candle_saver.retrieve_and_save()
+
+    assert len(candle_saver.sink.get_candles("INFY", 1, "1m")) == 1
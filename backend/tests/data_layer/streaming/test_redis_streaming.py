@@ -0,0 +1,197 @@
+# pylint: disable=missing-function-docstring
+import json
+
+import fakeredis
+import pytest
+from omegaconf import OmegaConf
+
+from app.data_layer.streaming import RedisStreamConsumer, RedisStreamer
+from app.data_layer.streaming.consumer import StreamRecord, init_consumer
+
+
+####################### FIXTURES #######################
+@pytest.fixture
+def redis_client():
+    return fakeredis.FakeRedis(decode_responses=True)
+
+
+@pytest.fixture
+def stream_name():
+    return "test-stream"
+
+
+@pytest.fixture
+def redis_streamer(redis_client, stream_name):
+    streamer = RedisStreamer(redis_client, stream_name, batch_size=3, flush_interval=60)
+    yield streamer
+    streamer.close()
+
+
+@pytest.fixture
+def ticks():
+    return [
+        json.dumps({"symbol": f"SYMBOL{i}", "exchange_id": 1, "data_provider_id": 1})
+        for i in range(5)
+    ]
+
+
+####################### TESTS #######################
+
+
+# Test: 1 (Test the ticks are sent in batches)
+def test_redis_streamer_batches(redis_streamer, redis_client, stream_name, ticks):
+    for tick in ticks[:2]:
+        redis_streamer(tick)
+
+    # Test: 1.1 ( Ticks wait in the buffer until the batch is full )
+    assert redis_client.xlen(stream_name) == 0
+
+    # Test: 1.2 ( Full batch is sent in a single pipeline )
+    redis_streamer(ticks[2])
+    assert redis_client.xlen(stream_name) == 3
+
+    # Test: 1.3 ( Pending ticks are sent on flush )
+    redis_streamer(ticks[3])
+    redis_streamer.flush()
+    entries = redis_client.xrange(stream_name)
+    assert [fields["data"] for _, fields in entries] == ticks[:4]
+
+
+# Test: 2 (Test the stream is trimmed and the ticks are routed)
+def test_redis_streamer_trim_and_routes(redis_client, stream_name, ticks):
+    streamer = RedisStreamer(
+        redis_client,
+        stream_name,
+        max_len=2,
+        batch_size=1,
+        flush_interval=60,
+        routes=[{"topic": "nse", "exchange": "NSE"}],
+    )
+    for tick in ticks:
+        streamer(tick)
+    streamer(json.dumps({"symbol": "TCS", "exchange_id": 2}))
+    streamer.close()
+
+    # fakeredis trims exactly, the real server trims approximately
+    assert redis_client.xlen("nse") == 2
+    assert redis_client.xlen(stream_name) == 1
+
+
+# Test: 3 (Test the streamer sends the buffered ticks periodically)
+def test_redis_streamer_flush_interval(redis_client, stream_name, ticks):
+    streamer = RedisStreamer(
+        redis_client, stream_name, batch_size=100, flush_interval=0.01
+    )
+    streamer(ticks[0])
+    streamer._stop_event.wait(0.2)  # pylint: disable=protected-access
+
+    assert redis_client.xlen(stream_name) == 1
+    streamer.close()
+
+
+# Test: 4 (Test the consumer reads the batches and acknowledges them on commit)
+def test_redis_stream_consumer(redis_client, stream_name, ticks):
+    for tick in ticks:
+        redis_client.xadd(stream_name, {"data": tick})
+
+    consumer = RedisStreamConsumer(redis_client, stream_name, "csv_saver")
+
+    # Test: 4.1 ( Batch polling )
+    batch = consumer.poll(max_records=3)
+    records = batch[stream_name]
+    assert [record.value for record in records] == [t.encode() for t in ticks[:3]]
+    assert isinstance(records[0], StreamRecord)
+
+    # Test: 4.2 ( Unacknowledged messages are read again after a restart )
+    consumer = RedisStreamConsumer(redis_client, stream_name, "csv_saver")
+    records = consumer.poll(max_records=10)[stream_name]
+    assert [record.value for record in records] == [t.encode() for t in ticks[:3]]
+
+    records = consumer.poll(max_records=10)[stream_name]
+    assert [record.value for record in records] == [t.encode() for t in ticks[3:]]
+    consumer.commit()
+    assert redis_client.xpending(stream_name, "csv_saver")["pending"] == 0
+
+    # Test: 4.3 ( No more messages )
+    assert not consumer.poll()
+
+    # Test: 4.4 ( Each group gets all the messages )
+    other_consumer = RedisStreamConsumer(redis_client, stream_name, "jsonl_saver")
+    assert len(other_consumer.poll(max_records=10)[stream_name]) == len(ticks)
+
+
+# Test: 5 (Test the iteration over the consumer)
+def test_redis_stream_consumer_iter(redis_client, stream_name, ticks):
+    for tick in ticks:
+        redis_client.xadd(stream_name, {"data": tick})
+
+    consumer = RedisStreamConsumer(
+        redis_client, stream_name, "sqlite_saver", batch_size=2, block_ms=10
+    )
+    iterator = iter(consumer)
+    values = [next(iterator).value for _ in ticks]
+
+    assert values == [tick.encode() for tick in ticks]
+    assert redis_client.xpending(stream_name, "sqlite_saver")["pending"] == 1
+
+
+# Test: 6 (Test the consumer is created from the streaming configuration)
+def test_init_consumer_redis_stream(mocker, redis_client, stream_name):
+    mocker.patch(
+        "app.data_layer.streaming.consumers.redis_stream_consumer.init_redis_client",
+        return_value=redis_client,
+    )
+    cfg = OmegaConf.create(
+        {"name": "redis_stream", "stream_name": stream_name, "group_name": None}
+    )
+
+    consumer = init_consumer(cfg, "csv_saver")
+    assert isinstance(consumer, RedisStreamConsumer)
+    assert consumer.group_name == "csv_saver"
+
+    # Test: 6.1 ( Consumer creation failure )
+    mocker.patch(
+        "app.data_layer.streaming.consumers.redis_stream_consumer.init_redis_client",
+        side_effect=ConnectionError("Connection refused"),
+    )
+    with pytest.raises(ValueError):
+        init_consumer(cfg, "csv_saver")
+
+
+# Test: 7 (Test the consumer reads the streams of the routes)
+def test_redis_stream_consumer_routes(redis_client, stream_name, ticks):
+    routes = [{"topic": "nse", "exchange": "NSE"}]
+    streamer = RedisStreamer(
+        redis_client, stream_name, batch_size=1, flush_interval=60, routes=routes
+    )
+    routed_tick = ticks[0]
+    default_tick = json.dumps({"symbol": "TCS", "exchange_id": 2})
+    streamer(routed_tick)
+    streamer(default_tick)
+    streamer.close()
+
+    # Test: 7.1 ( Ticks of the default and routed streams are read )
+    consumer = RedisStreamConsumer(
+        redis_client, stream_name, "csv_saver", routes=routes
+    )
+    batch = consumer.poll(max_records=10)
+    assert [record.value for record in batch["nse"]] == [routed_tick.encode()]
+    assert [record.value for record in batch[stream_name]] == [default_tick.encode()]
+
+    # Test: 7.2 ( Pending messages of each stream are read again after a restart )
+    consumer = RedisStreamConsumer(
+        redis_client, stream_name, "csv_saver", routes=routes
+    )
+    values = [
+        record.value
+        for _ in range(2)
+        for records in consumer.poll(max_records=10).values()
+        for record in records
+    ]
+    assert sorted(values) == sorted([routed_tick.encode(), default_tick.encode()])
+
+    # Test: 7.3 ( Messages of all the streams are acknowledged )
+    consumer.commit()
+    assert redis_client.xpending("nse", "csv_saver")["pending"] == 0
+    assert redis_client.xpending(stream_name, "csv_saver")["pending"] == 0
+    assert not consumer.poll()
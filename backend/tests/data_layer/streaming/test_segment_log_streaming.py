@@ -0,0 +1,210 @@
+# pylint: disable=missing-function-docstring
+import json
+
+import pytest
+from omegaconf import OmegaConf
+
+from app.data_layer.streaming import SegmentLogConsumer, SegmentLogStreamer
+from app.data_layer.streaming.consumer import init_consumer
+from app.data_layer.streaming.segment_log import (
+    SegmentLogReader,
+    SegmentLogWriter,
+    list_segments,
+    read_index,
+)
+
+
+####################### FIXTURES #######################
+@pytest.fixture
+def ticks():
+    return [
+        json.dumps({"symbol": f"SYMBOL{i}", "exchange_id": 1, "data_provider_id": 1})
+        for i in range(50)
+    ]
+
+
+####################### TESTS #######################
+
+
+# Test: 1 (Test the writer rolls the segments and indexes the records)
+def test_segment_log_writer(tmp_path, ticks):
+    writer = SegmentLogWriter(tmp_path, segment_bytes=1024, index_interval_bytes=256)
+    offsets = [writer.append(tick.encode()) for tick in ticks]
+    writer.close()
+
+    assert offsets == list(range(len(ticks)))
+
+    # Test: 1.1 ( Segments are named after their first offset )
+    segments = list_segments(tmp_path)
+    assert len(segments) > 1 and segments[0] == 0
+    assert all(base in offsets for base in segments)
+
+    # Test: 1.2 ( Sparse index )
+    index = read_index(tmp_path / f"{segments[0]:020d}.index")
+    assert 0 < len(index) < segments[1]
+
+    # Test: 1.3 ( Writer continues after the last record and truncates torn records )
+    last_segment = tmp_path / f"{segments[-1]:020d}.log"
+    with open(last_segment, "ab") as segment:
+        segment.write(b"\x10\x00\x00")
+
+    writer = SegmentLogWriter(tmp_path, segment_bytes=1024)
+    assert writer.append(b"new") == len(ticks)
+    writer.close()
+
+    records = SegmentLogReader(tmp_path, len(ticks) - 1).read(10)
+    assert records == [(len(ticks) - 1, ticks[-1].encode()), (len(ticks), b"new")]
+
+
+# Test: 2 (Test the reader reads from any offset and tails the writer)
+def test_segment_log_reader(tmp_path, ticks):
+    writer = SegmentLogWriter(tmp_path, segment_bytes=1024, index_interval_bytes=256)
+    for tick in ticks[:30]:
+        writer.append(tick.encode())
+    writer.flush()
+
+    # Test: 2.1 ( Read from the middle of a segment )
+    reader = SegmentLogReader(tmp_path, 17)
+    assert reader.read(5) == [(i, ticks[i].encode()) for i in range(17, 22)]
+
+    # Test: 2.2 ( Read across the segments )
+    assert [offset for offset, _ in reader.read(100)] == list(range(22, 30))
+    assert reader.read(10) == []
+
+    # Test: 2.3 ( Tail the new records )
+    for tick in ticks[30:]:
+        writer.append(tick.encode())
+    writer.flush()
+
+    assert [value for _, value in reader.read(100)] == [
+        tick.encode() for tick in ticks[30:]
+    ]
+    writer.close()
+    reader.close()
+
+
+# Test: 3 (Test the ticks written by the streamer are read by the consumer)
+def test_segment_log_streaming(tmp_path, ticks):
+    streamer = SegmentLogStreamer(
+        tmp_path,
+        "ticks",
+        segment_bytes=1024,
+        flush_interval=60,
+        routes=[{"topic": "nse", "exchange": "NSE"}],
+    )
+    for tick in ticks[:10]:
+        streamer(tick)
+    streamer(json.dumps({"symbol": "TCS", "exchange_id": 2}))
+    streamer.flush()
+
+    consumer = SegmentLogConsumer(tmp_path, "nse", "csv_saver", batch_size=4)
+
+    # Test: 3.1 ( Batch polling )
+    records = consumer.poll()["nse"]
+    assert [record.value for record in records] == [t.encode() for t in ticks[:4]]
+    assert [record.offset for record in records] == [0, 1, 2, 3]
+
+    # Test: 3.2 ( Offsets are persisted per consumer group on commit )
+    consumer.commit()
+    consumer.poll()
+    consumer = SegmentLogConsumer(tmp_path, "nse", "csv_saver")
+    assert consumer.poll(max_records=1)["nse"][0].value == ticks[4].encode()
+
+    other_consumer = SegmentLogConsumer(tmp_path, "nse", "jsonl_saver")
+    assert len(other_consumer.poll(max_records=100)["nse"]) == 10
+
+    # Test: 3.3 ( Routed ticks and no new ticks )
+    routed = SegmentLogConsumer(tmp_path, "ticks", "csv_saver")
+    assert len(routed.poll()["ticks"]) == 1
+    assert not routed.poll(timeout_ms=10)
+
+    # Test: 3.4 ( Iteration tails the streamer )
+    iterator = iter(consumer)
+    assert [next(iterator).offset for _ in range(5)] == [5, 6, 7, 8, 9]
+    streamer(ticks[10])
+    streamer.close()
+    assert next(iterator).value == ticks[10].encode()
+
+    consumer.close()
+
+
+# Test: 4 (Test the consumer reads the topics of the routes)
+def test_segment_log_consumer_routes(tmp_path, ticks):
+    routes = [{"topic": "nse", "exchange": "NSE"}]
+    streamer = SegmentLogStreamer(tmp_path, "ticks", flush_interval=60, routes=routes)
+    default_tick = json.dumps({"symbol": "TCS", "exchange_id": 2})
+    for tick in ticks[:3]:
+        streamer(tick)
+    streamer(default_tick)
+    streamer.close()
+
+    # Test: 4.1 ( Ticks of the default and routed topics are read )
+    consumer = SegmentLogConsumer(tmp_path, "ticks", "csv_saver", routes=routes)
+    batch = consumer.poll(max_records=10)
+    assert [record.value for record in batch["nse"]] == [t.encode() for t in ticks[:3]]
+    assert [record.value for record in batch["ticks"]] == [default_tick.encode()]
+
+    # Test: 4.2 ( Offsets are persisted per topic )
+    consumer.commit()
+    consumer.close()
+    assert (tmp_path / "nse" / "consumers" / "csv_saver.offset").read_text() == "3"
+    assert (tmp_path / "ticks" / "consumers" / "csv_saver.offset").read_text() == "1"
+
+    consumer = SegmentLogConsumer(tmp_path, "ticks", "csv_saver", routes=routes)
+    assert not consumer.poll()
+
+    # Test: 4.3 ( Batch size shared between the topics )
+    consumer = SegmentLogConsumer(tmp_path, "ticks", "jsonl_saver", routes=routes)
+    assert sum(len(records) for records in consumer.poll(max_records=2).values()) == 2
+    assert sum(len(records) for records in consumer.poll(max_records=10).values()) == 2
+
+
+# Test: 5 (Test the oldest segments are deleted past the retention)
+def test_segment_log_retention(tmp_path, ticks):
+    reader = SegmentLogReader(tmp_path)
+    writer = SegmentLogWriter(tmp_path, segment_bytes=512, retention_bytes=1024)
+    for tick in ticks[:10]:
+        writer.append(tick.encode())
+    writer.flush()
+    assert reader.read(1)[0][0] == 0
+
+    for tick in ticks[10:]:
+        writer.append(tick.encode())
+    writer.close()
+
+    # Test: 5.1 ( Segments kept within the retention )
+    segments = list_segments(tmp_path)
+    assert segments[0] > 0
+    assert (
+        sum((tmp_path / f"{base:020d}.log").stat().st_size for base in segments[:-1])
+        <= 1024
+    )
+    assert not (tmp_path / f"{0:020d}.index").exists()
+
+    # Test: 5.2 ( Readers continue from the first remaining record )
+    offsets = [offset for offset, _ in reader.read(100)]
+    assert offsets[-1] == len(ticks) - 1
+    assert segments[0] in offsets
+    assert [offset for offset, _ in SegmentLogReader(tmp_path).read(1)] == [segments[0]]
+    reader.close()
+
+
+# Test: 6 (Test the consumer is created from the streaming configuration)
+def test_init_consumer_segment_log(tmp_path):
+    cfg = OmegaConf.create(
+        {
+            "name": "segment_log",
+            "log_dir": str(tmp_path),
+            "topic": "ticks",
+            "group_name": None,
+        }
+    )
+
+    consumer = init_consumer(cfg, "csv_saver")
+    assert isinstance(consumer, SegmentLogConsumer)
+    assert consumer.group_name == "csv_saver"
+
+    # Test: 6.1 ( Missing topic )
+    del cfg["topic"]
+    with pytest.raises(ValueError):
+        init_consumer(cfg, "csv_saver")
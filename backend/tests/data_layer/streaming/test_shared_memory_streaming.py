@@ -0,0 +1,188 @@
+# pylint: disable=missing-function-docstring
+import json
+import multiprocessing
+import struct
+import threading
+import uuid
+from multiprocessing.shared_memory import SharedMemory
+
+import pytest
+from omegaconf import OmegaConf
+
+from app.data_layer.streaming import SharedMemoryConsumer, SharedMemoryStreamer
+from app.data_layer.streaming.consumer import init_consumer
+from app.data_layer.streaming.ring_buffer import (
+    HEADER,
+    HEADER_SIZE,
+    READY,
+    READY_OFFSET,
+    RingBufferReader,
+    SharedMemoryRingBuffer,
+)
+
+
+####################### FIXTURES #######################
+@pytest.fixture
+def buffer_name():
+    name = f"test_ticks_{uuid.uuid4().hex[:8]}"
+    yield name
+    SharedMemoryRingBuffer(name, capacity=4, slot_size=64).close(unlink=True)
+
+
+@pytest.fixture
+def ticks():
+    return [json.dumps({"symbol": f"SYMBOL{i}", "exchange_id": 1}) for i in range(6)]
+
+
+def write_ticks(buffer_name: str, ticks: list[str]):
+    streamer = SharedMemoryStreamer(buffer_name, capacity=4, slot_size=64)
+    for tick in ticks:
+        streamer(tick)
+    streamer.close()
+
+
+####################### TESTS #######################
+
+
+# Test: 1 (Test the ring buffer write and read)
+def test_ring_buffer(buffer_name):
+    ring_buffer = SharedMemoryRingBuffer(buffer_name, capacity=4, slot_size=64)
+    reader = RingBufferReader(ring_buffer)
+
+    # Test: 1.1 ( Records are read in order )
+    for i in range(3):
+        assert ring_buffer.write(f"tick{i}".encode())
+    assert reader.read(10) == [(0, b"tick0"), (1, b"tick1"), (2, b"tick2")]
+    assert not reader.read(10)
+
+    # Test: 1.2 ( Records larger than the slot are rejected )
+    assert not ring_buffer.write(b"x" * 64)
+    assert ring_buffer.write_sequence == 3
+
+    # Test: 1.3 ( Overwritten records are detected )
+    assert ring_buffer.read(2) == b"tick2"
+    for i in range(4):
+        ring_buffer.write(f"new{i}".encode())
+    assert ring_buffer.read(2) is None
+    assert not ring_buffer.is_valid(2)
+
+    # Test: 1.4 ( Invalid size )
+    with pytest.raises(ValueError):
+        SharedMemoryRingBuffer(buffer_name, capacity=0)
+
+    ring_buffer.close()
+
+
+# Test: 2 (Test the reader skips the overwritten records)
+def test_ring_buffer_reader_overrun(buffer_name):
+    ring_buffer = SharedMemoryRingBuffer(buffer_name, capacity=4, slot_size=64)
+    reader = RingBufferReader(ring_buffer)
+
+    for i in range(10):
+        ring_buffer.write(f"tick{i}".encode())
+
+    # Test: 2.1 ( The lag and the lost records )
+    assert reader.lag == 10
+    records = reader.read(10)
+    assert [value for _, value in records] == [b"tick7", b"tick8", b"tick9"]
+    assert reader.overruns == 7
+
+    # Test: 2.2 ( A new reader starts from the oldest record )
+    reader = RingBufferReader(ring_buffer, from_beginning=True)
+    assert reader.next_sequence == 6
+
+    ring_buffer.close()
+
+
+# Test: 3 (Test the consumer reads the ticks written by the streamer)
+def test_shared_memory_streaming(buffer_name, ticks):
+    consumer = SharedMemoryConsumer(buffer_name, capacity=4, slot_size=64)
+    write_ticks(buffer_name, ticks[:3])
+
+    # Test: 3.1 ( Batch polling )
+    records = consumer.poll(max_records=2)[buffer_name]
+    assert [record.value for record in records] == [t.encode() for t in ticks[:2]]
+    assert [record.offset for record in records] == [0, 1]
+
+    # Test: 3.2 ( Zero copy views with their sequence )
+    views = consumer.read_views()
+    assert [(sequence, bytes(view)) for sequence, view in views] == [
+        (2, ticks[2].encode())
+    ]
+    assert consumer.is_valid(2)
+
+    # Test: 3.3 ( No ticks within the timeout )
+    assert not consumer.poll(timeout_ms=5)
+
+    # Test: 3.4 ( Overruns )
+    write_ticks(buffer_name, ticks)
+    records = consumer.poll(max_records=10)[buffer_name]
+    assert [record.value for record in records] == [t.encode() for t in ticks[3:]]
+    assert consumer.overruns == 3
+    assert not consumer.is_valid(2)
+
+    # Test: 3.5 ( Views released on close )
+    write_ticks(buffer_name, ticks[:1])
+    views = consumer.read_views()
+    assert len(views) == 1
+    consumer.close()
+    with pytest.raises(ValueError):
+        bytes(views[0][1])
+
+
+# Test: 4 (Test the ticks are handed off between the processes)
+def test_shared_memory_streaming_processes(buffer_name, ticks):
+    consumer = SharedMemoryConsumer(buffer_name, capacity=4, slot_size=64)
+
+    process = multiprocessing.Process(target=write_ticks, args=(buffer_name, ticks[:3]))
+    process.start()
+    process.join()
+
+    iterator = iter(consumer)
+    assert [next(iterator).value for _ in range(3)] == [t.encode() for t in ticks[:3]]
+    consumer.close()
+
+
+# Test: 5 (Test the consumer is created from the streaming configuration)
+def test_init_consumer_shared_memory(buffer_name):
+    cfg = OmegaConf.create(
+        {
+            "name": "shared_memory",
+            "buffer_name": buffer_name,
+            "capacity": 4,
+            "slot_size": 64,
+        }
+    )
+
+    consumer = init_consumer(cfg, "csv_saver")
+    assert isinstance(consumer, SharedMemoryConsumer)
+    assert consumer.ring_buffer.capacity == 4
+    consumer.close()
+
+    # Test: 5.1 ( Invalid configuration )
+    cfg.slot_size = 0
+    with pytest.raises(ValueError):
+        init_consumer(cfg, "csv_saver")
+
+
+# Test: 6 (Test the buffer is attached once its creator has written the header)
+def test_ring_buffer_attach_before_ready(mocker, buffer_name):
+    shared_memory = SharedMemory(buffer_name, create=True, size=HEADER_SIZE + 4 * 64)
+
+    # Test: 6.1 ( Header never written )
+    mocker.patch("app.data_layer.streaming.ring_buffer.READY_TIMEOUT", 0.01)
+    with pytest.raises(TimeoutError):
+        SharedMemoryRingBuffer(buffer_name, capacity=4, slot_size=64)
+
+    # Test: 6.2 ( Header written while waiting )
+    def write_header():
+        HEADER.pack_into(shared_memory.buf, 0, 4, 64, 0)
+        struct.pack_into("<Q", shared_memory.buf, READY_OFFSET, READY)
+
+    mocker.patch("app.data_layer.streaming.ring_buffer.READY_TIMEOUT", 5.0)
+    threading.Timer(0.05, write_header).start()
+    ring_buffer = SharedMemoryRingBuffer(buffer_name, capacity=4, slot_size=64)
+    assert (ring_buffer.capacity, ring_buffer.slot_size) == (4, 64)
+
+    ring_buffer.close()
+    shared_memory.close()
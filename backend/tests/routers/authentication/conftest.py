@@ -4,11 +4,21 @@ from datetime import datetime
 import pytest
 from pytest_mock import MockFixture, MockType
 
+from app.data_layer.database.db_connections import postgresql
 from app.data_layer.database.models.user_model import User
 from app.routers.authentication.authenticate import get_hash_password
 from app.schemas.user_model import UserSignup
 
 
+@pytest.fixture(autouse=True)
+def sync_database_functions(monkeypatch: pytest.MonkeyPatch):
+    """
+    Run the async database functions through their synchronous variants, so the
+    database is mocked with `get_session` whether the async driver is installed or not.
+    """
+    monkeypatch.setattr(postgresql, "is_async_driver_available", lambda: False)
+
+
 # Mock data
 @pytest.fixture
 def sign_up_data() -> UserSignup:
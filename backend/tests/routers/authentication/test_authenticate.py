@@ -1,4 +1,4 @@
-""" 
+"""
 Test cases for the authenticate.py module
 """
 
@@ -22,13 +22,14 @@ from app.utils.constants import JWT_SECRET
 
 
 # Test: 1
-def test_signup_user(mock_session: MockType, sign_up_data: UserSignup):
+@pytest.mark.asyncio
+async def test_signup_user(mock_session: MockType, sign_up_data: UserSignup):
     """
     Test signup_user function
     """
     # Test: 1.1 ( Successful user signup )
     mock_session.first.side_effect = [None, None, sign_up_data]
-    response = signup_user(sign_up_data)
+    response = await signup_user(sign_up_data)
 
     assert (
         response["message"]
@@ -38,24 +39,27 @@ def test_signup_user(mock_session: MockType, sign_up_data: UserSignup):
     # Test: 1.2 ( User already exists )
     mock_session.first.side_effect = sign_up_data
     with pytest.raises(UserSignupError) as signup_error:
-        signup_user(sign_up_data)
+        await signup_user(sign_up_data)
 
     assert signup_error.value.detail == "email already exists"
 
     sign_up_data.confirm_password = "wrong_password"
     with pytest.raises(UserSignupError) as signup_error:
-        signup_user(sign_up_data)
+        await signup_user(sign_up_data)
 
 
 # Test: 2
-def test_signin_user(mock_session: MockType, test_user: User, sign_up_data: UserSignup):
+@pytest.mark.asyncio
+async def test_signin_user(
+    mock_session: MockType, test_user: User, sign_up_data: UserSignup
+):
     """
     Test signin_user function
     """
     # Test: 2.1 ( User not found )
     mock_session.first.return_value = None
     with pytest.raises(HTTPException) as http_exe:
-        signin_user(sign_up_data.email, sign_up_data.password)
+        await signin_user(sign_up_data.email, sign_up_data.password)
     assert http_exe.value.status_code == status.HTTP_404_NOT_FOUND
     assert (
         http_exe.value.detail == "User does not exist with given email: test@gmail.com"
@@ -64,14 +68,14 @@ def test_signin_user(mock_session: MockType, test_user: User, sign_up_data: User
     # Test: 2.2 ( Incorrect password )
     mock_session.first.return_value = test_user
     with pytest.raises(HTTPException) as http_exe:
-        signin_user(sign_up_data.email, "test_password")
+        await signin_user(sign_up_data.email, "test_password")
 
     assert http_exe.value.status_code == status.HTTP_401_UNAUTHORIZED
     assert http_exe.value.detail == "Passwords do not match"
 
     # Test: 2.3 ( User not verified )
     with pytest.raises(HTTPException) as http_exe:
-        signin_user(sign_up_data.email, sign_up_data.password)
+        await signin_user(sign_up_data.email, sign_up_data.password)
 
     assert http_exe.value.status_code == status.HTTP_401_UNAUTHORIZED
     assert http_exe.value.detail == "User is not verified"
@@ -79,13 +83,14 @@ def test_signin_user(mock_session: MockType, test_user: User, sign_up_data: User
     # Test: 2.4 ( Successful user signin )
     test_user.is_verified = True
 
-    response = signin_user(sign_up_data.email, sign_up_data.password)
+    response = await signin_user(sign_up_data.email, sign_up_data.password)
     assert response.keys() == {"message", "access_token", "refresh_token"}
     assert response["message"] == "Login successful"
 
 
 # Test: 3
-def test_update_user_verification_status(mock_session: MockType, test_user: User):
+@pytest.mark.asyncio
+async def test_update_user_verification_status(mock_session: MockType, test_user: User):
     """
     Test update_user_verification_status function
     """
@@ -93,7 +98,7 @@ def test_update_user_verification_status(mock_session: MockType, test_user: User
     mock_session.first.return_value = None
 
     with pytest.raises(HTTPException) as http_exe:
-        update_user_verification_status(test_user.email)
+        await update_user_verification_status(test_user.email)
 
     assert http_exe.value.status_code == status.HTTP_404_NOT_FOUND
     assert (
@@ -103,7 +108,7 @@ def test_update_user_verification_status(mock_session: MockType, test_user: User
 
     # Test: 3.2 ( Verify user )
     mock_session.first.return_value = test_user
-    response = update_user_verification_status(user_email=test_user.email)
+    response = await update_user_verification_status(user_email=test_user.email)
     assert response["message"] == "User verified successfully"
 
     assert test_user.is_verified is True
@@ -126,7 +131,8 @@ def test_generate_verification_code():
 
 
 # Test: 5
-def test_get_current_user(
+@pytest.mark.asyncio
+async def test_get_current_user(
     mock_session: MockType, token_data: dict[str, str], test_user: User
 ):
     """
@@ -134,12 +140,13 @@ def test_get_current_user(
     """
     token = create_token(token_data, JWT_SECRET, 15)
     mock_session.first.return_value = test_user
-    user = get_current_user(token)
+    user = await get_current_user(token)
     assert user.model_dump() == test_user.model_dump()
 
 
 # Test: 6
-def test_update_password(
+@pytest.mark.asyncio
+async def test_update_password(
     mock_session: MockType,
     test_user: User,
 ):
@@ -151,7 +158,7 @@ def test_update_password(
     # Test: 6.1 ( User not found )
     mock_session.first.return_value = None
     with pytest.raises(HTTPException) as http_exe:
-        update_password(test_user.user_id, test_user.password, new_password)
+        await update_password(test_user.user_id, test_user.password, new_password)
     assert http_exe.value.status_code == status.HTTP_404_NOT_FOUND
     assert http_exe.value.detail == "User not found"
 
@@ -159,7 +166,7 @@ def test_update_password(
     invalid_password = "short"
     mock_session.first.return_value = test_user
     with pytest.raises(HTTPException) as http_exe:
-        update_password(test_user.user_id, test_user.password, invalid_password)
+        await update_password(test_user.user_id, test_user.password, invalid_password)
     assert http_exe.value.status_code == status.HTTP_400_BAD_REQUEST
     assert (
         http_exe.value.detail
@@ -171,7 +178,7 @@ def test_update_password(
     mock_session.first.return_value = test_user
 
     with pytest.raises(HTTPException) as http_exe:
-        update_password(test_user.user_id, test_user.password, "Password1!")
+        await update_password(test_user.user_id, test_user.password, "Password1!")
     assert http_exe.value.status_code == status.HTTP_400_BAD_REQUEST
     assert (
         http_exe.value.detail == "New password cannot be the same as the old password"
@@ -1,4 +1,5 @@
 # pylint: disable=no-value-for-parameter too-many-lines
+import asyncio
 from datetime import datetime, timezone
 from time import sleep
 from typing import cast
@@ -19,6 +20,7 @@ from sqlalchemy.pool import StaticPool
 from sqlmodel import create_engine
 
 from app.data_layer.database.crud.user_crud import (
+    create_or_update_user_verification,
     get_user_by_attr,
     get_user_verification,
     update_user,
@@ -29,7 +31,6 @@ from app.data_layer.database.db_connections.sqlite import (
 )
 from app.data_layer.database.models.user_model import UserVerification
 from app.routers.authentication.authenticate import (
-    create_or_update_user_verification,
     create_token,
     signup_user,
     update_user_verification_status,
@@ -233,7 +234,7 @@ def test_signin_invalid_email(
     """
     Test the signin functionality with an invalid email.
     """
-    signup_user(sign_up_data)
+    asyncio.run(signup_user(sign_up_data))
     with pytest.raises(HTTPException) as exc:
         client.post(
             "/authentication/signin",
@@ -252,7 +253,7 @@ def test_signin_invalid_password(
     """
     Test the signin functionality with an invalid password.
     """
-    signup_user(sign_up_data)
+    asyncio.run(signup_user(sign_up_data))
     with pytest.raises(HTTPException) as exc:
         client.post(
             "/authentication/signin",
@@ -267,7 +268,7 @@ def test_signin_user_not_verified(
     """
     Test the signin functionality for a user who has not verified their email.
     """
-    signup_user(sign_up_data)
+    asyncio.run(signup_user(sign_up_data))
     with pytest.raises(HTTPException) as exc:
         client.post(
             "/authentication/signin",
@@ -282,8 +283,8 @@ def test_signin_success(
     """
     Test the successful signin functionality.
     """
-    signup_user(sign_up_data)
-    update_user_verification_status(sign_up_data.email)
+    asyncio.run(signup_user(sign_up_data))
+    asyncio.run(update_user_verification_status(sign_up_data.email))
     response = client.post(
         "/authentication/signin",
         json={"email": sign_up_data.email, "password": sign_up_data.password},
@@ -302,7 +303,7 @@ async def test_send_verification_code_invalid_email(
     """
     Test sending a verification code to an invalid email.
     """
-    signup_user(sign_up_data)
+    await signup_user(sign_up_data)
     response = await async_client.post(
         "/authentication/send-verification-code",
         params={"email": "invalid_email"},
@@ -321,8 +322,8 @@ async def test_send_verification_code_already_verified(
     """
     Test sending a verification code to an already verified email.
     """
-    signup_user(sign_up_data)
-    update_user_verification_status(sign_up_data.email)
+    await signup_user(sign_up_data)
+    await update_user_verification_status(sign_up_data.email)
 
     response = await async_client.post(
         "/authentication/send-verification-code",
@@ -341,8 +342,8 @@ async def test_send_verification_code_success(
     """
     Test the successful sending of a verification code.
     """
-    signup_user(sign_up_data)
-    update_user_verification_status(sign_up_data.email, False)
+    await signup_user(sign_up_data)
+    await update_user_verification_status(sign_up_data.email, False)
     response = await async_client.post(
         "/authentication/send-verification-code", params={"email": sign_up_data.email}
     )
@@ -364,7 +365,7 @@ def test_verify_code_invalid_email(
     """
     Test verifying a code with an invalid email.
     """
-    signup_user(sign_up_data)
+    asyncio.run(signup_user(sign_up_data))
     with pytest.raises(HTTPException) as exc:
         client.post(
             "/authentication/verify-code",
@@ -386,7 +387,7 @@ def test_verify_code_invalid_code(
     """
     Test verifying an invalid code.
     """
-    signup_user(sign_up_data)
+    asyncio.run(signup_user(sign_up_data))
     user_verification = UserVerification(
         email=sign_up_data.email,
         verification_code=test_verification_code,
@@ -407,7 +408,7 @@ def test_verify_code_expired(sign_up_data: UserSignup, test_verification_code) -
     """
     Test verifying an expired code.
     """
-    signup_user(sign_up_data)
+    asyncio.run(signup_user(sign_up_data))
     user_verification = UserVerification(
         email=sign_up_data.email,
         verification_code=test_verification_code,
@@ -431,7 +432,7 @@ def test_verify_code_success(sign_up_data: UserSignup, test_verification_code) -
     """
     Test the successful verification of a code.
     """
-    signup_user(sign_up_data)
+    asyncio.run(signup_user(sign_up_data))
     user_verification = UserVerification(
         email=sign_up_data.email,
         verification_code=test_verification_code,
@@ -472,7 +473,7 @@ async def test_send_reset_password_code_success(
     """
     Test the successful sending of a reset password code.
     """
-    signup_user(sign_up_data)
+    await signup_user(sign_up_data)
 
     assert get_user_verification(sign_up_data.email) is None
     response = await async_client.post(
@@ -497,7 +498,7 @@ def test_reset_password_invalid_email(
     """
     Test resetting the password with an invalid email.
     """
-    signup_user(sign_up_data)
+    asyncio.run(signup_user(sign_up_data))
     with pytest.raises(HTTPException) as exc:
         client.post(
             "/authentication/reset-password",
@@ -519,7 +520,7 @@ def test_reset_password_invalid_code(
     """
     Test resetting the password with an invalid verification code.
     """
-    signup_user(sign_up_data)
+    asyncio.run(signup_user(sign_up_data))
     user_verification = UserVerification(
         email=sign_up_data.email,
         verification_code=test_verification_code,
@@ -547,7 +548,7 @@ def test_reset_password_expired_code(
     """
     Test resetting the password with an expired verification code.
     """
-    signup_user(sign_up_data)
+    asyncio.run(signup_user(sign_up_data))
     user_verification = UserVerification(
         email=sign_up_data.email,
         verification_code=test_verification_code,
@@ -575,7 +576,7 @@ def test_reset_password_invalid_password(
     """
     Test resetting the password with an invalid new password.
     """
-    signup_user(sign_up_data)
+    asyncio.run(signup_user(sign_up_data))
     user_verification = UserVerification(
         email=sign_up_data.email,
         verification_code=test_verification_code,
@@ -606,7 +607,7 @@ def test_reset_password_same_as_old(
     """
     Test resetting the password with the same password as the old one.
     """
-    signup_user(sign_up_data)
+    asyncio.run(signup_user(sign_up_data))
     user_verification = UserVerification(
         email=sign_up_data.email,
         verification_code=test_verification_code,
@@ -636,7 +637,7 @@ def test_reset_password_success(
     """
     Test the successful resetting of the password.
     """
-    signup_user(sign_up_data)
+    asyncio.run(signup_user(sign_up_data))
     user_verification = UserVerification(
         email=sign_up_data.email,
         verification_code=test_verification_code,
@@ -672,7 +673,7 @@ def test_change_password_invalid_email(
     """
     Test changing the password with an invalid email.
     """
-    signup_user(sign_up_data)
+    asyncio.run(signup_user(sign_up_data))
     with pytest.raises(HTTPException) as exc:
         client.post(
             "/authentication/change-password",
@@ -695,7 +696,7 @@ def test_change_password_invalid_old_password(
     """
     Test changing the password with an invalid old password.
     """
-    signup_user(sign_up_data)
+    asyncio.run(signup_user(sign_up_data))
     with pytest.raises(HTTPException) as exc:
         client.post(
             "/authentication/change-password",
@@ -714,7 +715,7 @@ def test_change_password_not_verified(
     """
     Test changing the password for a user who has not verified their email.
     """
-    signup_user(sign_up_data)
+    asyncio.run(signup_user(sign_up_data))
     with pytest.raises(HTTPException) as exc:
         client.post(
             "/authentication/change-password",
@@ -737,7 +738,7 @@ def test_change_password_invalid_new_password(
     """
     Test changing the password with an invalid new password.
     """
-    signup_user(sign_up_data)
+    asyncio.run(signup_user(sign_up_data))
     user = get_user_by_attr("email", sign_up_data.email)
     update_user(user.user_id, {"is_verified": True})
     with pytest.raises(HTTPException) as exc:
@@ -763,7 +764,7 @@ def test_change_password_same_as_old(
     """
     Test changing the password with the same password as the old one.
     """
-    signup_user(sign_up_data)
+    asyncio.run(signup_user(sign_up_data))
     user = get_user_by_attr("email", sign_up_data.email)
     update_user(user.user_id, {"is_verified": True})
     with pytest.raises(HTTPException) as exc:
@@ -788,7 +789,7 @@ def test_change_password_success(
     """
     Test the successful changing of the password.
     """
-    signup_user(sign_up_data)
+    asyncio.run(signup_user(sign_up_data))
     user = get_user_by_attr("email", sign_up_data.email)
     update_user(user.user_id, {"is_verified": True})
     response = client.post(
@@ -814,7 +815,7 @@ def test_protected_endpoint_no_token(
     """
     Test accessing a protected endpoint without a token.
     """
-    signup_user(sign_up_data)
+    asyncio.run(signup_user(sign_up_data))
     with pytest.raises(HTTPException) as exc:
         client.get("/authentication/protected-endpoint")
     validate_http_exception(exc, status.HTTP_401_UNAUTHORIZED, "Not authenticated")
@@ -826,7 +827,7 @@ def test_protected_endpoint_missing_token(
     """
     Test accessing a protected endpoint with a missing token.
     """
-    signup_user(sign_up_data)
+    asyncio.run(signup_user(sign_up_data))
     with pytest.raises(HTTPException) as exc:
         client.get(
             "/authentication/protected-endpoint", headers={"Authorization": "Bearer "}
@@ -840,7 +841,7 @@ def test_protected_endpoint_invalid_token(
     """
     Test accessing a protected endpoint with an invalid token.
     """
-    signup_user(sign_up_data)
+    asyncio.run(signup_user(sign_up_data))
     with pytest.raises(HTTPException) as exc:
         client.get(
             "/authentication/protected-endpoint",
@@ -855,7 +856,7 @@ def test_protected_endpoint_expired_token(
     """
     Test accessing a protected endpoint with an expired token.
     """
-    signup_user(sign_up_data)
+    asyncio.run(signup_user(sign_up_data))
     access_token = create_token(
         {
             "email": sign_up_data.email,
@@ -879,8 +880,8 @@ def test_protected_endpoint_success(
     """
     Test the successful access to a protected endpoint.
     """
-    signup_user(sign_up_data)
-    update_user_verification_status(sign_up_data.email)
+    asyncio.run(signup_user(sign_up_data))
+    asyncio.run(update_user_verification_status(sign_up_data.email))
     access_token = create_token(
         {
             "email": sign_up_data.email,
@@ -913,7 +914,7 @@ def test_refresh_token_expired_token(sign_up_data: UserSignup) -> None:
     """
     Test refreshing the token with an expired refresh token.
     """
-    signup_user(sign_up_data)
+    asyncio.run(signup_user(sign_up_data))
     refresh_token = create_token(
         {
             "email": sign_up_data.email,
@@ -950,7 +951,7 @@ def test_refresh_token_with_invalid_user(sign_up_data: UserSignup) -> None:
     """
     Test refreshing the token with an invalid user.
     """
-    signup_user(sign_up_data)
+    asyncio.run(signup_user(sign_up_data))
     refresh_token = create_token(
         {
             "email": "invalid_email",
@@ -968,7 +969,7 @@ def test_refresh_token_success(sign_up_data: UserSignup) -> None:
     """
     Test the successful refreshing of the token.
     """
-    signup_user(sign_up_data)
+    asyncio.run(signup_user(sign_up_data))
     refresh_token = create_token(
         {
             "email": sign_up_data.email,
@@ -993,7 +994,7 @@ async def test_rate_limiter_send_verification_code(
     """
     Test the rate limiter for the send verification code endpoint.
     """
-    signup_user(sign_up_data)
+    await signup_user(sign_up_data)
     failed_attempts = 0
     for _ in range(5):
         response = await async_client.post(
@@ -1020,7 +1021,7 @@ async def test_rate_limiter_send_password_reset_code(
     """
     Test the rate limiter for the send password reset code endpoint.
     """
-    signup_user(sign_up_data)
+    await signup_user(sign_up_data)
     failed_attempts = 0
     for _ in range(5):
         response = await async_client.post(
@@ -1038,3 +1039,55 @@ async def test_rate_limiter_send_password_reset_code(
             failed_attempts += 1
 
     assert failed_attempts == 4
+
+
+@pytest.mark.asyncio
+async def test_routes_with_async_database(
+    async_client: AsyncClient,
+    sign_up_data: UserSignup,
+    mock_notification_provider,
+    monkeypatch: MonkeyPatch,
+) -> None:
+    """
+    Test the routes with the async session of the database, if the async sqlite
+    driver is installed.
+    """
+    pytest.importorskip("aiosqlite")
+    # pylint: disable=import-outside-toplevel
+    from sqlalchemy.ext.asyncio import create_async_engine
+    from sqlmodel import SQLModel
+
+    from app.data_layer.database.crud.user_crud import get_user_by_attr_async
+    from app.data_layer.database.db_connections import postgresql
+
+    engine = create_async_engine("sqlite+aiosqlite:///:memory:", poolclass=StaticPool)
+    async with engine.begin() as connection:
+        await connection.run_sync(SQLModel.metadata.create_all)
+
+    monkeypatch.setattr(postgresql, "is_async_driver_available", lambda: True)
+    monkeypatch.setattr(postgresql, "get_async_engine", lambda: engine)
+
+    response = await async_client.post(
+        "/authentication/signup", json=sign_up_data.dict()
+    )
+    assert response.status_code == 201
+
+    response = await async_client.post(
+        "/authentication/send-verification-code",
+        params={"email": sign_up_data.email},
+    )
+    validate_verification_code_sent(
+        response, sign_up_data.email, mock_notification_provider
+    )
+
+    # The rows are saved with the async session, not the synchronous one
+    async with postgresql.get_async_session(engine) as session:
+        user = await get_user_by_attr_async(
+            "email", sign_up_data.email, session=session
+        )
+    assert user is not None
+    assert user.username == sign_up_data.username
+    with pytest.raises(HTTPException):
+        get_user_by_attr("email", sign_up_data.email)
+
+    await engine.dispose()
@@ -24,14 +24,15 @@ def test_create_token(token_data: dict[str, str]):
 
 
 # Test: 2
-def test_access_token_from_refresh_token(
+@pytest.mark.asyncio
+async def test_access_token_from_refresh_token(
     token_data: dict[str, str], mock_session: MockType
 ):
     """
     Test access_token_from_refresh_token function
     """
     refresh_token = create_token(token_data, JWT_REFRESH_SECRET, 15)
-    tokens = access_token_from_refresh_token(refresh_token)
+    tokens = await access_token_from_refresh_token(refresh_token)
     assert "access_token" in tokens
     assert "refresh_token" in tokens
 
@@ -41,7 +42,7 @@ def test_access_token_from_refresh_token(
     mock_session.first.return_value = None
 
     with pytest.raises(HTTPException) as exc:
-        access_token_from_refresh_token(dummy_token)
+        await access_token_from_refresh_token(dummy_token)
 
     assert exc.value.detail == "User not found"
 